@@ -0,0 +1,56 @@
+from flask import Response
+from pydantic import ValidationError as PydanticValidationError
+
+from api.decorators import admin_endpoint
+from dto.export_api import ExportQueryDTO, MembershipExportQueryDTO, ParticipantExportQueryDTO
+from services.core.export_service import ExportService, ExportStream
+from utils.http_responses import handle_pydantic_error, handle_service_error
+
+export_service = ExportService()
+
+
+def _stream_response(export: ExportStream):
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export.filename}"',
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",
+        # Cross-origin il browser nasconde Content-Disposition al fetch se non esposto.
+        "Access-Control-Expose-Headers": "Content-Disposition",
+    }
+    return Response(export.chunks, mimetype=export.mimetype, headers=headers), 200
+
+
+@admin_endpoint(methods=("GET",))
+def admin_export_participants(req):
+    """Admin: export partecipanti di un evento. Query: event_id, format (csv|ndjson), columns"""
+    try:
+        dto = ParticipantExportQueryDTO.model_validate(dict(req.args or {}))
+        return _stream_response(export_service.export_participants(dto))
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        return handle_service_error(err)
+
+
+@admin_endpoint(methods=("GET",))
+def admin_export_memberships(req):
+    """Admin: export soci (opzionale year). Query: year, format (csv|ndjson), columns"""
+    try:
+        dto = MembershipExportQueryDTO.model_validate(dict(req.args or {}))
+        return _stream_response(export_service.export_memberships(dto))
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        return handle_service_error(err)
+
+
+@admin_endpoint(methods=("GET",))
+def admin_export_purchases(req):
+    """Admin: export acquisti. Query: format (csv|ndjson), columns"""
+    try:
+        dto = ExportQueryDTO.model_validate(dict(req.args or {}))
+        return _stream_response(export_service.export_purchases(dto))
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        return handle_service_error(err)
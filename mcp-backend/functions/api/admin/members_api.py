@@ -29,6 +29,8 @@ merge_service = MergeService()
 def get_memberships(req):
     try:
         dto = MembershipListQueryDTO.model_validate(dict(req.args or {}))
+        if dto.paginated:
+            return jsonify(memberships_service.get_page(dto, year=dto.year).to_payload()), 200
         payload = memberships_service.get_all(year=dto.year)
         return jsonify([item.to_payload() for item in payload]), 200
     except PydanticValidationError as err:
@@ -3,6 +3,7 @@ from pydantic import ValidationError as PydanticValidationError
 
 from api.decorators import admin_endpoint
 from dto.message_api import MessageIdRequestDTO, ReplyMessageRequestDTO
+from dto.pagination import PageQueryDTO
 from services.communications.messages_service import MessagesService
 from utils.http_responses import handle_pydantic_error, handle_service_error
 
@@ -11,6 +12,9 @@ messages_service = MessagesService()
 @admin_endpoint(methods=("GET",))
 def get_messages(req):
     try:
+        dto = PageQueryDTO.model_validate(dict(req.args or {}))
+        if dto.paginated:
+            return jsonify(messages_service.get_page(dto).to_payload()), 200
         payload = messages_service.get_all()
         return jsonify([item.to_payload() for item in payload]), 200
     except PydanticValidationError as err:
@@ -9,6 +9,7 @@ from dto.newsletter_api import (
     NewsletterLookupQueryDTO,
     NewsletterUpdateRequestDTO,
 )
+from dto.pagination import PageQueryDTO
 from services.communications.newsletter_service import NewsletterService
 from utils.http_responses import handle_pydantic_error, handle_service_error
 from utils.safe_logging import redact_sensitive
@@ -24,6 +25,8 @@ def admin_get_newsletter_signups(req):
         dto = NewsletterLookupQueryDTO.model_validate(dict(req.args or {}))
         if dto.id:
             payload = newsletter_service.get_signup_by_id(dto.id)
+        elif dto.paginated:
+            payload = newsletter_service.get_signups_page(dto)
         else:
             payload = newsletter_service.get_all_signups()
         return jsonify(payload.to_payload()), 200
@@ -66,8 +69,14 @@ def admin_delete_newsletter_signup(req):
 def admin_get_newsletter_consents(req):
     logger.debug("admin_get_newsletter_consents called")
     try:
-        payload = newsletter_service.get_all_consents()
+        dto = PageQueryDTO.model_validate(dict(req.args or {}))
+        if dto.paginated:
+            payload = newsletter_service.get_consents_page(dto)
+        else:
+            payload = newsletter_service.get_all_consents()
         return jsonify(payload.to_payload()), 200
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
     except Exception as err:
         logger.error("[admin_get_newsletter_consents] %s", redact_sensitive(str(err)))
         return handle_service_error(err)
@@ -4,7 +4,7 @@ from pydantic import ValidationError as PydanticValidationError
 from api.decorators import admin_endpoint
 from dto.participant_api import (
     ParticipantCreateRequestDTO,
-    ParticipantEventRequestDTO,
+    ParticipantListRequestDTO,
     ParticipantLookupRequestDTO,
     ParticipantUpdateRequestDTO,
     SendLocationRequestDTO,
@@ -24,7 +24,9 @@ participants_service = ParticipantsService()
 def get_participants_by_event(req):
     """Admin: get participants for an event"""
     try:
-        dto = ParticipantEventRequestDTO.model_validate(req.get_json(silent=True) or {})
+        dto = ParticipantListRequestDTO.model_validate(req.get_json(silent=True) or {})
+        if dto.paginated:
+            return jsonify(participants_service.get_page(dto.event_id, dto).to_payload()), 200
         payload = participants_service.get_all(dto.event_id)
         return jsonify([item.to_payload() for item in payload]), 200
     except PydanticValidationError as err:
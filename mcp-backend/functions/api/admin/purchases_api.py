@@ -2,6 +2,7 @@ from flask import jsonify
 from pydantic import ValidationError as PydanticValidationError
 
 from api.decorators import admin_endpoint
+from dto.pagination import PageQueryDTO
 from dto.purchase import (
     CreatePurchaseRequestDTO,
     PurchaseIdRequestDTO,
@@ -18,8 +19,13 @@ purchases_service = PurchasesService()
 @admin_endpoint(methods=("GET",))
 def get_all_purchases(req):
     try:
+        dto = PageQueryDTO.model_validate(dict(req.args or {}))
+        if dto.paginated:
+            return jsonify(purchases_service.get_page(dto).to_payload()), 200
         payload = purchases_service.get_all()
         return jsonify([purchase.to_payload() for purchase in payload]), 200
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
     except Exception as err:
         return handle_service_error(err)
 
@@ -4,7 +4,7 @@ from flask import jsonify
 from pydantic import ValidationError as PydanticValidationError
 
 from api.decorators import admin_endpoint
-from dto.analytics_api import EventAnalyticsQueryDTO, MembershipTrendQueryDTO
+from dto.analytics_api import AttendanceCohortsQueryDTO, EventAnalyticsQueryDTO, MembershipTrendQueryDTO
 from dto.stats_api import EventSnapshotQueryDTO, RebuildAnalyticsRequestDTO
 from services.core.analytics_service import AnalyticsService
 from services.core.analytics_snapshot_service import AnalyticsSnapshotService
@@ -115,6 +115,19 @@ def admin_get_audience_retention(req):
         return handle_service_error(err)
 
 
+@admin_endpoint(methods=("GET",))
+def admin_get_attendance_cohorts(req):
+    try:
+        dto = AttendanceCohortsQueryDTO.model_validate(dict(req.args or {}))
+        result = analytics_service.get_attendance_cohorts(dto.last_events, dto.min_attended)
+        return jsonify(result.model_dump(by_alias=True)), 200
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        logger.error("[admin_get_attendance_cohorts] %s", redact_sensitive(str(err)))
+        return handle_service_error(err)
+
+
 @admin_endpoint(methods=("GET",))
 def admin_get_revenue_breakdown(req):
     try:
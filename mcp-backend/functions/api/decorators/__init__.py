@@ -12,11 +12,12 @@ from services.core.auth_service import require_admin
 from .active_event import require_active_event
 
 
-def public_endpoint(*, methods: Iterable[str]):
+def public_endpoint(*, methods: Iterable[str], **options):
+    """``options`` passa al deploy della function (es. ``timeout_sec``, ``concurrency``)."""
     allowed_methods = tuple(method.upper() for method in methods)
 
     def decorator(handler: Callable):
-        @https_fn.on_request(cors=cors, region=region)
+        @https_fn.on_request(cors=cors, region=region, **options)
         @wraps(handler)
         def wrapped(req, *args, **kwargs):
             if req.method.upper() not in allowed_methods:
@@ -28,11 +29,12 @@ def public_endpoint(*, methods: Iterable[str]):
     return decorator
 
 
-def admin_endpoint(*, methods: Iterable[str]):
+def admin_endpoint(*, methods: Iterable[str], **options):
+    """Come ``public_endpoint``, con verifica del claim admin."""
     allowed_methods = tuple(method.upper() for method in methods)
 
     def decorator(handler: Callable):
-        @https_fn.on_request(cors=cors, region=region)
+        @https_fn.on_request(cors=cors, region=region, **options)
         @require_admin
         @wraps(handler)
         def wrapped(req, *args, **kwargs):
@@ -2,15 +2,18 @@ from functools import wraps
 
 from flask import jsonify
 
-from config.firebase_config import db
+from repositories.event_repository import EventRepository
 from utils.events_utils import ensure_event_is_active
 
+# Condiviso con EventPaymentService/ticket_service tramite la cache eventi del repository.
+_event_repository = EventRepository()
+
 
 def require_active_event(handler):
     """
     Validates that the incoming request is targeting an active/future event.
     Expects the request payload to contain a cart with a single item that
-    includes the `eventId`. Injects the payload and event data onto the
+    includes the `eventId`. Injects the payload and the event model onto the
     request object so downstream handlers can reuse them without refetching.
     """
 
@@ -32,18 +35,17 @@ def require_active_event(handler):
         if not event_id:
             return jsonify({"error": "Missing eventId"}), 400
 
-        event_snapshot = db.collection("events").document(event_id).get()
-        if not event_snapshot.exists:
+        event_model = _event_repository.get_model(event_id)
+        if event_model is None:
             return jsonify({"error": "Evento non trovato"}), 404
 
-        event_data = event_snapshot.to_dict() or {}
         try:
-            ensure_event_is_active(event_data)
+            ensure_event_is_active(event_model)
         except ValueError as exc:
             return jsonify({"error": "validation_error", "message": str(exc)}), 400
 
         setattr(req, "event_payload", payload)
-        setattr(req, "event_data", event_data)
+        setattr(req, "event_model", event_model)
         setattr(req, "event_id", event_id)
         setattr(req, "json_data", payload)
 
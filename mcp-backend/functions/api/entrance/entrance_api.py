@@ -5,9 +5,15 @@ from pydantic import ValidationError as PydanticValidationError
 
 from api.decorators import admin_endpoint, public_endpoint
 from dto.entrance_api import (
+    LIVE_STATS_MAX_WAIT_SECONDS,
+    AdminLiveStatsQueryDTO,
     DeactivateScanTokenRequestDTO,
     GenerateScanTokenRequestDTO,
+    LiveStatsQueryDTO,
     ManualEntryRequestDTO,
+    ScannerManifestQueryDTO,
+    SyncOfflineScansRequestDTO,
+    ValidateEntryBatchRequestDTO,
     ValidateEntryRequestDTO,
     VerifyScanTokenQueryDTO,
 )
@@ -18,6 +24,16 @@ from utils.safe_logging import redact_sensitive
 logger = logging.getLogger("EntranceAPI")
 entrance_service = EntranceService()
 
+# Il long-poll tiene la richiesta aperta fino a LIVE_STATS_MAX_WAIT_SECONDS senza usare CPU:
+# una vCPU intera abilita la concorrenza (con CPU frazionaria Cloud Run forza 1 richiesta
+# per istanza, quindi ogni scanner in attesa occuperebbe un'istanza) e il timeout lascia
+# margine oltre l'attesa massima.
+LIVE_STATS_FUNCTION_OPTIONS = {
+    "cpu": 1,
+    "concurrency": 80,
+    "timeout_sec": LIVE_STATS_MAX_WAIT_SECONDS + 35,
+}
+
 
 @admin_endpoint(methods=("POST",))
 def entrance_generate_scan_token(req):
@@ -88,3 +104,77 @@ def entrance_validate(req):
         return handle_pydantic_error(err)
     except Exception as err:
         return handle_service_error(err)
+
+
+@public_endpoint(methods=("POST",))
+def entrance_validate_batch(req):
+    try:
+        # Ingressi di gruppo / scanner multipli: N tessere con un solo token, un solo payload di contatori.
+        dto = ValidateEntryBatchRequestDTO.model_validate(req.get_json(silent=True) or {})
+        payload = entrance_service.validate_entries(dto)
+        status = 401 if payload.result == "invalid_token" else 200
+        return jsonify(payload.to_payload()), status
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        logger.error("[entrance_validate_batch] %s", redact_sensitive(str(err)))
+        return handle_service_error(err)
+
+
+@public_endpoint(methods=("GET",))
+def entrance_scanner_manifest(req):
+    try:
+        # Scarica il manifest dell'evento per la validazione offline; con `version` invariata torna solo i contatori.
+        dto = ScannerManifestQueryDTO.model_validate(dict(req.args or {}))
+        payload = entrance_service.get_scanner_manifest(dto)
+        status = 200 if payload.valid else 401
+        return jsonify(payload.to_payload()), status
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        logger.error("[entrance_scanner_manifest] %s", redact_sensitive(str(err)))
+        return handle_service_error(err)
+
+
+@public_endpoint(methods=("POST",))
+def entrance_sync_scans(req):
+    try:
+        # Upload degli scan raccolti offline: ogni voce riceve lo stesso result di entrance_validate.
+        dto = SyncOfflineScansRequestDTO.model_validate(req.get_json(silent=True) or {})
+        payload = entrance_service.sync_offline_scans(dto)
+        status = 401 if payload.result == "invalid_token" else 200
+        return jsonify(payload.to_payload()), status
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        logger.error("[entrance_sync_scans] %s", redact_sensitive(str(err)))
+        return handle_service_error(err)
+
+
+@public_endpoint(methods=("GET",), **LIVE_STATS_FUNCTION_OPTIONS)
+def entrance_live_stats(req):
+    try:
+        # Long-poll per gli scanner: con `cursor` risponde al primo ingresso successivo o allo scadere di `wait`.
+        dto = LiveStatsQueryDTO.model_validate(dict(req.args or {}))
+        payload = entrance_service.get_live_stats(dto)
+        status = 200 if payload.valid else 401
+        return jsonify(payload.to_payload()), status
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        logger.error("[entrance_live_stats] %s", redact_sensitive(str(err)))
+        return handle_service_error(err)
+
+
+@admin_endpoint(methods=("GET",), **LIVE_STATS_FUNCTION_OPTIONS)
+def entrance_admin_live_stats(req):
+    try:
+        # Stesso feed per la dashboard organizzatore, per event_id.
+        dto = AdminLiveStatsQueryDTO.model_validate(dict(req.args or {}))
+        payload = entrance_service.get_admin_live_stats(dto)
+        return jsonify(payload.to_payload()), 200
+    except PydanticValidationError as err:
+        return handle_pydantic_error(err)
+    except Exception as err:
+        logger.error("[entrance_admin_live_stats] %s", redact_sensitive(str(err)))
+        return handle_service_error(err)
@@ -3,7 +3,6 @@ from pydantic import ValidationError as PydanticValidationError
 
 from api.decorators import public_endpoint, require_active_event
 from dto.preorder import OrderCaptureDTO, PreOrderDTO
-from models import Event
 from services.payments.event_payment_service import EventPaymentService
 from utils.http_responses import handle_pydantic_error, handle_service_error
 
@@ -16,11 +15,9 @@ event_payment_service = EventPaymentService()
 def create_order_event(req):
     try:
         req_json = getattr(req, "event_payload", None) or req.get_json(silent=True) or {}
-        event_data = getattr(req, "event_data", None) or {}
-        event_id = getattr(req, "event_id", None)
+        event_model = getattr(req, "event_model", None)
 
         order_dto = PreOrderDTO.model_validate(req_json)
-        event_model = Event.from_firestore(event_data, event_id) if event_data and event_id else None
 
         payload = event_payment_service.create_order_event(order_dto, event_model)
         return jsonify(payload.to_payload()), 201
@@ -0,0 +1,79 @@
+"""Client HTTP raw per Genderize: niente cache ne' normalizzazione, solo chiamate e parsing."""
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+import requests
+
+from config.external_services import GENDER_API_KEY, GENDER_API_URL
+from services.core.error_logs_service import log_external_error
+from utils.safe_logging import redact_sensitive
+
+logger = logging.getLogger("genderize_client")
+
+# Genderize accetta al massimo 10 nomi per richiesta (``name[]=...`` ripetuto).
+GENDERIZE_MAX_NAMES = 10
+GENDERIZE_TIMEOUT_SECONDS = 3
+
+# Sessione condivisa: le istanze calde riusano la connessione TLS tra un trigger e l'altro.
+_session = requests.Session()
+
+
+@dataclass(frozen=True)
+class GenderizeApiResult:
+    status_code: int
+    payload: Optional[List[Any]] = None
+    error_message: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+
+class GenderizeRoutes:
+    @classmethod
+    def lookup(
+        cls,
+        names: Sequence[str],
+        timeout: float = GENDERIZE_TIMEOUT_SECONDS,
+    ) -> GenderizeApiResult:
+        """Una richiesta per al massimo ``GENDERIZE_MAX_NAMES`` nomi; il payload e' sempre una lista."""
+        if len(names) > GENDERIZE_MAX_NAMES:
+            raise ValueError(f"Genderize accepts at most {GENDERIZE_MAX_NAMES} names per request")
+        params = [("name[]", name) for name in names]
+        if GENDER_API_KEY:
+            params.append(("apikey", GENDER_API_KEY))
+        try:
+            response = _session.get(GENDER_API_URL, params=params, timeout=timeout)
+        except Exception as exc:
+            log_external_error(
+                service="Genderize",
+                operation="lookup",
+                source="clients.genderize_client.lookup",
+                message=str(exc),
+                status_code=0,
+                context={"names": len(names)},
+            )
+            raise
+
+        try:
+            payload = response.json()
+        except Exception:
+            payload = response.text
+
+        if response.status_code >= 400:
+            error_message = str(redact_sensitive(payload.get("error") if isinstance(payload, dict) else payload))
+            log_external_error(
+                service="Genderize",
+                operation="lookup",
+                source="clients.genderize_client.lookup",
+                message=error_message,
+                status_code=response.status_code,
+                context={"names": len(names)},
+            )
+            return GenderizeApiResult(status_code=response.status_code, error_message=error_message)
+
+        if isinstance(payload, dict):
+            payload = [payload]
+        logger.info("lookup: names=%d status=%d", len(names), response.status_code)
+        return GenderizeApiResult(status_code=response.status_code, payload=payload if isinstance(payload, list) else [])
@@ -0,0 +1,20 @@
+# Rebuild analytics: un solo documento job per scope (e per evento), quindi le
+# richieste ravvicinate confluiscono nello stesso job invece di accodarne di nuovi.
+
+# Finestra di debounce: il job parte solo dopo ANALYTICS_EVENT_DEBOUNCE_SECONDS
+# dalla prima richiesta, le scritture arrivate nel frattempo non ne creano altri.
+ANALYTICS_EVENT_DEBOUNCE_SECONDS = 60
+ANALYTICS_GLOBAL_DEBOUNCE_SECONDS = 60
+
+# Global e dashboard leggono tutte le collection: al massimo una rebuild ogni N minuti.
+ANALYTICS_GLOBAL_MIN_INTERVAL_MINUTES = 10
+
+# Un job "running" fermo da piu' di cosi' e' considerato perso e viene riprogrammato.
+ANALYTICS_JOB_STALE_AFTER_MINUTES = 15
+
+# I trigger Firestore sono at-least-once: il marker della delivery applicata resta
+# abbastanza da coprire le riconsegne, poi lo elimina la TTL policy su expires_at.
+ANALYTICS_APPLIED_TTL_DAYS = 7
+
+# Cadenza del dispatcher che mette in coda i job programmati arrivati a scadenza.
+ANALYTICS_DISPATCH_SCHEDULE = "* * * * *"
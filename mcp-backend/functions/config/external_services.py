@@ -6,6 +6,7 @@ GMAIL_TOKEN_URL = os.environ.get("GMAIL_TOKEN_URL", "https://oauth2.googleapis.c
 SOUNDCLOUD_CLIENT_ID = os.environ.get("SOUNDCLOUD_CLIENT_ID")
 SOUNDCLOUD_CLIENT_SECRET = os.environ.get("SOUNDCLOUD_CLIENT_SECRET")
 GENDER_API_URL = os.environ.get("GENDER_API_URL", "https://api.genderize.io")
+GENDER_API_KEY = os.environ.get("GENDER_API_KEY")
 
 
 PASS2U_API_KEY = os.environ.get("PASS2U_API_KEY")
@@ -25,6 +26,7 @@ __all__ = [
     "SOUNDCLOUD_CLIENT_ID",
     "SOUNDCLOUD_CLIENT_SECRET",
     "GENDER_API_URL",
+    "GENDER_API_KEY",
     "PASS2U_API_KEY",
     "PASS2U_BASE_URL",
     "SENDER_API_KEY",
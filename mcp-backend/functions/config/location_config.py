@@ -1,4 +1,17 @@
-LOCATION_MIN_INTERVAL = 0.8
 LOCATION_MAX_RETRIES = 5
 LOCATION_BASE_DELAY = 1.0
 LOCATION_MAX_DELAY = 30.0
+
+# Dispatcher invio massivo: il token bucket va allineato alla quota MailerSend del piano.
+LOCATION_SEND_WORKERS = 4
+LOCATION_SEND_RATE_PER_SECOND = 2.0
+LOCATION_SEND_BURST = 4
+
+# Cadenza di flush di progresso job e flag location_sent (la prima soglia raggiunta).
+LOCATION_PROGRESS_EVERY = 50
+LOCATION_PROGRESS_INTERVAL = 5.0
+
+# Ogni invocazione del trigger processa al massimo LOCATION_CHUNK_SIZE partecipanti
+# e poi rimette il job in coda: deve restare sotto il timeout della function.
+LOCATION_CHUNK_SIZE = 300
+LOCATION_JOB_TIMEOUT_SEC = 540
@@ -0,0 +1,15 @@
+import os
+
+# Risorse della function che genera i biglietti in batch. os.cpu_count() vede le CPU
+# dell'host, non le vCPU assegnate all'istanza: il pool si dimensiona solo da qui.
+# Con i valori di default (1 vCPU) il batch e' renderizzato in linea nel processo
+# principale, riusando comunque font e foglio di stile parsati una volta.
+PDF_BATCH_VCPU = int(os.environ.get("PDF_BATCH_VCPU", "1"))
+PDF_BATCH_MEMORY_MB = int(os.environ.get("PDF_BATCH_MEMORY_MB", "512"))
+
+# Ogni worker spawn reimporta l'app (client Firebase, WeasyPrint): memoria stimata per worker.
+PDF_WORKER_MEMORY_MB = 256
+PDF_BATCH_MAX_WORKERS = 4
+
+# Sotto soglia lo spawn dei worker costa piu' del rendering in linea.
+PDF_BATCH_POOL_THRESHOLD = 16
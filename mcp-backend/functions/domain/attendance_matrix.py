@@ -0,0 +1,232 @@
+"""
+Matrice presenze membership x evento, salvata come un unico blob compatto.
+
+Ogni evento ha un ordinale stabile (ordine di inserimento) e ogni membership
+una riga: un intero Python usato come bitset, con il bit ``i`` acceso se la
+membership ha partecipato all'evento con ordinale ``i``. Retention, coorti e
+churn diventano AND/popcount su interi invece di una query per evento storico.
+
+L'ordine cronologico non dipende dagli ordinali: si ricava da ``event_dates``,
+quindi aggiungere un evento non sposta i bit gia' scritti.
+"""
+
+from __future__ import annotations
+
+import zlib
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PAYLOAD_VERSION = 1
+
+
+class AttendanceMatrix:
+    def __init__(
+        self,
+        events: Optional[List[str]] = None,
+        event_dates: Optional[List[Optional[str]]] = None,
+        rows: Optional[Dict[str, int]] = None,
+    ):
+        self.events: List[str] = list(events or [])
+        self.event_dates: List[Optional[str]] = list(event_dates or [None] * len(self.events))
+        self.rows: Dict[str, int] = dict(rows or {})
+        self._ordinals = {event_id: index for index, event_id in enumerate(self.events)}
+
+    # ---- Costruzione e aggiornamento ------------------------------------
+    @classmethod
+    def build(
+        cls,
+        events: Iterable[Tuple[str, Optional[date]]],
+        attendance: Dict[str, Iterable[str]],
+    ) -> "AttendanceMatrix":
+        matrix = cls()
+        for event_id, event_date in events:
+            matrix.ensure_event(event_id, event_date)
+        for membership_id, event_ids in attendance.items():
+            for event_id in event_ids:
+                if event_id in matrix._ordinals:
+                    matrix.add(membership_id, event_id)
+        return matrix
+
+    def ensure_event(self, event_id: str, event_date: Optional[date] = None) -> int:
+        ordinal = self._ordinals.get(event_id)
+        if ordinal is None:
+            ordinal = len(self.events)
+            self.events.append(event_id)
+            self.event_dates.append(event_date.isoformat() if event_date else None)
+            self._ordinals[event_id] = ordinal
+        elif event_date and self.event_dates[ordinal] != event_date.isoformat():
+            self.event_dates[ordinal] = event_date.isoformat()
+        return ordinal
+
+    def has_event(self, event_id: str) -> bool:
+        return event_id in self._ordinals
+
+    def add(self, membership_id: str, event_id: str, event_date: Optional[date] = None) -> bool:
+        bit = 1 << self.ensure_event(event_id, event_date)
+        row = self.rows.get(membership_id, 0)
+        if row & bit:
+            return False
+        self.rows[membership_id] = row | bit
+        return True
+
+    def remove(self, membership_id: str, event_id: str) -> bool:
+        ordinal = self._ordinals.get(event_id)
+        row = self.rows.get(membership_id, 0)
+        if ordinal is None or not row & (1 << ordinal):
+            return False
+        row &= ~(1 << ordinal)
+        if row:
+            self.rows[membership_id] = row
+        else:
+            del self.rows[membership_id]
+        return True
+
+    def set_event_members(
+        self,
+        event_id: str,
+        membership_ids: Iterable[str],
+        event_date: Optional[date] = None,
+    ) -> bool:
+        """Riscrive la colonna di ``event_id``: acceso solo per ``membership_ids``. True se cambia qualcosa."""
+        before = (list(self.events), list(self.event_dates))
+        bit = 1 << self.ensure_event(event_id, event_date)
+        members = set(membership_ids)
+        changed = before != (self.events, self.event_dates)
+        for membership_id in list(self.rows):
+            if membership_id not in members and self.rows[membership_id] & bit:
+                changed = self.remove(membership_id, event_id) or changed
+        for membership_id in members:
+            changed = self.add(membership_id, event_id) or changed
+        return changed
+
+    def attended(self, membership_id: str, event_id: str) -> bool:
+        ordinal = self._ordinals.get(event_id)
+        return ordinal is not None and bool(self.rows.get(membership_id, 0) & (1 << ordinal))
+
+    # ---- Maschere ---------------------------------------------------------
+    def chronological(self) -> List[int]:
+        """Ordinali degli eventi con data, dal piu' vecchio al piu' recente."""
+        dated = [(value, ordinal) for ordinal, value in enumerate(self.event_dates) if value]
+        return [ordinal for _, ordinal in sorted(dated)]
+
+    def mask_before(self, event_id: str) -> int:
+        ordinal = self._ordinals.get(event_id)
+        current = self.event_dates[ordinal] if ordinal is not None else None
+        if not current:
+            return 0
+        mask = 0
+        for index, value in enumerate(self.event_dates):
+            if value and value < current:
+                mask |= 1 << index
+        return mask
+
+    def mask_last(self, count: int) -> int:
+        mask = 0
+        for ordinal in self.chronological()[-count:] if count > 0 else []:
+            mask |= 1 << ordinal
+        return mask
+
+    # ---- Statistiche --------------------------------------------------------
+    def retention(self, event_id: str, total: int) -> Dict[str, int]:
+        """
+        Classifica i partecipanti di ``event_id`` per eventi precedenti frequentati.
+        ``total`` include chi non ha membership (sempre "prima volta").
+        """
+        output = {"total": total, "first_time": 0, "second_third": 0, "four_plus": 0}
+        ordinal = self._ordinals.get(event_id)
+        if ordinal is not None:
+            bit = 1 << ordinal
+            before = self.mask_before(event_id)
+            for row in self.rows.values():
+                if not row & bit:
+                    continue
+                previous = (row & before).bit_count()
+                if previous == 0:
+                    continue
+                output["second_third" if previous <= 2 else "four_plus"] += 1
+        output["first_time"] = max(total - output["second_third"] - output["four_plus"], 0)
+        return output
+
+    def attended_at_least(self, min_attended: int, last_events: int) -> int:
+        """Membership presenti ad almeno ``min_attended`` degli ultimi ``last_events`` eventi."""
+        mask = self.mask_last(last_events)
+        return sum(1 for row in self.rows.values() if (row & mask).bit_count() >= min_attended)
+
+    def churned(self, last_events: int) -> int:
+        """Membership con presenze passate ma nessuna negli ultimi ``last_events`` eventi."""
+        mask = self.mask_last(last_events)
+        return sum(1 for row in self.rows.values() if row and not row & mask)
+
+    def cohorts(self) -> List[Dict[str, object]]:
+        """
+        Una coorte per evento di prima presenza. ``curve[k]`` e' la percentuale della
+        coorte presente al k-esimo evento successivo (in ordine cronologico).
+        """
+        order = self.chronological()
+        position = {ordinal: index for index, ordinal in enumerate(order)}
+        dated_mask = 0
+        for ordinal in order:
+            dated_mask |= 1 << ordinal
+
+        members_by_cohort: Dict[int, List[int]] = {}
+        for row in self.rows.values():
+            dated = row & dated_mask
+            if not dated:
+                continue
+            first = min(position[ordinal] for ordinal in self._bits(dated))
+            members_by_cohort.setdefault(first, []).append(row)
+
+        output = []
+        for first in sorted(members_by_cohort):
+            rows = members_by_cohort[first]
+            size = len(rows)
+            curve = []
+            for ordinal in order[first + 1:]:
+                bit = 1 << ordinal
+                present = sum(1 for row in rows if row & bit)
+                curve.append(round(present / size * 100, 1))
+            event_ordinal = order[first]
+            output.append(
+                {
+                    "event_id": self.events[event_ordinal],
+                    "event_date": self.event_dates[event_ordinal],
+                    "size": size,
+                    "curve": curve,
+                }
+            )
+        return output
+
+    @staticmethod
+    def _bits(value: int) -> Iterable[int]:
+        while value:
+            lowest = value & -value
+            yield lowest.bit_length() - 1
+            value ^= lowest
+
+    # ---- Serializzazione ---------------------------------------------------
+    def to_payload(self) -> Dict[str, object]:
+        width = max((len(self.events) + 7) // 8, 1)
+        members = sorted(self.rows)
+        packed = b"".join(self.rows[membership_id].to_bytes(width, "little") for membership_id in members)
+        return {
+            "version": PAYLOAD_VERSION,
+            "events": list(self.events),
+            "event_dates": list(self.event_dates),
+            "members": zlib.compress("\n".join(members).encode("utf-8")),
+            "bits": zlib.compress(packed),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Optional[Dict[str, object]]) -> Optional["AttendanceMatrix"]:
+        if not payload or payload.get("version") != PAYLOAD_VERSION:
+            return None
+        events = list(payload.get("events") or [])
+        raw_members = zlib.decompress(bytes(payload.get("members") or zlib.compress(b""))).decode("utf-8")
+        members = raw_members.split("\n") if raw_members else []
+        packed = zlib.decompress(bytes(payload.get("bits") or zlib.compress(b"")))
+        width = max((len(events) + 7) // 8, 1)
+        rows = {
+            membership_id: int.from_bytes(packed[index * width:(index + 1) * width], "little")
+            for index, membership_id in enumerate(members)
+        }
+        return cls(events=events, event_dates=list(payload.get("event_dates") or []), rows=rows)
@@ -4,19 +4,16 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Protocol, Set, Tuple, Union
 
-import requests
-
-from config.external_services import GENDER_API_URL
 from domain.membership_rules import membership_matches_year
 from interfaces.repositories import MembershipRepositoryProtocol, ParticipantRepositoryProtocol
 from models import Event, Membership
 from repositories.membership_repository import MembershipRepository
 from repositories.participant_repository import ParticipantRepository
+from services.core.gender_service import GenderService, normalize_name
 from utils.events_utils import is_Under_21, is_minor, normalize_email, normalize_phone
 
 
 logger = logging.getLogger("ParticipantRules")
-_GENDER_CACHE: Dict[str, Tuple[str, float]] = {}
 
 
 class ParticipantLike(Protocol):
@@ -48,26 +45,6 @@ def _normalize_text(value: str) -> str:
     return " ".join(s.split())
 
 
-def _get_gender_cached(name: str):
-    key = (name or "").strip().split(" ")[0].lower()
-    if not key:
-        return ("N/A", 0.0)
-    if key in _GENDER_CACHE:
-        return _GENDER_CACHE[key]
-    try:
-        resp = requests.get(GENDER_API_URL, params={"name": key}, timeout=5)
-        resp.raise_for_status()
-        data = resp.json() or {}
-        gender = data.get("gender") or "N/A"
-        prob = float(data.get("probability", 0.0) or 0.0)
-        _GENDER_CACHE[key] = (gender, round(prob, 2))
-        return _GENDER_CACHE[key]
-    except Exception as e:
-        logger.warning("Gender lookup failed for %s: %s", key, e)
-        _GENDER_CACHE[key] = ("N/A", 0.0)
-        return _GENDER_CACHE[key]
-
-
 def _is_valid_member(member: Membership, today: Optional[datetime] = None) -> bool:
     if today is None:
         today = datetime.now(timezone.utc)
@@ -90,6 +67,7 @@ def run_basic_checks(
     *,
     participant_repository: Optional[ParticipantRepositoryProtocol] = None,
     membership_repository: Optional[MembershipRepositoryProtocol] = None,
+    gender_service: Optional[GenderService] = None,
 ) -> ParticipantCheckResult:
     result = ParticipantCheckResult()
     today = datetime.now(timezone.utc)
@@ -102,7 +80,7 @@ def run_basic_checks(
     seen_emails: Set[str] = set()
     seen_phones: Set[str] = set()
     under21: List[str] = []
-    non_females: List[str] = []
+    female_candidates: List[Tuple[str, str]] = []
 
     for participant in participants:
         name = (participant.name or "").strip()
@@ -135,9 +113,16 @@ def run_basic_checks(
         seen_phones.add(phone)
 
         if only_females:
-            gender, _ = _get_gender_cached(name)
-            if gender != "female":
-                non_females.append(f"{name} {surname} <{email or phone}>")
+            female_candidates.append((name, f"{name} {surname} <{email or phone}>"))
+
+    # Eventi solo donne: tutti i nomi del modulo passano da una sola lookup (cache + batch Genderize).
+    non_females: List[str] = []
+    if female_candidates:
+        guesses = (gender_service or GenderService()).lookup_many(name for name, _ in female_candidates)
+        non_females = [
+            label for name, label in female_candidates
+            if getattr(guesses.get(normalize_name(name)), "gender", None) != "female"
+        ]
 
     if under21:
         result.errors.append(
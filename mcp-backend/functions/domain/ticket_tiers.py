@@ -0,0 +1,69 @@
+"""
+Classificazione dei prezzi unitari in fasce biglietto (super_early/early/regular/late).
+
+I prezzi distinti, pesati per numero di acquisti, vengono ordinati e scorsi una
+volta sola: un prezzo entra nel cluster corrente se dista al massimo
+``PRICE_TOLERANCE`` dal suo centro (media pesata, tenuta con somme correnti),
+altrimenti apre un cluster nuovo. Con i prezzi in ordine crescente solo
+l'ultimo cluster puo' accettare il prezzo successivo, quindi il risultato
+coincide con il vecchio confronto contro tutti i cluster.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+PRICE_TOLERANCE = 0.50
+TIER_NAMES = ("super_early", "early", "regular", "late")
+
+
+def tier_for_cluster(index: int, cluster_count: int) -> str:
+    """Fascia del cluster ``index`` (in ordine di prezzo) su ``cluster_count`` cluster."""
+    if cluster_count <= 1:
+        return "regular"
+    if cluster_count <= 3:
+        return ("early", "regular", "late")[index]
+    if index == 0:
+        return "super_early"
+    if index == 1:
+        return "early"
+    if index == cluster_count - 1:
+        return "late"
+    return "regular"
+
+
+def cluster_price_tiers(
+    price_weights: Mapping[float, int],
+    tolerance: float = PRICE_TOLERANCE,
+) -> Dict[float, str]:
+    """Prezzo unitario -> fascia; ``price_weights`` e' prezzo -> numero di acquisti."""
+    clusters: List[List[float]] = []
+    total = weight = center = 0.0
+    for price in sorted(price_weights):
+        price_weight = price_weights[price]
+        if clusters and abs(price - center) <= tolerance:
+            clusters[-1].append(price)
+            total += price * price_weight
+            weight += price_weight
+        else:
+            clusters.append([price])
+            total = price * price_weight
+            weight = price_weight
+        center = total / weight if weight else price
+
+    mapping: Dict[float, str] = {}
+    for index, prices in enumerate(clusters):
+        tier = tier_for_cluster(index, len(clusters))
+        for price in prices:
+            mapping[price] = tier
+    return mapping
+
+
+def map_ticket_tiers(rows: Iterable[Dict[str, Any]]) -> Dict[Optional[str], str]:
+    """``purchase_id`` -> fascia per righe ``{"purchase_id", "unit_price"}``."""
+    rows = list(rows)
+    weights: Dict[float, int] = {}
+    for row in rows:
+        weights[row["unit_price"]] = weights.get(row["unit_price"], 0) + 1
+    price_to_tier = cluster_price_tiers(weights)
+    return {row.get("purchase_id"): price_to_tier[row["unit_price"]] for row in rows}
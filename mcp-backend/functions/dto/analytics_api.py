@@ -66,6 +66,11 @@ class MembershipTrendQueryDTO(AnalyticsBaseDTO):
         return int(v)
 
 
+class AttendanceCohortsQueryDTO(AnalyticsBaseDTO):
+    last_events: int = Field(default=6, ge=1, le=52)
+    min_attended: int = Field(default=2, ge=1, le=52)
+
+
 # ---- Shared Response base ------------------------------------------------
 
 class _ResponseBase(BaseModel):
@@ -123,6 +128,25 @@ class AudienceRetentionResponseDTO(_ResponseBase):
     breakdown: List[AudienceBreakdownItemDTO]
 
 
+# ---- Attendance Cohorts --------------------------------------------------
+
+class AttendanceCohortDTO(_ResponseBase):
+    event_id: str = Field(serialization_alias="eventId")
+    event_date: Optional[str] = Field(default=None, serialization_alias="eventDate")
+    size: int
+    curve: List[float]
+
+
+class AttendanceCohortsResponseDTO(_ResponseBase):
+    events_indexed: int = Field(serialization_alias="eventsIndexed")
+    members_indexed: int = Field(serialization_alias="membersIndexed")
+    last_events: int = Field(serialization_alias="lastEvents")
+    min_attended: int = Field(serialization_alias="minAttended")
+    attended_min_of_last: int = Field(serialization_alias="attendedMinOfLast")
+    churned: int
+    cohorts: List[AttendanceCohortDTO]
+
+
 # ---- Revenue Breakdown ---------------------------------------------------
 
 class RevenueTierDTO(_ResponseBase):
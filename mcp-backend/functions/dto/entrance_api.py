@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+MAX_OFFLINE_SCANS_PER_SYNC = 500
+MAX_ENTRIES_PER_BATCH = 50
+# Long-poll del feed live ingressi: deve restare sotto il timeout HTTP della function.
+LIVE_STATS_MAX_WAIT_SECONDS = 25
+LIVE_FLOW_BUCKET_MINUTES = 15
+
 
 class EntranceApiBaseDTO(BaseModel):
     model_config = ConfigDict(
@@ -38,6 +45,38 @@ class ValidateEntryRequestDTO(EntranceApiBaseDTO):
     scan_token: str = Field(min_length=1)
 
 
+class ValidateEntryBatchRequestDTO(EntranceApiBaseDTO):
+    scan_token: str = Field(min_length=1)
+    membership_ids: List[str] = Field(min_length=1, max_length=MAX_ENTRIES_PER_BATCH)
+
+
+class ScannerManifestQueryDTO(EntranceApiBaseDTO):
+    token: str = Field(min_length=1)
+    version: Optional[str] = None
+
+
+class LiveStatsQueryDTO(EntranceApiBaseDTO):
+    token: str = Field(min_length=1)
+    cursor: Optional[int] = Field(default=None, ge=0)
+    wait: int = Field(default=LIVE_STATS_MAX_WAIT_SECONDS, ge=0, le=LIVE_STATS_MAX_WAIT_SECONDS)
+
+
+class AdminLiveStatsQueryDTO(EntranceApiBaseDTO):
+    event_id: str = Field(min_length=1)
+    cursor: Optional[int] = Field(default=None, ge=0)
+    wait: int = Field(default=LIVE_STATS_MAX_WAIT_SECONDS, ge=0, le=LIVE_STATS_MAX_WAIT_SECONDS)
+
+
+class OfflineScanDTO(EntranceApiBaseDTO):
+    membership_id: str = Field(min_length=1)
+    scanned_at: Optional[datetime] = None
+
+
+class SyncOfflineScansRequestDTO(EntranceApiBaseDTO):
+    scan_token: str = Field(min_length=1)
+    scans: List[OfflineScanDTO] = Field(min_length=1, max_length=MAX_OFFLINE_SCANS_PER_SYNC)
+
+
 # ── Response DTOs ─────────────────────────────────────────────────────────────
 
 class GenerateScanTokenResponseDTO(EntranceApiBaseDTO):
@@ -112,3 +151,109 @@ class ManualEntryResponseDTO(EntranceApiBaseDTO):
 
     def to_payload(self) -> Dict[str, Any]:
         return self.model_dump(by_alias=True)
+
+
+class ManifestMemberDTO(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    membership_id: str
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    valid: bool
+
+
+class ScannerManifestResponseDTO(EntranceApiBaseDTO):
+    valid: bool
+    reason: Optional[str] = None
+    event_id: Optional[str] = None
+    event_title: Optional[str] = None
+    version: Optional[str] = None
+    unchanged: bool = False
+    generated_at: Optional[str] = None
+    members: List[ManifestMemberDTO] = Field(default_factory=list)
+    scanned: List[str] = Field(default_factory=list)
+    participants_count: Optional[int] = None
+    entered_count: Optional[int] = None
+
+    def to_payload(self) -> Dict[str, Any]:
+        if not self.valid:
+            return {"valid": False, "reason": self.reason}
+        payload: Dict[str, Any] = {
+            "valid": True,
+            "event_id": self.event_id,
+            "version": self.version,
+            "unchanged": self.unchanged,
+            "participants_count": self.participants_count,
+            "entered_count": self.entered_count,
+        }
+        if not self.unchanged:
+            payload.update(
+                {
+                    "event_title": self.event_title,
+                    "generated_at": self.generated_at,
+                    "members": [member.model_dump() for member in self.members],
+                    "scanned": list(self.scanned),
+                }
+            )
+        return payload
+
+
+class EntryResultDTO(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    membership_id: str
+    result: str
+    membership: Optional[MemberInfoDTO] = None
+    scanned_at: Optional[str] = None
+
+
+class EntryBatchResponseDTO(EntranceApiBaseDTO):
+    result: str
+    results: List[EntryResultDTO] = Field(default_factory=list)
+    participants_count: Optional[int] = None
+    entered_count: Optional[int] = None
+
+    def to_payload(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "result": self.result,
+            "results": [row.model_dump() for row in self.results],
+        }
+        if self.participants_count is not None:
+            payload["participants_count"] = self.participants_count
+        if self.entered_count is not None:
+            payload["entered_count"] = self.entered_count
+        return payload
+
+
+class LiveFlowBucketDTO(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    bucket_start: str
+    count: int
+
+
+class LiveStatsResponseDTO(EntranceApiBaseDTO):
+    valid: bool
+    reason: Optional[str] = None
+    event_id: Optional[str] = None
+    cursor: Optional[int] = None
+    changed: bool = False
+    participants_count: Optional[int] = None
+    entered_count: Optional[int] = None
+    flow: List[LiveFlowBucketDTO] = Field(default_factory=list)
+
+    def to_payload(self) -> Dict[str, Any]:
+        if not self.valid:
+            return {"valid": False, "reason": self.reason}
+        payload: Dict[str, Any] = {
+            "valid": True,
+            "event_id": self.event_id,
+            "cursor": self.cursor,
+            "changed": self.changed,
+        }
+        if self.changed:
+            payload.update(
+                {
+                    "participants_count": self.participants_count,
+                    "entered_count": self.entered_count,
+                    "flow": [bucket.model_dump() for bucket in self.flow],
+                }
+            )
+        return payload
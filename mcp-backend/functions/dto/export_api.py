@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Any, List, Literal, Optional
+
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator
+
+
+class ExportQueryDTO(BaseModel):
+    """``columns``: chiavi della risposta separate da virgola; senza, le colonne di default dell'export."""
+
+    model_config = ConfigDict(extra="forbid", populate_by_name=True, str_strip_whitespace=True)
+
+    format: Literal["csv", "ndjson"] = "csv"
+    columns: Optional[List[str]] = None
+
+    @field_validator("format", mode="before")
+    @classmethod
+    def normalize_format(cls, value: Any) -> Any:
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return "csv"
+        return value.lower() if isinstance(value, str) else value
+
+    @field_validator("columns", mode="before")
+    @classmethod
+    def split_columns(cls, value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = value.split(",")
+        names = [str(name).strip() for name in value if str(name).strip()]
+        return names or None
+
+
+class ParticipantExportQueryDTO(ExportQueryDTO):
+    event_id: str = Field(min_length=1, validation_alias=AliasChoices("event_id", "eventId"))
+
+
+class MembershipExportQueryDTO(ExportQueryDTO):
+    year: Optional[int] = None
+
+    @field_validator("year", mode="before")
+    @classmethod
+    def normalize_year(cls, value: Any) -> Any:
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional, Set
 
 from pydantic import AliasChoices, BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
 
+from dto.pagination import PageQueryDTO
 from utils.events_utils import normalize_email, normalize_phone
 
 
@@ -21,7 +22,7 @@ class MembershipApiBaseDTO(BaseModel):
     )
 
 
-class MembershipListQueryDTO(MembershipApiBaseDTO):
+class MembershipListQueryDTO(MembershipApiBaseDTO, PageQueryDTO):
     year: Optional[int] = None
 
     @field_validator("year", mode="before")
@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
+from dto.pagination import PageQueryDTO
+
 
 def _blank_to_none(value: Any):
     if isinstance(value, str) and not value.strip():
@@ -40,7 +42,7 @@ class NewsletterDeleteQueryDTO(NewsletterApiBaseDTO):
     id: str = Field(min_length=1)
 
 
-class NewsletterLookupQueryDTO(NewsletterApiBaseDTO):
+class NewsletterLookupQueryDTO(NewsletterApiBaseDTO, PageQueryDTO):
     id: Optional[str] = None
 
     @field_validator("id", mode="before")
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator
+
+MAX_PAGE_SIZE = 500
+
+
+class PageQueryDTO(BaseModel):
+    """
+    Parametri di paginazione condivisi dalle liste admin.
+
+    ``sort`` e' una chiave pubblica (``-`` davanti per l'ordine decrescente),
+    ``fields`` l'elenco separato da virgole delle chiavi da restituire.
+    Senza ``page_size`` ne' ``cursor`` gli endpoint restituiscono la lista completa.
+    """
+
+    model_config = ConfigDict(extra="forbid", populate_by_name=True, str_strip_whitespace=True)
+
+    page_size: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        validation_alias=AliasChoices("page_size", "pageSize", "limit"),
+    )
+    cursor: Optional[str] = None
+    sort: Optional[str] = None
+    fields: Optional[List[str]] = None
+
+    @field_validator("page_size", "cursor", "sort", mode="before")
+    @classmethod
+    def normalize_blank(cls, value: Any) -> Any:
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = value.split(",")
+        names = [str(name).strip() for name in value if str(name).strip()]
+        return names or None
+
+    @property
+    def paginated(self) -> bool:
+        return self.page_size is not None or self.cursor is not None
+
+    @property
+    def sort_key(self) -> Optional[str]:
+        return self.sort.lstrip("-") if self.sort else None
+
+    @property
+    def descending(self) -> bool:
+        return bool(self.sort and self.sort.startswith("-"))
+
+
+class PageResponseDTO(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_page(
+        cls,
+        page: Any,
+        mapper: Callable[[Any], Any],
+        fields: Optional[Iterable[str]] = None,
+    ) -> "PageResponseDTO":
+        wanted = set(fields) | {"id"} if fields else None
+        items = []
+        for model in page.items:
+            payload = mapper(model).to_payload()
+            if wanted is not None:
+                payload = {key: value for key, value in payload.items() if key in wanted}
+            items.append(payload)
+        return cls(items=items, next_cursor=page.next_cursor)
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {"items": self.items, "next_cursor": self.next_cursor}
@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional, Set
 
 from pydantic import AliasChoices, BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
 
+from dto.pagination import PageQueryDTO
 from models import PaymentMethod
 from utils.events_utils import normalize_email, normalize_phone
 
@@ -26,6 +27,10 @@ class ParticipantEventRequestDTO(ParticipantApiBaseDTO):
     event_id: str = Field(min_length=1, alias="eventId")
 
 
+class ParticipantListRequestDTO(ParticipantEventRequestDTO, PageQueryDTO):
+    pass
+
+
 class ParticipantLookupRequestDTO(ParticipantEventRequestDTO):
     participant_id: str = Field(min_length=1, alias="participantId")
 
@@ -13,6 +13,8 @@ class TicketPdfPayload(BaseModel):
     date: str
     time: str
     location: str
+    # Il batch passa il foglio di stile gia' parsato a WeasyPrint invece di inlinearlo.
+    inline_styles: bool = True
 
 
 class MembershipCardPdfPayload(BaseModel):
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional, Protocol, TypeVar
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple, TypeVar
 
 from models import (
     AdminUser,
@@ -9,18 +10,24 @@ from models import (
     Event,
     EventOrder,
     EventParticipant,
+    GenderGuess,
     Job,
     Membership,
     NewsletterConsent,
     NewsletterParticipant,
     NewsletterSignup,
+    ParticipantRow,
     Purchase,
+    PurchaseRow,
     Setting,
     UserProfile,
 )
 from models.radio import RadioEpisode, RadioSeason
 from models.scan_token import ScanToken
 
+if TYPE_CHECKING:
+    from repositories.base import Page, PageRequest
+
 
 JobModel = TypeVar("JobModel", bound=Job)
 
@@ -68,6 +75,9 @@ class EventRepositoryProtocol(Protocol):
     def get_model(self, event_id: str) -> Optional[Event]:
         ...
 
+    def get_many(self, event_ids: Iterable[str]) -> List[Event]:
+        ...
+
     def get_model_by_slug(self, slug: str) -> Optional[Event]:
         ...
 
@@ -85,6 +95,9 @@ class MembershipRepositoryProtocol(Protocol):
     def get(self, membership_id: str) -> Optional[Membership]:
         ...
 
+    def get_many(self, membership_ids: Iterable[str]) -> List[Membership]:
+        ...
+
     def list(self) -> List[Membership]:
         ...
 
@@ -127,6 +140,12 @@ class MembershipRepositoryProtocol(Protocol):
     def find_by_year(self, year: int) -> List[Membership]:
         ...
 
+    def stream_by_year(self, year: int) -> Iterable[Membership]:
+        ...
+
+    def query_page(self, request: PageRequest, year: Optional[int] = None) -> Page[Membership]:
+        ...
+
     def list_by_purchase_ids(self, purchase_ids: List[str]) -> Iterable[Membership]:
         ...
 
@@ -167,6 +186,24 @@ class ParticipantRepositoryProtocol(Protocol):
     def stream_all(self) -> Iterable[EventParticipant]:
         ...
 
+    def stream_rows(self, event_id: str) -> Iterable[ParticipantRow]:
+        ...
+
+    def stream_membership_ids(self, event_id: str) -> Iterable[str]:
+        ...
+
+    def stream_all_rows(self) -> Iterable[ParticipantRow]:
+        ...
+
+    def update_gender_many(self, updates: Iterable[Tuple[str, str, str, float]]) -> int:
+        ...
+
+    def list_page(self, event_id: str, after_id: Optional[str] = None, limit: int = 300) -> List[EventParticipant]:
+        ...
+
+    def query_page(self, event_id: str, request: PageRequest) -> Page[EventParticipant]:
+        ...
+
     def get(self, event_id: str, participant_id: str) -> Optional[EventParticipant]:
         ...
 
@@ -182,6 +219,9 @@ class ParticipantRepositoryProtocol(Protocol):
     def count(self, event_id: str) -> int:
         ...
 
+    def reconcile_count(self, event_id: str) -> int:
+        ...
+
     def any_with_contacts(self, event_id: str, emails: List[str], phones: List[str]) -> bool:
         ...
 
@@ -197,12 +237,32 @@ class ParticipantRepositoryProtocol(Protocol):
     def get_by_membership_id(self, event_id: str, membership_id: str) -> Optional[EventParticipant]:
         ...
 
+    def list_event_ids_by_membership(self, membership_id: str) -> List[str]:
+        ...
+
+    def list_by_membership_ids(self, event_id: str, membership_ids: List[str]) -> List[EventParticipant]:
+        ...
+
     def update_membership_reference(self, old_membership_id: str, new_membership_id: str) -> int:
         ...
 
     def update_entered(self, event_id: str, participant_id: str, entered: bool) -> None:
         ...
 
+    def update_entered_many(self, event_id: str, participant_ids: List[str], entered: bool) -> None:
+        ...
+
+    def mark_location_sent_many(self, event_id: str, participant_ids: List[str], job_id: Optional[str] = None) -> None:
+        ...
+
+
+class GenderCacheRepositoryProtocol(Protocol):
+    def get_many(self, identifiers: Iterable[str]) -> List[GenderGuess]:
+        ...
+
+    def set_many(self, guesses: Iterable[GenderGuess]) -> None:
+        ...
+
 
 class PurchaseRepositoryProtocol(Protocol):
     def create(self, purchase: Purchase) -> str:
@@ -217,9 +277,15 @@ class PurchaseRepositoryProtocol(Protocol):
     def stream_models(self) -> Iterable[Purchase]:
         ...
 
+    def query_page(self, request: PageRequest) -> Page[Purchase]:
+        ...
+
     def get_model(self, purchase_id: str) -> Optional[Purchase]:
         ...
 
+    def get_many(self, purchase_ids: Iterable[str]) -> List[Purchase]:
+        ...
+
     def get_model_by_slug(self, slug: str) -> Optional[Purchase]:
         ...
 
@@ -229,6 +295,9 @@ class PurchaseRepositoryProtocol(Protocol):
     def list_models_by_ref_id(self, event_id: str) -> Iterable[Purchase]:
         ...
 
+    def stream_rows(self, event_id: Optional[str] = None) -> Iterable[PurchaseRow]:
+        ...
+
     def delete(self, purchase_id: str) -> bool:
         ...
 
@@ -240,6 +309,9 @@ class MessageRepositoryProtocol(Protocol):
     def list_models_ordered_by_name(self) -> List[ContactMessage]:
         ...
 
+    def query_page(self, request: PageRequest) -> Page[ContactMessage]:
+        ...
+
     def count_unanswered_since(self, time_limit: Any) -> int:
         ...
 
@@ -309,6 +381,16 @@ class JobRepositoryProtocol(Protocol[JobModel]):
     def stream_raw_by_type(self, job_type: str) -> Iterable[tuple[str, Dict[str, Any]]]:
         ...
 
+    def stream_raw_by_status(self, job_type: str, status: str) -> Iterable[tuple[str, Dict[str, Any]]]:
+        ...
+
+    def mutate_raw(
+        self,
+        job_id: str,
+        mutate: Callable[[Optional[Dict[str, Any]]], tuple[Optional[Dict[str, Any]], Any]],
+    ) -> Any:
+        ...
+
     def claim_queued(self, job_id: str) -> bool:
         ...
 
@@ -325,6 +407,12 @@ class NewsletterRepositoryProtocol(Protocol):
     def stream_consents(self) -> Iterable[NewsletterConsent]:
         ...
 
+    def query_signups_page(self, request: PageRequest) -> Page[NewsletterSignup]:
+        ...
+
+    def query_consents_page(self, request: PageRequest) -> Page[NewsletterConsent]:
+        ...
+
     def get_signup(self, signup_id: str) -> Optional[NewsletterSignup]:
         ...
 
@@ -368,7 +456,24 @@ class EntranceScanRepositoryProtocol(Protocol):
     def exists(self, event_id: str, membership_id: str) -> bool:
         ...
 
-    def create_scan(self, event_id: str, membership_id: str, scan_token: str) -> Optional[EntranceScan]:
+    def stream_all(self) -> Iterable[Tuple[str, EntranceScan]]:
+        ...
+
+    def create_scan(
+        self,
+        event_id: str,
+        membership_id: str,
+        scan_token: str,
+        scanned_at: Optional[datetime] = None,
+    ) -> Optional[EntranceScan]:
+        ...
+
+    def create_scans(
+        self,
+        event_id: str,
+        scan_token: str,
+        entries: Dict[str, Optional[datetime]],
+    ) -> Dict[str, EntranceScan]:
         ...
 
     def create_manual(self, event_id: str, membership_id: str, admin_uid: str) -> None:
@@ -380,6 +485,27 @@ class EntranceScanRepositoryProtocol(Protocol):
     def count(self, event_id: str) -> int:
         ...
 
+    def reconcile_count(self, event_id: str) -> int:
+        ...
+
+    def get_flow_minutes(self, event_id: str) -> Dict[datetime, int]:
+        ...
+
+    def reconcile_flow(self, event_id: str) -> Dict[str, int]:
+        ...
+
+    def bump_versions(self, event_ids: Iterable[str]) -> None:
+        ...
+
+    def get_entry_state(self, event_id: str) -> Dict[str, int]:
+        ...
+
+    def get_live_state(self, event_id: str) -> Dict[str, Any]:
+        ...
+
+    def wait_live_state(self, event_id: str, version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        ...
+
 
 class RadioSeasonRepositoryProtocol(Protocol):
     def create_from_model(self, season: RadioSeason) -> RadioSeason:
@@ -142,11 +142,17 @@ class DocumentsServiceProtocol(Protocol):
     def create_ticket_document(self, ticket_data: Any, event_data: Dict[str, Any], storage_path: str) -> Any:
         ...
 
+    def create_ticket_documents(self, tickets: list[tuple[Any, str]], event_data: Dict[str, Any]) -> list[Any]:
+        ...
+
 
 class TicketServiceProtocol(Protocol):
     def process_new_ticket(self, participant_id: str, participant_data: Any, send: bool = True) -> Dict[str, Any]:
         ...
 
+    def create_ticket_documents(self, participants: list[Any], event_data: Any) -> list[Any]:
+        ...
+
 
 class Pass2UServiceProtocol(Protocol):
     def create_membership_pass(self, membership_id: str, membership: Any) -> Any:
@@ -144,6 +144,13 @@ from api.admin.purchases_api import (
     delete_purchase
 )
 
+# === API Admin: Export ===
+from api.admin.export_api import (
+    admin_export_participants,
+    admin_export_memberships,
+    admin_export_purchases,
+)
+
 # === Triggers ===
 from triggers.registration_trigger import (
     on_participant_created,
@@ -159,6 +166,7 @@ from api.admin.stats_api import (
     admin_get_entrance_flow,
     admin_get_sales_over_time,
     admin_get_audience_retention,
+    admin_get_attendance_cohorts,
     admin_get_revenue_breakdown,
     admin_get_event_funnel,
     admin_get_gender_distribution,
@@ -186,15 +194,20 @@ from api.admin.radio_episodes_api import (
     admin_publish_radio_episode,
     admin_unpublish_radio_episode,
 )
-from triggers.jobs_trigger import process_send_location_job, process_analytics_rebuild_job
+from triggers.jobs_trigger import (
+    process_send_location_job,
+    process_analytics_rebuild_job,
+    resume_stale_location_jobs,
+)
 from triggers.new_year_trigger import invalidate_memberships_new_year
 from triggers.cleanup_trigger import cleanup_stale_data
+from triggers.events_trigger import reconcile_event_participant_counts
 from triggers.analytics_trigger import (
     on_purchase_written,
     on_participant_written,
-    on_entrance_scan_written,
     on_membership_written,
     rebuild_analytics_nightly,
+    dispatch_analytics_rebuilds,
 )
 
 # === API Entrance Scanner ===
@@ -204,6 +217,11 @@ from api.entrance.entrance_api import (
     entrance_deactivate_scan_token,
     entrance_manual_entry,
     entrance_validate,
+    entrance_validate_batch,
+    entrance_scanner_manifest,
+    entrance_sync_scans,
+    entrance_live_stats,
+    entrance_admin_live_stats,
 )
 
 # === API Admin: Sender ===
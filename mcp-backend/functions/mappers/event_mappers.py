@@ -32,6 +32,7 @@ def create_event_dto_to_model(dto: CreateEventRequestDTO, admin_uid: str) -> Eve
         over21_only=dto.over21_only,
         only_females=dto.only_females,
         participants_count=0,
+        participants_count_seeded_at=firestore.SERVER_TIMESTAMP,
         external_link=dto.external_link,
         created_by=admin_uid,
         created_at=firestore.SERVER_TIMESTAMP,
@@ -9,6 +9,7 @@ from .event import Event
 from .discount_code import DiscountCode
 from .event_participant import EventParticipant
 from .event_purchase import EventPurchase
+from .gender_guess import GenderGuess
 from .job import AnalyticsJob, Job, LocationJob
 from .membership import Membership, MembershipRef
 from .newsletter_consent import NewsletterConsent
@@ -19,6 +20,7 @@ from .membership_pass import MembershipPass, MembershipPassResult
 from .settings import Setting
 from .order import Order, EventOrder
 from .purchase import Purchase
+from .analytics_rows import ParticipantRow, PurchaseRow
 from .user_profile import UserProfile
 
 __all__ = [
@@ -38,6 +40,9 @@ __all__ = [
     "EventParticipant",
     "Purchase",
     "EventPurchase",
+    "GenderGuess",
+    "ParticipantRow",
+    "PurchaseRow",
     "Job",
     "AnalyticsJob",
     "LocationJob",
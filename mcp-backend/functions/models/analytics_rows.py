@@ -0,0 +1,55 @@
+from dataclasses import fields
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from .event_participant import EventParticipant
+from .event_purchase import EventPurchase
+
+
+class ParticipantRow(NamedTuple):
+    """
+    Compact projection of a participant document for analytics. Attribute
+    names match ``EventParticipant`` so the same extractors work on both;
+    values are kept raw (``payment_method`` is the stored string, not the enum).
+    """
+
+    id: Optional[str]
+    event_id: Optional[str]
+    payment_method: Optional[str]
+    gender: Optional[str]
+    birthdate: Optional[str]
+    membership_id: Optional[str]
+    entered: Optional[bool]
+    created_at: Optional[Any]
+
+    @classmethod
+    def from_firestore(cls, data: Dict[str, Any], doc_id: Optional[str] = None) -> "ParticipantRow":
+        return cls(doc_id, *map(data.get, PARTICIPANT_ROW_KEYS))
+
+
+class PurchaseRow(NamedTuple):
+    """Compact projection of a purchase document for analytics (see ``ParticipantRow``)."""
+
+    id: Optional[str]
+    ref_id: Optional[str]
+    purchase_type: Optional[str]
+    status: Optional[str]
+    capture_status: Optional[str]
+    amount_total: Optional[Any]
+    net_amount: Optional[Any]
+    participants_count: Optional[int]
+    timestamp: Optional[Any]
+
+    @classmethod
+    def from_firestore(cls, data: Dict[str, Any], doc_id: Optional[str] = None) -> "PurchaseRow":
+        return cls(doc_id, *map(data.get, PURCHASE_ROW_KEYS))
+
+
+def _firestore_keys(row_cls: type, model_cls: type) -> Tuple[str, ...]:
+    # Le chiavi Firestore vengono dai metadata del modello: rinominare un campo
+    # li' aggiorna anche la projection ``select()`` dei repository.
+    keys = {f.name: f.metadata.get("firestore_name", f.name) for f in fields(model_cls)}
+    return tuple(keys[name] for name in row_cls._fields[1:])
+
+
+PARTICIPANT_ROW_KEYS = _firestore_keys(ParticipantRow, EventParticipant)
+PURCHASE_ROW_KEYS = _firestore_keys(PurchaseRow, EventPurchase)
@@ -1,14 +1,58 @@
 from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 
-@dataclass
+class _ModelCodec:
+    """
+    Mappatura chiavi Firestore <-> campi del dataclass, calcolata una volta per
+    classe: ``fields()`` e i metadata (``firestore_name``, ``enum``) non vengono
+    piu' riletti a ogni documento.
+    """
+
+    __slots__ = ("plain_decoders", "enum_decoders", "encoders")
+
+    def __init__(self, cls: Type["FirestoreModel"]):
+        self.plain_decoders: List[Tuple[str, str]] = []
+        self.enum_decoders: List[Tuple[str, str, Type[Enum]]] = []
+        self.encoders: List[Tuple[str, str, Optional[Type[Enum]]]] = []
+        for f in fields(cls):
+            if f.name == "id":
+                continue
+            key = f.metadata.get("firestore_name", f.name)
+            if key is None:
+                # Campo non persistito (es. ``Setting.key``, derivato dall'id documento).
+                continue
+            enum_cls = f.metadata.get("enum")
+            self.encoders.append((f.name, key, enum_cls))
+            if not f.init:
+                continue
+            if enum_cls:
+                self.enum_decoders.append((key, f.name, enum_cls))
+            else:
+                self.plain_decoders.append((key, f.name))
+
+
+_CODECS: Dict[type, _ModelCodec] = {}
+
+
+def model_codec(cls: type) -> _ModelCodec:
+    codec = _CODECS.get(cls)
+    if codec is None:
+        codec = _CODECS[cls] = _ModelCodec(cls)
+    return codec
+
+
+@dataclass(slots=True)
 class FirestoreModel:
     """
     Lightweight base class used by the backend refactor to describe Firestore
     documents as Python dataclasses. Each field can provide the original
     Firestore key through ``metadata={"firestore_name": "camelCaseKey"}``.
+
+    The key/enum mapping is compiled once per class (see ``model_codec``).
+    Models read in bulk by streams and analytics can be declared with
+    ``@dataclass(slots=True)`` to drop the per-instance ``__dict__``.
     """
 
     id: Optional[str] = field(default=None, metadata={"firestore_name": None})
@@ -20,19 +64,12 @@ class FirestoreModel:
         unless ``include_none`` is True.
         """
         payload: Dict[str, Any] = {}
-        for f in fields(self):
-            if f.name == "id":
-                continue
-            key = f.metadata.get("firestore_name", f.name)
-            value = getattr(self, f.name)
-
+        for name, key, enum_cls in model_codec(type(self)).encoders:
+            value = getattr(self, name)
             if value is None and not include_none:
                 continue
-
-            enum_cls = f.metadata.get("enum")
             if enum_cls and isinstance(value, Enum):
                 value = value.value
-
             payload[key] = value
         return payload
 
@@ -40,23 +77,22 @@ class FirestoreModel:
     def from_firestore(cls, data: Dict[str, Any], doc_id: Optional[str] = None):
         """
         Build the dataclass from a Firestore dictionary. Enum fields are
-        reconstructed automatically if the metadata declares ``enum``.
+        reconstructed automatically if the metadata declares ``enum``;
+        values that are not valid members fall back to the field default.
         """
+        codec = model_codec(cls)
         kwargs: Dict[str, Any] = {"id": doc_id}
-        for f in fields(cls):
-            if f.name == "id":
-                continue
-            if not f.init:
-                continue
-            key = f.metadata.get("firestore_name", f.name)
+        for key, name in codec.plain_decoders:
+            if key in data:
+                kwargs[name] = data[key]
+        for key, name, enum_cls in codec.enum_decoders:
             if key not in data:
                 continue
             value = data[key]
-            enum_cls = f.metadata.get("enum")
-            if enum_cls and value is not None:
+            if value is not None:
                 try:
                     value = enum_cls(value)
                 except ValueError:
                     continue
-            kwargs[f.name] = value
+            kwargs[name] = value
         return cls(**kwargs)
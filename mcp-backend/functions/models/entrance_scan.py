@@ -12,3 +12,5 @@ class EntranceScan(FirestoreModel):
     scan_token: Optional[str] = field(default=None, metadata={"firestore_name": "scan_token"})
     manual: bool = field(default=False, metadata={"firestore_name": "manual"})
     operator: Optional[str] = field(default=None, metadata={"firestore_name": "operator"})
+    offline: bool = field(default=False, metadata={"firestore_name": "offline"})
+    synced_at: Optional[Any] = field(default=None, metadata={"firestore_name": "synced_at"})
@@ -34,7 +34,11 @@ class Event(FirestoreModel):
     allow_duplicates: bool = field(default=False, metadata={"firestore_name": "allowDuplicates"})
     over21_only: bool = field(default=False, metadata={"firestore_name": "over21Only"})
     only_females: bool = field(default=False, metadata={"firestore_name": "onlyFemales"})
+    # Mantenuto dalle scritture dei partecipanti (ParticipantRepository): affidabile solo se seeded.
     participants_count: int = field(default=0, metadata={"firestore_name": "participantsCount"})
+    participants_count_seeded_at: Optional[Any] = field(
+        default=None, metadata={"firestore_name": "participantsCount_seeded_at"}
+    )
     external_link: Optional[str] = field(default=None, metadata={"firestore_name": "externalLink"})
     created_at: Optional[Any] = field(default=None, metadata={"firestore_name": "createdAt"})
     created_by: Optional[str] = field(default=None, metadata={"firestore_name": "createdBy"})
@@ -5,7 +5,7 @@ from .base import FirestoreModel
 from .enums import PaymentMethod
 
 
-@dataclass
+@dataclass(slots=True)
 class EventParticipant(FirestoreModel):
     """Represents a participant within ``participants/{eventId}/participants_event``."""
 
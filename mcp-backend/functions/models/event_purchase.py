@@ -5,7 +5,7 @@ from .enums import EventPurchaseAccessType, PurchaseTypes
 from .purchase import Purchase
 
 
-@dataclass
+@dataclass(slots=True)
 class EventPurchase(Purchase):
     """
     Represents a purchase linked to an event. The purchase_type is always
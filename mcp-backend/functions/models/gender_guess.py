@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .base import FirestoreModel
+
+UNKNOWN_GENDER = "N/A"
+
+
+@dataclass
+class GenderGuess(FirestoreModel):
+    """
+    Genderize answer cached in ``gender_cache``; the document id is the
+    normalized first name (see ``GenderService.normalize_name``).
+    """
+
+    gender: str = UNKNOWN_GENDER
+    probability: float = 0.0
+    count: int = 0
+    updated_at: Optional[Any] = None
@@ -30,6 +30,9 @@ class LocationJob(Job):
     total: int = 0
     sent: int = 0
     failed: int = 0
+    # Checkpoint dell'esecuzione a blocchi: id dell'ultimo partecipante processato.
+    cursor: Optional[str] = None
+    chunks: int = 0
 
 
 @dataclass
@@ -40,3 +43,9 @@ class AnalyticsJob(Job):
     target_event_id: Optional[str] = field(default=None, metadata={"firestore_name": "target_event_id"})
     scope: Optional[str] = None
     reason: Optional[str] = None
+    # Debounce: il dispatcher mette in coda un job "scheduled" solo dopo run_after.
+    run_after: Optional[Any] = None
+    # Richieste confluite nel job dall'ultima esecuzione.
+    requests: int = 0
+    # Richiesta arrivata mentre il job era running: a fine esecuzione va riprogrammato.
+    rerun_requested: bool = False
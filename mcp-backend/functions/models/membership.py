@@ -4,7 +4,7 @@ from typing import Any, Dict, List, Optional
 from .base import FirestoreModel
 
 
-@dataclass
+@dataclass(slots=True)
 class Membership(FirestoreModel):
     """Represents a member profile stored in ``memberships``."""
 
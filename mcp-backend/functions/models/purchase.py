@@ -5,7 +5,7 @@ from .enums import PurchaseTypes
 from .base import FirestoreModel
 
 
-@dataclass
+@dataclass(slots=True)
 class Purchase(FirestoreModel):
     """Base class representing a completed payment stored in ``purchases``."""
 
@@ -1,15 +1,49 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+from google.cloud.firestore_v1 import transactional as _fs_transactional
+
+from config.analytics_config import ANALYTICS_APPLIED_TTL_DAYS
 from config.firebase_config import db
 
+# Un batch Firestore accetta al massimo 500 scritture.
+SNAPSHOT_WRITE_CHUNK_SIZE = 400
+
+
+def _as_increments(deltas: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte un dict annidato di delta numerici in ``firestore.Increment``."""
+    payload: Dict[str, Any] = {}
+    for key, value in deltas.items():
+        if isinstance(value, dict):
+            nested = _as_increments(value)
+            if nested:
+                payload[key] = nested
+        elif value:
+            payload[key] = firestore.Increment(value)
+    return payload
+
+
+@_fs_transactional
+def _mutate_doc_tx(transaction, doc_ref, mutate) -> bool:
+    snap = doc_ref.get(transaction=transaction)
+    updated = mutate(snap.to_dict() if snap.exists else None)
+    if updated is None:
+        return False
+    transaction.set(doc_ref, updated)
+    return True
+
 
 class AnalyticsSnapshotRepository:
     def __init__(self):
         self.dashboard_collection = db.collection("analytics_dashboard")
         self.event_collection = db.collection("analytics_event")
         self.global_collection = db.collection("analytics_global")
+        # Un documento per delivery di trigger gia' applicata (id = id evento CloudEvent).
+        self.applied_collection = db.collection("analytics_applied")
 
     def get_dashboard_current(self) -> Optional[Dict[str, Any]]:
         doc = self.dashboard_collection.document("current").get()
@@ -31,7 +65,58 @@ class AnalyticsSnapshotRepository:
         return payload
 
     def set_global_current(self, payload: Dict[str, Any]) -> None:
-        self.global_collection.document("current").set(payload, merge=True)
+        # I campi top-level vengono sostituiti per intero: i contatori ricalcolati
+        # dalla rebuild non devono ereditare chiavi obsolete (es. mesi spariti).
+        self.global_collection.document("current").set(payload, merge=list(payload.keys()))
+
+    def get_attendance_index(self) -> Optional[Dict[str, Any]]:
+        doc = self.global_collection.document("attendance").get()
+        return (doc.to_dict() or {}) if doc.exists else None
+
+    def set_attendance_index(self, payload: Dict[str, Any]) -> None:
+        self.global_collection.document("attendance").set(payload)
+
+    def update_attendance_index(self, mutate: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> bool:
+        """Read-modify-write in transaction; ``mutate`` restituisce None per non scrivere."""
+        return _mutate_doc_tx(db.transaction(), self.global_collection.document("attendance"), mutate)
+
+    def apply_counter_increments(
+        self,
+        event_deltas: Dict[str, Dict[str, Any]],
+        global_delta: Optional[Dict[str, Any]],
+        delivery_id: Optional[str] = None,
+    ) -> bool:
+        """
+        Applica i delta di evento e globale in un solo batch. Con ``delivery_id`` il batch
+        fa anche ``create()`` del marker in ``analytics_applied``: una seconda consegna dello
+        stesso trigger fallisce per intero e ritorna False senza incrementare di nuovo.
+        """
+        writes = [
+            (self.event_collection.document(event_id), _as_increments(delta))
+            for event_id, delta in event_deltas.items()
+        ]
+        writes.append((self.global_collection.document("current"), _as_increments(global_delta or {})))
+        writes = [(ref, increments) for ref, increments in writes if increments]
+        if not writes:
+            return False
+
+        batch = db.batch()
+        if delivery_id:
+            batch.create(
+                self.applied_collection.document(delivery_id.replace("/", "_")),
+                {
+                    "applied_at": firestore.SERVER_TIMESTAMP,
+                    # Campo TTL (firestore.indexes.json): i marker scadono da soli.
+                    "expires_at": datetime.now(timezone.utc) + timedelta(days=ANALYTICS_APPLIED_TTL_DAYS),
+                },
+            )
+        for ref, increments in writes:
+            batch.set(ref, {"counters": increments, "counters_updated_at": firestore.SERVER_TIMESTAMP}, merge=True)
+        try:
+            batch.commit()
+        except AlreadyExists:
+            return False
+        return True
 
     def get_event_snapshot(self, event_id: str) -> Optional[Dict[str, Any]]:
         doc = self.event_collection.document(event_id).get()
@@ -42,7 +127,16 @@ class AnalyticsSnapshotRepository:
         return payload
 
     def set_event_snapshot(self, event_id: str, payload: Dict[str, Any]) -> None:
-        self.event_collection.document(event_id).set(payload, merge=True)
+        self.event_collection.document(event_id).set(payload, merge=list(payload.keys()))
+
+    def set_event_snapshots(self, snapshots: Dict[str, Dict[str, Any]]) -> None:
+        """Scrive piu' snapshot evento con commit batch (stessa semantica di ``set_event_snapshot``)."""
+        items = list(snapshots.items())
+        for start in range(0, len(items), SNAPSHOT_WRITE_CHUNK_SIZE):
+            batch = db.batch()
+            for event_id, payload in items[start:start + SNAPSHOT_WRITE_CHUNK_SIZE]:
+                batch.set(self.event_collection.document(event_id), payload, merge=list(payload.keys()))
+            batch.commit()
 
     def stream_event_snapshots(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
         for doc in self.event_collection.stream():
@@ -1,13 +1,187 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Generic, Iterable, List, Optional, Type, TypeVar
+import base64
+import json
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, Iterable, List, Mapping, Optional, Sequence, Type, TypeVar
 
 from google.cloud import firestore
 
 from config.firebase_config import db
+from errors.service_errors import ValidationError
 
 Model = TypeVar("Model")
 
+GET_ALL_CHUNK_SIZE = 100
+
+DEFAULT_PAGE_SIZE = 50
+DOCUMENT_ID = "__name__"
+
+
+@dataclass
+class PageRequest:
+    """
+    Richiesta di una pagina: ``order_by`` e ``fields`` sono chiavi Firestore.
+    Senza ``order_by`` si ordina per id documento; ``fields=None`` legge i documenti interi.
+    """
+
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+    order_by: Optional[str] = None
+    descending: bool = False
+    fields: Optional[Sequence[str]] = None
+
+
+@dataclass
+class Page(Generic[Model]):
+    items: List[Model]
+    next_cursor: Optional[str] = None
+
+
+def fetch_many(
+    collection: firestore.CollectionReference,
+    identifiers: Iterable[str],
+    from_snapshot: Callable[[firestore.DocumentSnapshot], Model],
+) -> List[Model]:
+    """
+    Legge piu' documenti con ``get_all`` a blocchi di ``GET_ALL_CHUNK_SIZE``
+    (un round trip per blocco invece di uno per id). Preserva l'ordine degli id,
+    salta i mancanti e i duplicati.
+    """
+    ordered_ids = list(dict.fromkeys(identifier for identifier in identifiers if identifier))
+    found: Dict[str, Model] = {}
+    for start in range(0, len(ordered_ids), GET_ALL_CHUNK_SIZE):
+        refs = [collection.document(identifier) for identifier in ordered_ids[start:start + GET_ALL_CHUNK_SIZE]]
+        for snapshot in db.get_all(refs):
+            if snapshot.exists:
+                found[snapshot.id] = from_snapshot(snapshot)
+    return [found[identifier] for identifier in ordered_ids if identifier in found]
+
+
+def build_page_request(
+    query: Any,
+    sort_fields: Mapping[str, str],
+    model_cls: Optional[Type] = None,
+) -> PageRequest:
+    """
+    Traduce una ``PageQueryDTO`` in ``PageRequest``.
+
+    ``sort_fields`` e' il contratto di ordinamento della lista: ogni service lo
+    dichiara come costante di modulo ``<RISORSA>_SORT_FIELDS`` e mappa le chiavi
+    pubbliche accettate in ``sort_key`` sul nome del campo Firestore. Una chiave
+    non presente viene rifiutata con ``ValidationError``; senza ``sort_key`` la
+    pagina e' ordinata per id documento.
+    """
+    order_by = None
+    if query.sort_key:
+        if query.sort_key not in sort_fields:
+            allowed = ", ".join(sorted(sort_fields)) or "none"
+            raise ValidationError(f"Unsupported sort key '{query.sort_key}' (allowed: {allowed})")
+        order_by = sort_fields[query.sort_key]
+    return PageRequest(
+        limit=query.page_size or DEFAULT_PAGE_SIZE,
+        cursor=query.cursor,
+        order_by=order_by,
+        descending=query.descending,
+        fields=_projection(query.fields, model_cls),
+    )
+
+
+def _projection(names: Optional[Sequence[str]], model_cls: Optional[Type]) -> Optional[List[str]]:
+    """
+    Campi Firestore da leggere con ``select()``. Se una chiave richiesta non e'
+    un campo del model (es. un valore calcolato dal mapper) si legge il documento
+    intero: la risposta viene comunque ridotta alle chiavi richieste.
+    """
+    if not names or model_cls is None:
+        return None
+    keys: Dict[str, str] = {}
+    for model_field in dataclass_fields(model_cls):
+        if model_field.name == "id":
+            continue
+        firestore_name = model_field.metadata.get("firestore_name", model_field.name)
+        keys[model_field.name] = firestore_name
+        keys[firestore_name] = firestore_name
+    selected = []
+    for name in names:
+        if name == "id":
+            continue
+        if name not in keys:
+            return None
+        selected.append(keys[name])
+    return list(dict.fromkeys(selected))
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(request: PageRequest, snapshot: firestore.DocumentSnapshot) -> str:
+    """Cursore opaco: chiave di ordinamento, direzione e posizione dell'ultimo documento."""
+    order_by = request.order_by or DOCUMENT_ID
+    payload = {"o": order_by, "d": request.descending, "id": snapshot.id}
+    if order_by != DOCUMENT_ID:
+        payload["v"] = _encode_value(snapshot.get(order_by))
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(request: PageRequest) -> Dict[str, Any]:
+    """Posizione per ``start_after``; il cursore deve venire da una pagina con lo stesso ordinamento."""
+    try:
+        padded = request.cursor + "=" * (-len(request.cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        order_by, descending, doc_id = payload["o"], payload["d"], payload["id"]
+    except (ValueError, TypeError, KeyError):
+        raise ValidationError("Invalid page cursor")
+    if order_by != (request.order_by or DOCUMENT_ID) or descending != request.descending:
+        raise ValidationError("Page cursor does not match the requested sort")
+    position = {DOCUMENT_ID: doc_id}
+    if order_by != DOCUMENT_ID:
+        position[order_by] = _decode_value(payload.get("v"))
+    return position
+
+
+def fetch_page(
+    query: firestore.Query,
+    request: PageRequest,
+    from_snapshot: Callable[[firestore.DocumentSnapshot], Model],
+) -> Page[Model]:
+    """
+    Legge una pagina di ``query`` con ``start_after`` sul cursore e ``select()`` sui campi richiesti.
+    L'id documento chiude sempre l'ordinamento, cosi' i pari merito non saltano tra le pagine.
+    Nota: ordinando per un campo, Firestore esclude i documenti che non lo hanno.
+    """
+    direction = firestore.Query.DESCENDING if request.descending else firestore.Query.ASCENDING
+    if request.order_by and request.order_by != DOCUMENT_ID:
+        query = query.order_by(request.order_by, direction=direction)
+    query = query.order_by(DOCUMENT_ID, direction=direction)
+    if request.fields is not None:
+        # Il campo di ordinamento serve anche per costruire il cursore successivo.
+        selected = list(request.fields)
+        if request.order_by and request.order_by != DOCUMENT_ID and request.order_by not in selected:
+            selected.append(request.order_by)
+        query = query.select(selected)
+    if request.cursor:
+        query = query.start_after(decode_cursor(request))
+
+    # Un documento in piu' dice se esiste una pagina successiva senza una seconda query.
+    snapshots = list(query.limit(request.limit + 1).stream())
+    next_cursor = None
+    if len(snapshots) > request.limit:
+        snapshots = snapshots[:request.limit]
+        next_cursor = encode_cursor(request, snapshots[-1])
+    return Page(items=[from_snapshot(snapshot) for snapshot in snapshots], next_cursor=next_cursor)
+
 
 class BaseRepository(Generic[Model]):
     """Helper Firestore condiviso per repository che lavorano su una singola collection."""
@@ -32,6 +206,9 @@ class BaseRepository(Generic[Model]):
             return None
         return self._model_from_snapshot(doc)
 
+    def get_many(self, identifiers: Iterable[str]) -> List[Model]:
+        return fetch_many(self.collection, identifiers, self._model_from_snapshot)
+
     def create(self, model: Model) -> str:
         ref = self.collection.add(self._dict_from_model(model))[1]
         return ref.id
@@ -44,6 +221,9 @@ class BaseRepository(Generic[Model]):
     def delete(self, identifier: str) -> None:
         self.collection.document(identifier).delete()
 
+    def query_page(self, request: PageRequest) -> Page[Model]:
+        return fetch_page(self.collection, request, self._model_from_snapshot)
+
     def stream(self) -> Iterable[Model]:
         for snapshot in self.collection.stream():
             yield self._model_from_snapshot(snapshot)
@@ -1,10 +1,107 @@
-from typing import Optional
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from google.api_core.exceptions import AlreadyExists
 from google.cloud import firestore
+from google.cloud.firestore_v1 import transactional as _fs_transactional
 
 from config.firebase_config import db
 from models import EntranceScan
+from repositories import event_counters
+
+ENTERED_COUNT_FIELD = "entered_count"
+# Ingressi per minuto (UTC) sullo stesso documento contatore: il grafico del
+# flusso ingressi si serve con una lettura invece di rileggere tutti gli scan.
+FLOW_MINUTES_FIELD = "flow_minutes"
+FLOW_MINUTE_FORMAT = "%Y-%m-%dT%H:%M"
+# Incrementato a ogni scrittura del contatore: e' il cursore del feed live ingressi.
+VERSION_FIELD = "version"
+# Una transaction accetta al massimo 500 scritture: resta spazio per il contatore.
+SCAN_WRITE_CHUNK_SIZE = 400
+
+
+def flow_minute_key(value: Any) -> Optional[str]:
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime(FLOW_MINUTE_FORMAT)
+
+
+def version_bump_payload() -> Dict[str, Any]:
+    """Solo il cursore: per chi cambia dati mostrati dal feed live senza toccare gli ingressi."""
+    return {VERSION_FIELD: firestore.Increment(1)}
+
+
+def _counter_payload(entered_delta: int, minute_deltas: Dict[str, int]) -> Dict[str, Any]:
+    payload = event_counters.increment_payload(ENTERED_COUNT_FIELD, entered_delta)
+    payload.update(version_bump_payload())
+    minutes = {key: firestore.Increment(amount) for key, amount in minute_deltas.items() if key and amount}
+    if minutes:
+        payload[FLOW_MINUTES_FIELD] = minutes
+    return payload
+
+
+def _scan_minute(snapshot) -> Optional[str]:
+    return flow_minute_key((snapshot.to_dict() or {}).get("scanned_at"))
+
+
+@_fs_transactional
+def _create_scans_tx(transaction, scan_refs, counter_ref, payloads, minutes) -> Dict[str, firestore.DocumentSnapshot]:
+    existing = {snap.id: snap for snap in transaction.get_all(list(scan_refs.values())) if snap.exists}
+    created = Counter()
+    for membership_id, ref in scan_refs.items():
+        if membership_id in existing:
+            continue
+        transaction.create(ref, payloads[membership_id])
+        created[minutes[membership_id]] += 1
+    if created:
+        transaction.set(counter_ref, _counter_payload(sum(created.values()), created), merge=True)
+    return existing
+
+
+@_fs_transactional
+def _set_scan_tx(transaction, scan_ref, counter_ref, payload, minute) -> bool:
+    snap = scan_ref.get(transaction=transaction)
+    transaction.set(scan_ref, payload)
+    if not snap.exists:
+        transaction.set(counter_ref, _counter_payload(1, {minute: 1}), merge=True)
+        return True
+    # Lo scan sovrascritto cambia orario: il conteggio si sposta di minuto.
+    previous = _scan_minute(snap)
+    if previous != minute:
+        transaction.set(counter_ref, _counter_payload(0, {previous: -1, minute: 1}), merge=True)
+    return False
+
+
+@_fs_transactional
+def _delete_scan_tx(transaction, scan_ref, counter_ref) -> bool:
+    snap = scan_ref.get(transaction=transaction)
+    if not snap.exists:
+        return False
+    transaction.delete(scan_ref)
+    transaction.set(counter_ref, _counter_payload(-1, {_scan_minute(snap): -1}), merge=True)
+    return True
+
+
+@_fs_transactional
+def _seed_flow_tx(transaction, counter_ref, scans_query) -> Dict[str, int]:
+    # La lettura del contatore nella transaction lo blocca fino al commit.
+    counter_ref.get(transaction=transaction)
+    minutes = Counter()
+    for snap in scans_query.stream(transaction=transaction):
+        key = _scan_minute(snap)
+        if key:
+            minutes[key] += 1
+    marker = event_counters.seeded_marker(FLOW_MINUTES_FIELD)
+    transaction.set(
+        counter_ref,
+        {FLOW_MINUTES_FIELD: dict(minutes), marker: firestore.SERVER_TIMESTAMP},
+        merge=[FLOW_MINUTES_FIELD, marker],
+    )
+    return dict(minutes)
 
 
 class EntranceScanRepository:
@@ -16,6 +113,10 @@ class EntranceScanRepository:
     def _collection(self, event_id: str):
         return self.base_collection.document(event_id).collection("scans")
 
+    def _counter_ref(self, event_id: str):
+        # Il documento padre entrance_scans/{eventId} ospita il contatore degli ingressi.
+        return self.base_collection.document(event_id)
+
     def _model_from_snapshot(self, snapshot) -> EntranceScan:
         return EntranceScan.from_firestore(snapshot.to_dict() or {}, doc_id=snapshot.id)
 
@@ -31,30 +132,181 @@ class EntranceScanRepository:
     def list(self, event_id: str):
         return [self._model_from_snapshot(doc) for doc in self._collection(event_id).stream()]
 
-    def create_scan(self, event_id: str, membership_id: str, scan_token: str) -> Optional[EntranceScan]:
-        """Ritorna None se crea il record; ritorna lo scan esistente se intercetta una race condition."""
+    def stream_all(self) -> Iterable[Tuple[str, EntranceScan]]:
+        """Tutte le scansioni di tutti gli eventi, come coppie ``(event_id, scan)``."""
+        for snap in db.collection_group("scans").stream():
+            event_ref = snap.reference.parent.parent
+            if event_ref is None or event_ref.parent.id != self.base_collection.id:
+                continue
+            yield event_ref.id, self._model_from_snapshot(snap)
+
+    def create_scan(
+        self,
+        event_id: str,
+        membership_id: str,
+        scan_token: str,
+        scanned_at: Optional[datetime] = None,
+    ) -> Optional[EntranceScan]:
+        """Ritorna None se crea il record; ritorna lo scan esistente se intercetta una race condition.
+
+        ``scanned_at`` arriva solo dagli scanner offline: l'orario del device viene
+        conservato e lo scan e' marcato ``offline`` con l'orario di sincronizzazione.
+        """
         model = EntranceScan(
-            scanned_at=firestore.SERVER_TIMESTAMP,
+            scanned_at=scanned_at or firestore.SERVER_TIMESTAMP,
             scan_token=scan_token,
             manual=False,
+            offline=scanned_at is not None,
+            synced_at=firestore.SERVER_TIMESTAMP if scanned_at is not None else None,
         )
         ref = self._collection(event_id).document(membership_id)
+        minute = flow_minute_key(scanned_at or datetime.now(timezone.utc))
+        # create() e incremento nello stesso batch: se lo scan esiste gia' il commit fallisce per intero.
+        batch = db.batch()
+        batch.create(ref, model.to_firestore())
+        batch.set(self._counter_ref(event_id), _counter_payload(1, {minute: 1}), merge=True)
         try:
-            ref.create(model.to_firestore())
+            batch.commit()
             return None
         except AlreadyExists:
             return self._model_from_snapshot(ref.get())
 
+    def create_scans(
+        self,
+        event_id: str,
+        scan_token: str,
+        entries: Dict[str, Optional[datetime]],
+    ) -> Dict[str, EntranceScan]:
+        """Crea piu' scan in transaction (400 per blocco) e ritorna quelli gia' esistenti per membership_id.
+
+        Come ``create_scan``: un valore ``datetime`` indica uno scan offline con orario del device.
+        """
+        existing: Dict[str, EntranceScan] = {}
+        membership_ids = [membership_id for membership_id in entries if membership_id]
+        for start in range(0, len(membership_ids), SCAN_WRITE_CHUNK_SIZE):
+            chunk = membership_ids[start:start + SCAN_WRITE_CHUNK_SIZE]
+            scan_refs = {membership_id: self._collection(event_id).document(membership_id) for membership_id in chunk}
+            payloads = {}
+            minutes = {}
+            now = datetime.now(timezone.utc)
+            for membership_id in chunk:
+                scanned_at = entries[membership_id]
+                minutes[membership_id] = flow_minute_key(scanned_at or now)
+                payloads[membership_id] = EntranceScan(
+                    scanned_at=scanned_at or firestore.SERVER_TIMESTAMP,
+                    scan_token=scan_token,
+                    manual=False,
+                    offline=scanned_at is not None,
+                    synced_at=firestore.SERVER_TIMESTAMP if scanned_at is not None else None,
+                ).to_firestore()
+            snapshots = _create_scans_tx(
+                db.transaction(), scan_refs, self._counter_ref(event_id), payloads, minutes
+            )
+            existing.update({membership_id: self._model_from_snapshot(snap) for membership_id, snap in snapshots.items()})
+        return existing
+
     def create_manual(self, event_id: str, membership_id: str, admin_uid: str) -> None:
         model = EntranceScan(
             scanned_at=firestore.SERVER_TIMESTAMP,
             manual=True,
             operator=admin_uid,
         )
-        self._collection(event_id).document(membership_id).set(model.to_firestore())
+        _set_scan_tx(
+            db.transaction(),
+            self._collection(event_id).document(membership_id),
+            self._counter_ref(event_id),
+            model.to_firestore(),
+            flow_minute_key(datetime.now(timezone.utc)),
+        )
 
     def delete(self, event_id: str, membership_id: str) -> None:
-        self._collection(event_id).document(membership_id).delete()
+        _delete_scan_tx(
+            db.transaction(),
+            self._collection(event_id).document(membership_id),
+            self._counter_ref(event_id),
+        )
 
     def count(self, event_id: str) -> int:
-        return sum(1 for _ in self._collection(event_id).stream())
+        return event_counters.read_count(self._counter_ref(event_id), ENTERED_COUNT_FIELD, self._collection(event_id))
+
+    def reconcile_count(self, event_id: str) -> int:
+        return event_counters.reconcile_count(
+            self._counter_ref(event_id), ENTERED_COUNT_FIELD, self._collection(event_id)
+        )
+
+    def get_flow_minutes(self, event_id: str) -> Dict[datetime, int]:
+        """Ingressi per minuto (inizio minuto in UTC) letti dal documento contatore."""
+        return self._flow_minutes(event_id, self._counter_data(self._counter_ref(event_id).get()))
+
+    def bump_versions(self, event_ids: Iterable[str]) -> None:
+        """Incrementa solo il cursore ``version`` degli eventi: i manifest scanner vanno riscaricati."""
+        event_ids = [event_id for event_id in dict.fromkeys(event_ids) if event_id]
+        for start in range(0, len(event_ids), SCAN_WRITE_CHUNK_SIZE):
+            batch = db.batch()
+            for event_id in event_ids[start:start + SCAN_WRITE_CHUNK_SIZE]:
+                batch.set(self._counter_ref(event_id), version_bump_payload(), merge=True)
+            batch.commit()
+
+    def get_entry_state(self, event_id: str) -> Dict[str, int]:
+        """``version`` ed ``entered_count`` con una sola lettura, senza il flusso per minuto."""
+        data = self._counter_data(self._counter_ref(event_id).get())
+        return {"version": int(data.get(VERSION_FIELD) or 0), "entered_count": self._entered_count(event_id, data)}
+
+    def get_live_state(self, event_id: str) -> Dict[str, Any]:
+        """``version``, ``entered_count`` e ``flow_minutes`` con una sola lettura del contatore."""
+        return self._live_state(event_id, self._counter_ref(event_id).get())
+
+    def wait_live_state(self, event_id: str, version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Resta in ascolto sul documento contatore finche' ``version`` cambia o scade ``timeout``.
+        Il primo snapshot arriva subito: se il cursore e' gia' vecchio ritorna senza attendere.
+        """
+        changed = threading.Event()
+        latest = {}
+
+        def on_snapshot(snapshots, _changes, _read_time):
+            for snap in snapshots:
+                if int(self._counter_data(snap).get(VERSION_FIELD) or 0) != version:
+                    latest["snapshot"] = snap
+                    changed.set()
+
+        watch = self._counter_ref(event_id).on_snapshot(on_snapshot)
+        try:
+            if not changed.wait(timeout):
+                return None
+        finally:
+            watch.unsubscribe()
+        return self._live_state(event_id, latest["snapshot"])
+
+    @staticmethod
+    def _counter_data(snap) -> Dict[str, Any]:
+        return (snap.to_dict() or {}) if snap.exists else {}
+
+    def _flow_minutes(self, event_id: str, data: Dict[str, Any]) -> Dict[datetime, int]:
+        if data.get(event_counters.seeded_marker(FLOW_MINUTES_FIELD)):
+            minutes = data.get(FLOW_MINUTES_FIELD) or {}
+        else:
+            minutes = self.reconcile_flow(event_id)
+        output = {}
+        for key, value in minutes.items():
+            count = int(value or 0)
+            if count > 0:
+                output[datetime.strptime(key, FLOW_MINUTE_FORMAT).replace(tzinfo=timezone.utc)] = count
+        return output
+
+    def _entered_count(self, event_id: str, data: Dict[str, Any]) -> int:
+        if data.get(event_counters.seeded_marker(ENTERED_COUNT_FIELD)) and ENTERED_COUNT_FIELD in data:
+            return max(int(data.get(ENTERED_COUNT_FIELD) or 0), 0)
+        return self.reconcile_count(event_id)
+
+    def _live_state(self, event_id: str, snap) -> Dict[str, Any]:
+        data = self._counter_data(snap)
+        return {
+            "version": int(data.get(VERSION_FIELD) or 0),
+            "entered_count": self._entered_count(event_id, data),
+            "flow_minutes": self._flow_minutes(event_id, data),
+        }
+
+    def reconcile_flow(self, event_id: str) -> Dict[str, int]:
+        """Ricalcola da zero i contatori per minuto rileggendo gli scan dell'evento."""
+        return _seed_flow_tx(db.transaction(), self._counter_ref(event_id), self._collection(event_id))
@@ -0,0 +1,56 @@
+"""
+Contatori per-evento mantenuti su un documento "contatore": il documento
+evento (``events/{eventId}``, partecipanti) o il padre della subcollection
+(``entrance_scans/{eventId}``, ingressi).
+
+Gli scrittori incrementano il campo nello stesso batch/transaction del
+documento figlio. Il lettore si fida del valore solo se il contatore e' stato
+inizializzato (``<field>_seeded_at``); altrimenti lo inizializza con una
+aggregation ``count()`` dentro una transaction, che blocca il documento
+contatore e quindi serializza gli incrementi concorrenti.
+"""
+
+from typing import Any, Dict
+
+from google.cloud import firestore
+from google.cloud.firestore_v1 import transactional as _fs_transactional
+
+from config.firebase_config import db
+
+
+def seeded_marker(field: str) -> str:
+    return f"{field}_seeded_at"
+
+
+def increment_payload(field: str, amount: int) -> Dict[str, Any]:
+    return {field: firestore.Increment(amount)}
+
+
+@_fs_transactional
+def _seed_count_tx(transaction, counter_ref, field: str, query, create_missing: bool = True) -> int:
+    # La lettura del contatore nella transaction lo blocca fino al commit.
+    snap = counter_ref.get(transaction=transaction)
+    results = query.count(alias="total").get(transaction=transaction)
+    total = int(results[0][0].value) if results else 0
+    if not snap.exists and not create_missing:
+        # Il contatore vive su un documento che non va ricreato (es. evento cancellato).
+        return total
+    transaction.set(
+        counter_ref,
+        {field: total, seeded_marker(field): firestore.SERVER_TIMESTAMP},
+        merge=True,
+    )
+    return total
+
+
+def reconcile_count(counter_ref, field: str, query, create_missing: bool = True) -> int:
+    """Ricalcola il contatore da zero con una aggregation query e lo salva."""
+    return _seed_count_tx(db.transaction(), counter_ref, field, query, create_missing)
+
+
+def read_count(counter_ref, field: str, query, create_missing: bool = True) -> int:
+    snap = counter_ref.get()
+    data = (snap.to_dict() or {}) if snap.exists else {}
+    if data.get(seeded_marker(field)) and field in data:
+        return max(int(data.get(field) or 0), 0)
+    return reconcile_count(counter_ref, field, query, create_missing)
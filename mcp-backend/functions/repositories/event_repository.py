@@ -1,12 +1,23 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+import copy
+from typing import Iterable, List, Optional
 
 from google.cloud.firestore_v1 import FieldFilter
 
 from models import Event
 from repositories.base import BaseRepository
 from utils.slug_utils import build_slug
+from utils.ttl_cache import TTLCache
+
+# Campi scritti solo da ParticipantRepository: un update dell'evento (magari da
+# un modello in cache) non deve sovrascriverli.
+COUNTER_FIELDS = ("participantsCount", "participantsCount_seeded_at")
+
+# Checkout, pagamento e biglietti rileggono lo stesso evento nella stessa
+# richiesta (e nelle successive): le istanze calde lo servono dalla memoria.
+EVENT_CACHE_TTL_SECONDS = 60
+_event_cache = TTLCache(ttl_seconds=EVENT_CACHE_TTL_SECONDS)
 
 
 class EventRepository(BaseRepository[Event]):
@@ -19,7 +30,29 @@ class EventRepository(BaseRepository[Event]):
     def get_model(self, event_id: str) -> Optional[Event]:
         if not event_id:
             return None
-        return self.get_by_id(event_id)
+        cached = _event_cache.get(event_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        event = self.get_by_id(event_id)
+        if event is not None:
+            _event_cache.set(event_id, event)
+        return copy.deepcopy(event)
+
+    def get_many(self, identifiers: Iterable[str]) -> List[Event]:
+        """Come ``get_model`` per piu' id: i mancanti in cache arrivano con un solo ``get_all``."""
+        ordered_ids = list(dict.fromkeys(identifier for identifier in identifiers if identifier))
+        found = {}
+        missing = []
+        for event_id in ordered_ids:
+            cached = _event_cache.get(event_id)
+            if cached is not None:
+                found[event_id] = cached
+            else:
+                missing.append(event_id)
+        for event in super().get_many(missing):
+            _event_cache.set(event.id, event)
+            found[event.id] = event
+        return [copy.deepcopy(found[event_id]) for event_id in ordered_ids if event_id in found]
 
     def get_model_by_slug(self, slug: str) -> Optional[Event]:
         if not slug:
@@ -43,7 +76,12 @@ class EventRepository(BaseRepository[Event]):
 
 
     def update_from_model(self, event_id: str, event: Event) -> None:
-        self.collection.document(event_id).set(event.to_firestore(include_none=True), merge=True)
+        payload = event.to_firestore(include_none=True)
+        for key in COUNTER_FIELDS:
+            payload.pop(key, None)
+        self.collection.document(event_id).set(payload, merge=True)
+        _event_cache.invalidate(event_id)
 
     def delete(self, event_id: str) -> None:
         self.collection.document(event_id).delete()
+        _event_cache.invalidate(event_id)
@@ -0,0 +1,27 @@
+from typing import Iterable
+
+from google.cloud import firestore
+
+from config.firebase_config import db
+from models import GenderGuess
+from repositories.base import BaseRepository
+
+# Limite Firestore: 500 operazioni per batch.
+GENDER_CACHE_BATCH_SIZE = 400
+
+
+class GenderCacheRepository(BaseRepository[GenderGuess]):
+    """Cache persistente nome -> genere: un documento per nome normalizzato (id documento)."""
+
+    def __init__(self):
+        super().__init__("gender_cache", GenderGuess)
+
+    def set_many(self, guesses: Iterable[GenderGuess]) -> None:
+        guesses = [guess for guess in guesses if guess.id]
+        for start in range(0, len(guesses), GENDER_CACHE_BATCH_SIZE):
+            batch = db.batch()
+            for guess in guesses[start:start + GENDER_CACHE_BATCH_SIZE]:
+                payload = guess.to_firestore()
+                payload["updated_at"] = firestore.SERVER_TIMESTAMP
+                batch.set(self.collection.document(guess.id), payload)
+            batch.commit()
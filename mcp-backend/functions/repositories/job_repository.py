@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, Optional, Tuple, Type
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type
 
 from google.cloud.firestore_v1 import FieldFilter
 from google.cloud.firestore_v1 import transactional as _fs_transactional
@@ -33,6 +33,15 @@ def _claim_queued_tx(transaction, job_ref):
     return True
 
 
+@_fs_transactional
+def _mutate_job_tx(transaction, job_ref, mutate):
+    snap = job_ref.get(transaction=transaction)
+    updated, result = mutate(snap.to_dict() if snap.exists else None)
+    if updated is not None:
+        transaction.set(job_ref, updated, merge=True)
+    return result
+
+
 class JobRepository(BaseRepository[Job]):
     def __init__(self, collection_name: str = JOBS_COLLECTION, model_cls: Type[Job] = Job) -> None:
         super().__init__(collection_name, model_cls)
@@ -67,6 +76,28 @@ class JobRepository(BaseRepository[Job]):
         for snap in snaps:
             yield snap.id, (snap.to_dict() or {})
 
+    def stream_raw_by_status(self, job_type: str, status: str) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        snaps = (
+            self.collection.where(filter=FieldFilter("type", "==", job_type))
+            .where(filter=FieldFilter("status", "==", status))
+            .stream()
+        )
+        for snap in snaps:
+            yield snap.id, (snap.to_dict() or {})
+
+    def mutate_raw(
+        self,
+        job_id: str,
+        mutate: Callable[[Optional[Dict[str, Any]]], Tuple[Optional[Dict[str, Any]], Any]],
+    ) -> Any:
+        """
+        Legge e aggiorna il job ``job_id`` in una transazione.
+        ``mutate(payload)`` riceve il documento (None se assente) e restituisce
+        ``(campi da scrivere in merge o None, risultato)``.
+        """
+        job_ref = self.collection.document(job_id)
+        return _mutate_job_tx(db.transaction(), job_ref, mutate)
+
     def claim_queued(self, job_id: str) -> bool:
         job_ref = self.collection.document(job_id)
         return _claim_queued_tx(db.transaction(), job_ref)
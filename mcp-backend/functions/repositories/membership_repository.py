@@ -4,7 +4,7 @@ from google.cloud import firestore
 from google.cloud.firestore_v1 import FieldFilter
 
 from models import Membership
-from repositories.base import BaseRepository
+from repositories.base import BaseRepository, Page, PageRequest, fetch_page
 from utils.slug_utils import build_slug
 
 
@@ -97,10 +97,20 @@ class MembershipRepository(BaseRepository[Membership]):
         return True
 
     def find_by_year(self, year: int) -> List[Membership]:
+        return list(self.stream_by_year(year))
+
+    def stream_by_year(self, year: int) -> Iterable[Membership]:
         docs = self.collection.where(
             filter=FieldFilter("membership_years", "array_contains", int(year))
         ).stream()
-        return [self._model_from_snapshot(doc) for doc in docs]
+        for doc in docs:
+            yield self._model_from_snapshot(doc)
+
+    def query_page(self, request: PageRequest, year: Optional[int] = None) -> Page[Membership]:
+        query = self.collection
+        if year:
+            query = query.where(filter=FieldFilter("membership_years", "array_contains", int(year)))
+        return fetch_page(query, request, self._model_from_snapshot)
 
     def update_from_model(self, membership_id: str, payload: Membership) -> bool:
         # Il repository non contiene regole di rinnovo: persiste il model già deciso dal service.
@@ -7,6 +7,7 @@ from google.cloud.firestore_v1 import FieldFilter
 
 from config.firebase_config import db
 from models import NewsletterConsent, NewsletterParticipant, NewsletterSignup
+from repositories.base import Page, PageRequest, fetch_page
 
 
 class NewsletterRepository:
@@ -29,6 +30,12 @@ class NewsletterRepository:
         for doc in self.consents_collection.order_by("timestamp").stream():
             yield self._consent_from_snapshot(doc)
 
+    def query_signups_page(self, request: PageRequest) -> Page[NewsletterSignup]:
+        return fetch_page(self.signup_collection, request, self._signup_from_snapshot)
+
+    def query_consents_page(self, request: PageRequest) -> Page[NewsletterConsent]:
+        return fetch_page(self.consents_collection, request, self._consent_from_snapshot)
+
     def get_signup(self, signup_id: str) -> Optional[NewsletterSignup]:
         doc = self.signup_collection.document(signup_id).get()
         if not doc.exists:
@@ -1,15 +1,50 @@
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from google.cloud import firestore
 from google.cloud.firestore_v1 import FieldFilter
+from google.cloud.firestore_v1 import transactional as _fs_transactional
 
 from config.firebase_config import db
-from models import EventParticipant
+from models import EventParticipant, ParticipantRow
+from models.analytics_rows import PARTICIPANT_ROW_KEYS
+from repositories import event_counters
+from repositories.base import Page, PageRequest, fetch_page
+from repositories.entrance_scan_repository import version_bump_payload
+
+# Contatore sul documento evento (campo Event.participants_count): la lista
+# eventi admin lo legge dalla sola query sugli eventi.
+PARTICIPANTS_COUNT_FIELD = "participantsCount"
+
+
+@_fs_transactional
+def _create_participant_tx(transaction, participant_ref, payload, counter_ref, entrance_ref) -> None:
+    event_snap = counter_ref.get(transaction=transaction)
+    transaction.set(participant_ref, payload)
+    # update() e non set(merge): un evento cancellato non va ricreato dal contatore.
+    if event_snap.exists:
+        transaction.update(counter_ref, event_counters.increment_payload(PARTICIPANTS_COUNT_FIELD, 1))
+        # Cursore ingressi: feed live e manifest scanner vedono il nuovo partecipante.
+        transaction.set(entrance_ref, version_bump_payload(), merge=True)
+
+
+@_fs_transactional
+def _delete_participant_tx(transaction, participant_ref, counter_ref, entrance_ref) -> bool:
+    snap = participant_ref.get(transaction=transaction)
+    event_snap = counter_ref.get(transaction=transaction)
+    if not snap.exists:
+        return False
+    transaction.delete(participant_ref)
+    if event_snap.exists:
+        transaction.update(counter_ref, event_counters.increment_payload(PARTICIPANTS_COUNT_FIELD, -1))
+        transaction.set(entrance_ref, version_bump_payload(), merge=True)
+    return True
 
 
 class ParticipantRepository:
     def __init__(self):
         self.base_collection = db.collection("participants")
+        self.events_collection = db.collection("events")
+        self.entrance_collection = db.collection("entrance_scans")
 
     def _chunked(self, values: List[str], size: int = 10) -> Iterable[List[str]]:
         for i in range(0, len(values), size):
@@ -18,6 +53,13 @@ class ParticipantRepository:
     def _collection(self, event_id: str) -> firestore.CollectionReference:
         return self.base_collection.document(event_id).collection("participants_event")
 
+    def _counter_ref(self, event_id: str) -> firestore.DocumentReference:
+        return self.events_collection.document(event_id)
+
+    def _entrance_ref(self, event_id: str) -> firestore.DocumentReference:
+        # Documento contatore ingressi (vedi EntranceScanRepository): ospita il cursore ``version``.
+        return self.entrance_collection.document(event_id)
+
     def _model_from_snapshot(self, snapshot: firestore.DocumentSnapshot, event_id: str) -> EventParticipant:
         return EventParticipant.from_firestore(snapshot.to_dict() or {}, snapshot.id)
 
@@ -29,6 +71,32 @@ class ParticipantRepository:
         for doc in self._collection(event_id).stream():
             yield self._model_from_snapshot(doc, event_id)
 
+    def stream_rows(self, event_id: str) -> Iterable[ParticipantRow]:
+        """Righe compatte per gli analytics: ``select()`` legge dal server solo i campi di ``ParticipantRow``."""
+        for doc in self._collection(event_id).select(PARTICIPANT_ROW_KEYS).stream():
+            yield ParticipantRow.from_firestore(doc.to_dict() or {}, doc.id)
+
+    def stream_membership_ids(self, event_id: str) -> Iterable[str]:
+        """Membership dei partecipanti dell'evento: ``select()`` legge solo ``membershipId``."""
+        for doc in self._collection(event_id).select(["membershipId"]).stream():
+            membership_id = str((doc.to_dict() or {}).get("membershipId") or "").strip()
+            if membership_id:
+                yield membership_id
+
+    def list_page(self, event_id: str, after_id: Optional[str] = None, limit: int = 300) -> List[EventParticipant]:
+        """Pagina ordinata per id documento: ``after_id`` e' il cursore dell'ultima pagina letta."""
+        query = self._collection(event_id).order_by("__name__")
+        if after_id:
+            query = query.start_after({"__name__": after_id})
+        return [self._model_from_snapshot(doc, event_id) for doc in query.limit(limit).stream()]
+
+    def query_page(self, event_id: str, request: PageRequest) -> Page[EventParticipant]:
+        return fetch_page(
+            self._collection(event_id),
+            request,
+            lambda snapshot: self._model_from_snapshot(snapshot, event_id),
+        )
+
     def get(self, event_id: str, participant_id: str) -> Optional[EventParticipant]:
         doc = self._collection(event_id).document(participant_id).get()
         if not doc.exists:
@@ -36,7 +104,14 @@ class ParticipantRepository:
         return self._model_from_snapshot(doc, event_id)
 
     def create_from_model(self, event_id: str, participant: EventParticipant) -> str:
-        doc_ref = self._collection(event_id).add(participant.to_firestore(include_none=True))[1]
+        doc_ref = self._collection(event_id).document()
+        _create_participant_tx(
+            db.transaction(),
+            doc_ref,
+            participant.to_firestore(include_none=True),
+            self._counter_ref(event_id),
+            self._entrance_ref(event_id),
+        )
         return doc_ref.id
 
     def update_from_model(self, event_id: str, participant_id: str, participant: EventParticipant) -> bool:
@@ -47,14 +122,26 @@ class ParticipantRepository:
         return True
 
     def delete(self, event_id: str, participant_id: str) -> None:
-        self._collection(event_id).document(participant_id).delete()
+        _delete_participant_tx(
+            db.transaction(),
+            self._collection(event_id).document(participant_id),
+            self._counter_ref(event_id),
+            self._entrance_ref(event_id),
+        )
 
     def count(self, event_id: str) -> int:
         try:
-            return sum(1 for _ in self._collection(event_id).stream())
+            return event_counters.read_count(
+                self._counter_ref(event_id), PARTICIPANTS_COUNT_FIELD, self._collection(event_id), create_missing=False
+            )
         except Exception:
             return 0
 
+    def reconcile_count(self, event_id: str) -> int:
+        return event_counters.reconcile_count(
+            self._counter_ref(event_id), PARTICIPANTS_COUNT_FIELD, self._collection(event_id), create_missing=False
+        )
+
     def any_with_contacts(self, event_id: str, emails: List[str], phones: List[str]) -> bool:
         if not event_id:
             return False
@@ -85,15 +172,14 @@ class ParticipantRepository:
     def set_membership(self, event_id: str, participant_id: str, membership_id: Optional[str]) -> None:
         """Set or clear the membershipId field on a participant document."""
         if membership_id:
-            self._collection(event_id).document(participant_id).update({
-                "membershipId": membership_id,
-                "membership_included": True,
-            })
+            payload = {"membershipId": membership_id, "membership_included": True}
         else:
-            self._collection(event_id).document(participant_id).update({
-                "membershipId": firestore.DELETE_FIELD,
-                "membership_included": False,
-            })
+            payload = {"membershipId": firestore.DELETE_FIELD, "membership_included": False}
+        # La tessera cambia il manifest scanner: il cursore ingressi va incrementato insieme.
+        batch = db.batch()
+        batch.update(self._collection(event_id).document(participant_id), payload)
+        batch.set(self._entrance_ref(event_id), version_bump_payload(), merge=True)
+        batch.commit()
 
     def clear_membership_reference(self, membership_id: str) -> int:
         if not membership_id:
@@ -111,16 +197,49 @@ class ParticipantRepository:
         return updated
 
     def get_by_membership_id(self, event_id: str, membership_id: str) -> Optional["EventParticipant"]:
-        """Return the first participant in the given event whose membershipId matches."""
+        """Return the first participant in the given event whose membershipId matches.
+
+        The query is scoped to the event subcollection and served by the
+        single-field ``membershipId`` index (COLLECTION scope), so the scanner
+        reads at most one document regardless of how many events exist.
+        """
+        if not event_id or not membership_id:
+            return None
         docs = (
-            db.collection_group("participants_event")
+            self._collection(event_id)
             .where(filter=FieldFilter("membershipId", "==", membership_id))
+            .limit(1)
             .get()
         )
-        for doc in docs:
-            if doc.reference.parent.parent.id == event_id:
-                return EventParticipant.from_firestore(doc.to_dict() or {}, doc.id)
-        return None
+        if not docs:
+            return None
+        return self._model_from_snapshot(docs[0], event_id)
+
+    def list_event_ids_by_membership(self, membership_id: str) -> List[str]:
+        """Eventi con almeno un partecipante collegato alla tessera: ``select([])`` legge solo i path."""
+        if not membership_id:
+            return []
+        query = db.collection_group("participants_event").where(
+            filter=FieldFilter("membershipId", "==", membership_id)
+        )
+        event_ids = []
+        for snap in query.select([]).stream():
+            event_ref = snap.reference.parent.parent
+            if event_ref is not None:
+                event_ids.append(event_ref.id)
+        return list(dict.fromkeys(event_ids))
+
+    def list_by_membership_ids(self, event_id: str, membership_ids: List[str]) -> List[EventParticipant]:
+        """Participants of one event matching any of the given membership ids (``in`` queries, 30 per chunk)."""
+        unique_ids = list(dict.fromkeys(mid for mid in membership_ids if mid))
+        if not event_id or not unique_ids:
+            return []
+        collection = self._collection(event_id)
+        participants = []
+        for batch in self._chunked(unique_ids, size=30):
+            query = collection.where(filter=FieldFilter("membershipId", "in", batch))
+            participants.extend(self._model_from_snapshot(doc, event_id) for doc in query.stream())
+        return participants
 
     def update_entered(self, event_id: str, participant_id: str, entered: bool) -> None:
         self._collection(event_id).document(participant_id).update({
@@ -128,6 +247,42 @@ class ParticipantRepository:
             "entered_at": firestore.SERVER_TIMESTAMP if entered else None,
         })
 
+    def update_entered_many(self, event_id: str, participant_ids: List[str], entered: bool) -> None:
+        payload = {
+            "entered": entered,
+            "entered_at": firestore.SERVER_TIMESTAMP if entered else None,
+        }
+        for chunk in self._chunked([pid for pid in participant_ids if pid], size=400):
+            batch = db.batch()
+            for participant_id in chunk:
+                batch.update(self._collection(event_id).document(participant_id), payload)
+            batch.commit()
+
+    def update_gender_many(self, updates: Iterable[Tuple[str, str, str, float]]) -> int:
+        """Scrive ``gender``/``gender_probability`` a batch: ``updates`` e' (event_id, participant_id, gender, probability)."""
+        updates = [update for update in updates if update[0] and update[1]]
+        for start in range(0, len(updates), 400):
+            batch = db.batch()
+            for event_id, participant_id, gender, probability in updates[start:start + 400]:
+                batch.update(
+                    self._collection(event_id).document(participant_id),
+                    {"gender": gender, "gender_probability": probability},
+                )
+            batch.commit()
+        return len(updates)
+
+    def mark_location_sent_many(self, event_id: str, participant_ids: List[str], job_id: Optional[str] = None) -> None:
+        payload = {
+            "location_sent": True,
+            "location_sent_at": firestore.SERVER_TIMESTAMP,
+            "location_job_id": job_id,
+        }
+        for chunk in self._chunked([pid for pid in participant_ids if pid], size=400):
+            batch = db.batch()
+            for participant_id in chunk:
+                batch.update(self._collection(event_id).document(participant_id), payload)
+            batch.commit()
+
     def update_membership_reference(self, old_membership_id: str, new_membership_id: str) -> int:
         if not old_membership_id or not new_membership_id:
             return 0
@@ -151,3 +306,12 @@ class ParticipantRepository:
             if event_id:
                 payload["event_id"] = payload.get("event_id") or event_id
             yield EventParticipant.from_firestore(payload, snap.id)
+
+    def stream_all_rows(self) -> Iterable[ParticipantRow]:
+        """Come ``stream_all`` ma con la projection di ``ParticipantRow``."""
+        for snap in db.collection_group("participants_event").select(PARTICIPANT_ROW_KEYS).stream():
+            payload = snap.to_dict() or {}
+            if not payload.get("event_id"):
+                event_ref = snap.reference.parent.parent
+                payload["event_id"] = event_ref.id if event_ref else None
+            yield ParticipantRow.from_firestore(payload, snap.id)
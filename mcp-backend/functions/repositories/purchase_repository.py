@@ -1,10 +1,12 @@
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional
 
 from google.cloud import firestore
 from google.cloud.firestore_v1 import FieldFilter
 
 from config.firebase_config import db
-from models import EventPurchase, Purchase, PurchaseTypes
+from models import EventPurchase, Purchase, PurchaseRow, PurchaseTypes
+from models.analytics_rows import PURCHASE_ROW_KEYS
+from repositories.base import Page, PageRequest, fetch_many, fetch_page
 from utils.slug_utils import build_slug
 
 
@@ -41,12 +43,18 @@ class PurchaseRepository:
         for snap in self.collection.stream():
             yield self._model_from_snapshot(snap)
 
+    def query_page(self, request: PageRequest) -> Page[Purchase]:
+        return fetch_page(self.collection, request, self._model_from_snapshot)
+
     def get_model(self, purchase_id: str) -> Optional[Purchase]:
         doc = self.collection.document(purchase_id).get()
         if not doc.exists:
             return None
         return self._model_from_snapshot(doc)
 
+    def get_many(self, purchase_ids: Iterable[str]) -> List[Purchase]:
+        return fetch_many(self.collection, purchase_ids, self._model_from_snapshot)
+
     def get_model_by_slug(self, slug: str) -> Optional[Purchase]:
         matches = (
             self.collection.where(filter=FieldFilter("slug", "==", slug))
@@ -78,6 +86,17 @@ class PurchaseRepository:
         for snap in snaps:
             yield self._model_from_snapshot(snap)
 
+    def stream_rows(self, event_id: Optional[str] = None) -> Iterable[PurchaseRow]:
+        """
+        Righe compatte per gli analytics (projection ``select()`` sui campi di
+        ``PurchaseRow``); con ``event_id`` solo gli acquisti di quell'evento.
+        """
+        query = self.collection
+        if event_id:
+            query = query.where(filter=FieldFilter("ref_id", "==", event_id))
+        for snap in query.select(PURCHASE_ROW_KEYS).stream():
+            yield PurchaseRow.from_firestore(snap.to_dict() or {}, snap.id)
+
     def update_status(self, purchase_id: str, status: str) -> None:
         self.collection.document(purchase_id).update({"status": status})
 
@@ -1,9 +1,16 @@
+import copy
 from typing import Optional
 
 from google.cloud import firestore
 
 from models.scan_token import ScanToken
 from repositories.base import BaseRepository
+from utils.ttl_cache import TTLCache
+
+# Letto a ogni scansione: TTL breve perche' una disattivazione fatta su un'altra
+# istanza diventa visibile qui solo alla scadenza della voce.
+SCAN_TOKEN_CACHE_TTL_SECONDS = 30
+_token_cache = TTLCache(ttl_seconds=SCAN_TOKEN_CACHE_TTL_SECONDS)
 
 
 class ScanTokenRepository(BaseRepository[ScanToken]):
@@ -11,10 +18,15 @@ class ScanTokenRepository(BaseRepository[ScanToken]):
         super().__init__("scan_tokens", ScanToken)
 
     def get(self, token: str) -> Optional[ScanToken]:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            return copy.deepcopy(cached)
         doc = self.collection.document(token).get()
         if not doc.exists:
             return None
-        return self._model_from_snapshot(doc)
+        model = self._model_from_snapshot(doc)
+        _token_cache.set(token, model)
+        return copy.deepcopy(model)
 
     def create(self, token: str, event_id: str, admin_uid: str, expires_at) -> None:
         model = ScanToken(
@@ -25,6 +37,7 @@ class ScanTokenRepository(BaseRepository[ScanToken]):
             is_active=True,
         )
         self.collection.document(token).set(model.to_firestore())
+        _token_cache.invalidate(token)
 
     def deactivate(self, token: str, admin_uid: str) -> None:
         self.collection.document(token).update({
@@ -32,3 +45,4 @@ class ScanTokenRepository(BaseRepository[ScanToken]):
             "deactivated_by": admin_uid,
             "deactivated_at": firestore.SERVER_TIMESTAMP,
         })
+        _token_cache.invalidate(token)
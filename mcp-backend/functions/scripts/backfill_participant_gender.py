@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+
+# Allow running from repo root by adding functions/ to sys.path
+FUNCTIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if FUNCTIONS_DIR not in sys.path:
+    sys.path.insert(0, FUNCTIONS_DIR)
+
+from services.core.gender_service import GenderService
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backfill gender/gender_probability on participants (gender_cache + batched Genderize)."
+    )
+    parser.add_argument("--event-id", default=None, help="Only participants of this event (default: all events).")
+    parser.add_argument("--overwrite", action="store_true", help="Recompute participants that already have a gender.")
+    parser.add_argument("--dry-run", action="store_true", help="Do not write participant updates.")
+    parser.add_argument("--limit", type=int, default=None, help="Max participants to enrich.")
+    args = parser.parse_args()
+
+    stats = GenderService().backfill_participants(
+        event_id=args.event_id,
+        overwrite=args.overwrite,
+        dry_run=args.dry_run,
+        limit=args.limit,
+    )
+    prefix = "[DRY-RUN] " if args.dry_run else ""
+    print(f"{prefix}[DONE] scanned={stats['scanned']} candidates={stats['candidates']} updated={stats['updated']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark della (de)serializzazione FirestoreModel.
+
+Confronta il codec compilato di ``models/base.py`` con la versione precedente
+(``dataclasses.fields()`` e metadata riletti a ogni documento) su documenti
+partecipante sintetici. Non tocca Firestore.
+
+USO
+  cd mcp-backend/functions
+  python scripts/bench_model_codec.py [--docs 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import fields
+from enum import Enum
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models import EventParticipant  # noqa: E402
+
+
+def _legacy_from_firestore(cls, data, doc_id=None):
+    kwargs = {"id": doc_id}
+    for f in fields(cls):
+        if f.name == "id" or not f.init:
+            continue
+        key = f.metadata.get("firestore_name", f.name)
+        if key not in data:
+            continue
+        value = data[key]
+        enum_cls = f.metadata.get("enum")
+        if enum_cls and value is not None:
+            try:
+                value = enum_cls(value)
+            except ValueError:
+                continue
+        kwargs[f.name] = value
+    return cls(**kwargs)
+
+
+def _legacy_to_firestore(model, include_none=False):
+    payload = {}
+    for f in fields(model):
+        if f.name == "id":
+            continue
+        key = f.metadata.get("firestore_name", f.name)
+        value = getattr(model, f.name)
+        if value is None and not include_none:
+            continue
+        enum_cls = f.metadata.get("enum")
+        if enum_cls and isinstance(value, Enum):
+            value = value.value
+        payload[key] = value
+    return payload
+
+
+def _documents(count):
+    return [
+        {
+            "event_id": "evt-bench",
+            "name": f"Nome{index}",
+            "surname": f"Cognome{index}",
+            "email": f"user{index}@example.com",
+            "phone": f"+39333{index:07d}",
+            "birthdate": "01-01-1995",
+            "membershipId": f"mem-{index}" if index % 3 else None,
+            "entered": index % 2 == 0,
+            "ticket_sent": True,
+            "gender": "f" if index % 2 else "m",
+            "price": 15.0,
+            "payment_method": "website" if index % 5 else "omaggio",
+            "purchase_id": f"pur-{index}",
+            "createdAt": "2026-03-01T21:00:00Z",
+        }
+        for index in range(count)
+    ]
+
+
+def _timed(label, fn, repeat):
+    best = min(_run(fn) for _ in range(repeat))
+    print(f"{label:<32} {best:8.3f}s")
+    return best
+
+
+def _run(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    docs = _documents(args.docs)
+    ids = [f"p{index}" for index in range(args.docs)]
+    print(f"{args.docs} documenti EventParticipant, migliore di {args.repeat} run")
+
+    legacy_decode = _timed(
+        "from_firestore (legacy)",
+        lambda: [_legacy_from_firestore(EventParticipant, doc, doc_id) for doc, doc_id in zip(docs, ids)],
+        args.repeat,
+    )
+    codec_decode = _timed(
+        "from_firestore (codec)",
+        lambda: [EventParticipant.from_firestore(doc, doc_id) for doc, doc_id in zip(docs, ids)],
+        args.repeat,
+    )
+    models = [EventParticipant.from_firestore(doc, doc_id) for doc, doc_id in zip(docs, ids)]
+    legacy_encode = _timed(
+        "to_firestore (legacy)",
+        lambda: [_legacy_to_firestore(model, include_none=True) for model in models],
+        args.repeat,
+    )
+    codec_encode = _timed(
+        "to_firestore (codec)",
+        lambda: [model.to_firestore(include_none=True) for model in models],
+        args.repeat,
+    )
+    print(f"speedup decode x{legacy_decode / codec_decode:.2f}, encode x{legacy_encode / codec_encode:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del clustering delle fasce biglietto.
+
+Confronta ``domain.ticket_tiers.map_ticket_tiers`` con le due implementazioni
+precedenti (``AnalyticsService._map_tiers``, che ricalcolava il centro
+risommando tutte le righe del cluster a ogni inserimento, e
+``AnalyticsSnapshotService._cluster_price_tiers``, che confrontava ogni prezzo
+con tutti i cluster) su eventi sintetici, e verifica che le fasce coincidano.
+Non tocca Firestore.
+
+USO
+  cd mcp-backend/functions
+  python scripts/bench_ticket_tiers.py [--purchases 1000 5000 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from domain.ticket_tiers import PRICE_TOLERANCE, map_ticket_tiers, tier_for_cluster  # noqa: E402
+
+
+def _legacy_map_tiers(rows):
+    clustered = []
+    for row in sorted(rows, key=lambda r: r["unit_price"]):
+        for cluster in clustered:
+            if abs(row["unit_price"] - cluster["center"]) <= PRICE_TOLERANCE:
+                cluster["rows"].append(row)
+                cluster["center"] = sum(r["unit_price"] for r in cluster["rows"]) / len(cluster["rows"])
+                break
+        else:
+            clustered.append({"center": row["unit_price"], "rows": [row]})
+    clustered.sort(key=lambda c: c["center"])
+    return {
+        row.get("purchase_id"): tier_for_cluster(index, len(clustered))
+        for index, cluster in enumerate(clustered)
+        for row in cluster["rows"]
+    }
+
+
+def _legacy_cluster_price_tiers(price_weights):
+    clustered = []
+    for price in sorted(price_weights):
+        weight = price_weights[price]
+        for cluster in clustered:
+            if abs(price - cluster["center"]) <= PRICE_TOLERANCE:
+                cluster["prices"].append(price)
+                cluster["total"] += price * weight
+                cluster["weight"] += weight
+                cluster["center"] = cluster["total"] / cluster["weight"]
+                break
+        else:
+            clustered.append({"center": price, "total": price * weight, "weight": weight, "prices": [price]})
+    return {
+        price: tier_for_cluster(index, len(clustered))
+        for index, cluster in enumerate(clustered)
+        for price in cluster["prices"]
+    }
+
+
+def _legacy_weighted_map(rows):
+    weights = {}
+    for row in rows:
+        weights[row["unit_price"]] = weights.get(row["unit_price"], 0) + 1
+    price_to_tier = _legacy_cluster_price_tiers(weights)
+    return {row.get("purchase_id"): price_to_tier[row["unit_price"]] for row in rows}
+
+
+def _rows(count, seed):
+    # Quattro listini piu' sconti in centesimi e qualche prezzo isolato (omaggi parziali,
+    # codici sconto): tanti prezzi distinti e molti cluster, il caso peggiore per i confronti.
+    rng = random.Random(seed)
+    base_prices = (10.0, 12.0, 15.0, 18.0)
+    rows = []
+    for index in range(count):
+        if rng.random() < 0.1:
+            unit_price = round(rng.uniform(1.0, 40.0), 2)
+        else:
+            unit_price = round(rng.choice(base_prices) + rng.uniform(-0.45, 0.45), 2)
+        rows.append({"purchase_id": f"p{index}", "unit_price": unit_price})
+    return rows
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--purchases", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'acquisti':>9} {'_map_tiers':>12} {'snapshot':>12} {'ticket_tiers':>13}  fasce uguali")
+    for count in args.purchases:
+        rows = _rows(count, seed=count)
+        legacy_time, legacy = _timed(lambda: _legacy_map_tiers(rows), args.repeat)
+        snapshot_time, snapshot = _timed(lambda: _legacy_weighted_map(rows), args.repeat)
+        new_time, new = _timed(lambda: map_ticket_tiers(rows), args.repeat)
+        print(
+            f"{count:>9} {legacy_time:>11.4f}s {snapshot_time:>11.4f}s {new_time:>12.4f}s  "
+            f"{new == legacy and new == snapshot}"
+        )
+
+
+if __name__ == "__main__":
+    main()
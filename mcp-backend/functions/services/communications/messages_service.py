@@ -10,8 +10,11 @@ from dto.message_api import (
     MessageActionResponseDTO,
     ReplyMessageRequestDTO,
 )
+from dto.pagination import PageQueryDTO, PageResponseDTO
 from interfaces.repositories import MessageRepositoryProtocol
 from mappers.message_mappers import contact_form_dto_to_model, contact_message_to_response
+from models import ContactMessage
+from repositories.base import build_page_request
 from repositories.message_repository import MessageRepository
 from services.communications.mail_service import EmailMessage, MailService, mail_service
 from errors.service_errors import ExternalServiceError, NotFoundError, ValidationError
@@ -35,6 +38,9 @@ def _resolve_contact_destination_email() -> str:
     return (to_email or "").strip()
 
 
+MESSAGE_SORT_FIELDS = {"name": "name", "timestamp": "timestamp"}
+
+
 class MessagesService:
     def __init__(
         self,
@@ -52,6 +58,11 @@ class MessagesService:
         self.logger.debug("Found %s messages.", len(result))
         return result
 
+    def get_page(self, query: PageQueryDTO) -> PageResponseDTO:
+        request = build_page_request(query, MESSAGE_SORT_FIELDS, ContactMessage)
+        page = self.message_repository.query_page(request)
+        return PageResponseDTO.from_page(page, contact_message_to_response, query.fields)
+
     def delete_by_id(self, message_id: str) -> MessageActionResponseDTO:
         self.logger.debug("Deleting contact message with ID: %s", message_id)
         if not message_id:
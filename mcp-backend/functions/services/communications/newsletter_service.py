@@ -6,7 +6,7 @@ from typing import Optional
 
 from firebase_admin import firestore
 
-from models import NewsletterSignup
+from models import NewsletterConsent, NewsletterSignup
 from dto.newsletter_api import (
     NewsletterActionResponseDTO,
     NewsletterConsentsListResponseDTO,
@@ -16,9 +16,11 @@ from dto.newsletter_api import (
     NewsletterSignupsListResponseDTO,
     NewsletterUpdateRequestDTO,
 )
+from dto.pagination import PageQueryDTO, PageResponseDTO
 from errors.service_errors import NotFoundError
 from interfaces.repositories import NewsletterRepositoryProtocol
 from mappers.newsletter_mappers import consent_to_response, participant_item_to_model, signup_to_response
+from repositories.base import build_page_request
 from repositories.newsletter_repository import NewsletterRepository
 from services.communications.mail_service import EmailMessage, MailService, mail_service
 from utils.templates_mail import get_newsletter_signup_template, get_newsletter_signup_text
@@ -26,6 +28,9 @@ from utils.safe_logging import mask_email, redact_sensitive
 
 logger = logging.getLogger("NewsletterService")
 
+SIGNUP_SORT_FIELDS = {"timestamp": "timestamp", "email": "email"}
+CONSENT_SORT_FIELDS = {"timestamp": "timestamp", "surname": "surname"}
+
 
 class NewsletterService:
     def __init__(
@@ -78,6 +83,16 @@ class NewsletterService:
         consents = [consent_to_response(c) for c in self.newsletter_repository.stream_consents()]
         return NewsletterConsentsListResponseDTO(consents=consents)
 
+    def get_signups_page(self, query: PageQueryDTO) -> PageResponseDTO:
+        request = build_page_request(query, SIGNUP_SORT_FIELDS, NewsletterSignup)
+        page = self.newsletter_repository.query_signups_page(request)
+        return PageResponseDTO.from_page(page, signup_to_response, query.fields)
+
+    def get_consents_page(self, query: PageQueryDTO) -> PageResponseDTO:
+        request = build_page_request(query, CONSENT_SORT_FIELDS, NewsletterConsent)
+        page = self.newsletter_repository.query_consents_page(request)
+        return PageResponseDTO.from_page(page, consent_to_response, query.fields)
+
     def update_signup(self, dto: NewsletterUpdateRequestDTO) -> NewsletterActionResponseDTO:
         signup = self.newsletter_repository.get_signup(dto.id)
         if not signup:
@@ -3,13 +3,16 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 from datetime import date, datetime, time, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 from zoneinfo import ZoneInfo
 
 from domain.event_rules import parse_event_date
+from domain.ticket_tiers import TIER_NAMES, map_ticket_tiers
 from dto.analytics_api import (
     AgeBandDTO,
     AgeDistributionResponseDTO,
+    AttendanceCohortDTO,
+    AttendanceCohortsResponseDTO,
     AudienceBreakdownItemDTO,
     AudienceRetentionResponseDTO,
     DailySalesDTO,
@@ -38,12 +41,11 @@ from repositories.event_repository import EventRepository
 from repositories.membership_repository import MembershipRepository
 from repositories.participant_repository import ParticipantRepository
 from repositories.purchase_repository import PurchaseRepository
+from services.core.analytics_snapshot_service import AnalyticsSnapshotService
 
 logger = logging.getLogger("AnalyticsService")
 
 ROMA_TZ = ZoneInfo("Europe/Rome")
-PRICE_TOLERANCE = 0.50
-TIER_NAMES = ("super_early", "early", "regular", "late")
 MONTH_LABELS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
 
 
@@ -55,12 +57,22 @@ class AnalyticsService:
         purchase_repository: Optional[PurchaseRepositoryProtocol] = None,
         participant_repository: Optional[ParticipantRepositoryProtocol] = None,
         entrance_scan_repository: Optional[EntranceScanRepositoryProtocol] = None,
+        analytics_snapshot_service: Optional[AnalyticsSnapshotService] = None,
     ):
         self.event_repository = event_repository or EventRepository()
         self.membership_repository = membership_repository or MembershipRepository()
         self.purchase_repository = purchase_repository or PurchaseRepository()
         self.participant_repository = participant_repository or ParticipantRepository()
         self.entrance_scan_repository = entrance_scan_repository or EntranceScanRepository()
+        # KPI dashboard e retention si leggono da snapshot e matrice presenze; il calcolo
+        # live resta solo come fallback quando lo snapshot non esiste ancora.
+        self.analytics_snapshot_service = analytics_snapshot_service or AnalyticsSnapshotService(
+            event_repository=self.event_repository,
+            membership_repository=self.membership_repository,
+            purchase_repository=self.purchase_repository,
+            participant_repository=self.participant_repository,
+            entrance_scan_repository=self.entrance_scan_repository,
+        )
 
     # ---- Public API -------------------------------------------------------
 
@@ -75,7 +87,7 @@ class AnalyticsService:
         if not event:
             raise NotFoundError(f"Evento non trovato: {event_id}")
 
-        scans = self.entrance_scan_repository.list(event_id)
+        minutes = self.entrance_scan_repository.get_flow_minutes(event_id)
         safe_span_hours = max(1, min(24, self._safe_int(span_hours) or 6))
         safe_bucket_minutes = self._sanitize_bucket_minutes(bucket_minutes)
 
@@ -90,10 +102,7 @@ class AnalyticsService:
         buckets_count = max(1, int((safe_span_hours * 60) // safe_bucket_minutes))
 
         counts = [0] * buckets_count
-        for scan in scans:
-            ts = self._to_datetime(getattr(scan, "scanned_at", None))
-            if not ts:
-                continue
+        for ts, scanned in minutes.items():
             local = ts.astimezone(ROMA_TZ)
             minute_of_day = local.hour * 60 + local.minute
             # Orari post-mezzanotte appartengono alla stessa finestra notturna
@@ -104,7 +113,7 @@ class AnalyticsService:
                 continue
             idx = (minute_of_day - window_start_minutes) // safe_bucket_minutes
             if 0 <= idx < buckets_count:
-                counts[idx] += 1
+                counts[idx] += scanned
 
         buckets = []
         cumulative = 0
@@ -145,7 +154,7 @@ class AnalyticsService:
         event_date_str = event.date or ""
 
         purchases = [
-            p for p in self.purchase_repository.list_models_by_ref_id(event_id)
+            p for p in self.purchase_repository.stream_rows(event_id)
             if self._is_valid_event_purchase(p)
         ]
 
@@ -189,6 +198,33 @@ class AnalyticsService:
         if not event:
             raise NotFoundError(f"Evento non trovato: {event_id}")
 
+        retention = self.analytics_snapshot_service.get_audience_retention(event_id)
+        if not retention:
+            logger.info("get_audience_retention: attendance index missing for event=%s, live fallback", event_id)
+            retention = self._live_audience_retention(event_id, event)
+
+        total = self._safe_int(retention.get("total"))
+        first_time = self._safe_int(retention.get("first_time"))
+        second_third = self._safe_int(retention.get("second_third"))
+        four_plus = self._safe_int(retention.get("four_plus"))
+
+        def pct(n: int) -> float:
+            return round(n / total * 100, 1) if total > 0 else 0.0
+
+        return AudienceRetentionResponseDTO(
+            event_id=event_id,
+            event_title=event.title or "",
+            total_participants=total,
+            new=first_time,
+            returning=second_third + four_plus,
+            breakdown=[
+                AudienceBreakdownItemDTO(category="First time", count=first_time, pct=pct(first_time)),
+                AudienceBreakdownItemDTO(category="2nd–3rd event", count=second_third, pct=pct(second_third)),
+                AudienceBreakdownItemDTO(category="4+ events", count=four_plus, pct=pct(four_plus)),
+            ],
+        )
+
+    def _live_audience_retention(self, event_id: str, event) -> Dict[str, int]:
         current_event_date = self._parse_date_like(getattr(event, "date", None))
 
         # Find all events with dates strictly before the current event
@@ -200,16 +236,18 @@ class AnalyticsService:
             if ev_date and current_event_date and ev_date < current_event_date:
                 previous_event_ids.add(ev.id)
 
-        # Count how many previous events each membership attended
+        # Count how many previous events each membership attended (one collection-group pass)
         membership_prev_count: Dict[str, int] = defaultdict(int)
-        for prev_id in previous_event_ids:
-            for p in self.participant_repository.list(prev_id):
+        if previous_event_ids:
+            for p in self.participant_repository.stream_all_rows():
+                if getattr(p, "event_id", None) not in previous_event_ids:
+                    continue
                 mid = (getattr(p, "membership_id", None) or "").strip()
                 if mid:
                     membership_prev_count[mid] += 1
 
         # Classify current participants
-        current_participants = self.participant_repository.list(event_id)
+        current_participants = list(self.participant_repository.stream_rows(event_id))
         first_time = 0
         second_third = 0
         four_plus = 0
@@ -227,23 +265,12 @@ class AnalyticsService:
             else:
                 four_plus += 1
 
-        total = len(current_participants)
-
-        def pct(n: int) -> float:
-            return round(n / total * 100, 1) if total > 0 else 0.0
-
-        return AudienceRetentionResponseDTO(
-            event_id=event_id,
-            event_title=event.title or "",
-            total_participants=total,
-            new=first_time,
-            returning=second_third + four_plus,
-            breakdown=[
-                AudienceBreakdownItemDTO(category="First time", count=first_time, pct=pct(first_time)),
-                AudienceBreakdownItemDTO(category="2nd–3rd event", count=second_third, pct=pct(second_third)),
-                AudienceBreakdownItemDTO(category="4+ events", count=four_plus, pct=pct(four_plus)),
-            ],
-        )
+        return {
+            "total": len(current_participants),
+            "first_time": first_time,
+            "second_third": second_third,
+            "four_plus": four_plus,
+        }
 
     def get_revenue_breakdown(self, event_id: str) -> RevenueBreakdownResponseDTO:
         event = self.event_repository.get_model(event_id)
@@ -251,7 +278,7 @@ class AnalyticsService:
             raise NotFoundError(f"Evento non trovato: {event_id}")
 
         purchases = [
-            p for p in self.purchase_repository.list_models_by_ref_id(event_id)
+            p for p in self.purchase_repository.stream_rows(event_id)
             if self._is_valid_event_purchase(p)
         ]
 
@@ -270,7 +297,7 @@ class AnalyticsService:
                 "unit_price": gross / count,
             })
 
-        tier_map = self._map_tiers(rows)
+        tier_map = map_ticket_tiers(rows)
 
         aggregates: Dict[str, Dict] = {
             name: {"tier": name, "count": 0, "gross": 0.0, "net": 0.0}
@@ -316,14 +343,14 @@ class AnalyticsService:
             raise NotFoundError(f"Evento non trovato: {event_id}")
 
         purchases = [
-            p for p in self.purchase_repository.list_models_by_ref_id(event_id)
+            p for p in self.purchase_repository.stream_rows(event_id)
             if self._is_valid_event_purchase(p)
         ]
         tickets_sold = sum(
             self._safe_int(getattr(p, "participants_count", 0)) for p in purchases
         )
 
-        participants = self.participant_repository.list(event_id)
+        participants = list(self.participant_repository.stream_rows(event_id))
         entered_flag = sum(1 for p in participants if bool(getattr(p, "entered", False)))
 
         scanned = len(self.entrance_scan_repository.list(event_id))
@@ -346,20 +373,11 @@ class AnalyticsService:
         if not event:
             raise NotFoundError(f"Evento non trovato: {event_id}")
 
-        participants = self.participant_repository.list(event_id)
-        male = sum(
-            1 for p in participants
-            if self._normalize_gender(getattr(p, "gender", None)) == "male"
-        )
-        female = sum(
-            1 for p in participants
-            if self._normalize_gender(getattr(p, "gender", None)) == "female"
-        )
-        unknown = sum(
-            1 for p in participants
-            if self._normalize_gender(getattr(p, "gender", None)) == "unknown"
-        )
-        total = len(participants)
+        counts: Dict[str, int] = {"male": 0, "female": 0, "unknown": 0}
+        for p in self.participant_repository.stream_rows(event_id):
+            counts[self._normalize_gender(p.gender)] += 1
+        male, female, unknown = counts["male"], counts["female"], counts["unknown"]
+        total = male + female + unknown
 
         def pct(n: int) -> float:
             return round(n / total * 100, 1) if total > 0 else 0.0
@@ -387,12 +405,13 @@ class AnalyticsService:
         if not event:
             raise NotFoundError(f"Evento non trovato: {event_id}")
 
-        participants = self.participant_repository.list(event_id)
         counts: Dict[str, int] = {band: 0 for band, _, _ in self._AGE_BANDS}
         counts["unknown"] = 0
 
-        for p in participants:
-            age = self._age_from_birthdate(getattr(p, "birthdate", None))
+        total = 0
+        for p in self.participant_repository.stream_rows(event_id):
+            total += 1
+            age = self._age_from_birthdate(p.birthdate)
             if age is None:
                 counts["unknown"] += 1
                 continue
@@ -405,7 +424,6 @@ class AnalyticsService:
             if not matched:
                 counts["unknown"] += 1
 
-        total = len(participants)
         dominant = max(counts, key=lambda k: counts[k]) if total > 0 else "unknown"
 
         def pct(n: int) -> float:
@@ -481,74 +499,38 @@ class AnalyticsService:
             monthly=monthly,
         )
 
-    def get_dashboard_kpis(self) -> DashboardKpisResponseDTO:
-        events = list(self.event_repository.stream_models())
-        purchases = [
-            p for p in self.purchase_repository.stream_models()
-            if self._is_valid_event_purchase(p)
-        ]
-        members_count = sum(
-            1 for m in self.membership_repository.stream()
-            if bool(getattr(m, "subscription_valid", False))
+    def get_attendance_cohorts(self, last_events: int = 6, min_attended: int = 2) -> AttendanceCohortsResponseDTO:
+        stats = self.analytics_snapshot_service.get_attendance_stats(last_events=last_events, min_attended=min_attended)
+        if not stats.get("exists"):
+            raise NotFoundError("Indice presenze non ancora disponibile: avvia una rebuild analytics completa")
+        return AttendanceCohortsResponseDTO(
+            events_indexed=stats["events_indexed"],
+            members_indexed=stats["members_indexed"],
+            last_events=stats["last_events"],
+            min_attended=stats["min_attended"],
+            attended_min_of_last=stats["attended_min_of_last"],
+            churned=stats["churned"],
+            cohorts=[AttendanceCohortDTO(**row) for row in stats["cohorts"]],
         )
 
-        revenue_net_total = sum(
-            self._safe_amount(getattr(p, "net_amount", 0)) for p in purchases
-        )
-
-        now_local = datetime.now(ROMA_TZ)
-        revenue_net_month = sum(
-            self._safe_amount(getattr(p, "net_amount", 0))
-            for p in purchases
-            if self._in_current_month(getattr(p, "timestamp", None), now_local)
-        )
-
-        # participants count (unique membership_ids across all events)
-        unique_keys: set = set()
-        for ev in events:
-            if not ev.id:
-                continue
-            for p in self.participant_repository.list(ev.id):
-                mid = (getattr(p, "membership_id", None) or "").strip().lower()
-                email = (getattr(p, "email", None) or "").strip().lower()
-                key = mid or email or f"{getattr(p, 'name', '')}:{getattr(p, 'surname', '')}:{ev.id}"
-                if key:
-                    unique_keys.add(key)
-
-        # avg fill rate
-        fill_rates = []
-        for ev in events:
-            max_p = self._safe_int(getattr(ev, "max_participants", 0))
-            if max_p <= 0:
-                continue
-            count = sum(1 for _ in self.participant_repository.list(ev.id)) if ev.id else 0
-            fill_rates.append(count / max_p * 100)
-        avg_fill_rate = round(sum(fill_rates) / len(fill_rates), 2) if fill_rates else 0.0
-
-        # omaggi
-        total_omaggi = 0
-        for ev in events:
-            if not ev.id:
-                continue
-            for p in self.participant_repository.list(ev.id):
-                pm = self._normalize_payment_method(getattr(p, "payment_method", None))
-                if pm == "omaggio":
-                    total_omaggi += 1
-
-        # avg unit payment
-        gross_total = sum(self._safe_amount(getattr(p, "amount_total", 0)) for p in purchases)
-        ticket_total = sum(self._safe_int(getattr(p, "participants_count", 0)) for p in purchases)
-        avg_unit_payment = round(gross_total / ticket_total, 2) if ticket_total > 0 else 0.0
-
+    def get_dashboard_kpis(self) -> DashboardKpisResponseDTO:
+        snapshot = self.analytics_snapshot_service.get_dashboard_snapshot()
+        if not snapshot.get("exists"):
+            logger.info("get_dashboard_kpis: dashboard snapshot missing, live fallback")
+            snapshot = self.analytics_snapshot_service.build_live_dashboard()
+            self.analytics_snapshot_service.enqueue_global_rebuild(reason="missing_snapshot")
+
+        kpis = snapshot.get("kpis") or {}
+        global_cards = snapshot.get("global_cards") or {}
         return DashboardKpisResponseDTO(
-            total_revenue_net=round(revenue_net_total, 2),
-            events_count=len(events),
-            members_count=members_count,
-            participants_count=len(unique_keys),
-            avg_fill_rate=avg_fill_rate,
-            this_month_revenue=round(revenue_net_month, 2),
-            total_omaggi=total_omaggi,
-            avg_unit_payment=avg_unit_payment,
+            total_revenue_net=round(self._safe_amount(kpis.get("total_revenue_net")), 2),
+            events_count=self._safe_int(kpis.get("events")),
+            members_count=self._safe_int(kpis.get("active_members")),
+            participants_count=self._safe_int(kpis.get("unique_participants")),
+            avg_fill_rate=round(self._safe_amount(kpis.get("avg_fill_rate")), 2),
+            this_month_revenue=round(self._safe_amount(kpis.get("this_month_revenue")), 2),
+            total_omaggi=self._safe_int(global_cards.get("omaggi_total")),
+            avg_unit_payment=round(self._safe_amount(global_cards.get("avg_unit_payment")), 2),
         )
 
     # ---- Internal helpers ------------------------------------------------
@@ -569,48 +551,6 @@ class AnalyticsService:
         bad = PurchaseStatus.invalid_statuses()
         return status not in bad and capture not in bad
 
-    def _map_tiers(self, rows: List[Dict]) -> Dict[Optional[str], str]:
-        if not rows:
-            return {}
-        clustered = []
-        for row in sorted(rows, key=lambda r: r["unit_price"]):
-            placed = False
-            for cluster in clustered:
-                if abs(row["unit_price"] - cluster["center"]) <= PRICE_TOLERANCE:
-                    cluster["rows"].append(row)
-                    cluster["center"] = sum(r["unit_price"] for r in cluster["rows"]) / len(cluster["rows"])
-                    placed = True
-                    break
-            if not placed:
-                clustered.append({"center": row["unit_price"], "rows": [row]})
-
-        clustered.sort(key=lambda c: c["center"])
-        n = len(clustered)
-        cluster_to_tier = {}
-        if n <= 1:
-            cluster_to_tier = {0: "regular"}
-        elif n == 2:
-            cluster_to_tier = {0: "early", 1: "regular"}
-        elif n == 3:
-            cluster_to_tier = {0: "early", 1: "regular", 2: "late"}
-        else:
-            for i in range(n):
-                if i == 0:
-                    cluster_to_tier[i] = "super_early"
-                elif i == 1:
-                    cluster_to_tier[i] = "early"
-                elif i == n - 1:
-                    cluster_to_tier[i] = "late"
-                else:
-                    cluster_to_tier[i] = "regular"
-
-        mapping: Dict[Optional[str], str] = {}
-        for i, cluster in enumerate(clustered):
-            tier = cluster_to_tier.get(i, "regular")
-            for row in cluster["rows"]:
-                mapping[row.get("purchase_id")] = tier
-        return mapping
-
     def _normalize_gender(self, value: Any) -> str:
         raw = str(value or "").strip().lower()
         if raw in {"male", "maschio", "m"}:
@@ -619,22 +559,11 @@ class AnalyticsService:
             return "female"
         return "unknown"
 
-    def _normalize_payment_method(self, value: Any) -> str:
-        raw = getattr(value, "value", value)
-        return str(raw or "unknown").strip().lower()
-
     def _pct(self, numerator: int, denominator: int) -> float:
         if denominator <= 0:
             return 0.0
         return round(numerator / denominator * 100, 1)
 
-    def _in_current_month(self, timestamp: Any, now_local: datetime) -> bool:
-        ts = self._to_datetime(timestamp)
-        if not ts:
-            return False
-        local = ts.astimezone(ROMA_TZ)
-        return local.year == now_local.year and local.month == now_local.month
-
     def _parse_date_like(self, value: Any) -> Optional[date]:
         if value is None:
             return None
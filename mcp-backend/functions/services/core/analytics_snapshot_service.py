@@ -3,10 +3,18 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 from datetime import date, datetime, time, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
 from zoneinfo import ZoneInfo
 
+from config.analytics_config import (
+    ANALYTICS_EVENT_DEBOUNCE_SECONDS,
+    ANALYTICS_GLOBAL_DEBOUNCE_SECONDS,
+    ANALYTICS_GLOBAL_MIN_INTERVAL_MINUTES,
+    ANALYTICS_JOB_STALE_AFTER_MINUTES,
+)
+from domain.attendance_matrix import AttendanceMatrix
 from domain.event_rules import parse_event_date
+from domain.ticket_tiers import TIER_NAMES, cluster_price_tiers, map_ticket_tiers
 from interfaces.repositories import (
     EntranceScanRepositoryProtocol,
     EventRepositoryProtocol,
@@ -16,7 +24,7 @@ from interfaces.repositories import (
     ParticipantRepositoryProtocol,
     PurchaseRepositoryProtocol,
 )
-from models import AnalyticsJob, PurchaseStatus, PurchaseTypes
+from models import AnalyticsJob, EventParticipant, EventPurchase, PurchaseStatus, PurchaseTypes
 from repositories.analytics_snapshot_repository import AnalyticsSnapshotRepository
 from repositories.entrance_scan_repository import EntranceScanRepository
 from repositories.event_repository import EventRepository
@@ -25,17 +33,29 @@ from repositories.membership_repository import MembershipRepository
 from repositories.message_repository import MessageRepository
 from repositories.participant_repository import ParticipantRepository
 from repositories.purchase_repository import PurchaseRepository
+from utils.aggregators import (
+    Aggregate,
+    Count,
+    Distinct,
+    Filtered,
+    Fold,
+    Histogram,
+    MonthlyBuckets,
+    Partitioned,
+    Reducer,
+    Sum,
+    TopK,
+)
 from utils.safe_logging import redact_sensitive
 
 
 logger = logging.getLogger("AnalyticsSnapshotService")
 
 ANALYTICS_JOB_TYPE = "analytics_rebuild"
-ANALYTICS_JOB_STALE_AFTER = timedelta(minutes=15)
+ANALYTICS_JOB_STALE_AFTER = timedelta(minutes=ANALYTICS_JOB_STALE_AFTER_MINUTES)
 ROMA_TZ = ZoneInfo("Europe/Rome")
-PRICE_TOLERANCE = 0.50
-
-TIER_NAMES = ("super_early", "early", "regular", "late")
+GENDER_KEYS = ("male", "female", "unknown")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 AGE_BANDS = (
     ("18-20", 18, 20),
     ("21-24", 21, 24),
@@ -71,19 +91,20 @@ class AnalyticsSnapshotService:
         payload = self.analytics_snapshot_repository.get_dashboard_current()
         if payload is None:
             return {"exists": False}
-        return {"exists": True, **payload}
+        global_payload = self.analytics_snapshot_repository.get_global_current()
+        return {"exists": True, **self._project_dashboard_counters(payload, global_payload)}
 
     def get_event_snapshot(self, event_id: str) -> Dict[str, Any]:
         payload = self.analytics_snapshot_repository.get_event_snapshot(event_id)
         if payload is None:
             return {"exists": False, "event_id": event_id}
-        return {"exists": True, **payload}
+        return {"exists": True, **self._project_entrance_flow(event_id, self._project_event_counters(payload))}
 
     def get_global_snapshot(self) -> Dict[str, Any]:
         payload = self.analytics_snapshot_repository.get_global_current()
         if payload is None:
             return {"exists": False}
-        return {"exists": True, **payload}
+        return {"exists": True, **self._project_global_counters(payload)}
 
     def get_events_index(self) -> Dict[str, Any]:
         rows = []
@@ -114,27 +135,15 @@ class AnalyticsSnapshotService:
         return {"events": rows}
 
     def get_entrance_flow(self, event_id: str) -> Dict[str, Any]:
-        snapshot = self.get_event_snapshot(event_id)
-        if snapshot.get("exists"):
-            charts = snapshot.get("charts") or {}
-            flow = charts.get("entrance_flow") or []
-            if flow:
-                return {
-                    "event_id": event_id,
-                    "flow": flow,
-                    "source": "snapshot",
-                    "generated_at": snapshot.get("generated_at"),
-                }
-
+        # I contatori per minuto sono aggiornati a ogni scan: niente snapshot da rigenerare.
         event = self.event_repository.get_model(event_id)
         if not event:
             return {"event_id": event_id, "flow": [], "source": "missing_event"}
 
-        flow = self._build_entrance_flow(event)
         return {
             "event_id": event_id,
-            "flow": flow,
-            "source": "live_fallback",
+            "flow": self._build_entrance_flow(event),
+            "source": "counters",
             "generated_at": datetime.now(timezone.utc),
         }
 
@@ -142,11 +151,14 @@ class AnalyticsSnapshotService:
     def enqueue_event_rebuild(self, event_id: str, reason: str = "trigger") -> Dict[str, Any]:
         return self._enqueue_rebuild(scope="event", event_id=event_id, reason=reason)
 
+    def enqueue_attendance_sync(self, event_id: str, reason: str = "trigger") -> Dict[str, Any]:
+        return self._enqueue_rebuild(scope="attendance", event_id=event_id, reason=reason)
+
     def enqueue_global_rebuild(self, reason: str = "trigger") -> Dict[str, Any]:
         return self._enqueue_rebuild(scope="global", reason=reason)
 
     def enqueue_full_rebuild(self, reason: str = "trigger") -> Dict[str, Any]:
-        return self._enqueue_rebuild(scope="all", reason=reason)
+        return self._enqueue_rebuild(scope="all", reason=reason, immediate=True)
 
     def request_rebuild(
         self,
@@ -166,8 +178,23 @@ class AnalyticsSnapshotService:
             scope=normalized_scope,
             event_id=event_id,
             reason=reason,
+            immediate=True,
         )
 
+    def dispatch_due_rebuilds(self) -> int:
+        """Mette in coda i job programmati la cui finestra di debounce e' scaduta."""
+        now = datetime.now(timezone.utc)
+        dispatched = 0
+        for job_id, payload in self.job_repository.stream_raw_by_status(ANALYTICS_JOB_TYPE, "scheduled"):
+            run_after = self._to_datetime(payload.get("run_after"))
+            if run_after is not None and run_after > now:
+                continue
+            if self.job_repository.mutate_raw(job_id, lambda current: self._promote_scheduled_job(current, now)):
+                dispatched += 1
+        if dispatched:
+            logger.info("dispatch_due_rebuilds: queued %s job(s)", dispatched)
+        return dispatched
+
     def process_rebuild_job(self, job_id: str) -> None:
         claimed = self.job_repository.claim_queued(job_id)
         if not claimed:
@@ -184,49 +211,241 @@ class AnalyticsSnapshotService:
             if scope == "event":
                 if event_id:
                     self.rebuild_event_snapshot(event_id)
-                self.rebuild_global_snapshot()
-                self.rebuild_dashboard_snapshot()
+                # Global e dashboard seguono i delta dei trigger e la riconciliazione
+                # notturna: la rebuild globale serve solo se manca ancora la baseline.
+                if not self._has_counters(self.analytics_snapshot_repository.get_global_current()):
+                    self.enqueue_global_rebuild(reason=f"event_rebuilt:{event_id}")
+            elif scope == "attendance":
+                if event_id:
+                    self.sync_event_attendance(event_id)
             elif scope == "global":
                 self.rebuild_global_snapshot()
                 self.rebuild_dashboard_snapshot()
             else:
                 self.rebuild_all_snapshots()
 
-            self.job_repository.update(
-                job_id,
-                {
-                    "status": "completed",
-                    "percent": 100,
-                    "finished_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
-                    "error": None,
-                },
-            )
+            error = None
         except Exception as exc:
             logger.error("process_rebuild_job: failed job=%s error=%s", job_id, redact_sensitive(str(exc)))
-            self.job_repository.update(
-                job_id,
-                {
-                    "status": "failed",
-                    "error": str(exc),
-                    "finished_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
-                },
+            error = str(exc)
+
+        now = datetime.now(timezone.utc)
+        status = self.job_repository.mutate_raw(
+            job_id,
+            lambda current: self._finish_job(current, scope, now, error),
+        )
+        logger.info("process_rebuild_job: end job=%s status=%s", job_id, status)
+
+    # ---- Incremental counters -------------------------------------------
+    # I trigger applicano delta firmati (after - before) ai contatori salvati negli
+    # snapshot invece di accodare una rebuild per ogni scrittura. La rebuild
+    # notturna ricalcola i contatori da zero e fa da riconciliazione.
+    # ``delivery_id`` (id dell'evento del trigger) rende il delta idempotente: una
+    # riconsegna della stessa scrittura non incrementa una seconda volta.
+    def apply_purchase_change(
+        self,
+        before: Dict[str, Any],
+        after: Dict[str, Any],
+        delivery_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        event_deltas: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        global_delta: Dict[str, Any] = {}
+        for payload, sign in ((before, -1), (after, 1)):
+            purchase = self._purchase_from_payload(payload)
+            if purchase is None or not self._is_valid_event_purchase(purchase):
+                continue
+            self._accumulate_counters(event_deltas[purchase.ref_id], self._purchase_event_counters(purchase), sign)
+            self._accumulate_counters(global_delta, self._purchase_global_counters(purchase), sign)
+        return self._apply_counter_deltas(event_deltas, global_delta, "purchase_written", delivery_id)
+
+    def apply_participant_change(
+        self,
+        event_id: str,
+        before: Dict[str, Any],
+        after: Dict[str, Any],
+        delivery_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        event_delta: Dict[str, Any] = {}
+        global_delta: Dict[str, Any] = {}
+        for payload, sign in ((before, -1), (after, 1)):
+            if not payload:
+                continue
+            participant = EventParticipant.from_firestore(payload)
+            self._accumulate_counters(event_delta, self._participant_event_counters(participant), sign)
+            self._accumulate_counters(global_delta, self._participant_global_counters(participant), sign)
+        result = self._apply_counter_deltas({event_id: event_delta}, global_delta, "participant_written", delivery_id)
+
+        # La matrice presenze e' un solo documento: aggiornarla qui serializzerebbe tutte le
+        # iscrizioni. Un cambio di membership accoda (con debounce) il job attendance
+        # dell'evento, che rilegge solo i membershipId e riscrive la colonna una volta sola.
+        # Se e' gia' in coda la rebuild dell'evento, la colonna la riscrive quella.
+        if self._payload_membership_id(before) != self._payload_membership_id(after) and event_id not in {
+            rebuild.get("event_id") for rebuild in result["rebuilds"] if rebuild.get("scope") == "event"
+        }:
+            try:
+                result["rebuilds"].append(self.enqueue_attendance_sync(event_id, reason="participant_membership"))
+            except Exception as exc:
+                logger.warning(
+                    "apply_participant_change: attendance sync enqueue failed event=%s error=%s",
+                    event_id, redact_sensitive(str(exc)),
+                )
+        return result
+
+    def apply_membership_change(
+        self,
+        before: Dict[str, Any],
+        after: Dict[str, Any],
+        delivery_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        global_delta: Dict[str, Any] = {}
+        for payload, sign in ((before, -1), (after, 1)):
+            self._accumulate_counters(global_delta, self._membership_global_counters(payload), sign)
+        return self._apply_counter_deltas({}, global_delta, "membership_written", delivery_id)
+
+    # ---- Attendance index -------------------------------------------------
+    def get_audience_retention(self, event_id: str) -> Optional[Dict[str, int]]:
+        """Retention dell'evento dalla matrice presenze; None se l'indice non e' ancora stato costruito."""
+        matrix = AttendanceMatrix.from_payload(self.analytics_snapshot_repository.get_attendance_index())
+        if matrix is None or not matrix.has_event(event_id):
+            return None
+        payload = self.analytics_snapshot_repository.get_event_snapshot(event_id)
+        if payload is not None and "kpis" in payload:
+            total = self._safe_int((self._project_event_counters(payload).get("kpis") or {}).get("participants"))
+        else:
+            total = self.participant_repository.count(event_id)
+        return matrix.retention(event_id, total)
+
+    def get_attendance_stats(self, last_events: int = 6, min_attended: int = 2) -> Dict[str, Any]:
+        matrix = AttendanceMatrix.from_payload(self.analytics_snapshot_repository.get_attendance_index())
+        if matrix is None:
+            return {"exists": False}
+        return {
+            "exists": True,
+            "events_indexed": len(matrix.events),
+            "members_indexed": len(matrix.rows),
+            "last_events": last_events,
+            "min_attended": min_attended,
+            "attended_min_of_last": matrix.attended_at_least(min_attended, last_events),
+            "churned": matrix.churned(last_events),
+            "cohorts": matrix.cohorts(),
+        }
+
+    def sync_event_attendance(self, event_id: str) -> bool:
+        """Riscrive la colonna dell'evento nella matrice presenze leggendo solo i ``membershipId``."""
+        event = self.event_repository.get_model(event_id)
+        if not event:
+            return False
+        return self._sync_event_attendance(
+            event_id, event, set(self.participant_repository.stream_membership_ids(event_id))
+        )
+
+    def _sync_event_attendance(self, event_id: str, event, membership_ids: Set[str]) -> bool:
+        def mutate(payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            matrix = AttendanceMatrix.from_payload(payload)
+            if matrix is None:
+                # Nessun indice: lo costruisce la prossima rebuild completa.
+                return None
+            event_date = self._parse_date_like(getattr(event, "date", None))
+            changed = matrix.set_event_members(event_id, membership_ids, event_date)
+            return matrix.to_payload() if changed else None
+
+        try:
+            return self.analytics_snapshot_repository.update_attendance_index(mutate)
+        except Exception as exc:
+            # Non blocca snapshot e job: la colonna si riallinea alla prossima sync o rebuild.
+            logger.warning(
+                "_sync_event_attendance: attendance index update failed event=%s error=%s",
+                event_id, redact_sensitive(str(exc)),
             )
+            return False
+
+    @staticmethod
+    def _row_membership_id(participant: Any) -> Optional[str]:
+        return (getattr(participant, "membership_id", None) or "").strip() or None
+
+    def _payload_membership_id(self, payload: Dict[str, Any]) -> Optional[str]:
+        if not payload:
+            return None
+        return self._row_membership_id(EventParticipant.from_firestore(payload))
 
     # ---- Snapshot builders ----------------------------------------------
+    # Gli snapshot sono calcolati con reducer (utils.aggregators) alimentati dagli
+    # stream dei repository: nessuna collection viene materializzata in memoria,
+    # lo stato cresce solo con il numero di bucket (giorni, mesi, eventi, prezzi).
     def rebuild_all_snapshots(self) -> Dict[str, Any]:
-        event_ids = []
-        for event in self.event_repository.stream_models():
-            if event.id:
-                event_ids.append(event.id)
+        # Rebuild completa in un solo passaggio: ogni collection sorgente viene letta
+        # una volta e ogni riga alimenta i reducer del suo evento, quelli globali e
+        # quelli della dashboard. Gli snapshot evento vengono scritti con commit batch.
+        events = [event for event in self.event_repository.stream_models() if event.id]
+        event_reducers = {event.id: self._event_reducers(event) for event in events}
+        global_reducers = self._global_reducers()
+        dashboard_reducers = self._dashboard_reducers()
+
+        Aggregate(
+            by_event=Partitioned(
+                lambda purchase: getattr(purchase, "ref_id", None),
+                reducers={event_id: reducers["purchases"] for event_id, reducers in event_reducers.items()},
+            ),
+            totals=global_reducers["purchases"],
+            dashboard=dashboard_reducers["purchases"],
+        ).consume(self.purchase_repository.stream_models())
+        # La matrice presenze si riempie durante lo stream: per membership resta solo il bitset.
+        attendance = AttendanceMatrix()
+        for event in events:
+            attendance.ensure_event(event.id, self._parse_date_like(getattr(event, "date", None)))
+        Aggregate(
+            by_event=Partitioned(
+                lambda participant: getattr(participant, "event_id", None),
+                reducers={event_id: reducers["participants"] for event_id, reducers in event_reducers.items()},
+            ),
+            totals=global_reducers["participants"],
+            dashboard=dashboard_reducers["participants"],
+            attendance=self._attendance_reducer(attendance),
+        ).consume(self._stream_all_participants())
+        Aggregate(
+            totals=global_reducers["memberships"],
+            dashboard=dashboard_reducers["memberships"],
+        ).consume(self.membership_repository.stream())
+        dashboard_reducers["messages"].consume(self.message_repository.stream())
+        for event_id, scan in self.entrance_scan_repository.stream_all():
+            if event_id in event_reducers:
+                event_reducers[event_id]["scans"].add(scan)
+
+        event_snapshots = {
+            event.id: self._compose_event_snapshot(event.id, event, event_reducers[event.id]) for event in events
+        }
+        self.analytics_snapshot_repository.set_event_snapshots(event_snapshots)
+        self.analytics_snapshot_repository.set_attendance_index(attendance.to_payload())
+
+        global_snapshot = self._compose_global_snapshot(global_reducers)
+        self.analytics_snapshot_repository.set_global_current(global_snapshot)
 
-        for event_id in event_ids:
-            self.rebuild_event_snapshot(event_id)
+        dashboard_snapshot = self._compose_dashboard_snapshot(
+            events,
+            dashboard_reducers,
+            {"exists": True, **self._project_global_counters(global_snapshot)},
+        )
+        self.analytics_snapshot_repository.set_dashboard_current(dashboard_snapshot)
+        return {"ok": True, "events_rebuilt": len(event_snapshots)}
 
-        self.rebuild_global_snapshot()
-        self.rebuild_dashboard_snapshot()
-        return {"ok": True, "events_rebuilt": len(event_ids)}
+    def build_live_dashboard(self) -> Dict[str, Any]:
+        """Dashboard calcolata al volo (senza scriverla), per quando lo snapshot manca."""
+        events = list(self.event_repository.stream_models())
+        global_reducers = self._global_reducers()
+        dashboard_reducers = self._dashboard_reducers()
+        for source, stream in (
+            ("purchases", self.purchase_repository.stream_models()),
+            ("participants", self._stream_all_participants()),
+            ("memberships", self.membership_repository.stream()),
+        ):
+            Aggregate(totals=global_reducers[source], dashboard=dashboard_reducers[source]).consume(stream)
+
+        global_snapshot = self._compose_global_snapshot(global_reducers)
+        return self._compose_dashboard_snapshot(
+            events,
+            dashboard_reducers,
+            {"exists": True, **self._project_global_counters(global_snapshot)},
+        )
 
     def rebuild_event_snapshot(self, event_id: str) -> Dict[str, Any]:
         event = self.event_repository.get_model(event_id)
@@ -240,26 +459,103 @@ class AnalyticsSnapshotService:
             self.analytics_snapshot_repository.set_event_snapshot(event_id, snapshot)
             return snapshot
 
-        participants = self.participant_repository.list(event_id)
-        event_purchases = [
-            p for p in self.purchase_repository.list_models_by_ref_id(event_id) if self._is_valid_event_purchase(p)
-        ]
+        # Le rebuild per evento e globale leggono righe proiettate (ParticipantRow/PurchaseRow):
+        # i reducer usano solo quei campi. Dashboard e rebuild completa restano sui modelli
+        # interi perche' l'attivita' recente mostra nomi ed email.
+        reducers = self._event_reducers(event)
+        members = self._event_members_reducer()
+        Aggregate(snapshot=reducers["participants"], members=members).consume(
+            self.participant_repository.stream_rows(event_id)
+        )
+        reducers["purchases"].consume(self.purchase_repository.stream_rows(event_id))
+        reducers["scans"] = self._entrance_minutes_reducer(event).consume(
+            self.entrance_scan_repository.get_flow_minutes(event_id).items()
+        )
+
+        event_snapshot = self._compose_event_snapshot(event_id, event, reducers)
+        self.analytics_snapshot_repository.set_event_snapshot(event_id, event_snapshot)
+        self._sync_event_attendance(event_id, event, members.result())
+        return event_snapshot
+
+    def rebuild_global_snapshot(self) -> Dict[str, Any]:
+        reducers = self._global_reducers()
+        reducers["participants"].consume(self.participant_repository.stream_all_rows())
+        reducers["purchases"].consume(self.purchase_repository.stream_rows())
+        reducers["memberships"].consume(self.membership_repository.stream())
+
+        global_snapshot = self._compose_global_snapshot(reducers)
+        self.analytics_snapshot_repository.set_global_current(global_snapshot)
+        return global_snapshot
+
+    def rebuild_dashboard_snapshot(self) -> Dict[str, Any]:
+        events = list(self.event_repository.stream_models())
+        reducers = self._dashboard_reducers()
+        reducers["purchases"].consume(self.purchase_repository.stream_models())
+        reducers["participants"].consume(self._stream_all_participants())
+        reducers["memberships"].consume(self.membership_repository.stream())
+        reducers["messages"].consume(self.message_repository.stream())
+
+        dashboard_snapshot = self._compose_dashboard_snapshot(events, reducers, self.get_global_snapshot())
+        self.analytics_snapshot_repository.set_dashboard_current(dashboard_snapshot)
+        return dashboard_snapshot
+
+    def _event_reducers(self, event) -> Dict[str, Reducer]:
+        return {
+            "participants": Aggregate(
+                count=Count(),
+                omaggi=Count(self._is_omaggio),
+                gender=Histogram(self._participant_gender, keys=GENDER_KEYS),
+                membership_daily=Partitioned(
+                    lambda participant: self._local_period(self._participant_created_at(participant), "%Y-%m-%d"),
+                    lambda: Histogram(self._membership_bucket),
+                ),
+                counters=Fold(
+                    dict,
+                    lambda counters, participant: self._accumulate_counters(
+                        counters, self._participant_event_counters(participant)
+                    ),
+                ),
+            ),
+            "purchases": Filtered(
+                self._is_valid_event_purchase,
+                Aggregate(
+                    count=Count(),
+                    gross=Sum(self._purchase_gross),
+                    net=Sum(self._purchase_net),
+                    tickets=Sum(self._purchase_tickets),
+                    tiers=self._ticket_tier_reducer(),
+                    sales_daily=Partitioned(
+                        lambda purchase: self._local_period(self._purchase_ts(purchase), "%Y-%m-%d"),
+                        lambda: Aggregate(gross=Sum(self._purchase_gross), net=Sum(self._purchase_net)),
+                    ),
+                    counters=Fold(
+                        lambda: {**self._empty_counters(), "sales_daily": {}, "membership_daily": {}},
+                        lambda counters, purchase: self._accumulate_counters(
+                            counters, self._purchase_event_counters(purchase)
+                        ),
+                    ),
+                ),
+            ),
+            "scans": self._entrance_flow_reducer(event),
+        }
 
-        total_gross = sum(self._safe_amount(getattr(purchase, "amount_total", 0)) for purchase in event_purchases)
-        total_net = sum(self._safe_amount(getattr(purchase, "net_amount", 0)) for purchase in event_purchases)
-        total_ticket_count = sum(self._safe_int(getattr(purchase, "participants_count", 0)) for purchase in event_purchases)
+    def _compose_event_snapshot(self, event_id: str, event, reducers: Dict[str, Reducer]) -> Dict[str, Any]:
+        participants = reducers["participants"].result()
+        purchases = reducers["purchases"].result()
 
-        tier_payload = self._build_ticket_tier_payload(event_purchases)
-        gender_counts = self._gender_distribution(participants)
-        entrance_flow = self._build_entrance_flow(event)
+        total_gross = purchases["gross"]
+        total_ticket_count = purchases["tickets"]
+        tier_payload = self._ticket_tier_payload_from_prices(purchases["tiers"])
+        entrance_flow = self._entrance_flow_rows(event, reducers["scans"].result())
 
         max_participants = self._safe_int(getattr(event, "max_participants", 0))
-        participants_count = len(participants)
+        participants_count = participants["count"]
         entered_count = self._count_entered(entrance_flow)
+        generated_at = datetime.now(timezone.utc)
 
-        event_snapshot = {
+        return {
             "event_id": event_id,
-            "generated_at": datetime.now(timezone.utc),
+            "generated_at": generated_at,
             "event": {
                 "id": event_id,
                 "title": event.title,
@@ -272,114 +568,185 @@ class AnalyticsSnapshotService:
                 "entered": entered_count,
                 "fill_rate": self._percentage(participants_count, max_participants),
                 "revenue_gross": round(total_gross, 2),
-                "revenue_net": round(total_net, 2),
+                "revenue_net": round(purchases["net"], 2),
                 "avg_unit_payment": round(total_gross / total_ticket_count, 2) if total_ticket_count > 0 else 0.0,
-                "omaggi": sum(
-                    1
-                    for participant in participants
-                    if self._normalize_payment_method(getattr(participant, "payment_method", None)) == "omaggio"
-                ),
+                "omaggi": participants["omaggi"],
             },
             "ticket_tiers": tier_payload["tiers"],
             "charts": {
                 "entrance_flow": entrance_flow,
-                "sales_over_time": self._build_sales_over_time(event_purchases),
+                "sales_over_time": self._sales_over_time_rows(purchases["sales_daily"]),
                 "revenue_by_tier": tier_payload["chart"],
-                "event_funnel": self._build_event_funnel(event_purchases, participants_count, entered_count),
-                "gender_distribution": self._distribution_rows(gender_counts),
-                "membership_trend": self._build_membership_trend(participants),
+                "event_funnel": self._build_event_funnel(
+                    purchases["count"], total_ticket_count, participants_count, entered_count
+                ),
+                "gender_distribution": self._distribution_rows(participants["gender"]),
+                "membership_trend": self._membership_trend_rows(participants["membership_daily"]),
             },
+            "counters": self._accumulate_counters(purchases["counters"], participants["counters"]),
+            "counters_since": generated_at,
         }
 
-        self.analytics_snapshot_repository.set_event_snapshot(event_id, event_snapshot)
-        return event_snapshot
+    def _event_members_reducer(self) -> Reducer:
+        # Membership presenti all'evento: la colonna dell'evento nella matrice presenze.
+        return Filtered(
+            lambda participant: self._row_membership_id(participant) is not None,
+            Fold(set, lambda members, participant: members.add(self._row_membership_id(participant))),
+        )
 
-    def rebuild_global_snapshot(self) -> Dict[str, Any]:
-        participants = self._stream_all_participants()
-        purchases = [purchase for purchase in self.purchase_repository.stream_models() if self._is_valid_event_purchase(purchase)]
+    def _attendance_reducer(self, matrix: AttendanceMatrix) -> Reducer:
+        # Accende il bit (membership, evento) su ``matrix``; gli eventi non indicizzati vengono ignorati.
+        return Filtered(
+            lambda participant: self._row_membership_id(participant) is not None
+            and matrix.has_event(getattr(participant, "event_id", None)),
+            Fold(lambda: matrix, self._mark_attendance),
+        )
 
-        age_counts = self._age_band_distribution(participants)
-        gender_counts = self._gender_distribution(participants)
+    def _mark_attendance(self, matrix: AttendanceMatrix, participant: Any) -> None:
+        matrix.add(self._row_membership_id(participant), participant.event_id)
 
-        omaggi_total = sum(
-            1
-            for participant in participants
-            if self._normalize_payment_method(getattr(participant, "payment_method", None)) == "omaggio"
-        )
+    def _global_reducers(self) -> Dict[str, Reducer]:
+        return {
+            "participants": Aggregate(
+                age_bands=Histogram(
+                    lambda participant: self._age_band(getattr(participant, "birthdate", None)),
+                    keys=self._age_band_keys(),
+                ),
+                gender=Histogram(self._participant_gender, keys=GENDER_KEYS),
+                omaggi=Count(self._is_omaggio),
+                omaggi_monthly=Filtered(
+                    self._is_omaggio,
+                    MonthlyBuckets(self._participant_created_at, tz=ROMA_TZ),
+                ),
+                counters=Fold(
+                    dict,
+                    lambda counters, participant: self._accumulate_counters(
+                        counters, self._participant_global_counters(participant)
+                    ),
+                ),
+            ),
+            "purchases": Filtered(
+                self._is_valid_event_purchase,
+                Aggregate(
+                    gross=Sum(self._purchase_gross),
+                    tickets=Sum(self._purchase_tickets),
+                    monthly=Partitioned(
+                        lambda purchase: self._local_period(self._purchase_ts(purchase), "%Y-%m"),
+                        lambda: Aggregate(amount=Sum(self._purchase_gross), participants=Sum(self._purchase_tickets)),
+                    ),
+                    counters=Fold(
+                        lambda: {
+                            **self._empty_counters(),
+                            "age_bands": {band: 0 for band in self._age_band_keys()},
+                            "sales_monthly": {},
+                            "omaggi_monthly": {},
+                            "active_members": 0,
+                        },
+                        lambda counters, purchase: self._accumulate_counters(
+                            counters, self._purchase_global_counters(purchase)
+                        ),
+                    ),
+                ),
+            ),
+            "memberships": Fold(
+                dict,
+                lambda counters, membership: self._accumulate_counters(
+                    counters, self._membership_global_counters(membership)
+                ),
+            ),
+        }
 
-        gross_total = sum(self._safe_amount(getattr(purchase, "amount_total", 0)) for purchase in purchases)
-        ticket_total = sum(self._safe_int(getattr(purchase, "participants_count", 0)) for purchase in purchases)
-        avg_unit_payment = gross_total / ticket_total if ticket_total > 0 else 0.0
+    def _compose_global_snapshot(self, reducers: Dict[str, Reducer]) -> Dict[str, Any]:
+        participants = reducers["participants"].result()
+        purchases = reducers["purchases"].result()
 
-        global_snapshot = {
-            "generated_at": datetime.now(timezone.utc),
+        age_counts = participants["age_bands"]
+        gender_counts = participants["gender"]
+        ticket_total = purchases["tickets"]
+        avg_unit_payment = purchases["gross"] / ticket_total if ticket_total > 0 else 0.0
+        generated_at = datetime.now(timezone.utc)
+
+        counters = purchases["counters"]
+        self._accumulate_counters(counters, participants["counters"])
+        self._accumulate_counters(counters, reducers["memberships"].result())
+
+        omaggi_monthly = participants["omaggi_monthly"]
+        return {
+            "generated_at": generated_at,
             "kpis": {
                 "avg_unit_payment": round(avg_unit_payment, 2),
-                "omaggi_total": omaggi_total,
+                "omaggi_total": participants["omaggi"],
                 "gender_distribution": gender_counts,
                 "age_band_dominant": self._dominant_bucket(age_counts),
             },
             "charts": {
                 "age_bands_distribution": [{"band": band, "count": count} for band, count in age_counts.items()],
                 "gender_distribution": self._distribution_rows(gender_counts),
-                "omaggi_trend_monthly": self._build_omaggi_trend(participants),
-                "avg_unit_payment_trend_monthly": self._build_avg_unit_payment_trend(purchases),
+                "omaggi_trend_monthly": [
+                    {"month": month, "count": omaggi_monthly[month]} for month in sorted(omaggi_monthly)
+                ][-18:],
+                "avg_unit_payment_trend_monthly": self._avg_unit_payment_rows(purchases["monthly"]),
             },
+            "counters": counters,
+            "counters_since": generated_at,
         }
 
-        self.analytics_snapshot_repository.set_global_current(global_snapshot)
-        return global_snapshot
-
-    def rebuild_dashboard_snapshot(self) -> Dict[str, Any]:
-        events = list(self.event_repository.stream_models())
-        purchases = [purchase for purchase in self.purchase_repository.stream_models() if self._is_valid_event_purchase(purchase)]
-        participants = self._stream_all_participants()
-
-        active_members = sum(
-            1 for membership in self.membership_repository.stream() if bool(getattr(membership, "subscription_valid", False))
-        )
-
-        event_participants_map = defaultdict(int)
-        unique_participant_keys = set()
-        for participant in participants:
-            event_id = getattr(participant, "event_id", "") or ""
-            if event_id:
-                event_participants_map[event_id] += 1
-
-            unique_key = (
-                (getattr(participant, "membership_id", None) or "").strip().lower()
-                or (getattr(participant, "email", None) or "").strip().lower()
-                or f"{getattr(participant, 'name', '')}:{getattr(participant, 'surname', '')}:{event_id}"
-            )
-            if unique_key:
-                unique_participant_keys.add(unique_key)
-
-        revenue_net_total = sum(self._safe_amount(getattr(purchase, "net_amount", 0)) for purchase in purchases)
-        revenue_net_month = 0.0
-        now_local = datetime.now(ROMA_TZ)
-        for purchase in purchases:
-            ts = self._to_datetime(getattr(purchase, "timestamp", None))
-            if not ts:
-                continue
-            local_ts = ts.astimezone(ROMA_TZ)
-            if local_ts.year == now_local.year and local_ts.month == now_local.month:
-                revenue_net_month += self._safe_amount(getattr(purchase, "net_amount", 0))
+    def _dashboard_reducers(self) -> Dict[str, Reducer]:
+        current_month = datetime.now(ROMA_TZ).strftime("%Y-%m")
+        return {
+            "purchases": Aggregate(
+                recent=TopK(4, lambda purchase: self._sort_ts(self._purchase_ts(purchase))),
+                valid=Filtered(
+                    self._is_valid_event_purchase,
+                    Aggregate(
+                        revenue_net=Sum(self._purchase_net),
+                        this_month=Filtered(
+                            lambda purchase: self._local_period(self._purchase_ts(purchase), "%Y-%m") == current_month,
+                            Sum(self._purchase_net),
+                        ),
+                        revenue_by_event=Histogram(
+                            lambda purchase: getattr(purchase, "ref_id", None) or None,
+                            self._purchase_net,
+                        ),
+                    ),
+                ),
+            ),
+            "participants": Aggregate(
+                per_event=Histogram(lambda participant: getattr(participant, "event_id", "") or None),
+                unique=Distinct(self._participant_identity),
+                recent=TopK(3, lambda participant: self._sort_ts(self._participant_created_at(participant))),
+            ),
+            "memberships": Aggregate(
+                active=Count(lambda membership: bool(getattr(membership, "subscription_valid", False))),
+                recent=TopK(2, lambda membership: self._sort_ts(self._to_datetime(getattr(membership, "start_date", None)))),
+            ),
+            "messages": TopK(2, lambda message: self._sort_ts(self._to_datetime(getattr(message, "timestamp", None)))),
+        }
 
-        avg_fill_rate = self._compute_avg_fill_rate(events, event_participants_map)
+    def _compose_dashboard_snapshot(
+        self,
+        events,
+        reducers: Dict[str, Reducer],
+        global_snapshot: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        purchases = reducers["purchases"].result()
+        participants = reducers["participants"].result()
+        memberships = reducers["memberships"].result()
+        valid_purchases = purchases["valid"]
+        event_participants_map = participants["per_event"]
 
-        global_snapshot = self.get_global_snapshot()
         global_kpis = global_snapshot.get("kpis") if global_snapshot.get("exists") else {}
         gender_distribution = global_kpis.get("gender_distribution") or {"male": 0, "female": 0, "unknown": 0}
 
-        dashboard_snapshot = {
+        return {
             "generated_at": datetime.now(timezone.utc),
             "kpis": {
-                "total_revenue_net": round(revenue_net_total, 2),
+                "total_revenue_net": round(valid_purchases["revenue_net"], 2),
                 "events": len(events),
-                "active_members": active_members,
-                "unique_participants": len(unique_participant_keys),
-                "avg_fill_rate": round(avg_fill_rate, 2),
-                "this_month_revenue": round(revenue_net_month, 2),
+                "active_members": memberships["active"],
+                "unique_participants": participants["unique"],
+                "avg_fill_rate": round(self._compute_avg_fill_rate(events, event_participants_map), 2),
+                "this_month_revenue": round(valid_purchases["this_month"], 2),
             },
             "global_cards": {
                 "avg_unit_payment": round(self._safe_amount(global_kpis.get("avg_unit_payment")), 2),
@@ -387,92 +754,132 @@ class AnalyticsSnapshotService:
                 "gender_split": gender_distribution,
                 "age_band_dominant": global_kpis.get("age_band_dominant") or "unknown",
             },
-            "upcoming_events": self._build_upcoming_events(events, event_participants_map, purchases),
-            "recent_activity": self._build_recent_activity(),
+            "upcoming_events": self._build_upcoming_events(
+                events, event_participants_map, valid_purchases["revenue_by_event"]
+            ),
+            "recent_activity": self._build_recent_activity(
+                purchases["recent"],
+                participants["recent"],
+                memberships["recent"],
+                reducers["messages"].result(),
+            ),
         }
 
-        self.analytics_snapshot_repository.set_dashboard_current(dashboard_snapshot)
-        return dashboard_snapshot
-
     # ---- Internal helpers ------------------------------------------------
+    def _rebuild_job_id(self, scope: str, event_id: Optional[str] = None) -> str:
+        # Id deterministico per scope/evento: il dedupe e' una sola lettura transazionale.
+        if scope in {"event", "attendance"}:
+            return f"{ANALYTICS_JOB_TYPE}__{scope}__{event_id}"
+        return f"{ANALYTICS_JOB_TYPE}__{scope}"
+
     def _enqueue_rebuild(
         self,
         scope: str,
         event_id: Optional[str] = None,
         reason: str = "trigger",
+        immediate: bool = False,
     ) -> Dict[str, Any]:
         now = datetime.now(timezone.utc)
-        for doc_id, payload in self.job_repository.stream_raw_by_type(ANALYTICS_JOB_TYPE):
-            status = str(payload.get("status") or "").lower()
-            if status not in {"queued", "running"}:
-                continue
+        job_id = self._rebuild_job_id(scope, event_id)
 
-            same_scope = (payload.get("scope") or "") == scope
-            same_event = (payload.get("target_event_id") or payload.get("event_id") or "") == (event_id or "")
-            matching_job = (scope in {"global", "all"} and same_scope) or (
-                scope == "event" and same_scope and same_event
+        def mutate(payload: Optional[Dict[str, Any]]):
+            current = payload or {}
+            status = str(current.get("status") or "").lower()
+            active = status in {"scheduled", "queued"} or (
+                status == "running" and not self._is_stale_job(current, now)
             )
-            if not matching_job:
-                continue
-
-            if status == "queued":
-                self.job_repository.update(
-                    doc_id,
-                    {
-                        "reason": reason,
-                        "updated_at": now,
-                        "last_kicked_at": now,
-                    },
-                )
-                return {
-                    "ok": True,
+            if active:
+                updates: Dict[str, Any] = {
+                    "reason": reason,
+                    "updated_at": now,
+                    "requests": int(current.get("requests") or 0) + 1,
+                }
+                if status == "running":
+                    # La rebuild in corso potrebbe non vedere questa scrittura.
+                    updates["rerun_requested"] = True
+                elif status == "queued" or immediate:
+                    # Riscrivere un job queued rilancia il trigger se l'invocazione e' andata persa.
+                    updates["status"] = "queued"
+                    updates["last_kicked_at"] = now
+                return updates, {
                     "deduped": True,
-                    "kicked": True,
-                    "job_id": doc_id,
-                    "scope": scope,
-                    "event_id": event_id,
+                    "kicked": "last_kicked_at" in updates,
+                    "status": updates.get("status", status),
                 }
 
-            if self._is_stale_job(payload, now):
-                self.job_repository.update(
-                    doc_id,
-                    {
-                        "status": "failed",
-                        "error": "Stale analytics rebuild job superseded by a new request",
-                        "finished_at": now,
-                        "updated_at": now,
-                    },
-                )
-                continue
-
-            return {
-                "ok": True,
-                "deduped": True,
+            run_after = now if immediate else self._next_run_after(scope, current, now)
+            job_model = AnalyticsJob(
+                target_event_id=event_id,
+                status="queued" if run_after <= now else "scheduled",
+                percent=0,
+                scope=scope,
+                reason=reason,
+                created_at=now,
+                updated_at=now,
+                finished_at=current.get("finished_at"),
+                run_after=run_after,
+                requests=1,
+                rerun_requested=False,
+            )
+            return job_model.to_firestore(include_none=True), {
+                "deduped": False,
                 "kicked": False,
-                "job_id": doc_id,
-                "scope": scope,
-                "event_id": event_id,
+                "status": job_model.status,
             }
 
-        job_model = AnalyticsJob(
-            target_event_id=event_id,
-            status="queued",
-            percent=0,
-            scope=scope,
-            reason=reason,
-            created_at=now,
-            updated_at=now,
-        )
-        job_id = self.job_repository.create_from_model(job_model)
-
+        result = self.job_repository.mutate_raw(job_id, mutate)
         return {
             "ok": True,
-            "deduped": False,
-            "kicked": False,
             "job_id": job_id,
             "scope": scope,
             "event_id": event_id,
+            **result,
+        }
+
+    def _next_run_after(self, scope: str, payload: Dict[str, Any], now: datetime) -> datetime:
+        if scope == "all":
+            return now
+        debounce = ANALYTICS_EVENT_DEBOUNCE_SECONDS if scope in {"event", "attendance"} else ANALYTICS_GLOBAL_DEBOUNCE_SECONDS
+        run_after = now + timedelta(seconds=debounce)
+        last_finished = self._to_datetime(payload.get("finished_at"))
+        if scope == "global" and last_finished is not None:
+            run_after = max(run_after, last_finished + timedelta(minutes=ANALYTICS_GLOBAL_MIN_INTERVAL_MINUTES))
+        return run_after
+
+    def _promote_scheduled_job(self, payload: Optional[Dict[str, Any]], now: datetime):
+        if str((payload or {}).get("status") or "").lower() != "scheduled":
+            return None, False
+        return {"status": "queued", "updated_at": now}, True
+
+    def _finish_job(
+        self,
+        payload: Optional[Dict[str, Any]],
+        scope: str,
+        now: datetime,
+        error: Optional[str],
+    ):
+        if payload is None:
+            return None, None
+        updates: Dict[str, Any] = {
+            "finished_at": now,
+            "updated_at": now,
+            "error": error,
+            "rerun_requested": False,
         }
+        if payload.get("rerun_requested"):
+            updates.update(
+                {
+                    "status": "scheduled",
+                    "percent": 0,
+                    "requests": 0,
+                    "run_after": self._next_run_after(scope, {"finished_at": now}, now),
+                }
+            )
+        elif error:
+            updates["status"] = "failed"
+        else:
+            updates.update({"status": "completed", "percent": 100})
+        return updates, updates["status"]
 
     def _is_stale_job(self, payload: Dict[str, Any], now: datetime) -> bool:
         status = str(payload.get("status") or "").lower()
@@ -484,42 +891,404 @@ class AnalyticsSnapshotService:
             return True
         return now - marker > ANALYTICS_JOB_STALE_AFTER
 
-    def _stream_all_participants(self) -> List[Any]:
-        participants = []
-        for participant in self.participant_repository.stream_all():
-            participants.append(participant)
-        return participants
+    def _apply_counter_deltas(
+        self,
+        event_deltas: Dict[str, Dict[str, Any]],
+        global_delta: Dict[str, Any],
+        reason: str,
+        delivery_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"events": [], "global": False, "rebuilds": [], "duplicate": False}
+
+        increments: Dict[str, Dict[str, Any]] = {}
+        for event_id, delta in event_deltas.items():
+            delta = self._prune_counters(delta)
+            if not event_id or not delta:
+                continue
+            snapshot = self.analytics_snapshot_repository.get_event_snapshot(event_id)
+            if not self._has_counters(snapshot):
+                # Nessuna baseline: la rebuild calcola i contatori includendo questa scrittura.
+                result["rebuilds"].append(self.enqueue_event_rebuild(event_id, reason=reason))
+                continue
+            increments[event_id] = delta
+
+        global_delta = self._prune_counters(global_delta)
+        if global_delta and not self._has_counters(self.analytics_snapshot_repository.get_global_current()):
+            result["rebuilds"].append(self.enqueue_global_rebuild(reason=reason))
+            global_delta = {}
+
+        if not increments and not global_delta:
+            return result
+        # Delta e marker della delivery vanno nello stesso batch: o entrambi o nessuno.
+        if not self.analytics_snapshot_repository.apply_counter_increments(increments, global_delta, delivery_id):
+            logger.info("_apply_counter_deltas: delivery %s already applied, skipping (%s)", delivery_id, reason)
+            result["duplicate"] = True
+            return result
+        result["events"] = list(increments)
+        result["global"] = bool(global_delta)
+        return result
+
+    def _has_counters(self, snapshot: Optional[Dict[str, Any]]) -> bool:
+        return bool(snapshot) and bool(snapshot.get("counters_since")) and isinstance(snapshot.get("counters"), dict)
+
+    def _purchase_from_payload(self, payload: Dict[str, Any]) -> Optional[EventPurchase]:
+        if not payload or payload.get("type") not in self._VALID_EVENT_TYPE_VALUES:
+            return None
+        return EventPurchase.from_firestore(payload)
+
+    def _accumulate_counters(self, target: Dict[str, Any], source: Dict[str, Any], sign: int = 1) -> Dict[str, Any]:
+        for key, value in source.items():
+            if isinstance(value, dict):
+                self._accumulate_counters(target.setdefault(key, {}), value, sign)
+            else:
+                target[key] = target.get(key, 0) + sign * value
+        return target
+
+    def _prune_counters(self, counters: Dict[str, Any]) -> Dict[str, Any]:
+        output = {}
+        for key, value in counters.items():
+            if isinstance(value, dict):
+                nested = self._prune_counters(value)
+                if nested:
+                    output[key] = nested
+            elif abs(value) > 1e-9:
+                output[key] = value
+        return output
+
+    def _purchase_counters(self, purchase: Any) -> Dict[str, Any]:
+        return {
+            "purchases": 1,
+            "tickets": self._safe_int(getattr(purchase, "participants_count", 0)),
+            "revenue_gross": self._safe_amount(getattr(purchase, "amount_total", 0)),
+            "revenue_net": self._safe_amount(getattr(purchase, "net_amount", 0)),
+        }
+
+    def _purchase_event_counters(self, purchase: Any) -> Dict[str, Any]:
+        counters = self._purchase_counters(purchase)
+        ts = self._to_datetime(getattr(purchase, "timestamp", None))
+        if ts:
+            day = ts.astimezone(ROMA_TZ).strftime("%Y-%m-%d")
+            counters["sales_daily"] = {
+                day: {"purchases": 1, "gross": counters["revenue_gross"], "net": counters["revenue_net"]}
+            }
+        return counters
+
+    def _purchase_global_counters(self, purchase: Any) -> Dict[str, Any]:
+        counters = self._purchase_counters(purchase)
+        ts = self._to_datetime(getattr(purchase, "timestamp", None))
+        if ts:
+            month = ts.astimezone(ROMA_TZ).strftime("%Y-%m")
+            counters["sales_monthly"] = {
+                month: {
+                    "purchases": 1,
+                    "tickets": counters["tickets"],
+                    "gross": counters["revenue_gross"],
+                    "net": counters["revenue_net"],
+                }
+            }
+        return counters
+
+    def _participant_counters(self, participant: Any) -> Dict[str, Any]:
+        is_omaggio = self._normalize_payment_method(getattr(participant, "payment_method", None)) == "omaggio"
+        return {
+            "participants": 1,
+            "omaggi": 1 if is_omaggio else 0,
+            "gender": {self._normalize_gender(getattr(participant, "gender", None)): 1},
+        }
 
-    def _build_ticket_tier_payload(self, purchases: List[Any]) -> Dict[str, Any]:
+    def _participant_event_counters(self, participant: Any) -> Dict[str, Any]:
+        counters = self._participant_counters(participant)
+        created_at = self._to_datetime(getattr(participant, "created_at", None))
+        if created_at:
+            day = created_at.astimezone(ROMA_TZ).strftime("%Y-%m-%d")
+            key = "with_membership" if getattr(participant, "membership_id", None) else "without_membership"
+            counters["membership_daily"] = {day: {key: 1}}
+        return counters
+
+    def _participant_global_counters(self, participant: Any) -> Dict[str, Any]:
+        counters = self._participant_counters(participant)
+        counters["age_bands"] = {self._age_band(getattr(participant, "birthdate", None)): 1}
+        created_at = self._to_datetime(getattr(participant, "created_at", None))
+        if counters["omaggi"] and created_at:
+            counters["omaggi_monthly"] = {created_at.astimezone(ROMA_TZ).strftime("%Y-%m"): 1}
+        return counters
+
+    def _membership_global_counters(self, payload: Any) -> Dict[str, Any]:
+        if not payload:
+            return {}
+        if isinstance(payload, dict):
+            active = bool(payload.get("subscription_valid", True))
+        else:
+            active = bool(getattr(payload, "subscription_valid", False))
+        return {"active_members": 1 if active else 0}
+
+    def _empty_counters(self) -> Dict[str, Any]:
+        return {
+            "purchases": 0,
+            "tickets": 0,
+            "revenue_gross": 0.0,
+            "revenue_net": 0.0,
+            "participants": 0,
+            "omaggi": 0,
+            "gender": {"male": 0, "female": 0, "unknown": 0},
+        }
+
+    def _project_event_counters(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        counters = payload.get("counters")
+        if not self._has_counters(payload) or "kpis" not in payload:
+            return {key: value for key, value in payload.items() if key != "counters"}
+
+        participants_count = self._safe_int(counters.get("participants"))
+        max_participants = self._safe_int((payload.get("event") or {}).get("max_participants"))
+        gross = self._safe_amount(counters.get("revenue_gross"))
+        tickets = self._safe_int(counters.get("tickets"))
+
+        kpis = dict(payload.get("kpis") or {})
+        kpis.update(
+            {
+                "participants": participants_count,
+                "fill_rate": self._percentage(participants_count, max_participants),
+                "revenue_gross": round(gross, 2),
+                "revenue_net": round(self._safe_amount(counters.get("revenue_net")), 2),
+                "avg_unit_payment": round(gross / tickets, 2) if tickets > 0 else 0.0,
+                "omaggi": self._safe_int(counters.get("omaggi")),
+            }
+        )
+
+        funnel_values = {
+            "Acquisti": self._safe_int(counters.get("purchases")),
+            "Ticket": tickets,
+            "Partecipanti": participants_count,
+        }
+        charts = dict(payload.get("charts") or {})
+        charts.update(
+            {
+                "sales_over_time": self._sales_rows_from_counters(counters.get("sales_daily") or {}),
+                "event_funnel": [
+                    {**row, "value": funnel_values.get(row.get("stage"), row.get("value"))}
+                    for row in charts.get("event_funnel") or []
+                ],
+                "gender_distribution": self._distribution_rows(counters.get("gender") or {}),
+                "membership_trend": self._membership_rows_from_counters(counters.get("membership_daily") or {}),
+            }
+        )
+
+        output = {key: value for key, value in payload.items() if key != "counters"}
+        output.update({"kpis": kpis, "charts": charts})
+        return output
+
+    def _project_entrance_flow(self, event_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Gli scan non rigenerano lo snapshot: flusso e ingressi arrivano dai contatori per minuto.
+        if "kpis" not in payload:
+            return payload
+        event = payload.get("event") or {}
+        minutes = self.entrance_scan_repository.get_flow_minutes(event_id)
+        flow = self._entrance_flow_rows(event, self._entrance_minutes_reducer(event).consume(minutes.items()).result())
+        entered = self._count_entered(flow)
+
+        charts = dict(payload.get("charts") or {})
+        charts["entrance_flow"] = flow
+        charts["event_funnel"] = [
+            {**row, "value": entered} if row.get("stage") == "Ingressi" else row
+            for row in charts.get("event_funnel") or []
+        ]
+        return {**payload, "kpis": {**payload["kpis"], "entered": entered}, "charts": charts}
+
+    def _project_global_counters(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        counters = payload.get("counters")
+        if not self._has_counters(payload):
+            return {key: value for key, value in payload.items() if key != "counters"}
+
+        gross = self._safe_amount(counters.get("revenue_gross"))
+        tickets = self._safe_int(counters.get("tickets"))
+        raw_gender = counters.get("gender") or {}
+        gender_counts = {key: self._safe_int(raw_gender.get(key)) for key in ("male", "female", "unknown")}
+        raw_ages = counters.get("age_bands") or {}
+        age_counts = {band: self._safe_int(raw_ages.get(band)) for band in self._age_band_keys()}
+
+        omaggi_monthly = counters.get("omaggi_monthly") or {}
+        omaggi_rows = [
+            {"month": month, "count": self._safe_int(omaggi_monthly[month])}
+            for month in sorted(omaggi_monthly.keys())
+            if self._safe_int(omaggi_monthly[month]) > 0
+        ]
+
+        sales_monthly = counters.get("sales_monthly") or {}
+        avg_rows = []
+        for month in sorted(sales_monthly.keys()):
+            bucket = sales_monthly[month] or {}
+            if self._safe_int(bucket.get("purchases")) <= 0:
+                continue
+            month_tickets = self._safe_int(bucket.get("tickets"))
+            avg = self._safe_amount(bucket.get("gross")) / month_tickets if month_tickets > 0 else 0.0
+            avg_rows.append({"month": month, "value": round(avg, 2)})
+
+        kpis = dict(payload.get("kpis") or {})
+        kpis.update(
+            {
+                "avg_unit_payment": round(gross / tickets, 2) if tickets > 0 else 0.0,
+                "omaggi_total": self._safe_int(counters.get("omaggi")),
+                "gender_distribution": gender_counts,
+                "age_band_dominant": self._dominant_bucket(age_counts),
+            }
+        )
+        charts = dict(payload.get("charts") or {})
+        charts.update(
+            {
+                "age_bands_distribution": [{"band": band, "count": count} for band, count in age_counts.items()],
+                "gender_distribution": self._distribution_rows(gender_counts),
+                "omaggi_trend_monthly": omaggi_rows[-18:],
+                "avg_unit_payment_trend_monthly": avg_rows[-18:],
+            }
+        )
+
+        output = {key: value for key, value in payload.items() if key != "counters"}
+        output.update({"kpis": kpis, "charts": charts})
+        return output
+
+    def _project_dashboard_counters(
+        self,
+        payload: Dict[str, Any],
+        global_payload: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        if not self._has_counters(global_payload):
+            return payload
+
+        counters = global_payload["counters"]
+        current_month = datetime.now(ROMA_TZ).strftime("%Y-%m")
+        month_bucket = (counters.get("sales_monthly") or {}).get(current_month) or {}
+        global_kpis = self._project_global_counters(global_payload).get("kpis") or {}
+
+        kpis = dict(payload.get("kpis") or {})
+        kpis.update(
+            {
+                "total_revenue_net": round(self._safe_amount(counters.get("revenue_net")), 2),
+                "active_members": self._safe_int(counters.get("active_members")),
+                "this_month_revenue": round(self._safe_amount(month_bucket.get("net")), 2),
+            }
+        )
+        global_cards = dict(payload.get("global_cards") or {})
+        global_cards.update(
+            {
+                "avg_unit_payment": round(self._safe_amount(global_kpis.get("avg_unit_payment")), 2),
+                "omaggi_total": self._safe_int(global_kpis.get("omaggi_total")),
+                "gender_split": global_kpis.get("gender_distribution") or {"male": 0, "female": 0, "unknown": 0},
+                "age_band_dominant": global_kpis.get("age_band_dominant") or "unknown",
+            }
+        )
+        return {**payload, "kpis": kpis, "global_cards": global_cards}
+
+    def _sales_rows_from_counters(self, sales_daily: Dict[str, Any]) -> List[Dict[str, Any]]:
         rows = []
-        for purchase in purchases:
-            participants_count = self._safe_int(getattr(purchase, "participants_count", 0))
-            if participants_count <= 0:
+        for day in sorted(sales_daily.keys()):
+            bucket = sales_daily[day] or {}
+            if self._safe_int(bucket.get("purchases")) <= 0:
+                continue
+            rows.append(
+                {
+                    "day": day,
+                    "gross": round(self._safe_amount(bucket.get("gross")), 2),
+                    "net": round(self._safe_amount(bucket.get("net")), 2),
+                }
+            )
+        return rows[-120:]
+
+    def _membership_rows_from_counters(self, membership_daily: Dict[str, Any]) -> List[Dict[str, Any]]:
+        cumulative_with = 0
+        cumulative_without = 0
+        rows = []
+        for day in sorted(membership_daily.keys()):
+            bucket = membership_daily[day] or {}
+            with_membership = self._safe_int(bucket.get("with_membership"))
+            without_membership = self._safe_int(bucket.get("without_membership"))
+            if with_membership == 0 and without_membership == 0:
                 continue
-            gross = self._safe_amount(getattr(purchase, "amount_total", 0))
-            net = self._safe_amount(getattr(purchase, "net_amount", 0))
-            unit_price = gross / participants_count
+            cumulative_with += with_membership
+            cumulative_without += without_membership
             rows.append(
                 {
-                    "purchase_id": getattr(purchase, "id", None),
-                    "participants_count": participants_count,
-                    "gross": gross,
-                    "net": net,
-                    "unit_price": unit_price,
+                    "day": day,
+                    "with_membership": cumulative_with,
+                    "without_membership": cumulative_without,
                 }
             )
+        return rows[-120:]
 
-        mapping = self._map_ticket_tiers(rows)
+    def _stream_all_participants(self) -> Iterable[Any]:
+        return self.participant_repository.stream_all()
+
+    # Estrattori usati dai reducer degli snapshot.
+    def _purchase_ts(self, purchase: Any) -> Optional[datetime]:
+        return self._to_datetime(getattr(purchase, "timestamp", None))
+
+    def _purchase_gross(self, purchase: Any) -> float:
+        return self._safe_amount(getattr(purchase, "amount_total", 0))
+
+    def _purchase_net(self, purchase: Any) -> float:
+        return self._safe_amount(getattr(purchase, "net_amount", 0))
+
+    def _purchase_tickets(self, purchase: Any) -> int:
+        return self._safe_int(getattr(purchase, "participants_count", 0))
+
+    def _participant_created_at(self, participant: Any) -> Optional[datetime]:
+        return self._to_datetime(getattr(participant, "created_at", None) or getattr(participant, "createdAt", None))
+
+    def _participant_gender(self, participant: Any) -> str:
+        return self._normalize_gender(getattr(participant, "gender", None))
+
+    def _is_omaggio(self, participant: Any) -> bool:
+        return self._normalize_payment_method(getattr(participant, "payment_method", None)) == "omaggio"
+
+    def _membership_bucket(self, participant: Any) -> str:
+        membership_id = getattr(participant, "membership_id", None) or getattr(participant, "membershipId", None)
+        return "with_membership" if membership_id else "without_membership"
+
+    def _participant_identity(self, participant: Any) -> str:
+        return (
+            (getattr(participant, "membership_id", None) or "").strip().lower()
+            or (getattr(participant, "email", None) or "").strip().lower()
+            or f"{getattr(participant, 'name', '')}:{getattr(participant, 'surname', '')}:{getattr(participant, 'event_id', '') or ''}"
+        )
+
+    def _local_period(self, ts: Optional[datetime], fmt: str) -> Optional[str]:
+        return ts.astimezone(ROMA_TZ).strftime(fmt) if ts else None
+
+    def _sort_ts(self, ts: Optional[datetime]) -> datetime:
+        return ts or EPOCH
+
+    def _ticket_tier_reducer(self) -> Reducer:
+        # Gli acquisti sono raggruppati per prezzo unitario: il clustering lavora sui
+        # prezzi distinti (pesati per numero di acquisti) e non sulle singole righe.
+        def unit_price(purchase: Any) -> Optional[float]:
+            participants_count = self._purchase_tickets(purchase)
+            if participants_count <= 0:
+                return None
+            return self._purchase_gross(purchase) / participants_count
+
+        return Partitioned(
+            unit_price,
+            lambda: Aggregate(
+                rows=Count(),
+                count=Sum(self._purchase_tickets),
+                gross=Sum(self._purchase_gross),
+                net=Sum(self._purchase_net),
+            ),
+        )
+
+    def _build_ticket_tier_payload(self, purchases: Iterable[Any]) -> Dict[str, Any]:
+        return self._ticket_tier_payload_from_prices(self._ticket_tier_reducer().consume(purchases).result())
+
+    def _ticket_tier_payload_from_prices(self, price_buckets: Dict[float, Dict[str, Any]]) -> Dict[str, Any]:
+        mapping = cluster_price_tiers({price: bucket["rows"] for price, bucket in price_buckets.items()})
 
         aggregates = {
             tier_name: {"tier": tier_name, "count": 0, "gross": 0.0, "net": 0.0, "avg_unit_price": 0.0}
             for tier_name in TIER_NAMES
         }
 
-        for row in rows:
-            tier_name = mapping.get(row["purchase_id"], "regular")
-            bucket = aggregates[tier_name]
-            bucket["count"] += row["participants_count"]
+        for price, row in price_buckets.items():
+            bucket = aggregates[mapping.get(price, "regular")]
+            bucket["count"] += row["count"]
             bucket["gross"] += row["gross"]
             bucket["net"] += row["net"]
 
@@ -539,63 +1308,9 @@ class AnalyticsSnapshotService:
         return {"tiers": tiers, "chart": chart}
 
     def _map_ticket_tiers(self, rows: List[Dict[str, Any]]) -> Dict[Optional[str], str]:
-        if not rows:
-            return {}
-
-        clustered = []
-        for row in sorted(rows, key=lambda item: item["unit_price"]):
-            placed = False
-            for cluster in clustered:
-                if abs(row["unit_price"] - cluster["center"]) <= PRICE_TOLERANCE:
-                    cluster["rows"].append(row)
-                    cluster["center"] = sum(item["unit_price"] for item in cluster["rows"]) / len(cluster["rows"])
-                    placed = True
-                    break
-            if not placed:
-                clustered.append({"center": row["unit_price"], "rows": [row]})
-
-        clustered.sort(key=lambda cluster: cluster["center"])
-        cluster_count = len(clustered)
-
-        cluster_to_tier = {}
-        if cluster_count <= 1:
-            for index in range(cluster_count):
-                cluster_to_tier[index] = "regular"
-        elif cluster_count == 2:
-            cluster_to_tier[0] = "early"
-            cluster_to_tier[1] = "regular"
-        elif cluster_count == 3:
-            cluster_to_tier[0] = "early"
-            cluster_to_tier[1] = "regular"
-            cluster_to_tier[2] = "late"
-        else:
-            for index in range(cluster_count):
-                if index == 0:
-                    cluster_to_tier[index] = "super_early"
-                elif index == 1:
-                    cluster_to_tier[index] = "early"
-                elif index == cluster_count - 1:
-                    cluster_to_tier[index] = "late"
-                else:
-                    cluster_to_tier[index] = "regular"
-
-        mapping = {}
-        for index, cluster in enumerate(clustered):
-            tier = cluster_to_tier.get(index, "regular")
-            for row in cluster["rows"]:
-                mapping[row.get("purchase_id")] = tier
-        return mapping
-
-    def _build_sales_over_time(self, purchases: List[Any]) -> List[Dict[str, Any]]:
-        by_day = defaultdict(lambda: {"gross": 0.0, "net": 0.0})
-        for purchase in purchases:
-            ts = self._to_datetime(getattr(purchase, "timestamp", None))
-            if not ts:
-                continue
-            day = ts.astimezone(ROMA_TZ).strftime("%Y-%m-%d")
-            by_day[day]["gross"] += self._safe_amount(getattr(purchase, "amount_total", 0))
-            by_day[day]["net"] += self._safe_amount(getattr(purchase, "net_amount", 0))
+        return map_ticket_tiers(rows)
 
+    def _sales_over_time_rows(self, by_day: Dict[str, Dict[str, float]]) -> List[Dict[str, Any]]:
         rows = []
         for day in sorted(by_day.keys()):
             rows.append(
@@ -607,36 +1322,27 @@ class AnalyticsSnapshotService:
             )
         return rows[-120:]
 
-    def _build_event_funnel(self, purchases: List[Any], participants_count: int, entered_count: int) -> List[Dict[str, Any]]:
-        ticket_count = sum(self._safe_int(getattr(purchase, "participants_count", 0)) for purchase in purchases)
+    def _build_event_funnel(
+        self,
+        purchases_count: int,
+        ticket_count: int,
+        participants_count: int,
+        entered_count: int,
+    ) -> List[Dict[str, Any]]:
         return [
-            {"stage": "Acquisti", "value": len(purchases)},
+            {"stage": "Acquisti", "value": purchases_count},
             {"stage": "Ticket", "value": ticket_count},
             {"stage": "Partecipanti", "value": participants_count},
             {"stage": "Ingressi", "value": entered_count},
         ]
 
-    def _build_membership_trend(self, participants: List[Any]) -> List[Dict[str, Any]]:
-        by_day = defaultdict(lambda: {"with_membership": 0, "without_membership": 0})
-
-        for participant in participants:
-            created_at = self._to_datetime(getattr(participant, "created_at", None) or getattr(participant, "createdAt", None))
-            key = created_at.astimezone(ROMA_TZ).strftime("%Y-%m-%d") if created_at else "unknown"
-
-            membership_id = (getattr(participant, "membership_id", None) or getattr(participant, "membershipId", None) or "")
-            if membership_id:
-                by_day[key]["with_membership"] += 1
-            else:
-                by_day[key]["without_membership"] += 1
-
+    def _membership_trend_rows(self, by_day: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
         cumulative_with = 0
         cumulative_without = 0
         rows = []
         for day in sorted(by_day.keys()):
-            if day == "unknown":
-                continue
-            cumulative_with += by_day[day]["with_membership"]
-            cumulative_without += by_day[day]["without_membership"]
+            cumulative_with += by_day[day].get("with_membership", 0)
+            cumulative_without += by_day[day].get("without_membership", 0)
             rows.append(
                 {
                     "day": day,
@@ -647,37 +1353,53 @@ class AnalyticsSnapshotService:
 
         return rows[-120:]
 
-    def _build_entrance_flow(self, event) -> List[Dict[str, Any]]:
-        event_date = self._parse_date_like(getattr(event, "date", None))
+    def _entrance_window(self, event) -> tuple:
+        raw_date = event.get("date") if isinstance(event, dict) else getattr(event, "date", None)
+        event_date = self._parse_date_like(raw_date)
         if not event_date:
             event_date = datetime.now(ROMA_TZ).date()
 
         window_start = datetime.combine(event_date, time(22, 0), tzinfo=ROMA_TZ)
         window_end = window_start + timedelta(hours=8)
-
         total_buckets = int((window_end - window_start).total_seconds() // (30 * 60))
-        counts = [0 for _ in range(total_buckets)]
+        return window_start, total_buckets
 
-        event_id = getattr(event, "id", None)
-        scans = self.entrance_scan_repository.list(event_id) if event_id else []
-        for scan in scans:
-            scanned_at = self._to_datetime(getattr(scan, "scanned_at", None))
+    def _entrance_bucket_fn(self, event):
+        window_start, total_buckets = self._entrance_window(event)
+
+        def bucket_index(scanned_at: Optional[datetime]) -> Optional[int]:
             if not scanned_at:
-                continue
-            local_ts = scanned_at.astimezone(ROMA_TZ)
-            if not (window_start <= local_ts < window_end):
-                continue
+                return None
+            index = int((scanned_at.astimezone(ROMA_TZ) - window_start).total_seconds() // (30 * 60))
+            return index if 0 <= index < total_buckets else None
+
+        return bucket_index
 
-            index = int((local_ts - window_start).total_seconds() // (30 * 60))
-            if 0 <= index < total_buckets:
-                counts[index] += 1
+    def _entrance_flow_reducer(self, event) -> Reducer:
+        bucket_index = self._entrance_bucket_fn(event)
+        return Histogram(lambda scan: bucket_index(self._to_datetime(getattr(scan, "scanned_at", None))))
+
+    def _entrance_minutes_reducer(self, event) -> Reducer:
+        # Consuma coppie (minuto, ingressi) dei contatori di entrance_scans/{eventId}.
+        bucket_index = self._entrance_bucket_fn(event)
+        return Histogram(lambda item: bucket_index(item[0]), lambda item: item[1])
+
+    def _build_entrance_flow(self, event, scans: Optional[Iterable[Any]] = None) -> List[Dict[str, Any]]:
+        if scans is not None:
+            return self._entrance_flow_rows(event, self._entrance_flow_reducer(event).consume(scans).result())
+        event_id = getattr(event, "id", None)
+        minutes = self.entrance_scan_repository.get_flow_minutes(event_id) if event_id else {}
+        return self._entrance_flow_rows(event, self._entrance_minutes_reducer(event).consume(minutes.items()).result())
+
+    def _entrance_flow_rows(self, event, counts: Dict[int, int]) -> List[Dict[str, Any]]:
+        window_start, total_buckets = self._entrance_window(event)
 
         output = []
         cumulative = 0
         for index in range(total_buckets):
             bucket_start = window_start + timedelta(minutes=30 * index)
             bucket_end = bucket_start + timedelta(minutes=30)
-            count = counts[index]
+            count = counts.get(index, 0)
             cumulative += count
             output.append(
                 {
@@ -691,49 +1413,22 @@ class AnalyticsSnapshotService:
 
         return output
 
-    def _build_omaggi_trend(self, participants: List[Any]) -> List[Dict[str, Any]]:
-        months = defaultdict(int)
-        for participant in participants:
-            if self._normalize_payment_method(getattr(participant, "payment_method", None)) != "omaggio":
-                continue
-
-            created_at = self._to_datetime(getattr(participant, "created_at", None) or getattr(participant, "createdAt", None))
-            if not created_at:
-                continue
-            month = created_at.astimezone(ROMA_TZ).strftime("%Y-%m")
-            months[month] += 1
-
-        rows = [{"month": month, "count": months[month]} for month in sorted(months.keys())]
-        return rows[-18:]
-
-    def _build_avg_unit_payment_trend(self, purchases: List[Any]) -> List[Dict[str, Any]]:
-        month_totals = defaultdict(lambda: {"amount": 0.0, "participants": 0})
-
-        for purchase in purchases:
-            ts = self._to_datetime(getattr(purchase, "timestamp", None))
-            if not ts:
-                continue
-            month = ts.astimezone(ROMA_TZ).strftime("%Y-%m")
-            month_totals[month]["amount"] += self._safe_amount(getattr(purchase, "amount_total", 0))
-            month_totals[month]["participants"] += self._safe_int(getattr(purchase, "participants_count", 0))
-
+    def _avg_unit_payment_rows(self, monthly: Dict[str, Dict[str, float]]) -> List[Dict[str, Any]]:
         rows = []
-        for month in sorted(month_totals.keys()):
-            total_participants = month_totals[month]["participants"]
-            avg = month_totals[month]["amount"] / total_participants if total_participants > 0 else 0.0
+        for month in sorted(monthly.keys()):
+            total_participants = monthly[month]["participants"]
+            avg = monthly[month]["amount"] / total_participants if total_participants > 0 else 0.0
             rows.append({"month": month, "value": round(avg, 2)})
 
         return rows[-18:]
 
-    def _build_upcoming_events(self, events, participants_map: Dict[str, int], purchases: List[Any]) -> List[Dict[str, Any]]:
+    def _build_upcoming_events(
+        self,
+        events,
+        participants_map: Dict[str, int],
+        revenues: Dict[str, float],
+    ) -> List[Dict[str, Any]]:
         today = datetime.now(ROMA_TZ).date()
-        revenues = defaultdict(float)
-        for purchase in purchases:
-            event_id = getattr(purchase, "ref_id", None)
-            if not event_id:
-                continue
-            revenues[event_id] += self._safe_amount(getattr(purchase, "net_amount", 0))
-
         candidates = []
         for event in events:
             if not event.id:
@@ -764,49 +1459,34 @@ class AnalyticsSnapshotService:
             row.pop("sort_date", None)
         return rows
 
-    def _build_recent_activity(self) -> List[Dict[str, Any]]:
+    def _build_recent_activity(self, purchases, participants, memberships, messages) -> List[Dict[str, Any]]:
+        # Gli input sono gia' i piu' recenti per tipo (TopK dei reducer dashboard).
         activity = []
 
-        purchases = sorted(
-            list(self.purchase_repository.stream_models()),
-            key=lambda item: self._to_datetime(getattr(item, "timestamp", None)) or datetime(1970, 1, 1, tzinfo=timezone.utc),
-            reverse=True,
-        )
-        for purchase in purchases[:4]:
+        for purchase in purchases:
             activity.append(
                 {
                     "id": getattr(purchase, "id", None),
                     "type": "purchase",
                     "title": "Nuovo acquisto",
                     "subtitle": f"{getattr(purchase, 'payer_name', '')} {getattr(purchase, 'payer_surname', '')}".strip() or "Acquisto",
-                    "amount": round(self._safe_amount(getattr(purchase, "amount_total", 0)), 2),
-                    "timestamp": self._to_datetime(getattr(purchase, "timestamp", None)),
+                    "amount": round(self._purchase_gross(purchase), 2),
+                    "timestamp": self._purchase_ts(purchase),
                 }
             )
 
-        participants = sorted(
-            self._stream_all_participants(),
-            key=lambda item: self._to_datetime(getattr(item, "created_at", None) or getattr(item, "createdAt", None))
-            or datetime(1970, 1, 1, tzinfo=timezone.utc),
-            reverse=True,
-        )
-        for participant in participants[:3]:
+        for participant in participants:
             activity.append(
                 {
                     "id": getattr(participant, "id", None),
                     "type": "participant",
                     "title": "Nuovo partecipante",
                     "subtitle": f"{getattr(participant, 'name', '')} {getattr(participant, 'surname', '')}".strip() or "Partecipante",
-                    "timestamp": self._to_datetime(getattr(participant, "created_at", None) or getattr(participant, "createdAt", None)),
+                    "timestamp": self._participant_created_at(participant),
                 }
             )
 
-        memberships = sorted(
-            list(self.membership_repository.stream()),
-            key=lambda item: self._to_datetime(getattr(item, "start_date", None)) or datetime(1970, 1, 1, tzinfo=timezone.utc),
-            reverse=True,
-        )
-        for membership in memberships[:2]:
+        for membership in memberships:
             activity.append(
                 {
                     "id": getattr(membership, "id", None),
@@ -817,12 +1497,7 @@ class AnalyticsSnapshotService:
                 }
             )
 
-        messages = sorted(
-            list(self.message_repository.stream()),
-            key=lambda item: self._to_datetime(getattr(item, "timestamp", None)) or datetime(1970, 1, 1, tzinfo=timezone.utc),
-            reverse=True,
-        )
-        for message in messages[:2]:
+        for message in messages:
             activity.append(
                 {
                     "id": getattr(message, "id", None),
@@ -834,7 +1509,7 @@ class AnalyticsSnapshotService:
             )
 
         activity.sort(
-            key=lambda row: row.get("timestamp") or datetime(1970, 1, 1, tzinfo=timezone.utc),
+            key=lambda row: self._sort_ts(row.get("timestamp")),
             reverse=True,
         )
 
@@ -862,34 +1537,17 @@ class AnalyticsSnapshotService:
             return 0.0
         return sum(rates) / len(rates)
 
-    def _age_band_distribution(self, participants: List[Any]) -> Dict[str, int]:
-        output = {band: 0 for band, _, _ in AGE_BANDS}
-        output["unknown"] = 0
-
-        for participant in participants:
-            age = self._age_from_birthdate(getattr(participant, "birthdate", None))
-            if age is None:
-                output["unknown"] += 1
-                continue
-
-            matched = False
-            for band, start, end in AGE_BANDS:
-                if start <= age <= end:
-                    output[band] += 1
-                    matched = True
-                    break
-
-            if not matched:
-                output["unknown"] += 1
-
-        return output
+    def _age_band_keys(self) -> List[str]:
+        return [band for band, _, _ in AGE_BANDS] + ["unknown"]
 
-    def _gender_distribution(self, participants: List[Any]) -> Dict[str, int]:
-        output = {"male": 0, "female": 0, "unknown": 0}
-        for participant in participants:
-            key = self._normalize_gender(getattr(participant, "gender", None))
-            output[key] += 1
-        return output
+    def _age_band(self, birthdate: Any) -> str:
+        age = self._age_from_birthdate(birthdate)
+        if age is None:
+            return "unknown"
+        for band, start, end in AGE_BANDS:
+            if start <= age <= end:
+                return band
+        return "unknown"
 
     def _distribution_rows(self, payload: Dict[str, int]) -> List[Dict[str, Any]]:
         return [
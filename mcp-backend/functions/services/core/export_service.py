@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Type
+
+from dto.export_api import ExportQueryDTO, MembershipExportQueryDTO, ParticipantExportQueryDTO
+from dto.membership_api import MembershipResponseDTO
+from dto.participant_api import ParticipantResponseDTO
+from dto.purchase import PurchaseDTO
+from errors.service_errors import ValidationError
+from interfaces.repositories import (
+    MembershipRepositoryProtocol,
+    ParticipantRepositoryProtocol,
+    PurchaseRepositoryProtocol,
+)
+from mappers.membership_mappers import membership_to_response
+from mappers.participant_mappers import participant_to_response
+from mappers.purchase_mappers import purchase_to_response
+from repositories.membership_repository import MembershipRepository
+from repositories.participant_repository import ParticipantRepository
+from repositories.purchase_repository import PurchaseRepository
+from utils.streaming_export import csv_chunks, ndjson_chunks
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+PARTICIPANT_EXPORT_COLUMNS = [
+    "id", "name", "surname", "email", "phone", "birthdate", "membershipId",
+    "payment_method", "price", "entered", "entered_at", "createdAt",
+]
+MEMBERSHIP_EXPORT_COLUMNS = [
+    "id", "name", "surname", "email", "phone", "birthdate", "start_date", "end_date",
+    "membership_type", "membership_fee", "subscription_valid", "membership_years",
+]
+PURCHASE_EXPORT_COLUMNS = [
+    "id", "payer_name", "payer_surname", "payer_email", "amount_total", "currency",
+    "net_amount", "status", "type", "payment_method", "timestamp", "event_id",
+]
+
+
+@dataclass
+class ExportStream:
+    filename: str
+    mimetype: str
+    chunks: Iterator[str]
+
+
+def _response_columns(dto_cls: Type) -> List[str]:
+    return [field.serialization_alias or name for name, field in dto_cls.model_fields.items()]
+
+
+class ExportService:
+    """
+    Export admin in streaming: le righe passano una alla volta da
+    ``repository.stream()`` al mapper e al serializzatore, senza materializzare la lista.
+    """
+
+    def __init__(
+        self,
+        participant_repository: Optional[ParticipantRepositoryProtocol] = None,
+        membership_repository: Optional[MembershipRepositoryProtocol] = None,
+        purchase_repository: Optional[PurchaseRepositoryProtocol] = None,
+    ):
+        self.participant_repository = participant_repository or ParticipantRepository()
+        self.membership_repository = membership_repository or MembershipRepository()
+        self.purchase_repository = purchase_repository or PurchaseRepository()
+
+    def export_participants(self, dto: ParticipantExportQueryDTO) -> ExportStream:
+        return self._export(
+            dto,
+            name=f"partecipanti_{dto.event_id}",
+            models=lambda: self.participant_repository.stream(dto.event_id),
+            mapper=participant_to_response,
+            dto_cls=ParticipantResponseDTO,
+            default_columns=PARTICIPANT_EXPORT_COLUMNS,
+        )
+
+    def export_memberships(self, dto: MembershipExportQueryDTO) -> ExportStream:
+        if dto.year:
+            models = lambda: self.membership_repository.stream_by_year(int(dto.year))
+        else:
+            models = self.membership_repository.stream
+        return self._export(
+            dto,
+            name=f"soci_{dto.year}" if dto.year else "soci",
+            models=models,
+            mapper=membership_to_response,
+            dto_cls=MembershipResponseDTO,
+            default_columns=MEMBERSHIP_EXPORT_COLUMNS,
+        )
+
+    def export_purchases(self, dto: ExportQueryDTO) -> ExportStream:
+        return self._export(
+            dto,
+            name="acquisti",
+            models=self.purchase_repository.stream_models,
+            mapper=purchase_to_response,
+            dto_cls=PurchaseDTO,
+            default_columns=PURCHASE_EXPORT_COLUMNS,
+        )
+
+    def _export(
+        self,
+        dto: ExportQueryDTO,
+        name: str,
+        models: Callable[[], Iterable[Any]],
+        mapper: Callable[[Any], Any],
+        dto_cls: Type,
+        default_columns: Sequence[str],
+    ) -> ExportStream:
+        # Le colonne si validano prima di aprire lo stream: dopo il primo byte non si puo' piu' rispondere 400.
+        columns = list(dto.columns or default_columns)
+        allowed = set(_response_columns(dto_cls))
+        unknown = [column for column in columns if column not in allowed]
+        if unknown:
+            raise ValidationError(f"Unknown export columns: {', '.join(unknown)}")
+
+        def rows() -> Iterator[Dict[str, Any]]:
+            for model in models():
+                yield mapper(model).to_payload()
+
+        serializer = ndjson_chunks if dto.format == "ndjson" else csv_chunks
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+        return ExportStream(
+            filename=f"{name}_{stamp}.{dto.format}",
+            mimetype=EXPORT_MIMETYPES[dto.format],
+            chunks=serializer(rows(), columns),
+        )
@@ -0,0 +1,187 @@
+"""
+Arricchimento genere dei partecipanti a partire dal nome, con tre livelli di cache.
+
+1. ``_gender_memory``: LRU in memoria dell'istanza (``TTLCache`` limitata).
+2. ``gender_cache``: collection Firestore, un documento per nome normalizzato,
+   condivisa da tutte le istanze e sopravvive ai cold start.
+3. Genderize: solo per i nomi mancanti, fino a 10 nomi per richiesta.
+
+Il pubblico ripete poche centinaia di nomi, quindi a regime la registrazione non
+tocca il provider esterno. Gli errori del provider non vengono messi in cache:
+il nome viene ritentato alla lookup successiva.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from clients.genderize_client import GENDERIZE_MAX_NAMES, GenderizeRoutes
+from interfaces.repositories import GenderCacheRepositoryProtocol, ParticipantRepositoryProtocol
+from models import EventParticipant, GenderGuess
+from models.gender_guess import UNKNOWN_GENDER
+from repositories.gender_cache_repository import GenderCacheRepository
+from repositories.participant_repository import ParticipantRepository
+from utils.safe_logging import redact_sensitive
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("GenderService")
+
+GENDER_MEMORY_CACHE_SIZE = 2048
+GENDER_MEMORY_TTL_SECONDS = 24 * 60 * 60
+GENDER_BACKFILL_CHUNK = 500
+# Nomi ambigui per Genderize ma non per il nostro pubblico. Valgono solo per il genere
+# salvato sul partecipante (trigger e backfill), non per i controlli di acquisto.
+GENDER_NAME_OVERRIDES = {"andrea": ("male", 1.0)}
+
+_gender_memory = TTLCache(ttl_seconds=GENDER_MEMORY_TTL_SECONDS, maxsize=GENDER_MEMORY_CACHE_SIZE)
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Primo nome in minuscolo; stringa vuota se non utilizzabile come id documento."""
+    tokens = str(name or "").strip().lower().split()
+    key = tokens[0] if tokens else ""
+    if "/" in key or key in {".", ".."} or key.startswith("__"):
+        return ""
+    return key
+
+
+class GenderService:
+    def __init__(
+        self,
+        gender_cache_repository: Optional[GenderCacheRepositoryProtocol] = None,
+        participant_repository: Optional[ParticipantRepositoryProtocol] = None,
+        genderize: Any = None,
+    ):
+        self.gender_cache_repository = gender_cache_repository or GenderCacheRepository()
+        self.participant_repository = participant_repository or ParticipantRepository()
+        self.genderize = genderize or GenderizeRoutes
+
+    def lookup(self, name: Optional[str]) -> GenderGuess:
+        key = normalize_name(name)
+        if not key:
+            return GenderGuess()
+        return self.lookup_many([key], with_overrides=True).get(key) or GenderGuess(id=key)
+
+    def lookup_many(self, names: Iterable[Optional[str]], with_overrides: bool = False) -> Dict[str, GenderGuess]:
+        """
+        Nome normalizzato -> ``GenderGuess``; i nomi che il provider non ha risolto mancano dal risultato.
+        ``with_overrides`` applica ``GENDER_NAME_OVERRIDES`` (solo per l'arricchimento dei partecipanti).
+        """
+        found: Dict[str, GenderGuess] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(filter(None, map(normalize_name, names))):
+            override = GENDER_NAME_OVERRIDES.get(key) if with_overrides else None
+            if override:
+                found[key] = GenderGuess(id=key, gender=override[0], probability=override[1])
+                continue
+            cached = _gender_memory.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing.append(key)
+
+        if missing:
+            for guess in self._read_cache(missing):
+                found[guess.id] = guess
+                _gender_memory.set(guess.id, guess)
+            missing = [key for key in missing if key not in found]
+
+        if missing:
+            fetched = self._fetch(missing)
+            self._write_cache(fetched)
+            for guess in fetched:
+                found[guess.id] = guess
+                _gender_memory.set(guess.id, guess)
+        return found
+
+    def backfill_participants(
+        self,
+        event_id: Optional[str] = None,
+        overwrite: bool = False,
+        dry_run: bool = False,
+        limit: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Arricchisce in blocco i partecipanti senza genere (o tutti con ``overwrite``):
+        i nomi di ogni blocco passano da una sola ``lookup_many`` e gli update vanno a batch.
+        ``limit`` conta i partecipanti candidati, non quelli aggiornati.
+        """
+        participants = (
+            self.participant_repository.stream(event_id) if event_id else self.participant_repository.stream_all()
+        )
+        stats = {"scanned": 0, "candidates": 0, "updated": 0}
+        pending: List[EventParticipant] = []
+        for participant in participants:
+            stats["scanned"] += 1
+            if not overwrite and participant.gender not in (None, "", UNKNOWN_GENDER):
+                continue
+            if not normalize_name(participant.name):
+                continue
+            if event_id and not participant.event_id:
+                participant.event_id = event_id
+            pending.append(participant)
+            stats["candidates"] += 1
+            if len(pending) >= GENDER_BACKFILL_CHUNK:
+                stats["updated"] += self._apply_backfill(pending, dry_run)
+                pending = []
+            if limit and stats["candidates"] >= limit:
+                break
+        if pending:
+            stats["updated"] += self._apply_backfill(pending, dry_run)
+        logger.info("backfill_participants: event=%s %s dry_run=%s", event_id or "*", stats, dry_run)
+        return stats
+
+    def _apply_backfill(self, participants: List[EventParticipant], dry_run: bool) -> int:
+        guesses = self.lookup_many((participant.name for participant in participants), with_overrides=True)
+        updates = []
+        for participant in participants:
+            guess = guesses.get(normalize_name(participant.name))
+            if guess is None:
+                continue
+            probability = round(guess.probability, 1)
+            if (participant.gender, participant.gender_probability) == (guess.gender, probability):
+                continue
+            updates.append((participant.event_id, participant.id, guess.gender, probability))
+        if updates and not dry_run:
+            self.participant_repository.update_gender_many(updates)
+        return len(updates)
+
+    def _read_cache(self, keys: List[str]) -> List[GenderGuess]:
+        try:
+            return self.gender_cache_repository.get_many(keys)
+        except Exception as exc:
+            logger.warning("gender cache read failed: %s", redact_sensitive(str(exc)))
+            return []
+
+    def _write_cache(self, guesses: List[GenderGuess]) -> None:
+        if not guesses:
+            return
+        try:
+            self.gender_cache_repository.set_many(guesses)
+        except Exception as exc:
+            logger.warning("gender cache write failed: %s", redact_sensitive(str(exc)))
+
+    def _fetch(self, keys: List[str]) -> List[GenderGuess]:
+        guesses: List[GenderGuess] = []
+        for start in range(0, len(keys), GENDERIZE_MAX_NAMES):
+            chunk = keys[start:start + GENDERIZE_MAX_NAMES]
+            try:
+                result = self.genderize.lookup(chunk)
+            except Exception as exc:
+                logger.warning("Genderize lookup failed for %d names: %s", len(chunk), redact_sensitive(str(exc)))
+                continue
+            if not result.ok:
+                continue
+            requested = set(chunk)
+            for item in result.payload or []:
+                key = normalize_name((item or {}).get("name"))
+                if key not in requested:
+                    continue
+                guesses.append(
+                    GenderGuess(
+                        id=key,
+                        gender=item.get("gender") or UNKNOWN_GENDER,
+                        probability=round(float(item.get("probability") or 0.0), 2),
+                        count=int(item.get("count") or 0),
+                    )
+                )
+        return guesses
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 import secrets
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, List, Optional
 
 from errors.service_errors import NotFoundError, ValidationError
 from interfaces.repositories import (
@@ -14,13 +14,25 @@ from interfaces.repositories import (
     ScanTokenRepositoryProtocol,
 )
 from dto.entrance_api import (
+    LIVE_FLOW_BUCKET_MINUTES,
+    AdminLiveStatsQueryDTO,
     DeactivateScanTokenRequestDTO,
     DeactivateScanTokenResponseDTO,
+    EntryBatchResponseDTO,
+    EntryResultDTO,
     GenerateScanTokenRequestDTO,
     GenerateScanTokenResponseDTO,
+    LiveFlowBucketDTO,
+    LiveStatsQueryDTO,
+    LiveStatsResponseDTO,
+    ManifestMemberDTO,
     ManualEntryRequestDTO,
     ManualEntryResponseDTO,
     MemberInfoDTO,
+    ScannerManifestQueryDTO,
+    ScannerManifestResponseDTO,
+    SyncOfflineScansRequestDTO,
+    ValidateEntryBatchRequestDTO,
     ValidateEntryRequestDTO,
     ValidateEntryResponseDTO,
     VerifyScanTokenQueryDTO,
@@ -35,6 +47,9 @@ from repositories.participant_repository import ParticipantRepository
 from repositories.scan_token_repository import ScanTokenRepository
 from utils.safe_logging import safe_id
 
+# Campi del partecipante che finiscono nel manifest scanner (chiavi Firestore).
+MANIFEST_PARTICIPANT_FIELDS = ("name", "surname", "membershipId")
+
 
 class EntranceService:
     def __init__(
@@ -53,12 +68,26 @@ class EntranceService:
         self.membership_repository = membership_repository or MembershipRepository()
 
     def _build_event_counts(self, event_id: str) -> dict:
-        # I conteggi vengono ricalcolati dopo ogni mutazione per dare feedback live allo scanner.
+        # Contatori mantenuti dai repository: due letture puntuali, indipendenti dal numero di ingressi.
         return {
             "participants_count": self.participant_repository.count(event_id),
             "entered_count": self.entrance_scan_repository.count(event_id),
         }
 
+    @staticmethod
+    def _isoformat(value) -> Optional[str]:
+        return value.isoformat() if value and hasattr(value, "isoformat") else None
+
+    @staticmethod
+    def _normalize_client_timestamp(value: Optional[datetime]) -> datetime:
+        # L'orario del device e' affidabile solo entro certi limiti: niente futuro, fuso UTC di default.
+        now = datetime.now(timezone.utc)
+        if value is None:
+            return now
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return min(value, now)
+
     def _get_scan_token_doc(self, scan_token: str) -> ScanToken:
         # Il token non autorizza l'ingresso da solo: serve solo a legare lo scanner a un evento.
         token = self.scan_token_repository.get(scan_token)
@@ -151,11 +180,11 @@ class EntranceService:
             )
 
         member_info = MemberInfoDTO(name=participant_model.name, surname=participant_model.surname)
-        counts = self._build_event_counts(event_id)
 
         # Step 4: fast-path per doppia scansione gia' persistita.
         existing_scan = self.entrance_scan_repository.get(event_id, dto.membership_id)
         if existing_scan is not None:
+            counts = self._build_event_counts(event_id)
             scanned_at = existing_scan.scanned_at
             scanned_at_iso = scanned_at.isoformat() if scanned_at and hasattr(scanned_at, "isoformat") else None
             self.logger.info("validate_entry: già scansionato — %s evento %s", dto.membership_id, event_id)
@@ -170,6 +199,7 @@ class EntranceService:
         # Step 5: scrittura atomica; se due scanner leggono insieme, uno solo crea il record.
         race_scan = self.entrance_scan_repository.create_scan(event_id, dto.membership_id, dto.scan_token)
         if race_scan is not None:
+            counts = self._build_event_counts(event_id)
             scanned_at = race_scan.scanned_at
             scanned_at_iso = scanned_at.isoformat() if scanned_at and hasattr(scanned_at, "isoformat") else None
             self.logger.info("validate_entry: race condition risolta — %s", dto.membership_id)
@@ -196,6 +226,262 @@ class EntranceService:
             entered_count=counts["entered_count"],
         )
 
+    def get_scanner_manifest(self, dto: ScannerManifestQueryDTO) -> ScannerManifestResponseDTO:
+        # Manifest per la modalita' offline: lo scanner valida in locale e sincronizza dopo.
+        try:
+            token_data = self._get_scan_token_doc(dto.token)
+        except ValidationError as err:
+            return ScannerManifestResponseDTO(valid=False, reason=str(err))
+
+        event_id = token_data.event_id
+        # Versione da due letture puntuali (contatore ingressi + contatore partecipanti), prima di
+        # listare: il cursore ``version`` di entrance_scans/{eventId} cambia a ogni ingresso, a ogni
+        # partecipante creato, cancellato, rinominato o ricollegato a una tessera e quando una tessera
+        # collegata cambia validita' (trigger analytics, ``apply_*_change``). Un client aggiornato
+        # riceve solo i contatori senza rileggere partecipanti, tessere e scan.
+        entry_state = self.entrance_scan_repository.get_entry_state(event_id)
+        participants_count = self.participant_repository.count(event_id)
+        version = f"{entry_state['version']}-{participants_count}"
+
+        if dto.version and dto.version == version:
+            return ScannerManifestResponseDTO(
+                valid=True,
+                event_id=event_id,
+                version=version,
+                unchanged=True,
+                participants_count=participants_count,
+                entered_count=entry_state["entered_count"],
+            )
+
+        participants_by_membership = {}
+        for participant in self.participant_repository.list(event_id):
+            if participant.membership_id:
+                participants_by_membership.setdefault(participant.membership_id, participant)
+
+        memberships = {
+            membership.id: membership
+            for membership in self.membership_repository.get_many(list(participants_by_membership))
+        }
+        members: List[ManifestMemberDTO] = []
+        for membership_id in sorted(participants_by_membership):
+            membership = memberships.get(membership_id)
+            if membership is None:
+                continue
+            participant = participants_by_membership[membership_id]
+            members.append(
+                ManifestMemberDTO(
+                    membership_id=membership_id,
+                    name=participant.name,
+                    surname=participant.surname,
+                    valid=bool(membership.subscription_valid),
+                )
+            )
+
+        scanned = sorted(scan.id for scan in self.entrance_scan_repository.list(event_id) if scan.id)
+
+        event_model = self.event_repository.get_model(event_id)
+        self.logger.info(
+            "Manifest scanner: token=%s evento=%s members=%d scanned=%d",
+            safe_id(dto.token), event_id, len(members), len(scanned),
+        )
+        return ScannerManifestResponseDTO(
+            valid=True,
+            event_id=event_id,
+            event_title=event_model.title if event_model else "",
+            version=version,
+            generated_at=datetime.now(timezone.utc).isoformat(),
+            members=members,
+            scanned=scanned,
+            participants_count=participants_count,
+            entered_count=entry_state["entered_count"],
+        )
+
+    def apply_membership_change(self, membership_id: str, before: Dict, after: Dict) -> int:
+        """
+        Una tessera che cambia ``subscription_valid`` cambia il flag ``valid`` nei manifest
+        degli eventi in cui ha un partecipante: ne incrementa il cursore ``version``.
+        """
+        if not before or not after:
+            return 0
+        if bool(before.get("subscription_valid")) == bool(after.get("subscription_valid")):
+            return 0
+        event_ids = self.participant_repository.list_event_ids_by_membership(membership_id)
+        self.entrance_scan_repository.bump_versions(event_ids)
+        self.logger.info(
+            "apply_membership_change: membership=%s manifest invalidati=%d", safe_id(membership_id), len(event_ids)
+        )
+        return len(event_ids)
+
+    def apply_participant_change(self, event_id: str, before: Dict, after: Dict) -> bool:
+        # Creazione, cancellazione e set_membership incrementano gia' il cursore in transaction:
+        # qui restano le modifiche ai campi del manifest fatte da update generici.
+        if not before or not after:
+            return False
+        if all(before.get(field) == after.get(field) for field in MANIFEST_PARTICIPANT_FIELDS):
+            return False
+        self.entrance_scan_repository.bump_versions([event_id])
+        return True
+
+    def get_live_stats(self, dto: LiveStatsQueryDTO) -> LiveStatsResponseDTO:
+        # Feed live per gli scanner: stessa risposta del feed admin, autorizzata dal token.
+        try:
+            token_data = self._get_scan_token_doc(dto.token)
+        except ValidationError as err:
+            return LiveStatsResponseDTO(valid=False, reason=str(err))
+        return self._live_stats(token_data.event_id, dto.cursor, dto.wait)
+
+    def get_admin_live_stats(self, dto: AdminLiveStatsQueryDTO) -> LiveStatsResponseDTO:
+        if not self.event_repository.get_model(dto.event_id):
+            raise NotFoundError("Evento non trovato")
+        return self._live_stats(dto.event_id, dto.cursor, dto.wait)
+
+    def _live_stats(self, event_id: str, cursor: Optional[int], wait: int) -> LiveStatsResponseDTO:
+        # Long-poll: con un cursore la richiesta resta in ascolto sul contatore ingressi
+        # e risponde al primo scan successivo; alla scadenza torna changed=False.
+        if cursor is not None and wait > 0:
+            state = self.entrance_scan_repository.wait_live_state(event_id, cursor, wait)
+            if state is None:
+                return LiveStatsResponseDTO(valid=True, event_id=event_id, cursor=cursor)
+        else:
+            state = self.entrance_scan_repository.get_live_state(event_id)
+
+        if state["version"] == cursor:
+            return LiveStatsResponseDTO(valid=True, event_id=event_id, cursor=cursor)
+        return LiveStatsResponseDTO(
+            valid=True,
+            event_id=event_id,
+            cursor=state["version"],
+            changed=True,
+            participants_count=self.participant_repository.count(event_id),
+            entered_count=state["entered_count"],
+            flow=self._live_flow_buckets(state["flow_minutes"]),
+        )
+
+    @staticmethod
+    def _live_flow_buckets(flow_minutes: Dict[datetime, int]) -> List[LiveFlowBucketDTO]:
+        buckets: Dict[datetime, int] = {}
+        for minute, count in flow_minutes.items():
+            start = minute.replace(minute=minute.minute - minute.minute % LIVE_FLOW_BUCKET_MINUTES)
+            buckets[start] = buckets.get(start, 0) + count
+        return [
+            LiveFlowBucketDTO(bucket_start=start.isoformat(), count=buckets[start])
+            for start in sorted(buckets)
+        ]
+
+    def validate_entries(self, dto: ValidateEntryBatchRequestDTO) -> EntryBatchResponseDTO:
+        # Variante di gruppo di validate_entry: token verificato una volta, letture e scritture in blocco.
+        try:
+            token_data = self._get_scan_token_doc(dto.scan_token)
+        except ValidationError:
+            self.logger.warning("validate_entries: scan token non valido token=%s", safe_id(dto.scan_token))
+            return EntryBatchResponseDTO(result="invalid_token")
+
+        event_id = token_data.event_id
+        entries: Dict[str, Optional[datetime]] = {membership_id: None for membership_id in dto.membership_ids}
+        results = self._register_entries(event_id, dto.scan_token, entries)
+        counts = self._build_event_counts(event_id)
+        self.logger.info(
+            "validate_entries: evento=%s token=%s tessere=%d validi=%d",
+            event_id, safe_id(dto.scan_token), len(results), sum(1 for row in results if row.result == "valid"),
+        )
+        return EntryBatchResponseDTO(
+            result="ok",
+            results=results,
+            participants_count=counts["participants_count"],
+            entered_count=counts["entered_count"],
+        )
+
+    def sync_offline_scans(self, dto: SyncOfflineScansRequestDTO) -> EntryBatchResponseDTO:
+        try:
+            token_data = self._get_scan_token_doc(dto.scan_token)
+        except ValidationError:
+            self.logger.warning("sync_offline_scans: scan token non valido token=%s", safe_id(dto.scan_token))
+            return EntryBatchResponseDTO(result="invalid_token")
+
+        event_id = token_data.event_id
+
+        # Stessa tessera caricata piu' volte (o da piu' device): vale l'orario piu' vecchio.
+        client_times: Dict[str, Optional[datetime]] = {}
+        for scan in dto.scans:
+            scanned_at = self._normalize_client_timestamp(scan.scanned_at)
+            previous = client_times.get(scan.membership_id)
+            client_times[scan.membership_id] = min(previous, scanned_at) if previous else scanned_at
+
+        results = self._register_entries(event_id, dto.scan_token, client_times)
+        counts = self._build_event_counts(event_id)
+        self.logger.info(
+            "sync_offline_scans: evento=%s token=%s caricati=%d validi=%d",
+            event_id, safe_id(dto.scan_token), len(results), sum(1 for row in results if row.result == "valid"),
+        )
+        return EntryBatchResponseDTO(
+            result="ok",
+            results=results,
+            participants_count=counts["participants_count"],
+            entered_count=counts["entered_count"],
+        )
+
+    def _register_entries(
+        self,
+        event_id: str,
+        scan_token: str,
+        entries: Dict[str, Optional[datetime]],
+    ) -> List[EntryResultDTO]:
+        """Stessi step di validate_entry per N tessere: una get_all, query ``in`` e una transaction di scrittura."""
+        membership_ids = list(entries)
+        memberships = {membership.id: membership for membership in self.membership_repository.get_many(membership_ids)}
+        participants = {
+            participant.membership_id: participant
+            for participant in self.participant_repository.list_by_membership_ids(event_id, membership_ids)
+        }
+
+        results: Dict[str, EntryResultDTO] = {}
+        admissible = {}
+        for membership_id in membership_ids:
+            membership = memberships.get(membership_id)
+            if membership is None:
+                results[membership_id] = EntryResultDTO(membership_id=membership_id, result="invalid_member_not_found")
+                continue
+            member_info = MemberInfoDTO(name=membership.name, surname=membership.surname)
+            if not membership.subscription_valid:
+                results[membership_id] = EntryResultDTO(
+                    membership_id=membership_id, result="invalid_membership", membership=member_info
+                )
+                continue
+            if membership_id not in participants:
+                results[membership_id] = EntryResultDTO(
+                    membership_id=membership_id, result="invalid_no_purchase", membership=member_info
+                )
+                continue
+            admissible[membership_id] = participants[membership_id]
+
+        # Conflitti risolti dalla transaction: gli scan gia' persistiti vincono e tornano already_scanned.
+        existing_scans = self.entrance_scan_repository.create_scans(
+            event_id, scan_token, {membership_id: entries[membership_id] for membership_id in admissible}
+        )
+        entered_ids = []
+        for membership_id, participant in admissible.items():
+            member_info = MemberInfoDTO(name=participant.name, surname=participant.surname)
+            existing_scan = existing_scans.get(membership_id)
+            if existing_scan is not None:
+                results[membership_id] = EntryResultDTO(
+                    membership_id=membership_id,
+                    result="already_scanned",
+                    membership=member_info,
+                    scanned_at=self._isoformat(existing_scan.scanned_at),
+                )
+                continue
+            entered_ids.append(participant.id)
+            results[membership_id] = EntryResultDTO(
+                membership_id=membership_id,
+                result="valid",
+                membership=member_info,
+                scanned_at=self._isoformat(entries[membership_id]),
+            )
+
+        if entered_ids:
+            self.participant_repository.update_entered_many(event_id, entered_ids, entered=True)
+        return [results[membership_id] for membership_id in membership_ids]
+
     def manual_entry(
         self, dto: ManualEntryRequestDTO, admin_uid: str
     ) -> ManualEntryResponseDTO:
@@ -205,12 +491,11 @@ class EntranceService:
         if participant_model is None:
             raise NotFoundError("Partecipante non trovato per questa tessera in questo evento")
 
-        counts = self._build_event_counts(dto.event_id)
-
         if dto.entered:
             # Entrata manuale: stessa sorgente dati dello scanner, ma marcata con operatore admin.
             if self.entrance_scan_repository.exists(dto.event_id, dto.membership_id):
                 self.logger.info("manual_entry: già entrato — %s evento %s", dto.membership_id, dto.event_id)
+                counts = self._build_event_counts(dto.event_id)
                 return ManualEntryResponseDTO(
                     result="already_entered",
                     participants_count=counts["participants_count"],
@@ -1,15 +1,17 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from io import BytesIO
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from config.firebase_config import bucket
-from utils.pdf_template import generate_membership_pdf, generate_ticket_pdf
+from utils.pdf_template import generate_membership_pdf, generate_ticket_pdf, generate_ticket_pdfs
 
 
 DEFAULT_MEMBERSHIP_LOGO_PATH = "logos/logo_white.png"
 DEFAULT_MEMBERSHIP_PATTERN_PATH = "patterns/FINAL MCP PATTERN - ORANGE.png"
 DEFAULT_TICKET_LOGO_PATH = "logos/logo_white.png"
+UPLOAD_MAX_WORKERS = 8
 
 
 @dataclass
@@ -78,3 +80,21 @@ class DocumentsService:
         if not pdf_buffer:
             raise RuntimeError("PDF generation failed")
         return self._store_pdf(storage_path, pdf_buffer)
+
+    def create_ticket_documents(
+        self,
+        tickets: List[Tuple[Any, str]],
+        event_data: Dict[str, Any],
+        logo_path: Optional[str] = None,
+    ) -> List[StoredDocument]:
+        """Batch di ``(ticket_data, storage_path)`` dello stesso evento: un solo rendering, upload concorrenti."""
+        if not tickets:
+            return []
+        payloads = [self._normalize_payload(ticket_data) for ticket_data, _ in tickets]
+        buffers = generate_ticket_pdfs(payloads, event_data, logo_path or DEFAULT_TICKET_LOGO_PATH)
+        if len(buffers) != len(tickets) or not all(buffers):
+            raise RuntimeError("PDF generation failed")
+        storage_paths = [storage_path for _, storage_path in tickets]
+        workers = min(UPLOAD_MAX_WORKERS, len(tickets))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self._store_pdf, storage_paths, buffers))
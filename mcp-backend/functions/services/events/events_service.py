@@ -67,10 +67,22 @@ class EventsService:
     def get_all_events(self) -> List[AdminEventResponseDTO]:
         events_list: List[AdminEventResponseDTO] = []
         for event in self.event_repository.stream_models():
-            event.participants_count = self.participant_repository.count(event.id)
+            # Il contatore arriva con il documento evento: si legge a parte solo
+            # finche' non e' stato inizializzato (eventi creati prima del contatore).
+            if not event.participants_count_seeded_at:
+                event.participants_count = self.participant_repository.count(event.id)
             events_list.append(event_to_admin_response(event))
         return events_list
 
+    def reconcile_participant_counts(self) -> int:
+        """Ricalcola il contatore partecipanti di ogni evento con una aggregation count()."""
+        reconciled = 0
+        for event in self.event_repository.stream_models():
+            if event.id:
+                self.participant_repository.reconcile_count(event.id)
+                reconciled += 1
+        return reconciled
+
     def get_event_by_id(
         self,
         event_id: Optional[str] = None,
@@ -84,7 +96,8 @@ class EventsService:
         if not event:
             raise NotFoundError("Event not found")
 
-        if event.id:
+        # Come in get_all_events: il contatore e' gia' nel documento letto, salvo eventi non inizializzati.
+        if event.id and not event.participants_count_seeded_at:
             event.participants_count = self.participant_repository.count(event.id)
         return AdminEventEnvelopeResponseDTO(event=event_to_admin_response(event))
 
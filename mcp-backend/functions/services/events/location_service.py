@@ -1,17 +1,23 @@
 import logging
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import replace
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from google.cloud import firestore
 
 from config.location_config import (
     LOCATION_BASE_DELAY,
+    LOCATION_CHUNK_SIZE,
     LOCATION_MAX_DELAY,
     LOCATION_MAX_RETRIES,
-    LOCATION_MIN_INTERVAL,
+    LOCATION_PROGRESS_EVERY,
+    LOCATION_PROGRESS_INTERVAL,
+    LOCATION_SEND_BURST,
+    LOCATION_SEND_RATE_PER_SECOND,
+    LOCATION_SEND_WORKERS,
 )
 from dto.location_api import (
     AdminEventLocationResponseDTO,
@@ -40,13 +46,15 @@ from repositories import EventRepository, ParticipantRepository
 from repositories.event_location_repository import EventLocationRepository
 from repositories.job_repository import LOCATION_JOBS_COLLECTION, LocationJobRepository
 from services.communications.mail_service import EmailMessage, MailService, mail_service
+from utils.rate_limit import TokenBucket
 from utils.templates_mail import build_location_email_payload
 from utils.safe_logging import mask_email, redact_sensitive
 
 
 logger = logging.getLogger("LocationService")
 LOCATION_JOB_TYPE = "send_location"
-LOCATION_JOB_STALE_AFTER = timedelta(hours=1)
+# Un job running senza progressi oltre il timeout della function e' un'invocazione morta.
+LOCATION_JOB_STALE_AFTER = timedelta(minutes=15)
 
 
 def _sleep_with_jitter(seconds: float) -> None:
@@ -60,9 +68,13 @@ def _send_with_retry(
     text: str,
     html: str,
     mail_service_instance: MailService,
+    rate_limiter: Optional[TokenBucket] = None,
 ) -> bool:
     delay = LOCATION_BASE_DELAY
     for attempt in range(1, LOCATION_MAX_RETRIES + 1):
+        if rate_limiter is not None:
+            # Anche i retry consumano quota MailerSend.
+            rate_limiter.acquire()
         try:
             ok = mail_service_instance.send(
                 EmailMessage(
@@ -161,10 +173,14 @@ class LocationService:
         return replace(job, **model_changes)
 
     def _is_stale_job(self, payload: Dict[str, Any], now: datetime) -> bool:
-        marker = self._to_datetime(payload.get("updated_at")) or self._to_datetime(payload.get("created_at"))
-        if marker is None:
+        markers = [
+            self._to_datetime(payload.get(field))
+            for field in ("updated_at", "last_kicked_at", "created_at")
+        ]
+        markers = [marker for marker in markers if marker is not None]
+        if not markers:
             return True
-        return now - marker > LOCATION_JOB_STALE_AFTER
+        return now - max(markers) > LOCATION_JOB_STALE_AFTER
 
     @staticmethod
     def _to_datetime(value: Any) -> Optional[datetime]:
@@ -333,16 +349,15 @@ class LocationService:
                 )
 
             if self._is_stale_job(payload, now):
-                self.job_repository.update(
-                    doc_id,
-                    {
-                        "status": "failed",
-                        "error": "Stale location job superseded by a new request",
-                        "finished_at": now,
-                        "updated_at": now,
-                    },
+                # Invocazione morta a meta' blocco: si riprende dal cursore salvato.
+                self._requeue_stale_job(doc_id, now)
+                return LocationJobResponseDTO(
+                    message="Job resumed",
+                    job_id=doc_id,
+                    job_collection=LOCATION_JOBS_COLLECTION,
+                    total=int(payload.get("total") or remaining),
+                    status="queued",
                 )
-                continue
 
             return LocationJobResponseDTO(
                 message="Job already running",
@@ -381,7 +396,47 @@ class LocationService:
             status="queued",
         )
 
+    def _requeue_stale_job(self, job_id: str, now: datetime) -> None:
+        # Ogni scrittura con status queued riattiva il trigger del worker.
+        self.job_repository.update(
+            job_id,
+            {
+                "status": "queued",
+                "error": None,
+                "updated_at": now,
+                "last_kicked_at": now,
+                "resumed_at": now,
+            },
+        )
+
+    def resume_stale_jobs(self) -> int:
+        """
+        Riattiva i job fermi da oltre ``LOCATION_JOB_STALE_AFTER``: i ``running`` la cui
+        invocazione e' morta a meta' blocco e i ``queued`` il cui trigger non e' mai partito
+        (o e' fallito prima di passare a running). Entrambi riprendono dal cursore salvato.
+        """
+        now = datetime.now(timezone.utc)
+        resumed = 0
+        for doc_id, payload in self.job_repository.stream_raw_by_type(LOCATION_JOB_TYPE):
+            status = str(payload.get("status") or "").lower()
+            if status not in {"queued", "running"}:
+                continue
+            if not self._is_stale_job(payload, now):
+                continue
+            logger.warning(
+                "[LocationService] Job %s %s fermo dal %s, ripresa dal cursore",
+                doc_id, status, payload.get("updated_at"),
+            )
+            self._requeue_stale_job(doc_id, now)
+            resumed += 1
+        return resumed
+
     def _worker_send_location(self, job_id: str):
+        """
+        Processa un blocco di ``LOCATION_CHUNK_SIZE`` partecipanti a partire dal cursore
+        del job. Se restano partecipanti il job torna ``queued`` e il trigger su
+        ``location_jobs`` avvia il blocco successivo in una nuova invocazione.
+        """
         job: Optional[LocationJob] = None
         try:
             logger.info("[LocationService] Avvio worker per job %s", job_id)
@@ -404,67 +459,59 @@ class LocationService:
                 return
 
             event_model = self._load_event_model(job.event_id)
-            logger.info("[LocationService] Job per evento %s: %s", job.event_id, event_model.title)
+            logger.info(
+                "[LocationService] Job per evento %s: %s (blocco %s, cursore %s)",
+                job.event_id,
+                event_model.title,
+                job.chunks + 1,
+                job.cursor,
+            )
 
             stored_location = self._load_location(job.event_id)
             job_label = stored_location.label or ""
 
-            participants = self._pending_participants(job.event_id)
-            total = len(participants)
-            if job.total != total:
-                job = self._update_job(job_id, job, total=total)
-
-            sent = 0
-            failed = 0
-            last_send_ts = 0.0
-
-            for idx, participant in enumerate(participants, start=1):
-                email = participant.email
-                name = participant.name or "Partecipante"
-                logger.info("[LocationService] (%s/%s) Invio a %s", idx, total, mask_email(email))
-
-                if not email:
-                    failed += 1
-                else:
-                    subject, text, html = build_location_email_payload(
-                        name,
-                        event_model,
-                        job_label,
-                        job.address,
-                        job.link,
-                        job.message,
-                    )
-
-                    now = time.monotonic()
-                    elapsed = now - last_send_ts
-                    if elapsed < LOCATION_MIN_INTERVAL:
-                        time.sleep(LOCATION_MIN_INTERVAL - elapsed)
-
-                    ok = _send_with_retry(email, subject, text, html, self.mail_service)
-                    last_send_ts = time.monotonic()
+            if job.cursor is None and job.chunks == 0:
+                total = len(self._pending_participants(job.event_id))
+                if job.total != total:
+                    job = self._update_job(job_id, job, total=total)
 
-                    if ok:
-                        self._mark_location_sent(job.event_id, participant, job_id=job_id)
-                        sent += 1
-                    else:
-                        failed += 1
+            page = self.participant_repository.list_page(
+                job.event_id,
+                after_id=job.cursor,
+                limit=LOCATION_CHUNK_SIZE,
+            )
+            # Chi ha gia' il flag (anche da un blocco interrotto) viene saltato: la ripresa non re-invia.
+            participants = [participant for participant in page if participant.location_sent is not True]
+
+            job, sent, failed = self._dispatch_location_emails(
+                job_id,
+                job,
+                event_model,
+                job_label,
+                participants,
+            )
 
-                percent = int(((sent + failed) / max(total, 1)) * 100)
-                job = self._update_job(
+            cursor = page[-1].id if page else job.cursor
+            if len(page) < LOCATION_CHUNK_SIZE:
+                self._update_job(
                     job_id,
                     job,
-                    sent=sent,
-                    failed=failed,
-                    percent=percent,
+                    status="completed",
+                    cursor=cursor,
+                    chunks=job.chunks + 1,
+                    percent=100,
+                    finished_at=datetime.now(timezone.utc),
                 )
+                logger.info(
+                    "[LocationService] Job %s completato. Inviati=%s, errori=%s",
+                    job_id,
+                    sent,
+                    failed,
+                )
+                return
 
-            self._update_job(job_id, job, status="completed")
-            logger.info(
-                "[LocationService] Job %s completato. Inviati=%s, errori=%s",
-                job_id,
-                sent,
-                failed,
-            )
+            self._update_job(job_id, job, status="queued", cursor=cursor, chunks=job.chunks + 1)
+            logger.info("[LocationService] Job %s: blocco completato, cursore %s, rimesso in coda", job_id, cursor)
 
         except Exception as exc:
             logger.error("[LocationService] Errore in worker per job %s: %s", job_id, redact_sensitive(str(exc)))
@@ -472,6 +519,78 @@ class LocationService:
             if failed_job:
                 self._update_job(job_id, failed_job, status="failed", error=str(exc))
 
+    def _dispatch_location_emails(
+        self,
+        job_id: str,
+        job: LocationJob,
+        event_model: Event,
+        label: str,
+        participants: List[EventParticipant],
+    ) -> Tuple[LocationJob, int, int]:
+        """
+        Invia le email con un pool di worker limitato da un token bucket.
+        Flag ``location_sent`` e progresso del job sono scritti a blocchi,
+        ogni ``LOCATION_PROGRESS_EVERY`` esiti o ``LOCATION_PROGRESS_INTERVAL`` secondi.
+        I contatori ripartono da quelli del job, quindi restano cumulativi tra i blocchi.
+        """
+        total = max(job.total, job.sent + job.failed + len(participants))
+        limiter = TokenBucket(LOCATION_SEND_RATE_PER_SECOND, LOCATION_SEND_BURST)
+        missing_email = sum(1 for participant in participants if not participant.email)
+        sent = job.sent
+        failed = job.failed + missing_email
+        pending_sent_ids: List[str] = []
+        unflushed = missing_email
+        last_flush = time.monotonic()
+
+        def _send(participant: EventParticipant) -> bool:
+            subject, text, html = build_location_email_payload(
+                participant.name or "Partecipante",
+                event_model,
+                label,
+                job.address,
+                job.link,
+                job.message,
+            )
+            return _send_with_retry(participant.email, subject, text, html, self.mail_service, rate_limiter=limiter)
+
+        def _flush() -> None:
+            nonlocal job, unflushed, last_flush
+            if pending_sent_ids:
+                self.participant_repository.mark_location_sent_many(job.event_id, list(pending_sent_ids), job_id=job_id)
+                pending_sent_ids.clear()
+            percent = int(((sent + failed) / max(total, 1)) * 100)
+            job = self._update_job(job_id, job, sent=sent, failed=failed, percent=percent)
+            unflushed = 0
+            last_flush = time.monotonic()
+
+        try:
+            with ThreadPoolExecutor(max_workers=LOCATION_SEND_WORKERS) as pool:
+                futures = {
+                    pool.submit(_send, participant): participant
+                    for participant in participants
+                    if participant.email
+                }
+                for future in as_completed(futures):
+                    participant = futures[future]
+                    try:
+                        ok = future.result()
+                    except Exception as exc:
+                        logger.warning("[LocationService] Invio fallito per %s: %s", mask_email(participant.email), redact_sensitive(str(exc)))
+                        ok = False
+                    if ok:
+                        sent += 1
+                        if participant.id:
+                            pending_sent_ids.append(participant.id)
+                    else:
+                        failed += 1
+                    unflushed += 1
+                    if unflushed >= LOCATION_PROGRESS_EVERY or time.monotonic() - last_flush >= LOCATION_PROGRESS_INTERVAL:
+                        _flush()
+        finally:
+            # Anche in caso di errore i destinatari gia' serviti non devono ricevere un secondo invio.
+            _flush()
+        return job, sent, failed
+
     def send_location_to_all(
         self,
         dto: SendLocationToAllRequestDTO,
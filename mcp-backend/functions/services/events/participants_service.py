@@ -19,6 +19,7 @@ from domain.membership_rules import (
     membership_years_from_renewals,
 )
 from domain.participant_rules import run_basic_checks
+from dto.pagination import PageQueryDTO, PageResponseDTO
 from interfaces.repositories import (
     EventRepositoryProtocol,
     MembershipRepositoryProtocol,
@@ -34,6 +35,7 @@ from models import Event, EventParticipant, EventPurchaseAccessType, Membership,
 from repositories.event_location_repository import EventLocationRepository
 from repositories.event_repository import EventRepository
 from repositories.membership_repository import MembershipRepository
+from repositories.base import build_page_request
 from repositories.participant_repository import ParticipantRepository
 from errors.service_errors import ConflictError, ExternalServiceError, NotFoundError, ValidationError, ForbiddenError
 from services.events.ticket_service import TicketService
@@ -47,6 +49,8 @@ from utils.events_utils import (
     normalize_phone,
 )
 
+PARTICIPANT_SORT_FIELDS = {"surname": "surname", "name": "name", "created_at": "createdAt"}
+
 
 class ParticipantsService:
     def __init__(
@@ -124,6 +128,11 @@ class ParticipantsService:
         participants = self.participant_repository.list(event_id)
         return [participant_to_response(participant) for participant in participants]
 
+    def get_page(self, event_id: str, query: PageQueryDTO) -> PageResponseDTO:
+        request = build_page_request(query, PARTICIPANT_SORT_FIELDS, EventParticipant)
+        page = self.participant_repository.query_page(event_id, request)
+        return PageResponseDTO.from_page(page, participant_to_response, query.fields)
+
     def get_by_id(self, event_id: str, participant_id: str) -> ParticipantResponseDTO:
         participant = self.participant_repository.get(event_id, participant_id)
         if not participant:
@@ -360,6 +369,7 @@ class ParticipantsService:
         failed_count = 0
         skipped_count = 0
 
+        to_send = []
         for p in omaggi:
             if skip_already_sent and bool(getattr(p, "omaggio_email_sent", False)):
                 skipped_count += 1
@@ -367,7 +377,11 @@ class ParticipantsService:
             if not p.email:
                 failed_count += 1
                 continue
-            sent = self._send_omaggio_email(event_model, p, entry_time)
+            to_send.append(p)
+
+        ticket_docs = self._render_omaggio_tickets(event_model, to_send)
+        for p in to_send:
+            sent = self._send_omaggio_email(event_model, p, entry_time, ticket_doc=ticket_docs.get(p.id))
             if sent:
                 sent_count += 1
                 p.omaggio_email_sent = True
@@ -424,7 +438,25 @@ class ParticipantsService:
 
         return CheckParticipantsResponseDTO(valid=True)
 
-    def _send_omaggio_email(self, event_model: Event, participant: EventParticipant, entry_time: Optional[str]) -> bool:
+    def _render_omaggio_tickets(self, event_model: Event, participants: List[EventParticipant]) -> dict[str, Any]:
+        """Pre-genera i PDF degli omaggi in un solo batch; in caso di errore si torna al rendering singolo."""
+        if len(participants) < 2:
+            return {}
+        try:
+            event_payload = self.ticket_service._event_payload(event_model)
+            documents = self.ticket_service.create_ticket_documents(participants, event_payload)
+        except Exception as exc:
+            self.logger.warning("Batch PDF generation failed for omaggi of %s: %s", event_model.id, exc)
+            return {}
+        return {participant.id: document for participant, document in zip(participants, documents)}
+
+    def _send_omaggio_email(
+        self,
+        event_model: Event,
+        participant: EventParticipant,
+        entry_time: Optional[str],
+        ticket_doc: Any = None,
+    ) -> bool:
         if not participant.email:
             return False
 
@@ -439,8 +471,9 @@ class ParticipantsService:
 
         pdf_attachment = None
         try:
-            event_payload = self.ticket_service._event_payload(event_model)
-            ticket_doc = self.ticket_service.create_ticket_document(participant, event_payload)
+            if ticket_doc is None:
+                event_payload = self.ticket_service._event_payload(event_model)
+                ticket_doc = self.ticket_service.create_ticket_document(participant, event_payload)
             if ticket_doc.buffer:
                 filename = self.ticket_service._build_attachment_filename(event_model.title)
                 pdf_attachment = EmailAttachment(
@@ -2,7 +2,7 @@ import logging
 import re
 from dataclasses import dataclass
 from io import BytesIO
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from google.cloud import firestore
 
@@ -131,6 +131,29 @@ class TicketService:
             buffer=document.buffer,
         )
 
+    def create_ticket_documents(self, participants: List[Any], event_data: Any) -> List[TicketDocument]:
+        """Genera e carica i biglietti di piu' partecipanti dello stesso evento in un solo batch."""
+        event_payload = self._normalize_event_payload(event_data)
+        tickets = []
+        for participant_data in participants:
+            participant_payload = self._participant_payload(self._normalize_participant(participant_data))
+            storage_path = self._build_storage_path(
+                event_payload.get("title"),
+                participant_payload.get("name"),
+                participant_payload.get("surname"),
+            )
+            tickets.append((participant_payload, storage_path))
+
+        documents = self.documents_service.create_ticket_documents(tickets, event_payload)
+        return [
+            TicketDocument(
+                storage_path=document.storage_path,
+                public_url=document.public_url,
+                buffer=document.buffer,
+            )
+            for document in documents
+        ]
+
     def process_new_ticket(self, participant_id: str, participant_data: Any, send: bool = True) -> Dict[str, Any]:
         try:
             participant = self._normalize_participant(participant_data)
@@ -93,12 +93,15 @@ class MemberService:
         if not event_ids:
             return []
 
+        try:
+            attended = self.event_repository.get_many(event_ids)
+        except Exception as exc:
+            self.logger.warning("get_attended_events: failed to fetch events: %s", redact_sensitive(str(exc)))
+            return []
+
         events: List[MemberEventItemDTO] = []
-        for event_id in event_ids:
+        for event in attended:
             try:
-                event = self.event_repository.get_model(event_id)
-                if not event:
-                    continue
                 events.append(MemberEventItemDTO(
                     id=event.id,
                     slug=event.slug or "",
@@ -109,8 +112,8 @@ class MemberService:
                 ))
             except Exception as exc:
                 self.logger.warning(
-                    "get_attended_events: failed to fetch event %s: %s",
-                    event_id,
+                    "get_attended_events: failed to map event %s: %s",
+                    event.id,
                     redact_sensitive(str(exc)),
                 )
 
@@ -123,21 +126,31 @@ class MemberService:
         if not purchase_ids:
             return []
 
-        results: List[MemberPurchaseItemDTO] = []
-        for purchase_id in purchase_ids:
+        try:
+            purchases = self.purchase_repository.get_many(purchase_ids)
+        except Exception as exc:
+            self.logger.warning("get_purchases: failed to fetch purchases: %s", redact_sensitive(str(exc)))
+            return []
+
+        # Titoli degli eventi collegati: una sola lettura batch per tutti gli acquisti.
+        event_refs = [
+            purchase.ref_id
+            for purchase in purchases
+            if purchase.purchase_type and str(purchase.purchase_type.value) == "event" and purchase.ref_id
+        ]
+        event_titles = {}
+        if event_refs:
             try:
-                purchase = self.purchase_repository.get_model(purchase_id)
-                if not purchase:
-                    continue
+                event_titles = {event.id: event.title or None for event in self.event_repository.get_many(event_refs)}
+            except Exception:
+                pass
 
+        results: List[MemberPurchaseItemDTO] = []
+        for purchase in purchases:
+            try:
                 event_title = None
                 if purchase.purchase_type and str(purchase.purchase_type.value) == "event" and purchase.ref_id:
-                    try:
-                        event = self.event_repository.get_model(purchase.ref_id)
-                        if event:
-                            event_title = event.title or None
-                    except Exception:
-                        pass
+                    event_title = event_titles.get(purchase.ref_id)
 
                 results.append(MemberPurchaseItemDTO(
                     id=purchase.id,
@@ -151,8 +164,8 @@ class MemberService:
                 ))
             except Exception as exc:
                 self.logger.warning(
-                    "get_purchases: failed to fetch purchase %s: %s",
-                    purchase_id,
+                    "get_purchases: failed to map purchase %s: %s",
+                    purchase.id,
                     redact_sensitive(str(exc)),
                 )
 
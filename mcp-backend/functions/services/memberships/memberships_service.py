@@ -14,6 +14,7 @@ from dto.membership_api import (
     UpdateMembershipRequestDTO,
     WalletModelResponseDTO,
 )
+from dto.pagination import PageQueryDTO, PageResponseDTO
 from mappers.purchase_mappers import purchase_to_response
 from mappers.membership_mappers import (
     apply_membership_update_dto_to_model,
@@ -43,6 +44,7 @@ from repositories.membership_repository import MembershipRepository
 from repositories.membership_settings_repository import MembershipSettingsRepository
 from repositories.participant_repository import ParticipantRepository
 from repositories.purchase_repository import PurchaseRepository
+from repositories.base import build_page_request
 from services.memberships.pass2u_service import Pass2UService
 from services.memberships.renewal_command import RenewMembershipCommand
 from services.events.documents_service import DocumentsService
@@ -59,6 +61,8 @@ from utils.events_utils import (
 )
 from utils.safe_logging import redact_sensitive
 
+MEMBERSHIP_SORT_FIELDS = {"surname": "surname", "start_date": "start_date"}
+
 
 class MembershipsService:
     def __init__(
@@ -234,6 +238,11 @@ class MembershipsService:
             memberships = self.membership_repository.list()
         return [membership_to_response(membership) for membership in memberships]
 
+    def get_page(self, query: PageQueryDTO, year: int = None) -> PageResponseDTO:
+        request = build_page_request(query, MEMBERSHIP_SORT_FIELDS, Membership)
+        page = self.membership_repository.query_page(request, year=int(year) if year else None)
+        return PageResponseDTO.from_page(page, membership_to_response, query.fields)
+
     def get_by_id(self, membership_id, slug: str = None) -> MembershipResponseDTO:
         membership = None
         if slug:
@@ -493,13 +502,11 @@ class MembershipsService:
         if not purchase_ids:
             return []
 
-        purchases = []
-        for pid in purchase_ids:
-            purchase_model = self.purchase_repository.get_model(pid)
-            if purchase_model:
-                purchases.append(purchase_to_response(purchase_model).to_payload())
+        return [
+            purchase_to_response(purchase_model).to_payload()
+            for purchase_model in self.purchase_repository.get_many(purchase_ids)
+        ]
 
-        return purchases
     def get_events(self, membership_id):
         membership = self.membership_repository.get(membership_id)
         if not membership:
@@ -509,13 +516,11 @@ class MembershipsService:
         if not event_ids:
             return []
 
-        events = []
-        for eid in event_ids:
-            event = self.event_repository.get_model(eid)
-            if event:
-                events.append({"id": event.id, "title": event.title, "date": event.date, "image": event.image}) # To modify approach 
+        return [
+            {"id": event.id, "title": event.title, "date": event.date, "image": event.image}
+            for event in self.event_repository.get_many(event_ids)
+        ]
 
-        return events
     def set_membership_price(self, price, year=None) -> MembershipPriceResponseDTO:
         year = str(year or datetime.now().year)
         numeric_price = float(price)
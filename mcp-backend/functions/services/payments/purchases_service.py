@@ -1,12 +1,17 @@
 import logging
 from typing import List, Optional
 
+from dto.pagination import PageQueryDTO, PageResponseDTO
 from dto.purchase import CreatePurchaseRequestDTO, PurchaseActionResponseDTO, PurchaseDTO, UpdatePurchaseStatusRequestDTO
 from errors.service_errors import NotFoundError
 from interfaces.repositories import PurchaseRepositoryProtocol
 from mappers.purchase_mappers import create_purchase_dto_to_model, purchase_to_response
+from models import Purchase
+from repositories.base import build_page_request
 from repositories.purchase_repository import PurchaseRepository
 
+PURCHASE_SORT_FIELDS = {"timestamp": "timestamp", "payer_surname": "payer_surname"}
+
 
 class PurchasesService:
     def __init__(
@@ -22,6 +27,11 @@ class PurchasesService:
             for model in self.purchase_repository.stream_models()
         ]
 
+    def get_page(self, query: PageQueryDTO) -> PageResponseDTO:
+        request = build_page_request(query, PURCHASE_SORT_FIELDS, Purchase)
+        page = self.purchase_repository.query_page(request)
+        return PageResponseDTO.from_page(page, purchase_to_response, query.fields)
+
     def get_by_id(
         self,
         purchase_id: Optional[str],
@@ -9,6 +9,7 @@ from dotenv import load_dotenv
 from api.admin import members_api, messages_api, purchases_api
 from services.communications.mail_service import get_mail_config
 from config.firebase_config import bucket as storage_bucket
+from utils.ttl_cache import clear_all_caches
 
 _ASSETS_DIR = Path(__file__).resolve().parents[2] / "assets"
 _FUNCTIONS_DIR = Path(__file__).resolve().parents[2]
@@ -35,6 +36,14 @@ def _mock_admin_auth(monkeypatch):
     )
 
 
+@pytest.fixture(autouse=True)
+def _clear_read_caches():
+    """Read caches live at module level: start each test from a cold instance."""
+    clear_all_caches()
+    yield
+    clear_all_caches()
+
+
 @pytest.fixture(autouse=True)
 def _patch_flask_request_proxies(monkeypatch):
     """Avoid LocalProxy teardown issues when tests monkeypatch request.get_json."""
@@ -5,6 +5,15 @@ import pytest
 from api.admin import members_api, messages_api, purchases_api
 import services.sender.sender_service as sender_service_module
 from services.sender.sender_service import SenderService
+from utils.ttl_cache import clear_all_caches
+
+
+@pytest.fixture(autouse=True)
+def _clear_read_caches():
+    """Read caches live at module level: start each test from a cold instance."""
+    clear_all_caches()
+    yield
+    clear_all_caches()
 
 
 @pytest.fixture(autouse=True)
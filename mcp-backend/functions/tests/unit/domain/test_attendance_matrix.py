@@ -0,0 +1,68 @@
+from datetime import date
+
+from domain.attendance_matrix import AttendanceMatrix
+
+
+def _matrix():
+    # evt-4 viene aggiunto per ultimo ma cronologicamente precede evt-3.
+    events = [
+        ("evt-1", date(2026, 1, 10)),
+        ("evt-2", date(2026, 2, 10)),
+        ("evt-3", date(2026, 4, 10)),
+        ("evt-4", date(2026, 3, 10)),
+    ]
+    attendance = {
+        "m-loyal": ["evt-1", "evt-2", "evt-3", "evt-4"],
+        "m-early": ["evt-1"],
+        "m-late": ["evt-4", "evt-3"],
+    }
+    return AttendanceMatrix.build(events, attendance)
+
+
+def test_retention_counts_previous_events_by_date_not_insertion_order():
+    matrix = _matrix()
+
+    assert matrix.retention("evt-3", total=3) == {"total": 3, "first_time": 1, "second_third": 1, "four_plus": 1}
+    assert matrix.retention("evt-4", total=2) == {"total": 2, "first_time": 1, "second_third": 1, "four_plus": 0}
+
+
+def test_last_events_and_churn():
+    matrix = _matrix()
+
+    assert matrix.attended_at_least(2, last_events=2) == 2
+    assert matrix.churned(last_events=2) == 1
+
+
+def test_cohorts_follow_first_attendance():
+    cohorts = _matrix().cohorts()
+
+    assert [(row["event_id"], row["size"]) for row in cohorts] == [("evt-1", 2), ("evt-4", 1)]
+    assert cohorts[0]["curve"] == [50.0, 50.0, 50.0]
+    assert cohorts[1]["curve"] == [100.0]
+
+
+def test_payload_round_trip_and_incremental_updates():
+    matrix = _matrix()
+    matrix.add("m-new", "evt-5", date(2026, 5, 10))
+    matrix.remove("m-early", "evt-1")
+
+    restored = AttendanceMatrix.from_payload(matrix.to_payload())
+
+    assert restored.rows == matrix.rows
+    assert restored.events == ["evt-1", "evt-2", "evt-3", "evt-4", "evt-5"]
+    assert restored.attended("m-new", "evt-5")
+    assert "m-early" not in restored.rows
+    assert AttendanceMatrix.from_payload({"version": 99}) is None
+
+
+def test_set_event_members_rewrites_only_that_column():
+    matrix = _matrix()
+
+    assert matrix.set_event_members("evt-4", ["m-late", "m-new"]) is True
+    assert matrix.set_event_members("evt-4", ["m-late", "m-new"]) is False
+
+    assert matrix.attended("m-new", "evt-4")
+    assert not matrix.attended("m-loyal", "evt-4")
+    assert matrix.attended("m-loyal", "evt-3")
+    assert matrix.set_event_members("evt-6", [], date(2026, 6, 10)) is True
+    assert matrix.event_dates[-1] == "2026-06-10"
@@ -0,0 +1,33 @@
+from domain.ticket_tiers import cluster_price_tiers, map_ticket_tiers, tier_for_cluster
+
+
+def test_cluster_center_follows_weighted_running_mean():
+    # Centro 10.25 dopo 10.0 e 10.5: 10.7 resta nello stesso cluster.
+    assert len(set(cluster_price_tiers({10.0: 1, 10.5: 1, 10.7: 1, 15.0: 1}).values())) == 2
+
+    # Con 10.0 pesato x3 il centro e' 10.125 e 10.7 apre un cluster nuovo.
+    mapping = cluster_price_tiers({10.0: 3, 10.5: 1, 10.7: 1, 15.0: 1})
+    assert mapping[10.0] == mapping[10.5] == "early"
+    assert mapping[10.7] == "regular"
+    assert mapping[15.0] == "late"
+
+
+def test_middle_clusters_are_regular_with_more_than_four_tiers():
+    assert [tier_for_cluster(index, 5) for index in range(5)] == [
+        "super_early", "early", "regular", "regular", "late",
+    ]
+    assert tier_for_cluster(0, 1) == "regular"
+    assert cluster_price_tiers({}) == {}
+
+
+def test_map_ticket_tiers_weights_prices_by_row_count():
+    rows = [{"purchase_id": f"p{index}", "unit_price": 10.0} for index in range(3)]
+    rows += [
+        {"purchase_id": "p-mid", "unit_price": 10.5},
+        {"purchase_id": "p-high", "unit_price": 10.7},
+    ]
+
+    mapping = map_ticket_tiers(rows)
+
+    assert mapping["p0"] == mapping["p-mid"] == "early"
+    assert mapping["p-high"] == "regular"
@@ -0,0 +1,49 @@
+import pytest
+
+from models import EventParticipant, EventPurchase, PaymentMethod, Purchase, PurchaseTypes, Setting
+from models.base import FirestoreModel, model_codec
+
+
+def test_from_firestore_maps_renamed_keys_and_enums():
+    participant = EventParticipant.from_firestore(
+        {"membershipId": "mem-1", "payment_method": "omaggio", "createdAt": "2026-03-01", "unknown": 1},
+        "p1",
+    )
+
+    assert participant.id == "p1"
+    assert participant.membership_id == "mem-1"
+    assert participant.payment_method is PaymentMethod.OMAGGIO
+    assert participant.created_at == "2026-03-01"
+
+
+def test_invalid_enum_value_falls_back_to_default():
+    participant = EventParticipant.from_firestore({"payment_method": "bitcoin"}, "p1")
+
+    assert participant.payment_method is PaymentMethod.WEBSITE
+
+
+def test_to_firestore_round_trip_uses_firestore_names_and_raw_enum_values():
+    payload = EventParticipant(id="p1", membership_id="mem-1", payment_method=PaymentMethod.OMAGGIO).to_firestore()
+
+    assert payload["membershipId"] == "mem-1"
+    assert payload["payment_method"] == "omaggio"
+    assert "id" not in payload
+    assert "birthdate" not in payload
+    assert EventParticipant.from_firestore(payload, "p1") == EventParticipant(
+        id="p1", membership_id="mem-1", payment_method=PaymentMethod.OMAGGIO
+    )
+
+
+def test_codec_is_compiled_once_per_class():
+    assert model_codec(Purchase) is model_codec(Purchase)
+    assert model_codec(EventPurchase) is not model_codec(Purchase)
+    assert len(model_codec(EventPurchase).encoders) > len(model_codec(Purchase).encoders)
+    assert Purchase.from_firestore({"type": "membership"}).purchase_type is PurchaseTypes.MEMBERSHIP
+
+
+def test_unpersisted_fields_are_skipped_and_slotted_models_have_no_dict():
+    assert Setting.from_firestore({"value": 3}, "price").to_kv() == {"key": "price", "value": 3}
+    assert FirestoreModel.to_firestore(Setting(key="k", value=1)) == {"value": 1}
+
+    with pytest.raises(AttributeError):
+        EventParticipant().not_a_field = True
@@ -0,0 +1,42 @@
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import AlreadyExists
+
+import repositories.analytics_snapshot_repository as analytics_snapshot_repository_module
+from repositories.analytics_snapshot_repository import AnalyticsSnapshotRepository
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = MagicMock()
+    monkeypatch.setattr(analytics_snapshot_repository_module, "db", db)
+    return db
+
+
+def test_apply_counter_increments_writes_marker_and_deltas_in_one_batch(fake_db):
+    repo = AnalyticsSnapshotRepository()
+
+    assert repo.apply_counter_increments({"evt-1": {"tickets": 2}}, {"tickets": 2}, "delivery-1") is True
+
+    batch = fake_db.batch.return_value
+    marker_payload = batch.create.call_args.args[1]
+    assert set(marker_payload) == {"applied_at", "expires_at"}
+    assert batch.set.call_count == 2
+    assert all(call.kwargs == {"merge": True} for call in batch.set.call_args_list)
+    batch.commit.assert_called_once()
+
+
+def test_apply_counter_increments_skips_redelivered_trigger(fake_db):
+    fake_db.batch.return_value.commit.side_effect = AlreadyExists("applied")
+    repo = AnalyticsSnapshotRepository()
+
+    assert repo.apply_counter_increments({"evt-1": {"tickets": 2}}, {}, "delivery-1") is False
+
+
+def test_apply_counter_increments_without_delivery_id_has_no_marker(fake_db):
+    repo = AnalyticsSnapshotRepository()
+
+    assert repo.apply_counter_increments({}, {"active_members": 1}, None) is True
+
+    fake_db.batch.return_value.create.assert_not_called()
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from dto.pagination import PageQueryDTO
+from errors.service_errors import ValidationError
+from models import EventParticipant
+from repositories.base import PageRequest, build_page_request, fetch_page
+
+
+def _snapshot(doc_id, **data):
+    snap = MagicMock()
+    snap.id = doc_id
+    snap.get.side_effect = lambda field: data[field]
+    return snap
+
+
+def _query(snapshots):
+    query = MagicMock()
+    for method in ("order_by", "select", "start_after", "limit"):
+        getattr(query, method).return_value = query
+    query.stream.return_value = snapshots
+    return query
+
+
+def _from_snapshot(snap):
+    return SimpleNamespace(id=snap.id)
+
+
+def test_fetch_page_orders_by_document_id_and_reads_one_extra_doc():
+    query = _query([_snapshot("a"), _snapshot("b"), _snapshot("c")])
+
+    page = fetch_page(query, PageRequest(limit=2), _from_snapshot)
+
+    assert [item.id for item in page.items] == ["a", "b"]
+    assert page.next_cursor
+    query.order_by.assert_called_once_with("__name__", direction="ASCENDING")
+    query.limit.assert_called_once_with(3)
+    query.select.assert_not_called()
+
+
+def test_fetch_page_last_page_has_no_cursor():
+    page = fetch_page(_query([_snapshot("a")]), PageRequest(limit=2), _from_snapshot)
+
+    assert [item.id for item in page.items] == ["a"]
+    assert page.next_cursor is None
+
+
+def test_fetch_page_cursor_resumes_after_last_sort_value():
+    ts = datetime(2026, 3, 1, 21, 30, tzinfo=timezone.utc)
+    request = PageRequest(limit=1, order_by="timestamp", descending=True, fields=["email"])
+    first = _query([_snapshot("a", timestamp=ts), _snapshot("b", timestamp=ts)])
+
+    cursor = fetch_page(first, request, _from_snapshot).next_cursor
+
+    first.select.assert_called_once_with(["email", "timestamp"])
+    assert [call.args[0] for call in first.order_by.call_args_list] == ["timestamp", "__name__"]
+
+    second = _query([])
+    request.cursor = cursor
+    fetch_page(second, request, _from_snapshot)
+
+    second.start_after.assert_called_once_with({"__name__": "a", "timestamp": ts})
+
+
+def test_fetch_page_rejects_invalid_or_mismatched_cursor():
+    cursor = fetch_page(
+        _query([_snapshot("a"), _snapshot("b")]),
+        PageRequest(limit=1),
+        _from_snapshot,
+    ).next_cursor
+
+    with pytest.raises(ValidationError):
+        fetch_page(_query([]), PageRequest(cursor=cursor, order_by="timestamp"), _from_snapshot)
+    with pytest.raises(ValidationError):
+        fetch_page(_query([]), PageRequest(cursor="not-a-cursor"), _from_snapshot)
+
+
+def test_build_page_request_maps_sort_and_projection_to_firestore_keys():
+    query = PageQueryDTO.model_validate({"pageSize": "20", "sort": "-created_at", "fields": "id,name,membership_id"})
+
+    request = build_page_request(query, {"created_at": "createdAt"}, EventParticipant)
+
+    assert request.limit == 20
+    assert request.order_by == "createdAt"
+    assert request.descending is True
+    assert request.fields == ["name", "membershipId"]
+
+
+def test_build_page_request_reads_whole_docs_for_derived_fields_and_rejects_unknown_sort():
+    query = PageQueryDTO.model_validate({"page_size": 5, "fields": "name,full_name"})
+
+    assert build_page_request(query, {}, EventParticipant).fields is None
+    with pytest.raises(ValidationError):
+        build_page_request(PageQueryDTO(sort="email"), {"name": "name"}, EventParticipant)
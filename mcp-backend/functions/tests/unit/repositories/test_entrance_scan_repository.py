@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import AlreadyExists
+
+import repositories.entrance_scan_repository as entrance_scan_repository_module
+from repositories.entrance_scan_repository import EntranceScanRepository
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = MagicMock()
+    monkeypatch.setattr(entrance_scan_repository_module, "db", db)
+    return db
+
+
+def test_create_scan_increments_entered_count_with_create_precondition(fake_db):
+    repo = EntranceScanRepository()
+
+    assert repo.create_scan("evt-1", "m-1", "token-1") is None
+
+    batch = fake_db.batch.return_value
+    batch.create.assert_called_once()
+    counter_call = batch.set.call_args
+    assert "entered_count" in counter_call.args[1]
+    assert counter_call.kwargs == {"merge": True}
+    batch.commit.assert_called_once()
+
+
+def test_create_scan_returns_existing_scan_when_already_scanned(fake_db):
+    fake_db.batch.return_value.commit.side_effect = AlreadyExists("scan exists")
+    scan_ref = fake_db.collection.return_value.document.return_value.collection.return_value.document.return_value
+    scan_ref.get.return_value.id = "m-1"
+    scan_ref.get.return_value.to_dict.return_value = {"manual": False, "scan_token": "token-0"}
+    repo = EntranceScanRepository()
+
+    existing = repo.create_scan("evt-1", "m-1", "token-1")
+
+    assert existing.scan_token == "token-0"
+
+
+def test_count_uses_seeded_counter(fake_db):
+    counter_snap = fake_db.collection.return_value.document.return_value.get.return_value
+    counter_snap.exists = True
+    counter_snap.to_dict.return_value = {"entered_count": 7, "entered_count_seeded_at": "2026-01-01"}
+    repo = EntranceScanRepository()
+
+    assert repo.count("evt-1") == 7
+    fake_db.collection.return_value.document.return_value.collection.return_value.stream.assert_not_called()
+
+
+def test_create_scan_increments_flow_minute_of_offline_scan(fake_db):
+    repo = EntranceScanRepository()
+
+    repo.create_scan("evt-1", "m-1", "token-1", scanned_at=datetime(2026, 3, 21, 22, 10, 45, tzinfo=timezone.utc))
+
+    counter_payload = fake_db.batch.return_value.set.call_args.args[1]
+    assert list(counter_payload["flow_minutes"]) == ["2026-03-21T22:10"]
+
+
+def test_get_flow_minutes_reads_seeded_counter_without_listing_scans(fake_db):
+    counter_snap = fake_db.collection.return_value.document.return_value.get.return_value
+    counter_snap.exists = True
+    counter_snap.to_dict.return_value = {
+        "flow_minutes": {"2026-03-21T22:10": 3, "2026-03-21T22:11": 0},
+        "flow_minutes_seeded_at": "2026-01-01",
+    }
+    repo = EntranceScanRepository()
+
+    assert repo.get_flow_minutes("evt-1") == {datetime(2026, 3, 21, 22, 10, tzinfo=timezone.utc): 3}
+    fake_db.collection.return_value.document.return_value.collection.return_value.stream.assert_not_called()
+
+
+def test_wait_live_state_returns_when_counter_version_moves(fake_db):
+    counter_ref = fake_db.collection.return_value.document.return_value
+    changed = MagicMock(exists=True)
+    changed.to_dict.return_value = {
+        "version": 8,
+        "entered_count": 5,
+        "entered_count_seeded_at": "2026-01-01",
+        "flow_minutes": {"2026-03-21T22:10": 5},
+        "flow_minutes_seeded_at": "2026-01-01",
+    }
+    watch = MagicMock()
+    counter_ref.on_snapshot.side_effect = lambda callback: callback([changed], [], None) or watch
+    repo = EntranceScanRepository()
+
+    state = repo.wait_live_state("evt-1", 7, timeout=1)
+
+    assert state["version"] == 8
+    assert state["entered_count"] == 5
+    watch.unsubscribe.assert_called_once()
+
+
+def test_bump_versions_increments_only_the_cursor_once_per_event(fake_db):
+    repo = EntranceScanRepository()
+
+    repo.bump_versions(["evt-1", "evt-2", "evt-1", ""])
+
+    batch = fake_db.batch.return_value
+    assert batch.set.call_count == 2
+    assert all(list(call.args[1]) == ["version"] for call in batch.set.call_args_list)
+    batch.commit.assert_called_once()
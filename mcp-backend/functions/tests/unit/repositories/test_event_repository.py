@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+import repositories.base as base_module
+import repositories.event_repository as event_repository_module
+import repositories.scan_token_repository as scan_token_repository_module
+from models import Event
+from repositories.event_repository import EventRepository
+from repositories.scan_token_repository import ScanTokenRepository
+
+
+def _snapshot(doc_id, data):
+    snap = MagicMock()
+    snap.id = doc_id
+    snap.exists = True
+    snap.to_dict.return_value = data
+    return snap
+
+
+def _patch_db(monkeypatch, module, snap):
+    fake_db = MagicMock()
+    doc_ref = fake_db.collection.return_value.document.return_value
+    doc_ref.get.return_value = snap
+    monkeypatch.setattr(base_module, "db", fake_db)
+    monkeypatch.setattr(module, "db", fake_db, raising=False)
+    return doc_ref
+
+
+class TestEventModelCache:
+    def test_repeated_reads_hit_firestore_once(self, monkeypatch):
+        doc_ref = _patch_db(monkeypatch, event_repository_module, _snapshot("evt-1", {"title": "Closing Party"}))
+
+        first = EventRepository().get_model("evt-1")
+        second = EventRepository().get_model("evt-1")
+
+        assert first.title == second.title == "Closing Party"
+        assert doc_ref.get.call_count == 1
+
+    def test_returned_models_are_copies(self, monkeypatch):
+        _patch_db(monkeypatch, event_repository_module, _snapshot("evt-1", {"title": "Closing Party"}))
+        repo = EventRepository()
+
+        repo.get_model("evt-1").title = "Mutated"
+
+        assert repo.get_model("evt-1").title == "Closing Party"
+
+    def test_update_and_delete_invalidate(self, monkeypatch):
+        doc_ref = _patch_db(monkeypatch, event_repository_module, _snapshot("evt-1", {"title": "Closing Party"}))
+        repo = EventRepository()
+
+        repo.get_model("evt-1")
+        repo.update_from_model("evt-1", Event(title="Renamed"))
+        repo.get_model("evt-1")
+        repo.delete("evt-1")
+        repo.get_model("evt-1")
+
+        assert doc_ref.get.call_count == 3
+
+    def test_missing_event_is_not_cached(self, monkeypatch):
+        snap = MagicMock(exists=False)
+        doc_ref = _patch_db(monkeypatch, event_repository_module, snap)
+        repo = EventRepository()
+
+        assert repo.get_model("evt-404") is None
+        assert repo.get_model("evt-404") is None
+        assert doc_ref.get.call_count == 2
+
+    def test_get_many_batches_cache_misses_and_preserves_order(self, monkeypatch):
+        doc_ref = _patch_db(monkeypatch, event_repository_module, _snapshot("evt-1", {"title": "Cached"}))
+        fake_db = base_module.db
+        fake_db.get_all.return_value = [_snapshot("evt-3", {"title": "Three"}), _snapshot("evt-2", {"title": "Two"})]
+        fake_db.collection.return_value.document.side_effect = lambda doc_id: doc_id if doc_id != "evt-1" else doc_ref
+        repo = EventRepository()
+        repo.get_model("evt-1")
+
+        events = repo.get_many(["evt-2", "evt-1", "evt-404", "evt-3", "evt-2"])
+
+        assert [event.id for event in events] == ["evt-2", "evt-1", "evt-3"]
+        fake_db.get_all.assert_called_once_with(["evt-2", "evt-404", "evt-3"])
+        assert [event.title for event in repo.get_many(["evt-3", "evt-2"])] == ["Three", "Two"]
+        assert fake_db.get_all.call_count == 1
+
+
+class TestScanTokenCache:
+    def test_deactivate_invalidates_cached_token(self, monkeypatch):
+        doc_ref = _patch_db(
+            monkeypatch,
+            scan_token_repository_module,
+            _snapshot("tok-1", {"event_id": "evt-1", "is_active": True}),
+        )
+        repo = ScanTokenRepository()
+
+        assert repo.get("tok-1").is_active is True
+        assert repo.get("tok-1").is_active is True
+        assert doc_ref.get.call_count == 1
+
+        doc_ref.get.return_value = _snapshot("tok-1", {"event_id": "evt-1", "is_active": False})
+        repo.deactivate("tok-1", "admin-1")
+
+        assert repo.get("tok-1").is_active is False
+        assert doc_ref.get.call_count == 2
@@ -0,0 +1,155 @@
+from unittest.mock import MagicMock
+
+import repositories.participant_repository as participant_repository_module
+from repositories.participant_repository import ParticipantRepository
+
+
+class TestGetByMembershipId:
+    """Unit tests for ParticipantRepository.get_by_membership_id."""
+
+    def _build_repo(self, docs, monkeypatch):
+        event_collection = MagicMock()
+        event_collection.where.return_value.limit.return_value.get.return_value = docs
+
+        fake_db = MagicMock()
+        fake_db.collection.return_value.document.return_value.collection.return_value = event_collection
+        monkeypatch.setattr(participant_repository_module, "db", fake_db)
+
+        return ParticipantRepository(), fake_db, event_collection
+
+    def test_queries_only_the_event_subcollection(self, monkeypatch):
+        doc = MagicMock()
+        doc.id = "p-1"
+        doc.to_dict.return_value = {"name": "Mario", "membershipId": "m-1"}
+        repo, fake_db, event_collection = self._build_repo([doc], monkeypatch)
+
+        participant = repo.get_by_membership_id("evt-1", "m-1")
+
+        assert participant.id == "p-1"
+        assert participant.membership_id == "m-1"
+        fake_db.collection.return_value.document.assert_called_with("evt-1")
+        event_collection.where.return_value.limit.assert_called_once_with(1)
+        fake_db.collection_group.assert_not_called()
+
+    def test_returns_none_when_no_match(self, monkeypatch):
+        repo, _, _ = self._build_repo([], monkeypatch)
+
+        assert repo.get_by_membership_id("evt-1", "m-404") is None
+
+    def test_skips_query_without_membership_id(self, monkeypatch):
+        repo, _, event_collection = self._build_repo([], monkeypatch)
+
+        assert repo.get_by_membership_id("evt-1", "") is None
+        event_collection.where.assert_not_called()
+
+
+class TestParticipantsCounter:
+    """Unit tests for the maintained participantsCount on events/{eventId}."""
+
+    def _build_repo(self, monkeypatch, counter_data=None):
+        fake_db = MagicMock()
+        counter_ref = fake_db.collection.return_value.document.return_value
+        counter_snap = MagicMock()
+        counter_snap.exists = counter_data is not None
+        counter_snap.to_dict.return_value = counter_data or {}
+        counter_ref.get.return_value = counter_snap
+        counter_ref.collection.return_value.document.return_value.id = "p-new"
+        monkeypatch.setattr(participant_repository_module, "db", fake_db)
+        return ParticipantRepository(), fake_db, counter_ref
+
+    def test_create_increments_event_counter_in_same_transaction(self, monkeypatch):
+        repo, fake_db, counter_ref = self._build_repo(monkeypatch, counter_data={"title": "Party"})
+        participant = participant_repository_module.EventParticipant(name="Mario")
+
+        participant_id = repo.create_from_model("evt-1", participant)
+
+        transaction = fake_db.transaction.return_value
+        assert participant_id == "p-new"
+        counter_call = transaction.update.call_args
+        assert counter_call.args[0] is counter_ref
+        assert "participantsCount" in counter_call.args[1]
+        # Seconda scrittura: il cursore ingressi su entrance_scans/{eventId}.
+        participant_call, version_call = transaction.set.call_args_list
+        assert participant_call.args[1]["name"] == "Mario"
+        assert "version" in version_call.args[1]
+        assert version_call.kwargs == {"merge": True}
+
+    def test_delete_decrements_counter_and_bumps_entrance_version(self, monkeypatch):
+        repo, fake_db, counter_ref = self._build_repo(monkeypatch, counter_data={"title": "Party"})
+
+        repo.delete("evt-1", "p-1")
+
+        transaction = fake_db.transaction.return_value
+        transaction.delete.assert_called_once()
+        assert "participantsCount" in transaction.update.call_args.args[1]
+        assert "version" in transaction.set.call_args.args[1]
+
+    def test_create_does_not_recreate_deleted_event(self, monkeypatch):
+        repo, fake_db, _ = self._build_repo(monkeypatch, counter_data=None)
+
+        repo.create_from_model("evt-gone", participant_repository_module.EventParticipant(name="Mario"))
+
+        transaction = fake_db.transaction.return_value
+        transaction.set.assert_called_once()
+        transaction.update.assert_not_called()
+
+    def test_count_reads_seeded_counter_without_streaming(self, monkeypatch):
+        repo, _, counter_ref = self._build_repo(
+            monkeypatch,
+            counter_data={"participantsCount": 42, "participantsCount_seeded_at": "2026-01-01"},
+        )
+
+        assert repo.count("evt-1") == 42
+        counter_ref.collection.return_value.stream.assert_not_called()
+
+    def test_count_seeds_unseeded_counter(self, monkeypatch):
+        repo, _, _ = self._build_repo(monkeypatch, counter_data={"participantsCount": 3})
+        seeded = {}
+
+        def _reconcile(counter_ref, field, query, create_missing=True):
+            seeded["field"] = field
+            seeded["create_missing"] = create_missing
+            return 120
+
+        monkeypatch.setattr(participant_repository_module.event_counters, "reconcile_count", _reconcile)
+
+        assert repo.count("evt-1") == 120
+        assert seeded == {"field": "participantsCount", "create_missing": False}
+
+
+class TestStreamRows:
+    """Unit tests for the projected analytics rows."""
+
+    def _doc(self, doc_id, data, event_id="evt-1"):
+        doc = MagicMock()
+        doc.id = doc_id
+        doc.to_dict.return_value = data
+        doc.reference.parent.parent.id = event_id
+        return doc
+
+    def test_stream_rows_selects_only_row_fields(self, monkeypatch):
+        fake_db = MagicMock()
+        event_collection = fake_db.collection.return_value.document.return_value.collection.return_value
+        event_collection.select.return_value.stream.return_value = [
+            self._doc("p-1", {"gender": "f", "membershipId": "m-1", "payment_method": "omaggio"})
+        ]
+        monkeypatch.setattr(participant_repository_module, "db", fake_db)
+
+        rows = list(ParticipantRepository().stream_rows("evt-1"))
+
+        event_collection.select.assert_called_once_with(participant_repository_module.PARTICIPANT_ROW_KEYS)
+        assert rows[0].id == "p-1"
+        assert (rows[0].gender, rows[0].membership_id, rows[0].payment_method) == ("f", "m-1", "omaggio")
+
+    def test_stream_all_rows_falls_back_to_parent_event_id(self, monkeypatch):
+        fake_db = MagicMock()
+        fake_db.collection_group.return_value.select.return_value.stream.return_value = [
+            self._doc("p-1", {"gender": "m"}, event_id="evt-9"),
+            self._doc("p-2", {"event_id": "evt-2"}),
+        ]
+        monkeypatch.setattr(participant_repository_module, "db", fake_db)
+
+        rows = list(ParticipantRepository().stream_all_rows())
+
+        fake_db.collection_group.assert_called_once_with("participants_event")
+        assert [row.event_id for row in rows] == ["evt-9", "evt-2"]
@@ -0,0 +1,175 @@
+from types import SimpleNamespace
+
+import pytest
+
+from errors.service_errors import NotFoundError
+from models import ParticipantRow
+from services.core.analytics_service import AnalyticsService
+
+
+class _Events:
+    def __init__(self, events):
+        self.events = {event.id: event for event in events}
+        self.streamed = 0
+
+    def get_model(self, event_id):
+        return self.events.get(event_id)
+
+    def stream_models(self):
+        self.streamed += 1
+        return iter(self.events.values())
+
+
+class _Participants:
+    def __init__(self, participants):
+        self.participants = participants
+        self.list_calls = []
+        self.stream_all_calls = 0
+
+    def stream_rows(self, event_id):
+        self.list_calls.append(event_id)
+        return iter([p for p in self.participants if p.event_id == event_id])
+
+    def stream_all_rows(self):
+        self.stream_all_calls += 1
+        return iter(self.participants)
+
+
+class _SnapshotService:
+    def __init__(self, dashboard=None, retention=None, live_dashboard=None):
+        self.dashboard = dashboard
+        self.retention = retention or {}
+        self.live_dashboard = live_dashboard
+        self.enqueued = []
+
+    def get_dashboard_snapshot(self):
+        return {"exists": True, **self.dashboard} if self.dashboard else {"exists": False}
+
+    def get_audience_retention(self, event_id):
+        return self.retention.get(event_id)
+
+    def get_attendance_stats(self, last_events=6, min_attended=2):
+        return {"exists": False}
+
+    def build_live_dashboard(self):
+        return self.live_dashboard
+
+    def enqueue_global_rebuild(self, reason="trigger"):
+        self.enqueued.append(reason)
+
+
+_DASHBOARD = {
+    "kpis": {
+        "total_revenue_net": 1234.567,
+        "events": 4,
+        "active_members": 80,
+        "unique_participants": 150,
+        "avg_fill_rate": 72.5,
+        "this_month_revenue": 300.0,
+    },
+    "global_cards": {"omaggi_total": 12, "avg_unit_payment": 15.5},
+}
+
+
+def _service(snapshot_service, events=(), participants=()):
+    event_repo = _Events(events)
+    participant_repo = _Participants(list(participants))
+    service = AnalyticsService(
+        event_repository=event_repo,
+        membership_repository=object(),
+        purchase_repository=object(),
+        participant_repository=participant_repo,
+        entrance_scan_repository=object(),
+        analytics_snapshot_service=snapshot_service,
+    )
+    return service, event_repo, participant_repo
+
+
+def test_dashboard_kpis_are_read_from_snapshot():
+    snapshots = _SnapshotService(dashboard=_DASHBOARD)
+    service, event_repo, participant_repo = _service(snapshots)
+
+    kpis = service.get_dashboard_kpis()
+
+    assert kpis.total_revenue_net == 1234.57
+    assert kpis.events_count == 4
+    assert kpis.members_count == 80
+    assert kpis.participants_count == 150
+    assert kpis.total_omaggi == 12
+    assert kpis.avg_unit_payment == 15.5
+    assert event_repo.streamed == 0
+    assert participant_repo.list_calls == []
+    assert snapshots.enqueued == []
+
+
+def test_dashboard_kpis_fall_back_to_live_and_request_rebuild():
+    snapshots = _SnapshotService(live_dashboard=_DASHBOARD)
+    service, _, _ = _service(snapshots)
+
+    kpis = service.get_dashboard_kpis()
+
+    assert kpis.events_count == 4
+    assert snapshots.enqueued == ["missing_snapshot"]
+
+
+def test_audience_retention_uses_attendance_index():
+    event = SimpleNamespace(id="evt-3", title="Party", date="21-03-2026")
+    snapshots = _SnapshotService(
+        retention={"evt-3": {"total": 10, "first_time": 6, "second_third": 3, "four_plus": 1}}
+    )
+    service, event_repo, participant_repo = _service(snapshots, events=[event])
+
+    payload = service.get_audience_retention("evt-3")
+
+    assert (payload.total_participants, payload.new, payload.returning) == (10, 6, 4)
+    assert payload.breakdown[1].pct == 30.0
+    assert event_repo.streamed == 0
+    assert participant_repo.list_calls == []
+
+
+def test_audience_retention_live_fallback_streams_participants_once():
+    events = [
+        SimpleNamespace(id="evt-1", title="One", date="01-01-2026"),
+        SimpleNamespace(id="evt-2", title="Two", date="01-02-2026"),
+        SimpleNamespace(id="evt-3", title="Three", date="01-03-2026"),
+    ]
+    participants = [
+        SimpleNamespace(event_id="evt-1", membership_id="m-1"),
+        SimpleNamespace(event_id="evt-2", membership_id="m-1"),
+        SimpleNamespace(event_id="evt-3", membership_id="m-1"),
+        SimpleNamespace(event_id="evt-3", membership_id="m-2"),
+        SimpleNamespace(event_id="evt-3", membership_id=None),
+    ]
+    service, _, participant_repo = _service(_SnapshotService(), events=events, participants=participants)
+
+    payload = service.get_audience_retention("evt-3")
+
+    assert (payload.total_participants, payload.new, payload.returning) == (3, 2, 1)
+    assert participant_repo.stream_all_calls == 1
+    assert participant_repo.list_calls == ["evt-3"]
+
+
+def test_attendance_cohorts_require_index():
+    service, _, _ = _service(_SnapshotService())
+
+    with pytest.raises(NotFoundError):
+        service.get_attendance_cohorts()
+
+
+def test_gender_and_age_distribution_read_projected_rows():
+    event = SimpleNamespace(id="evt-1", title="Party", date="21-03-2026")
+    participants = [
+        ParticipantRow("p-1", "evt-1", "website", "m", "01-01-2000", None, False, None),
+        ParticipantRow("p-2", "evt-1", "omaggio", "femmina", None, "m-1", True, None),
+        ParticipantRow("p-3", "evt-1", "website", None, "01-01-1980", None, False, None),
+    ]
+    service, _, participant_repo = _service(_SnapshotService(), events=[event], participants=participants)
+
+    gender = service.get_gender_distribution("evt-1")
+    ages = service.get_age_distribution("evt-1")
+
+    assert (gender.male, gender.female, gender.unknown) == (1, 1, 1)
+    assert gender.male_pct == 33.3
+    assert ages.total == 3
+    assert {band.band: band.count for band in ages.bands}["unknown"] == 1
+    assert participant_repo.list_calls == ["evt-1", "evt-1"]
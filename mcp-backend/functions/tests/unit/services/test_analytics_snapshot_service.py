@@ -1,5 +1,9 @@
+from datetime import date, datetime, timedelta, timezone
 from types import SimpleNamespace
 
+from config.analytics_config import ANALYTICS_GLOBAL_MIN_INTERVAL_MINUTES
+from domain.attendance_matrix import AttendanceMatrix
+
 from services.core.analytics_snapshot_service import AnalyticsSnapshotService
 
 
@@ -9,20 +13,27 @@ class _DummyRepo:
 
 
 class _JobRepo:
-    def __init__(self, rows=None):
-        self.created_model = None
-        self.updates = []
-        self.rows = rows or []
+    def __init__(self, docs=None):
+        self.docs = {job_id: dict(payload) for job_id, payload in (docs or {}).items()}
+
+    def mutate_raw(self, job_id, mutate):
+        current = self.docs.get(job_id)
+        updated, result = mutate(dict(current) if current is not None else None)
+        if updated is not None:
+            self.docs[job_id] = {**(current or {}), **updated}
+        return result
 
-    def stream_raw_by_type(self, _job_type):
-        return iter(self.rows)
+    def stream_raw_by_status(self, _job_type, status):
+        return [(job_id, dict(payload)) for job_id, payload in self.docs.items() if payload.get("status") == status]
 
-    def create_from_model(self, job):
-        self.created_model = job
-        return "job-analytics-1"
+    def claim_queued(self, job_id):
+        if self.docs.get(job_id, {}).get("status") != "queued":
+            return False
+        self.docs[job_id]["status"] = "running"
+        return True
 
-    def update(self, job_id, payload):
-        self.updates.append((job_id, payload))
+    def get_raw(self, job_id):
+        return dict(self.docs[job_id]) if job_id in self.docs else None
 
 
 def _service():
@@ -101,9 +112,8 @@ def test_ticket_tier_payload_aggregates_counts_and_amounts():
     assert round(sum(item["gross"] for item in payload["tiers"]), 2) == 56.00
 
 
-def test_enqueue_full_rebuild_creates_complete_job_payload():
-    job_repo = _JobRepo()
-    service = AnalyticsSnapshotService(
+def _job_service(job_repo, **overrides):
+    repos = dict(
         event_repository=_DummyRepo(),
         membership_repository=_DummyRepo(),
         purchase_repository=_DummyRepo(),
@@ -113,36 +123,545 @@ def test_enqueue_full_rebuild_creates_complete_job_payload():
         entrance_scan_repository=_DummyRepo(),
         analytics_snapshot_repository=SimpleNamespace(),
     )
+    repos.update(overrides)
+    return AnalyticsSnapshotService(**repos)
+
+
+def test_enqueue_full_rebuild_creates_complete_job_payload():
+    job_repo = _JobRepo()
+    service = _job_service(job_repo)
 
     result = service.enqueue_full_rebuild(reason="manual:test")
 
-    assert result["job_id"] == "job-analytics-1"
+    assert result["job_id"] == "analytics_rebuild__all"
     assert result["scope"] == "all"
-    assert job_repo.created_model.type == "analytics_rebuild"
-    assert job_repo.created_model.status == "queued"
-    assert job_repo.created_model.scope == "all"
-    assert job_repo.created_model.reason == "manual:test"
-    assert job_repo.created_model.updated_at is not None
+    job = job_repo.docs["analytics_rebuild__all"]
+    assert job["type"] == "analytics_rebuild"
+    assert job["status"] == "queued"
+    assert job["scope"] == "all"
+    assert job["reason"] == "manual:test"
+    assert job["updated_at"] is not None
 
 
 def test_enqueue_full_rebuild_kicks_existing_queued_job():
-    job_repo = _JobRepo(rows=[("queued-job", {"type": "analytics_rebuild", "status": "queued", "scope": "all"})])
-    service = AnalyticsSnapshotService(
+    job_repo = _JobRepo(
+        docs={"analytics_rebuild__all": {"type": "analytics_rebuild", "status": "queued", "scope": "all"}}
+    )
+    service = _job_service(job_repo)
+
+    result = service.enqueue_full_rebuild(reason="manual:test")
+
+    assert result["job_id"] == "analytics_rebuild__all"
+    assert result["deduped"] is True
+    assert result["kicked"] is True
+    assert list(job_repo.docs) == ["analytics_rebuild__all"]
+    assert job_repo.docs["analytics_rebuild__all"]["last_kicked_at"] is not None
+
+
+def test_event_rebuild_requests_coalesce_into_one_scheduled_job():
+    job_repo = _JobRepo()
+    service = _job_service(job_repo)
+
+    first = service.enqueue_event_rebuild("evt-1", reason="scan")
+    second = service.enqueue_event_rebuild("evt-1", reason="scan")
+
+    assert first["deduped"] is False and first["status"] == "scheduled"
+    assert second["deduped"] is True and second["kicked"] is False
+    job = job_repo.docs["analytics_rebuild__event__evt-1"]
+    assert job["requests"] == 2
+    assert job["run_after"] > job["created_at"]
+    # Nulla parte prima della fine del debounce.
+    assert service.dispatch_due_rebuilds() == 0
+
+
+def test_dispatch_queues_due_jobs_only():
+    now = datetime.now(timezone.utc)
+    job_repo = _JobRepo(
+        docs={
+            "due": {"status": "scheduled", "run_after": now - timedelta(seconds=1)},
+            "later": {"status": "scheduled", "run_after": now + timedelta(minutes=5)},
+        }
+    )
+    service = _job_service(job_repo)
+
+    assert service.dispatch_due_rebuilds() == 1
+    assert job_repo.docs["due"]["status"] == "queued"
+    assert job_repo.docs["later"]["status"] == "scheduled"
+
+
+def test_global_rebuild_is_throttled_after_recent_run():
+    finished = datetime.now(timezone.utc) - timedelta(minutes=2)
+    job_repo = _JobRepo(docs={"analytics_rebuild__global": {"status": "completed", "finished_at": finished}})
+    service = _job_service(job_repo)
+
+    service.enqueue_global_rebuild(reason="event_rebuilt:evt-1")
+
+    job = job_repo.docs["analytics_rebuild__global"]
+    assert job["status"] == "scheduled"
+    assert job["run_after"] == finished + timedelta(minutes=ANALYTICS_GLOBAL_MIN_INTERVAL_MINUTES)
+
+
+def test_event_job_rebuilds_only_event_and_reschedules_when_written_during_run():
+    job_repo = _JobRepo()
+    service = _job_service(job_repo, analytics_snapshot_repository=_SnapshotRepo())
+    rebuilt = []
+    service.rebuild_event_snapshot = lambda event_id: rebuilt.append(event_id)
+    service.rebuild_global_snapshot = lambda: rebuilt.append("global")
+    service.rebuild_dashboard_snapshot = lambda: rebuilt.append("dashboard")
+
+    job_id = service.request_rebuild(scope="event", event_id="evt-1")["job_id"]
+
+    def rebuild_with_concurrent_write(event_id):
+        rebuilt.append(event_id)
+        service.enqueue_event_rebuild(event_id, reason="scan")
+
+    service.rebuild_event_snapshot = rebuild_with_concurrent_write
+    service.process_rebuild_job(job_id)
+
+    assert rebuilt == ["evt-1"]
+    assert job_repo.docs[job_id]["status"] == "scheduled"
+    assert job_repo.docs[job_id]["rerun_requested"] is False
+    # Senza baseline globale la rebuild evento accoda anche quella globale.
+    assert job_repo.docs["analytics_rebuild__global"]["status"] == "scheduled"
+
+
+def test_event_job_leaves_seeded_global_to_deltas():
+    job_repo = _JobRepo()
+    service = _job_service(job_repo, analytics_snapshot_repository=_SnapshotRepo(global_current=dict(_SEEDED)))
+    service.rebuild_event_snapshot = lambda event_id: None
+
+    job_id = service.request_rebuild(scope="event", event_id="evt-1")["job_id"]
+    service.process_rebuild_job(job_id)
+
+    assert job_repo.docs[job_id]["status"] == "completed"
+    assert "analytics_rebuild__global" not in job_repo.docs
+
+
+class _SnapshotRepo:
+    def __init__(self, event_snapshots=None, global_current=None):
+        self.event_snapshots = event_snapshots or {}
+        self.global_current = global_current
+        self.event_increments = []
+        self.global_increments = []
+        self.applied = set()
+
+    def get_event_snapshot(self, event_id):
+        return self.event_snapshots.get(event_id)
+
+    def set_event_snapshot(self, event_id, payload):
+        self.event_snapshots[event_id] = payload
+
+    def get_global_current(self):
+        return self.global_current
+
+    def set_global_current(self, payload):
+        self.global_current = payload
+
+    def apply_counter_increments(self, event_deltas, global_delta, delivery_id=None):
+        if delivery_id in self.applied:
+            return False
+        if delivery_id:
+            self.applied.add(delivery_id)
+        self.event_increments.extend(event_deltas.items())
+        if global_delta:
+            self.global_increments.append(global_delta)
+        return True
+
+
+_SEEDED = {"counters": {}, "counters_since": "2026-01-01T00:00:00Z"}
+
+
+def _counter_service(snapshot_repo, job_repo=None):
+    return AnalyticsSnapshotService(
         event_repository=_DummyRepo(),
         membership_repository=_DummyRepo(),
         purchase_repository=_DummyRepo(),
         participant_repository=_DummyRepo(),
         message_repository=_DummyRepo(),
-        job_repository=job_repo,
+        job_repository=job_repo or _JobRepo(),
         entrance_scan_repository=_DummyRepo(),
-        analytics_snapshot_repository=SimpleNamespace(),
+        analytics_snapshot_repository=snapshot_repo,
     )
 
-    result = service.enqueue_full_rebuild(reason="manual:test")
 
-    assert result["job_id"] == "queued-job"
-    assert result["deduped"] is True
-    assert result["kicked"] is True
-    assert job_repo.created_model is None
-    assert job_repo.updates[0][0] == "queued-job"
-    assert job_repo.updates[0][1]["last_kicked_at"] is not None
+def test_apply_purchase_change_reverts_refunded_purchase():
+    snapshot_repo = _SnapshotRepo(event_snapshots={"evt-1": dict(_SEEDED)}, global_current=dict(_SEEDED))
+    service = _counter_service(snapshot_repo)
+
+    before = {
+        "type": "event",
+        "ref_id": "evt-1",
+        "status": "COMPLETED",
+        "participants_count": 2,
+        "amount_total": "30.00",
+        "net_amount": "28.50",
+        "timestamp": "2026-03-10T21:00:00+00:00",
+    }
+    after = {**before, "status": "REFUNDED"}
+
+    service.apply_purchase_change(before, after)
+
+    event_id, event_delta = snapshot_repo.event_increments[0]
+    assert event_id == "evt-1"
+    assert event_delta["purchases"] == -1
+    assert event_delta["tickets"] == -2
+    assert event_delta["revenue_gross"] == -30.0
+    assert event_delta["sales_daily"] == {"2026-03-10": {"purchases": -1, "gross": -30.0, "net": -28.5}}
+    assert snapshot_repo.global_increments[0]["sales_monthly"]["2026-03"]["tickets"] == -2
+
+
+def test_redelivered_purchase_trigger_applies_deltas_once():
+    snapshot_repo = _SnapshotRepo(event_snapshots={"evt-1": dict(_SEEDED)}, global_current=dict(_SEEDED))
+    service = _counter_service(snapshot_repo)
+    after = {
+        "type": "event",
+        "ref_id": "evt-1",
+        "status": "COMPLETED",
+        "participants_count": 1,
+        "amount_total": "15.00",
+        "net_amount": "14.00",
+    }
+
+    first = service.apply_purchase_change({}, after, delivery_id="evt-delivery-1")
+    second = service.apply_purchase_change({}, after, delivery_id="evt-delivery-1")
+
+    assert (first["events"], first["global"], first["duplicate"]) == (["evt-1"], True, False)
+    assert (second["events"], second["global"], second["duplicate"]) == ([], False, True)
+    assert len(snapshot_repo.event_increments) == 1
+    assert len(snapshot_repo.global_increments) == 1
+
+
+def test_apply_participant_change_moves_gender_bucket_only():
+    snapshot_repo = _SnapshotRepo(event_snapshots={"evt-1": dict(_SEEDED)}, global_current=dict(_SEEDED))
+    service = _counter_service(snapshot_repo)
+
+    before = {"name": "Giulia", "gender": None, "payment_method": "website"}
+    after = {**before, "gender": "female"}
+
+    service.apply_participant_change("evt-1", before, after)
+
+    assert snapshot_repo.event_increments == [("evt-1", {"gender": {"unknown": -1, "female": 1}})]
+    assert snapshot_repo.global_increments == [{"gender": {"unknown": -1, "female": 1}}]
+
+
+def test_apply_change_without_baseline_enqueues_rebuild_instead_of_incrementing():
+    job_repo = _JobRepo()
+    snapshot_repo = _SnapshotRepo(global_current=dict(_SEEDED))
+    service = _counter_service(snapshot_repo, job_repo=job_repo)
+
+    service.apply_participant_change("evt-new", {}, {"name": "Luca", "payment_method": "omaggio"})
+
+    assert snapshot_repo.event_increments == []
+    job = job_repo.docs["analytics_rebuild__event__evt-new"]
+    assert job["scope"] == "event"
+    assert job["target_event_id"] == "evt-new"
+    assert snapshot_repo.global_increments[0]["omaggi"] == 1
+
+
+def test_event_snapshot_projection_matches_rebuild_kpis():
+    participants = [
+        SimpleNamespace(gender="male", payment_method="website", membership_id="m-1", created_at="2026-03-01T20:00:00+00:00"),
+        SimpleNamespace(gender="female", payment_method="omaggio", membership_id=None, created_at="2026-03-02T20:00:00+00:00"),
+    ]
+    purchases = [
+        SimpleNamespace(
+            id="p-1",
+            purchase_type="event",
+            ref_id="evt-1",
+            status="COMPLETED",
+            capture_status="COMPLETED",
+            participants_count=2,
+            amount_total="40.00",
+            net_amount="37.00",
+            timestamp="2026-03-01T20:00:00+00:00",
+        )
+    ]
+    event = SimpleNamespace(id="evt-1", title="Party", date="21-03-2026", start_time="23:00", max_participants=10)
+
+    class _Events:
+        def get_model(self, _event_id):
+            return event
+
+    class _Participants:
+        def stream_rows(self, _event_id):
+            return iter(participants)
+
+    class _Purchases:
+        def stream_rows(self, _event_id=None):
+            return iter(purchases)
+
+    class _Scans:
+        def get_flow_minutes(self, _event_id):
+            return {}
+
+    snapshot_repo = _SnapshotRepo()
+    service = AnalyticsSnapshotService(
+        event_repository=_Events(),
+        membership_repository=_DummyRepo(),
+        purchase_repository=_Purchases(),
+        participant_repository=_Participants(),
+        message_repository=_DummyRepo(),
+        job_repository=_JobRepo(),
+        entrance_scan_repository=_Scans(),
+        analytics_snapshot_repository=snapshot_repo,
+    )
+
+    rebuilt = service.rebuild_event_snapshot("evt-1")
+    projected = service.get_event_snapshot("evt-1")
+
+    assert "counters" not in projected
+    assert projected["kpis"] == rebuilt["kpis"]
+    for chart in ("sales_over_time", "event_funnel", "gender_distribution", "membership_trend"):
+        assert projected["charts"][chart] == rebuilt["charts"][chart]
+
+
+def test_rebuild_all_reads_sources_once_and_batches_event_snapshots():
+    events = [
+        SimpleNamespace(id="evt-1", title="Party", date="21-03-2026", start_time="23:00", max_participants=10),
+        SimpleNamespace(id="evt-2", title="Closing", date="28-03-2026", start_time="23:00", max_participants=5),
+    ]
+    participants = [
+        SimpleNamespace(event_id="evt-1", gender="male", payment_method="website", membership_id="m-1",
+                        created_at="2026-03-01T20:00:00+00:00"),
+        SimpleNamespace(event_id="evt-2", gender="female", payment_method="omaggio", membership_id=None,
+                        created_at="2026-03-02T20:00:00+00:00"),
+        SimpleNamespace(event_id="evt-deleted", gender="male", payment_method="website", membership_id="m-2",
+                        created_at="2026-02-01T20:00:00+00:00"),
+    ]
+    purchases = [
+        SimpleNamespace(id="p-1", purchase_type="event", ref_id="evt-1", status="COMPLETED",
+                        capture_status="COMPLETED", participants_count=1, amount_total="20.00",
+                        net_amount="18.50", timestamp="2026-03-01T20:00:00+00:00"),
+    ]
+    scans = [("evt-1", SimpleNamespace(scanned_at="2026-03-21T22:10:00+00:00"))]
+    calls = []
+
+    class _Source:
+        def __init__(self, name, rows):
+            self.name = name
+            self.rows = rows
+
+        def _read(self):
+            calls.append(self.name)
+            return iter(self.rows)
+
+        stream_models = stream = stream_all = lambda self: self._read()
+
+        def get_model(self, event_id):
+            return next(event for event in events if event.id == event_id)
+
+        def stream_rows(self, event_id=None):
+            return [
+                row for row in self.rows
+                if event_id in (getattr(row, "event_id", None), getattr(row, "ref_id", None))
+            ]
+
+    class _Scans(_Source):
+        def get_flow_minutes(self, event_id):
+            return {
+                datetime.fromisoformat(scan.scanned_at): 1
+                for scan_event_id, scan in self.rows
+                if scan_event_id == event_id
+            }
+
+    class _BatchSnapshotRepo(_SnapshotRepo):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+            self.dashboard = None
+
+        def set_event_snapshots(self, snapshots):
+            self.batches.append(sorted(snapshots))
+            self.event_snapshots.update(snapshots)
+
+        def set_dashboard_current(self, payload):
+            self.dashboard = payload
+
+        def set_attendance_index(self, payload):
+            self.attendance = payload
+
+    snapshot_repo = _BatchSnapshotRepo()
+    service = AnalyticsSnapshotService(
+        event_repository=_Source("events", events),
+        membership_repository=_Source("memberships", []),
+        purchase_repository=_Source("purchases", purchases),
+        participant_repository=_Source("participants", participants),
+        message_repository=_Source("messages", []),
+        job_repository=_JobRepo(),
+        entrance_scan_repository=_Scans("scans", scans),
+        analytics_snapshot_repository=snapshot_repo,
+    )
+
+    result = service.rebuild_all_snapshots()
+
+    assert result == {"ok": True, "events_rebuilt": 2}
+    assert sorted(calls) == ["events", "memberships", "messages", "participants", "purchases", "scans"]
+    assert snapshot_repo.batches == [["evt-1", "evt-2"]]
+    assert snapshot_repo.event_snapshots["evt-1"]["kpis"]["entered"] == 1
+    assert snapshot_repo.event_snapshots["evt-2"]["kpis"]["omaggi"] == 1
+    assert snapshot_repo.global_current["kpis"]["omaggi_total"] == 1
+    assert snapshot_repo.dashboard["kpis"]["total_revenue_net"] == 18.5
+    assert snapshot_repo.dashboard["global_cards"]["omaggi_total"] == 1
+
+    batched = snapshot_repo.event_snapshots["evt-1"]
+    single = service.rebuild_event_snapshot("evt-1")
+    assert batched["kpis"] == single["kpis"]
+    assert batched["charts"] == single["charts"]
+    assert batched["counters"] == single["counters"]
+    matrix = AttendanceMatrix.from_payload(snapshot_repo.attendance)
+    assert matrix.attended("m-1", "evt-1")
+    assert matrix.events == ["evt-1", "evt-2"]
+    assert set(matrix.rows) == {"m-1"}
+
+
+class _AttendanceRepo(_SnapshotRepo):
+    def __init__(self, attendance=None, **kwargs):
+        super().__init__(**kwargs)
+        self.attendance = attendance
+
+    def get_attendance_index(self):
+        return self.attendance
+
+    def update_attendance_index(self, mutate):
+        updated = mutate(self.attendance)
+        if updated is None:
+            return False
+        self.attendance = updated
+        return True
+
+
+def _attendance_payload():
+    events = [(f"evt-{index}", date(2026, 1, index)) for index in range(1, 6)]
+    return AttendanceMatrix.build(
+        events,
+        {"m-loyal": ["evt-1", "evt-2", "evt-3", "evt-4", "evt-5"], "m-back": ["evt-2", "evt-5"]},
+    ).to_payload()
+
+
+def test_audience_retention_reads_attendance_index_and_live_participant_counter():
+    snapshot_repo = _AttendanceRepo(
+        attendance=_attendance_payload(),
+        event_snapshots={"evt-5": {"kpis": {"participants": 3}, "counters": {"participants": 4}, "counters_since": "x"}},
+    )
+    service = _counter_service(snapshot_repo)
+
+    retention = service.get_audience_retention("evt-5")
+
+    assert retention == {"total": 4, "first_time": 2, "second_third": 1, "four_plus": 1}
+    assert service.get_audience_retention("evt-unknown") is None
+
+
+def test_participant_membership_change_enqueues_attendance_sync_after_counters():
+    snapshot_repo = _AttendanceRepo(
+        attendance=_attendance_payload(),
+        event_snapshots={"evt-1": dict(_SEEDED)},
+        global_current=dict(_SEEDED),
+    )
+    job_repo = _JobRepo()
+    service = _counter_service(snapshot_repo, job_repo)
+    attendance = snapshot_repo.attendance
+
+    result = service.apply_participant_change("evt-1", {}, {"name": "Nuovo", "membershipId": "m-new"})
+
+    # I contatori sono applicati nel trigger; la matrice presenze resta al job attendance.
+    assert snapshot_repo.event_increments[0][0] == "evt-1"
+    assert snapshot_repo.attendance is attendance
+    assert [(rebuild["scope"], rebuild["event_id"]) for rebuild in result["rebuilds"]] == [("attendance", "evt-1")]
+    assert job_repo.docs["analytics_rebuild__attendance__evt-1"]["status"] == "scheduled"
+    assert "analytics_rebuild__event__evt-1" not in job_repo.docs
+
+
+def test_attendance_job_reads_only_membership_ids_and_does_not_chain_global():
+    event = SimpleNamespace(id="evt-2", date="02-01-2026")
+    reads = []
+
+    class _Events:
+        def get_model(self, _event_id):
+            return event
+
+    class _Participants:
+        def stream_membership_ids(self, event_id):
+            reads.append(event_id)
+            return iter(["m-new"])
+
+    snapshot_repo = _AttendanceRepo(attendance=_attendance_payload())
+    job_repo = _JobRepo()
+    service = _job_service(
+        job_repo,
+        event_repository=_Events(),
+        participant_repository=_Participants(),
+        analytics_snapshot_repository=snapshot_repo,
+    )
+    job_id = service.enqueue_attendance_sync("evt-2")["job_id"]
+    job_repo.docs[job_id]["status"] = "queued"
+
+    service.process_rebuild_job(job_id)
+
+    matrix = AttendanceMatrix.from_payload(snapshot_repo.attendance)
+    assert reads == ["evt-2"]
+    assert matrix.attended("m-new", "evt-2") and not matrix.attended("m-back", "evt-2")
+    assert job_repo.docs[job_id]["status"] == "completed"
+    assert set(job_repo.docs) == {job_id}
+
+
+def test_participant_change_without_membership_change_skips_rebuild():
+    snapshot_repo = _AttendanceRepo(event_snapshots={"evt-1": dict(_SEEDED)}, global_current=dict(_SEEDED))
+    job_repo = _JobRepo()
+    service = _counter_service(snapshot_repo, job_repo)
+
+    result = service.apply_participant_change("evt-1", {"name": "A"}, {"name": "A", "gender": "female"})
+
+    assert result["rebuilds"] == []
+    assert job_repo.docs == {}
+
+
+def test_event_rebuild_rewrites_event_attendance_column():
+    event = SimpleNamespace(id="evt-2", title="Party", date="02-01-2026", start_time="23:00", max_participants=10)
+    rows = [
+        SimpleNamespace(gender="male", payment_method="website", membership_id="m-new", created_at=None),
+        SimpleNamespace(gender="female", payment_method="website", membership_id=None, created_at=None),
+    ]
+
+    class _Events:
+        def get_model(self, _event_id):
+            return event
+
+    class _Participants:
+        def stream_rows(self, _event_id):
+            return iter(rows)
+
+    class _Purchases:
+        def stream_rows(self, _event_id=None):
+            return iter(())
+
+    class _Scans:
+        def get_flow_minutes(self, _event_id):
+            return {}
+
+    snapshot_repo = _AttendanceRepo(attendance=_attendance_payload())
+    service = AnalyticsSnapshotService(
+        event_repository=_Events(),
+        membership_repository=_DummyRepo(),
+        purchase_repository=_Purchases(),
+        participant_repository=_Participants(),
+        message_repository=_DummyRepo(),
+        job_repository=_JobRepo(),
+        entrance_scan_repository=_Scans(),
+        analytics_snapshot_repository=snapshot_repo,
+    )
+
+    service.rebuild_event_snapshot("evt-2")
+
+    matrix = AttendanceMatrix.from_payload(snapshot_repo.attendance)
+    assert matrix.attended("m-new", "evt-2")
+    assert not matrix.attended("m-back", "evt-2")
+    assert matrix.attended("m-back", "evt-5")
+    assert matrix.attended("m-loyal", "evt-1")
+
+
+def test_event_rebuild_without_attendance_index_keeps_it_unbuilt():
+    snapshot_repo = _AttendanceRepo()
+    service = _counter_service(snapshot_repo)
+
+    assert service._sync_event_attendance("evt-1", None, {"m-new"}) is False
+    assert snapshot_repo.attendance is None
@@ -67,3 +67,24 @@ def test_create_ticket_document_success(monkeypatch):
     doc = service.create_ticket_document({"name": "Mario"}, {"title": "Event"}, "tickets/test.pdf")
     assert doc.storage_path == "tickets/test.pdf"
     assert doc.public_url
+
+
+def test_create_ticket_documents_renders_once_and_uploads_each(monkeypatch):
+    """Renders the whole batch in one call and stores each PDF at its own path."""
+    service = _make_service()
+    calls = []
+
+    def _fake_generate(payloads, event_data, logo_path):
+        calls.append([payload["name"] for payload in payloads])
+        return [BytesIO(f"pdf-{payload['name']}".encode()) for payload in payloads]
+
+    monkeypatch.setattr("services.events.documents_service.generate_ticket_pdfs", _fake_generate)
+
+    docs = service.create_ticket_documents(
+        [({"name": "Anna"}, "tickets/a.pdf"), ({"name": "Bruno"}, "tickets/b.pdf")],
+        {"title": "Event"},
+    )
+
+    assert calls == [["Anna", "Bruno"]]
+    assert [doc.storage_path for doc in docs] == ["tickets/a.pdf", "tickets/b.pdf"]
+    assert service.storage.blobs["tickets/b.pdf"].uploads == [(b"pdf-Bruno", "application/pdf")]
@@ -0,0 +1,348 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from dto.entrance_api import (
+    AdminLiveStatsQueryDTO,
+    LiveStatsQueryDTO,
+    OfflineScanDTO,
+    ScannerManifestQueryDTO,
+    SyncOfflineScansRequestDTO,
+    ValidateEntryBatchRequestDTO,
+)
+from models import EntranceScan, EventParticipant, Membership
+from models.scan_token import ScanToken
+from services.entrance_service import EntranceService
+
+
+class _ScanTokenRepo:
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def get(self, token):
+        return self.tokens.get(token)
+
+
+class _EventRepo:
+    def get_model(self, event_id):
+        return SimpleNamespace(id=event_id, title="Closing Party")
+
+
+class _MembershipRepo:
+    def __init__(self, memberships):
+        self.memberships = {membership.id: membership for membership in memberships}
+        self.get_many_calls = []
+
+    def get_many(self, membership_ids):
+        self.get_many_calls.append(list(membership_ids))
+        return [self.memberships[mid] for mid in membership_ids if mid in self.memberships]
+
+
+class _ParticipantRepo:
+    def __init__(self, participants):
+        self.participants = participants
+        self.entered = []
+        self.list_calls = 0
+
+    def list(self, _event_id):
+        self.list_calls += 1
+        return list(self.participants)
+
+    def list_event_ids_by_membership(self, membership_id):
+        return ["evt-1"] if any(p.membership_id == membership_id for p in self.participants) else []
+
+    def list_by_membership_ids(self, _event_id, membership_ids):
+        return [p for p in self.participants if p.membership_id in set(membership_ids)]
+
+    def update_entered_many(self, _event_id, participant_ids, entered):
+        self.entered.extend((participant_id, entered) for participant_id in participant_ids)
+
+    def count(self, _event_id):
+        return len(self.participants)
+
+
+class _ScanRepo:
+    def __init__(self, scans=None):
+        self.scans = dict(scans or {})
+        self.create_scans_calls = 0
+        self.version = 0
+
+    def list(self, _event_id):
+        return list(self.scans.values())
+
+    def get_entry_state(self, _event_id):
+        return {"version": self.version, "entered_count": len(self.scans)}
+
+    def bump_versions(self, event_ids):
+        self.version += len(list(event_ids))
+
+    def create_scans(self, _event_id, scan_token, entries):
+        self.create_scans_calls += 1
+        existing = {}
+        for membership_id, scanned_at in entries.items():
+            if membership_id in self.scans:
+                existing[membership_id] = self.scans[membership_id]
+                continue
+            self.scans[membership_id] = EntranceScan(id=membership_id, scanned_at=scanned_at, scan_token=scan_token)
+            self.version += 1
+        return existing
+
+    def count(self, _event_id):
+        return len(self.scans)
+
+
+def _service(scans=None):
+    token = ScanToken(
+        id="tok-1",
+        event_id="evt-1",
+        is_active=True,
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+    )
+    memberships = [
+        Membership(id="m-valid", name="Anna", subscription_valid=True),
+        Membership(id="m-expired", name="Bruno", subscription_valid=False),
+        Membership(id="m-no-ticket", name="Carla", subscription_valid=True),
+    ]
+    participants = [
+        EventParticipant(id="p-1", name="Anna", surname="Rossi", membership_id="m-valid"),
+        EventParticipant(id="p-2", name="Bruno", surname="Neri", membership_id="m-expired"),
+        EventParticipant(id="p-3", name="Dario", surname="Blu", membership_id=None),
+    ]
+    membership_repo = _MembershipRepo(memberships)
+    participant_repo = _ParticipantRepo(participants)
+    scan_repo = _ScanRepo(scans)
+    service = EntranceService(
+        event_repository=_EventRepo(),
+        scan_token_repository=_ScanTokenRepo({"tok-1": token}),
+        entrance_scan_repository=scan_repo,
+        participant_repository=participant_repo,
+        membership_repository=membership_repo,
+    )
+    return service, membership_repo, participant_repo, scan_repo
+
+
+def test_manifest_lists_event_members_and_scanned_set():
+    service, membership_repo, _, _ = _service(scans={"m-valid": EntranceScan(id="m-valid")})
+
+    payload = service.get_scanner_manifest(ScannerManifestQueryDTO(token="tok-1")).to_payload()
+
+    assert payload["valid"] is True
+    assert payload["event_title"] == "Closing Party"
+    assert payload["members"] == [
+        {"membership_id": "m-expired", "name": "Bruno", "surname": "Neri", "valid": False},
+        {"membership_id": "m-valid", "name": "Anna", "surname": "Rossi", "valid": True},
+    ]
+    assert payload["scanned"] == ["m-valid"]
+    assert payload["entered_count"] == 1
+    assert len(membership_repo.get_many_calls) == 1
+
+
+def test_manifest_with_current_version_returns_only_counters():
+    service, membership_repo, participant_repo, _ = _service()
+    first = service.get_scanner_manifest(ScannerManifestQueryDTO(token="tok-1")).to_payload()
+
+    second = service.get_scanner_manifest(
+        ScannerManifestQueryDTO(token="tok-1", version=first["version"])
+    ).to_payload()
+
+    assert second["unchanged"] is True
+    assert second["version"] == first["version"]
+    assert "members" not in second
+    # Versione confrontata prima di listare: nessuna lettura di partecipanti o tessere.
+    assert participant_repo.list_calls == 1
+    assert len(membership_repo.get_many_calls) == 1
+
+
+def test_manifest_version_changes_after_a_scan():
+    service, _, _, scan_repo = _service()
+    first = service.get_scanner_manifest(ScannerManifestQueryDTO(token="tok-1")).to_payload()
+    scan_repo.create_scans("evt-1", "tok-1", {"m-valid": None})
+
+    second = service.get_scanner_manifest(
+        ScannerManifestQueryDTO(token="tok-1", version=first["version"])
+    ).to_payload()
+
+    assert second["version"] != first["version"]
+    assert second["scanned"] == ["m-valid"]
+
+
+def test_manifest_version_changes_when_linked_membership_validity_changes():
+    service, membership_repo, _, _ = _service()
+    first = service.get_scanner_manifest(ScannerManifestQueryDTO(token="tok-1")).to_payload()
+    membership_repo.memberships["m-valid"].subscription_valid = False
+
+    assert service.apply_membership_change("m-valid", {"subscription_valid": True}, {"subscription_valid": False}) == 1
+    second = service.get_scanner_manifest(
+        ScannerManifestQueryDTO(token="tok-1", version=first["version"])
+    ).to_payload()
+
+    assert second.get("unchanged") is not True
+    assert {member["membership_id"]: member["valid"] for member in second["members"]}["m-valid"] is False
+
+
+def test_manifest_version_ignores_unrelated_membership_and_participant_writes():
+    service, _, _, scan_repo = _service()
+
+    assert service.apply_membership_change("m-valid", {"subscription_valid": True, "phone": "1"},
+                                           {"subscription_valid": True, "phone": "2"}) == 0
+    assert service.apply_membership_change("m-no-ticket", {"subscription_valid": True},
+                                           {"subscription_valid": False}) == 0
+    assert service.apply_participant_change("evt-1", {"name": "Anna", "gender": None},
+                                            {"name": "Anna", "gender": "female"}) is False
+    assert scan_repo.version == 0
+
+    assert service.apply_participant_change("evt-1", {"name": "Anna"}, {"name": "Annalisa"}) is True
+    assert scan_repo.version == 1
+
+
+def test_manifest_rejects_unknown_token():
+    service, _, _, _ = _service()
+
+    payload = service.get_scanner_manifest(ScannerManifestQueryDTO(token="nope")).to_payload()
+
+    assert payload == {"valid": False, "reason": "not_found"}
+
+
+def test_sync_offline_scans_resolves_each_upload():
+    earlier = datetime(2026, 5, 1, 22, 15, tzinfo=timezone.utc)
+    later = earlier + timedelta(minutes=5)
+    service, _, participant_repo, scan_repo = _service()
+
+    payload = service.sync_offline_scans(
+        SyncOfflineScansRequestDTO(
+            scan_token="tok-1",
+            scans=[
+                OfflineScanDTO(membership_id="m-valid", scanned_at=later),
+                OfflineScanDTO(membership_id="m-valid", scanned_at=earlier),
+                OfflineScanDTO(membership_id="m-expired", scanned_at=earlier),
+                OfflineScanDTO(membership_id="m-no-ticket", scanned_at=earlier),
+                OfflineScanDTO(membership_id="m-ghost", scanned_at=earlier),
+            ],
+        )
+    ).to_payload()
+
+    results = {row["membership_id"]: row for row in payload["results"]}
+    assert results["m-valid"]["result"] == "valid"
+    assert results["m-valid"]["scanned_at"] == earlier.isoformat()
+    assert scan_repo.scans["m-valid"].scanned_at == earlier
+    assert results["m-expired"]["result"] == "invalid_membership"
+    assert results["m-no-ticket"]["result"] == "invalid_no_purchase"
+    assert results["m-ghost"]["result"] == "invalid_member_not_found"
+    assert participant_repo.entered == [("p-1", True)]
+    assert payload["entered_count"] == 1
+
+
+def test_sync_offline_scans_keeps_first_persisted_scan_on_conflict():
+    server_time = datetime(2026, 5, 1, 22, 0, tzinfo=timezone.utc)
+    service, _, participant_repo, _ = _service(
+        scans={"m-valid": EntranceScan(id="m-valid", scanned_at=server_time)}
+    )
+
+    payload = service.sync_offline_scans(
+        SyncOfflineScansRequestDTO(
+            scan_token="tok-1",
+            scans=[OfflineScanDTO(membership_id="m-valid", scanned_at=server_time + timedelta(minutes=3))],
+        )
+    ).to_payload()
+
+    assert payload["results"] == [
+        {
+            "membership_id": "m-valid",
+            "result": "already_scanned",
+            "membership": {"name": "Anna", "surname": "Rossi"},
+            "scanned_at": server_time.isoformat(),
+        }
+    ]
+    assert participant_repo.entered == []
+
+
+def test_validate_entries_checks_token_once_and_writes_in_one_call():
+    service, membership_repo, participant_repo, scan_repo = _service(
+        scans={"m-valid": EntranceScan(id="m-valid", scanned_at=datetime(2026, 5, 1, 22, 0, tzinfo=timezone.utc))}
+    )
+    participant_repo.participants.append(
+        EventParticipant(id="p-4", name="Carla", surname="Verdi", membership_id="m-no-ticket")
+    )
+
+    payload = service.validate_entries(
+        ValidateEntryBatchRequestDTO(scan_token="tok-1", membership_ids=["m-no-ticket", "m-valid", "m-expired"])
+    ).to_payload()
+
+    assert [row["result"] for row in payload["results"]] == ["valid", "already_scanned", "invalid_membership"]
+    assert payload["results"][0]["membership"] == {"name": "Carla", "surname": "Verdi"}
+    assert payload["results"][0]["scanned_at"] is None
+    assert scan_repo.create_scans_calls == 1
+    assert len(membership_repo.get_many_calls) == 1
+    assert participant_repo.entered == [("p-4", True)]
+    assert payload["entered_count"] == 2
+
+
+def test_validate_entries_rejects_inactive_token():
+    service, _, _, scan_repo = _service()
+    service.scan_token_repository.tokens["tok-1"].is_active = False
+
+    payload = service.validate_entries(
+        ValidateEntryBatchRequestDTO(scan_token="tok-1", membership_ids=["m-valid"])
+    ).to_payload()
+
+    assert payload == {"result": "invalid_token", "results": []}
+    assert scan_repo.create_scans_calls == 0
+
+
+class _LiveScanRepo(_ScanRepo):
+    def __init__(self, state, changed_state=None):
+        super().__init__()
+        self.state = state
+        self.changed_state = changed_state
+        self.waits = []
+
+    def get_live_state(self, _event_id):
+        return self.state
+
+    def wait_live_state(self, _event_id, version, timeout):
+        self.waits.append((version, timeout))
+        return self.changed_state
+
+
+def _live_service(scan_repo):
+    service, _, _, _ = _service()
+    service.entrance_scan_repository = scan_repo
+    return service
+
+
+def test_live_stats_without_cursor_returns_snapshot_and_flow_buckets():
+    state = {
+        "version": 4,
+        "entered_count": 3,
+        "flow_minutes": {
+            datetime(2026, 3, 21, 22, 1, tzinfo=timezone.utc): 1,
+            datetime(2026, 3, 21, 22, 14, tzinfo=timezone.utc): 1,
+            datetime(2026, 3, 21, 22, 15, tzinfo=timezone.utc): 1,
+        },
+    }
+    service = _live_service(_LiveScanRepo(state))
+
+    payload = service.get_live_stats(LiveStatsQueryDTO(token="tok-1")).to_payload()
+
+    assert payload["cursor"] == 4
+    assert payload["changed"] is True
+    assert payload["participants_count"] == 3
+    assert payload["entered_count"] == 3
+    assert [bucket["count"] for bucket in payload["flow"]] == [2, 1]
+
+
+def test_live_stats_long_poll_times_out_without_reading_counts():
+    scan_repo = _LiveScanRepo(state=None, changed_state=None)
+    service = _live_service(scan_repo)
+
+    payload = service.get_admin_live_stats(AdminLiveStatsQueryDTO(event_id="evt-1", cursor=7, wait=5)).to_payload()
+
+    assert scan_repo.waits == [(7, 5)]
+    assert payload == {"valid": True, "event_id": "evt-1", "cursor": 7, "changed": False}
+
+
+def test_live_stats_rejects_unknown_token():
+    service = _live_service(_LiveScanRepo(state=None))
+
+    payload = service.get_live_stats(LiveStatsQueryDTO(token="missing")).to_payload()
+
+    assert payload == {"valid": False, "reason": "not_found"}
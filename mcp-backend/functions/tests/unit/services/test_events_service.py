@@ -149,6 +149,23 @@ def test_get_all_events_sets_participants_count():
     assert payload[1].participants_count == 1
 
 
+def test_get_all_events_uses_seeded_counter_from_event_doc():
+    service = _make_service()
+    event = Event(title="A", date="13-02-2026", participants_count=12, participants_count_seeded_at="2026-01-01")
+    event.id = "evt-1"
+    service.event_repository._stream = [event]
+
+    class _NoCountRepo:
+        def count(self, _event_id):
+            raise AssertionError("seeded counters must not be re-read")
+
+    service.participant_repository = _NoCountRepo()
+
+    payload = service.get_all_events()
+
+    assert payload[0].participants_count == 12
+
+
 def test_get_event_by_id_uses_slug():
     service = _make_service()
     event = Event(title="Slugged", date="13-02-2026")
@@ -159,6 +176,23 @@ def test_get_event_by_id_uses_slug():
     assert payload.event.title == "Slugged"
 
 
+def test_get_event_by_id_uses_seeded_counter_from_event_doc():
+    service = _make_service()
+    event = Event(title="A", date="13-02-2026", participants_count=12, participants_count_seeded_at="2026-01-01")
+    event.id = "evt-1"
+    service.event_repository.models["evt-1"] = event
+
+    class _NoCountRepo:
+        def count(self, _event_id):
+            raise AssertionError("seeded counters must not be re-read")
+
+    service.participant_repository = _NoCountRepo()
+
+    payload = service.get_event_by_id(event_id="evt-1")
+
+    assert payload.event.participants_count == 12
+
+
 def test_list_public_events_respects_view():
     service = _make_service()
     event = Event(title="Public", date="13-02-2026")
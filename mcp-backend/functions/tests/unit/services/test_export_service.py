@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from dto.export_api import ExportQueryDTO, MembershipExportQueryDTO, ParticipantExportQueryDTO
+from errors.service_errors import ValidationError
+from models import EventParticipant, Membership
+from services.core.export_service import ExportService
+from utils.streaming_export import CSV_BOM
+
+
+class _ParticipantRepo:
+    def __init__(self, participants):
+        self.participants = participants
+        self.streamed = []
+
+    def stream(self, event_id):
+        self.streamed.append(event_id)
+        yield from self.participants
+
+
+class _MembershipRepo:
+    def __init__(self, memberships):
+        self.memberships = memberships
+        self.years = []
+
+    def stream(self):
+        yield from self.memberships
+
+    def stream_by_year(self, year):
+        self.years.append(year)
+        yield from (m for m in self.memberships if year in m.membership_years)
+
+
+class _PurchaseRepo:
+    def stream_models(self):
+        return iter([])
+
+
+def _service(participants=(), memberships=()):
+    return ExportService(
+        participant_repository=_ParticipantRepo(list(participants)),
+        membership_repository=_MembershipRepo(list(memberships)),
+        purchase_repository=_PurchaseRepo(),
+    )
+
+
+def test_export_participants_streams_requested_columns_as_csv():
+    service = _service(participants=[
+        EventParticipant(id="p1", name="Anna", surname="Verdi", membership_id="m1"),
+        EventParticipant(id="p2", name="Luca", surname="Neri"),
+    ])
+
+    export = service.export_participants(
+        ParticipantExportQueryDTO.model_validate({"event_id": "ev1", "columns": "id,surname,membershipId"})
+    )
+
+    assert service.participant_repository.streamed == []
+    body = "".join(export.chunks)
+    assert body.removeprefix(CSV_BOM).splitlines() == ["id,surname,membershipId", "p1,Verdi,m1", "p2,Neri,"]
+    assert export.filename.startswith("partecipanti_ev1_") and export.filename.endswith(".csv")
+    assert export.mimetype.startswith("text/csv")
+
+
+def test_export_memberships_by_year_as_ndjson():
+    service = _service(memberships=[
+        Membership(id="m1", name="Anna", membership_years=[2025, 2026]),
+        Membership(id="m2", name="Luca", membership_years=[2025]),
+    ])
+
+    export = service.export_memberships(
+        MembershipExportQueryDTO.model_validate({"year": "2026", "format": "NDJSON", "columns": "id,name"})
+    )
+
+    assert [json.loads(line) for line in "".join(export.chunks).splitlines()] == [{"id": "m1", "name": "Anna"}]
+    assert service.membership_repository.years == [2026]
+
+
+def test_export_rejects_unknown_columns_before_streaming():
+    with pytest.raises(ValidationError):
+        _service().export_purchases(ExportQueryDTO(columns=["id", "card_number"]))
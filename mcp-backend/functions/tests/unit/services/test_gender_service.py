@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+
+from clients.genderize_client import GenderizeApiResult
+from models import EventParticipant, GenderGuess
+from services.core.gender_service import GenderService, normalize_name
+
+
+class _GenderCache:
+    def __init__(self, guesses=()):
+        self.guesses = {guess.id: guess for guess in guesses}
+        self.reads = []
+        self.writes = []
+
+    def get_many(self, names):
+        self.reads.append(list(names))
+        return [self.guesses[name] for name in names if name in self.guesses]
+
+    def set_many(self, guesses):
+        guesses = list(guesses)
+        self.writes.append([guess.id for guess in guesses])
+        self.guesses.update({guess.id: guess for guess in guesses})
+
+
+class _Genderize:
+    def __init__(self, genders=None, fail=False):
+        self.genders = genders or {}
+        self.fail = fail
+        self.calls = []
+
+    def lookup(self, names):
+        self.calls.append(list(names))
+        if self.fail:
+            return GenderizeApiResult(status_code=429, error_message="quota")
+        return GenderizeApiResult(
+            status_code=200,
+            payload=[
+                {"name": name, "gender": self.genders.get(name), "probability": 0.93 if name in self.genders else 0.0}
+                for name in names
+            ],
+        )
+
+
+class _Participants:
+    def __init__(self, participants):
+        self.participants = participants
+        self.updates = []
+
+    def stream_all(self):
+        return iter(self.participants)
+
+    def update_gender_many(self, updates):
+        self.updates.extend(updates)
+        return len(updates)
+
+
+def _service(cache=None, genderize=None, participants=None):
+    return GenderService(
+        gender_cache_repository=cache or _GenderCache(),
+        participant_repository=participants or _Participants([]),
+        genderize=genderize or _Genderize(),
+    )
+
+
+def test_normalize_name_keeps_first_token_and_rejects_invalid_ids():
+    assert normalize_name("  Maria Chiara ") == "maria"
+    assert normalize_name("a/b") == ""
+    assert normalize_name("__id__") == ""
+    assert normalize_name(None) == ""
+
+
+def test_lookup_reads_memory_then_firestore_then_provider_in_batches_of_ten():
+    cache = _GenderCache([GenderGuess(id="giulia", gender="female", probability=0.98)])
+    names = ["Giulia"] + [f"nome{index}" for index in range(12)]
+    genderize = _Genderize({"nome0": "male"})
+    service = _service(cache, genderize)
+
+    guesses = service.lookup_many(names)
+
+    assert guesses["giulia"].gender == "female"
+    assert guesses["nome0"].gender == "male"
+    assert guesses["nome5"].gender == "N/A"
+    assert [len(call) for call in genderize.calls] == [10, 2]
+    assert cache.writes == [[f"nome{index}" for index in range(12)]]
+
+    # Seconda lookup: tutto dalla memoria dell'istanza, nessuna lettura Firestore ne' chiamata esterna.
+    service.lookup_many(names)
+    assert len(cache.reads) == 1
+    assert len(genderize.calls) == 2
+
+
+def test_provider_errors_are_not_cached():
+    cache = _GenderCache()
+    genderize = _Genderize(fail=True)
+    service = _service(cache, genderize)
+
+    assert service.lookup("Mario").gender == "N/A"
+    assert service.lookup("Mario").gender == "N/A"
+    assert len(genderize.calls) == 2
+    assert cache.writes == []
+
+
+def test_overrides_skip_cache_and_provider():
+    cache = _GenderCache()
+    genderize = _Genderize()
+
+    guess = _service(cache, genderize).lookup("Andrea Rossi")
+
+    assert (guess.gender, guess.probability) == ("male", 1.0)
+    assert cache.reads == [] and genderize.calls == []
+
+
+def test_lookup_many_ignores_overrides_by_default():
+    genderize = _Genderize({"andrea": "female"})
+
+    guesses = _service(_GenderCache(), genderize).lookup_many(["Andrea"])
+
+    assert guesses["andrea"].gender == "female"
+    assert genderize.calls == [["andrea"]]
+
+
+def test_backfill_updates_only_participants_without_gender():
+    participants = _Participants([
+        EventParticipant(id="p-1", event_id="evt-1", name="Luca"),
+        EventParticipant(id="p-2", event_id="evt-1", name="Sara", gender="female", gender_probability=0.9),
+        EventParticipant(id="p-3", event_id="evt-2", name="Luca Bianchi", gender="N/A"),
+        EventParticipant(id="p-4", event_id="evt-2", name=""),
+    ])
+    genderize = _Genderize({"luca": "male"})
+    service = _service(genderize=genderize, participants=participants)
+
+    stats = service.backfill_participants()
+
+    assert stats == {"scanned": 4, "candidates": 2, "updated": 2}
+    assert participants.updates == [("evt-1", "p-1", "male", 0.9), ("evt-2", "p-3", "male", 0.9)]
+    assert genderize.calls == [["luca"]]
+
+
+def test_backfill_dry_run_does_not_write():
+    participants = _Participants([SimpleNamespace(id="p-1", event_id="evt-1", name="Luca", gender=None,
+                                                  gender_probability=None)])
+    service = _service(genderize=_Genderize({"luca": "male"}), participants=participants)
+
+    assert service.backfill_participants(dry_run=True)["updated"] == 1
+    assert participants.updates == []
@@ -17,13 +17,23 @@ class _ParticipantRepo:
     def __init__(self, participants):
         self.participants = participants
         self.updated = []
+        self.location_batches = []
 
     def stream(self, event_id):
         return iter(self.participants)
 
+    def list_page(self, event_id, after_id=None, limit=300):
+        ordered = sorted(self.participants, key=lambda participant: participant.id)
+        if after_id:
+            ordered = [participant for participant in ordered if participant.id > after_id]
+        return ordered[:limit]
+
     def update_from_model(self, event_id, participant_id, participant):
         self.updated.append((event_id, participant_id, participant))
 
+    def mark_location_sent_many(self, event_id, participant_ids, job_id=None):
+        self.location_batches.append((event_id, list(participant_ids), job_id))
+
 
 class _LocationJobRepo:
     def __init__(self, job=None):
@@ -44,11 +54,23 @@ class _LocationJobRepo:
 
     def update(self, job_id, payload):
         self.updates.append((job_id, payload))
+        if self.job is not None:
+            for key, value in payload.items():
+                if hasattr(self.job, key):
+                    setattr(self.job, key, value)
 
     def stream_raw_by_type(self, job_type):
         return iter(self.raw_jobs)
 
 
+class _LocationRepo:
+    def get(self, event_id):
+        return None
+
+    def merge_address(self, event_id, address, link):
+        pass
+
+
 class _MailService:
     def send(self, email):
         return True
@@ -149,9 +171,127 @@ def test_worker_send_location_processes_location_job(monkeypatch):
 
     service._worker_send_location("location-job-1")
 
-    assert participant_repo.updated[0][0] == "event-1"
-    assert participant_repo.updated[0][1] == "p1"
-    assert participant_repo.updated[0][2].location_job_id == "location-job-1"
+    assert participant_repo.location_batches == [("event-1", ["p1"], "location-job-1")]
+    assert participant_repo.updated == []
     assert any(update[0] == "location-job-1" and update[1].get("status") == "completed" for update in job_repo.updates)
     assert any(update[1].get("total") == 2 for update in job_repo.updates)
     assert any(update[1].get("sent") == 1 and update[1].get("failed") == 1 for update in job_repo.updates)
+
+
+def test_worker_send_location_batches_flags_and_progress(monkeypatch):
+    participants = [
+        EventParticipant(id=f"p{idx}", event_id="event-1", name="Guest", email=f"g{idx}@example.com")
+        for idx in range(5)
+    ]
+    participant_repo = _ParticipantRepo(participants)
+    job_repo = _LocationJobRepo(job=LocationJob(event_id="event-1", total=5))
+    monkeypatch.setattr(location_module, "LOCATION_PROGRESS_EVERY", 2)
+    monkeypatch.setattr(location_module, "LOCATION_PROGRESS_INTERVAL", 3600)
+    monkeypatch.setattr(location_module, "build_location_email_payload", lambda *args, **kwargs: ("subject", "text", "html"))
+    monkeypatch.setattr(
+        location_module,
+        "_send_with_retry",
+        lambda email, *args, **kwargs: email != "g3@example.com",
+    )
+
+    service = LocationService(
+        event_repository=_EventRepo(),
+        participant_repository=participant_repo,
+        job_repository=job_repo,
+        mail_service_instance=_MailService(),
+        location_event_repository=_LocationRepo(),
+    )
+
+    service._worker_send_location("location-job-1")
+
+    flagged = sorted(pid for _, ids, _ in participant_repo.location_batches for pid in ids)
+    assert flagged == ["p0", "p1", "p2", "p4"]
+    assert len(participant_repo.location_batches) == 3
+    progress = [payload for _, payload in job_repo.updates if "sent" in payload]
+    assert len(progress) == 3
+    assert progress[-1]["sent"] == 4
+    assert progress[-1]["failed"] == 1
+    assert progress[-1]["percent"] == 100
+
+
+def test_worker_send_location_processes_one_chunk_per_invocation(monkeypatch):
+    participants = [
+        EventParticipant(id="p0", event_id="event-1", email="g0@example.com", location_sent=True),
+        EventParticipant(id="p1", event_id="event-1", email="g1@example.com"),
+        EventParticipant(id="p2", event_id="event-1", email="g2@example.com"),
+    ]
+    participant_repo = _ParticipantRepo(participants)
+    job_repo = _LocationJobRepo(job=LocationJob(event_id="event-1", status="queued"))
+    monkeypatch.setattr(location_module, "LOCATION_CHUNK_SIZE", 2)
+    monkeypatch.setattr(location_module, "build_location_email_payload", lambda *args, **kwargs: ("subject", "text", "html"))
+    monkeypatch.setattr(location_module, "_send_with_retry", lambda *args, **kwargs: True)
+    service = LocationService(
+        event_repository=_EventRepo(),
+        participant_repository=participant_repo,
+        job_repository=job_repo,
+        mail_service_instance=_MailService(),
+        location_event_repository=_LocationRepo(),
+    )
+
+    service._worker_send_location("location-job-1")
+
+    assert job_repo.job.status == "queued"
+    assert job_repo.job.cursor == "p1"
+    assert job_repo.job.chunks == 1
+    assert job_repo.job.total == 2
+    assert participant_repo.location_batches == [("event-1", ["p1"], "location-job-1")]
+
+    service._worker_send_location("location-job-1")
+
+    assert job_repo.job.status == "completed"
+    assert job_repo.job.cursor == "p2"
+    assert job_repo.job.sent == 2
+    assert job_repo.job.percent == 100
+    assert [ids for _, ids, _ in participant_repo.location_batches] == [["p1"], ["p2"]]
+
+
+def test_resume_stale_jobs_requeues_only_dead_running_jobs():
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    job_repo = _LocationJobRepo()
+    job_repo.raw_jobs = [
+        ("stale", {"status": "running", "updated_at": now - timedelta(hours=1), "cursor": "p9"}),
+        ("alive", {"status": "running", "updated_at": now}),
+        ("done", {"status": "completed", "updated_at": now - timedelta(days=1)}),
+        ("kicked", {"status": "queued", "updated_at": now - timedelta(hours=1), "last_kicked_at": now}),
+    ]
+    service = LocationService(
+        event_repository=_EventRepo(),
+        participant_repository=_ParticipantRepo([]),
+        job_repository=job_repo,
+        mail_service_instance=_MailService(),
+        location_event_repository=_LocationRepo(),
+    )
+
+    assert service.resume_stale_jobs() == 1
+    assert [job_id for job_id, _ in job_repo.updates] == ["stale"]
+    assert job_repo.updates[0][1]["status"] == "queued"
+
+
+def test_resume_stale_jobs_rekicks_queued_jobs_never_picked_up():
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    job_repo = _LocationJobRepo()
+    job_repo.raw_jobs = [
+        ("stuck", {"status": "queued", "updated_at": now - timedelta(hours=2), "last_kicked_at": now - timedelta(hours=1)}),
+        ("fresh", {"status": "queued", "updated_at": now}),
+    ]
+    service = LocationService(
+        event_repository=_EventRepo(),
+        participant_repository=_ParticipantRepo([]),
+        job_repository=job_repo,
+        mail_service_instance=_MailService(),
+        location_event_repository=_LocationRepo(),
+    )
+
+    assert service.resume_stale_jobs() == 1
+    assert [job_id for job_id, _ in job_repo.updates] == ["stuck"]
+    assert job_repo.updates[0][1]["status"] == "queued"
+    assert job_repo.updates[0][1]["last_kicked_at"] is not None
@@ -92,6 +92,10 @@ class _DummyPurchaseRepo:
     def get_model(self, purchase_id):
         return self.models.get(purchase_id)
 
+    def get_many(self, purchase_ids):
+        self.batches = getattr(self, "batches", []) + [list(purchase_ids)]
+        return [self.models[pid] for pid in dict.fromkeys(purchase_ids) if pid in self.models]
+
 
 class _DummyEventRepo:
     def __init__(self, models=None):
@@ -100,6 +104,10 @@ class _DummyEventRepo:
     def get_model(self, event_id):
         return self.models.get(event_id)
 
+    def get_many(self, event_ids):
+        self.batches = getattr(self, "batches", []) + [list(event_ids)]
+        return [self.models[eid] for eid in dict.fromkeys(event_ids) if eid in self.models]
+
 
 class _DummyBlob:
     def __init__(self, exists=True, data=b"pdf-data"):
@@ -620,11 +628,12 @@ def test_get_events_returns_minimal_event_payloads():
     event = Event(title="Test", date="13-02-2026")
     event.id = "evt-1"
     service.event_repository = _DummyEventRepo(models={"evt-1": event})
-    service.membership_repository.models["mem-1"] = Membership(attended_events=["evt-1"])
+    service.membership_repository.models["mem-1"] = Membership(attended_events=["evt-1", "evt-missing"])
 
     payload = service.get_events("mem-1")
 
     assert payload == [{"id": "evt-1", "title": "Test", "date": "13-02-2026", "image": None}]
+    assert service.event_repository.batches == [["evt-1", "evt-missing"]]
 
 
 def test_membership_price_roundtrip():
@@ -493,3 +493,40 @@ def test_check_participants_happy_path(monkeypatch):
     payload = service.check_participants("evt-1", [_checkout_dto()])
 
     assert payload.valid is True
+
+
+class _BatchTicketService(_DummyTicketService):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def _event_payload(self, event_model):
+        return {"title": event_model.title}
+
+    def _build_attachment_filename(self, title):
+        return "ticket.pdf"
+
+    def create_ticket_documents(self, participants, event_payload):
+        self.batches.append([participant.id for participant in participants])
+        return [SimpleNamespace(buffer=SimpleNamespace(getvalue=lambda: b"pdf")) for _ in participants]
+
+    def create_ticket_document(self, participant, event_payload):
+        raise AssertionError("bulk send must not render tickets one by one")
+
+
+def test_send_omaggio_emails_renders_tickets_in_one_batch():
+    service = _make_service()
+    service.event_repository = _DummyEventRepo(model=Event(title="Test", date="13-02-2026", location_hint="Roma"))
+    service.ticket_service = _BatchTicketService()
+    sent = []
+    service.mail_service = SimpleNamespace(send=lambda message: sent.append(message) or True)
+    service.participant_repository.list_items = [
+        _participant_model(id="p1", name="A", surname="One", email="a@test.com", payment_method=PaymentMethod.OMAGGIO),
+        _participant_model(id="p2", name="B", surname="Two", email="b@test.com", payment_method=PaymentMethod.OMAGGIO),
+    ]
+
+    result = service.send_omaggio_emails(SendOmaggioEmailsRequestDTO(event_id="evt-1", entry_time="22:00"))
+
+    assert result.sent == 2
+    assert service.ticket_service.batches == [["p1", "p2"]]
+    assert all(message.attachment is not None for message in sent)
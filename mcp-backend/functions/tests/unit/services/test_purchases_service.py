@@ -1,7 +1,9 @@
 import pytest
 
 from dto import PurchaseDTO
+from dto.pagination import PageQueryDTO
 from models import Purchase
+from repositories.base import Page
 from services.payments.purchases_service import PurchasesService
 from errors.service_errors import NotFoundError, ValidationError
 
@@ -17,6 +19,10 @@ class _DummyPurchaseRepo:
     def stream_models(self):
         return iter(self.models)
 
+    def query_page(self, request):
+        self.page_request = request
+        return Page(items=self.models[:request.limit], next_cursor="next" if len(self.models) > request.limit else None)
+
     def get_model(self, purchase_id):
         return self.by_id.get(purchase_id)
 
@@ -52,6 +58,20 @@ def test_get_all_purchases():
     assert payload[0]["payer_name"] == "Mario"
 
 
+def test_get_page_projects_requested_fields():
+    service = _make_service()
+    service.purchase_repository.models = [
+        Purchase(id="pur-1", payer_name="Mario", payer_surname="Rossi", amount_total="10"),
+        Purchase(id="pur-2", payer_name="Luca", payer_surname="Bianchi", amount_total="20"),
+    ]
+
+    page = service.get_page(PageQueryDTO(page_size=1, sort="-timestamp", fields=["payer_name"])).to_payload()
+
+    assert page == {"items": [{"id": "pur-1", "payer_name": "Mario"}], "next_cursor": "next"}
+    request = service.purchase_repository.page_request
+    assert (request.order_by, request.descending, request.fields) == ("timestamp", True, ["payer_name"])
+
+
 def test_get_by_id_not_found():
     """Raises when purchase is missing."""
     service = _make_service()
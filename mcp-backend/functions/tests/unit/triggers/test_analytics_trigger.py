@@ -11,50 +11,96 @@ class _Snap:
         return dict(self._data)
 
 
-def test_on_purchase_written_enqueues_event_rebuild(monkeypatch):
+def test_on_purchase_written_applies_purchase_deltas(monkeypatch):
     called = {}
 
     monkeypatch.setattr(
         analytics_trigger.analytics_snapshot_service,
-        "enqueue_event_rebuild",
-        lambda event_id, reason="": called.setdefault("payload", (event_id, reason)),
+        "apply_purchase_change",
+        lambda before, after, delivery_id=None: called.setdefault("payload", (before, after, delivery_id)),
     )
 
     event = types.SimpleNamespace(
         data=types.SimpleNamespace(before=_Snap({"ref_id": "evt-old"}), after=_Snap({"ref_id": "evt-new"})),
         params={"purchaseId": "purchase-1"},
+        id="delivery-1",
     )
 
     analytics_trigger.on_purchase_written.__wrapped__(event)
 
-    assert called.get("payload")[0] == "evt-new"
+    assert called.get("payload") == ({"ref_id": "evt-old"}, {"ref_id": "evt-new"}, "delivery-1")
 
 
-def test_on_participant_written_enqueues_event_rebuild(monkeypatch):
+def test_on_participant_written_applies_participant_deltas(monkeypatch):
     called = {}
 
+    monkeypatch.setattr(
+        analytics_trigger.entrance_service,
+        "apply_participant_change",
+        lambda event_id, before, after: called.setdefault("manifest", event_id),
+    )
     monkeypatch.setattr(
         analytics_trigger.analytics_snapshot_service,
-        "enqueue_event_rebuild",
-        lambda event_id, reason="": called.setdefault("event_id", event_id),
+        "apply_participant_change",
+        lambda event_id, before, after, delivery_id=None: called.setdefault(
+            "payload", (event_id, before, after, delivery_id)
+        ),
     )
 
-    event = types.SimpleNamespace(data={}, params={"eventId": "evt-1", "participantId": "p-1"})
+    event = types.SimpleNamespace(
+        data=types.SimpleNamespace(before=None, after=_Snap({"name": "Mario"})),
+        params={"eventId": "evt-1", "participantId": "p-1"},
+        id="delivery-2",
+    )
     analytics_trigger.on_participant_written.__wrapped__(event)
 
-    assert called.get("event_id") == "evt-1"
+    assert called.get("payload") == ("evt-1", {}, {"name": "Mario"}, "delivery-2")
+    assert called.get("manifest") == "evt-1"
 
 
-def test_on_membership_written_enqueues_global_rebuild(monkeypatch):
+def test_on_membership_written_applies_membership_deltas(monkeypatch):
     called = {}
 
+    monkeypatch.setattr(
+        analytics_trigger.entrance_service,
+        "apply_membership_change",
+        lambda membership_id, before, after: called.setdefault("manifest", membership_id),
+    )
     monkeypatch.setattr(
         analytics_trigger.analytics_snapshot_service,
-        "enqueue_global_rebuild",
-        lambda reason="": called.setdefault("called", True),
+        "apply_membership_change",
+        lambda before, after, delivery_id=None: called.setdefault("payload", (before, after, delivery_id)),
     )
 
-    event = types.SimpleNamespace(data={}, params={"membershipId": "m-1"})
+    event = types.SimpleNamespace(
+        data=types.SimpleNamespace(before=_Snap({"subscription_valid": True}), after=_Snap({"subscription_valid": False})),
+        params={"membershipId": "m-1"},
+        id="delivery-3",
+    )
+    analytics_trigger.on_membership_written.__wrapped__(event)
+
+    assert called.get("payload") == ({"subscription_valid": True}, {"subscription_valid": False}, "delivery-3")
+    assert called.get("manifest") == "m-1"
+
+
+def test_manifest_refresh_failure_does_not_block_analytics(monkeypatch):
+    called = {}
+
+    def _fail(*_args):
+        raise RuntimeError("firestore unavailable")
+
+    monkeypatch.setattr(analytics_trigger.entrance_service, "apply_membership_change", _fail)
+    monkeypatch.setattr(
+        analytics_trigger.analytics_snapshot_service,
+        "apply_membership_change",
+        lambda before, after, delivery_id=None: called.setdefault("payload", delivery_id),
+    )
+
+    event = types.SimpleNamespace(
+        data=types.SimpleNamespace(before=_Snap({"subscription_valid": True}), after=_Snap({"subscription_valid": False})),
+        params={"membershipId": "m-1"},
+        id="delivery-4",
+    )
     analytics_trigger.on_membership_written.__wrapped__(event)
 
-    assert called.get("called") is True
+    assert called.get("payload") == "delivery-4"
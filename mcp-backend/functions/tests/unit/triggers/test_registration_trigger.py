@@ -2,6 +2,8 @@ import types
 
 import pytest
 
+from clients.genderize_client import GenderizeApiResult
+from services.core.gender_service import GenderService
 from triggers import registration_trigger
 
 
@@ -11,24 +13,39 @@ def _stub_sender_side_effects(monkeypatch):
     monkeypatch.setattr(registration_trigger, "sync_membership_to_sender", lambda *args, **kwargs: None)
     monkeypatch.setattr(registration_trigger, "log_external_error", lambda *args, **kwargs: None)
 
-    class _DummyDoc:
-        exists = False
+    class _DummyEventRepo:
+        def get_model(self, _event_id):
+            return None
 
-        def to_dict(self):
-            return {}
+    monkeypatch.setattr(registration_trigger, "event_repository", _DummyEventRepo())
 
-    class _DummyCollection:
-        def document(self, _doc_id):
-            return self
 
-        def get(self):
-            return _DummyDoc()
+class _DummyGenderCache:
+    def get_many(self, _names):
+        return []
 
-    class _DummyDB:
-        def collection(self, _name):
-            return _DummyCollection()
+    def set_many(self, _guesses):
+        return None
 
-    monkeypatch.setattr(registration_trigger, "db", _DummyDB())
+
+class _DummyGenderize:
+    def __init__(self, payload=None):
+        self.payload = payload
+        self.calls = []
+
+    def lookup(self, names):
+        self.calls.append(list(names))
+        if self.payload is None:
+            pytest.fail("Gender API should not be called")
+        return GenderizeApiResult(status_code=200, payload=self.payload)
+
+
+def _use_gender_service(monkeypatch, genderize):
+    monkeypatch.setattr(
+        registration_trigger,
+        "gender_service",
+        GenderService(gender_cache_repository=_DummyGenderCache(), participant_repository=object(), genderize=genderize),
+    )
 
 
 class _DummyRef:
@@ -62,24 +79,13 @@ def test_on_participant_created_updates_gender_and_sends_ticket(monkeypatch):
     event = types.SimpleNamespace(data=snap, params={"participantId": participant_id, "eventId": event_id})
 
     called = {}
-
-    def _fake_get(url, params=None, **_kwargs):
-        called["gender_api"] = params.get("name") if params else None
-
-        class _Resp:
-            def raise_for_status(self):
-                return None
-
-            def json(self):
-                return {"gender": "female", "probability": 0.7}
-
-        return _Resp()
+    genderize = _DummyGenderize([{"name": "mario", "gender": "female", "probability": 0.7, "count": 10}])
 
     def _fake_process(pid, data, send):
         called["ticket"] = (pid, send)
         return {"success": True}
 
-    monkeypatch.setattr(registration_trigger.requests, "get", _fake_get)
+    _use_gender_service(monkeypatch, genderize)
     monkeypatch.setattr(registration_trigger.ticket_service, "process_new_ticket", _fake_process)
     monkeypatch.setattr(
         registration_trigger.ticket_service,
@@ -93,6 +99,7 @@ def test_on_participant_created_updates_gender_and_sends_ticket(monkeypatch):
         for update in snap.reference.updates
     )
     assert called.get("ticket") == (participant_id, True)
+    assert genderize.calls == [["mario"]]
 
 
 def test_on_participant_created_newsletter_sync_and_skip_ticket(monkeypatch):
@@ -119,11 +126,7 @@ def test_on_participant_created_newsletter_sync_and_skip_ticket(monkeypatch):
         "process_new_ticket",
         _fake_process,
     )
-    monkeypatch.setattr(
-        registration_trigger.requests,
-        "get",
-        lambda *args, **kwargs: pytest.fail("Gender API should not be called for Andrea"),
-    )
+    _use_gender_service(monkeypatch, _DummyGenderize())
 
     registration_trigger.on_participant_created.__wrapped__(event)
 
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from utils.aggregators import (
+    Aggregate,
+    Count,
+    Distinct,
+    Filtered,
+    Fold,
+    Histogram,
+    MonthlyBuckets,
+    Partitioned,
+    Sum,
+    TopK,
+)
+
+
+def _rows():
+    return [
+        SimpleNamespace(id="a", kind="x", amount=10, ts=datetime(2026, 1, 31, 23, 30, tzinfo=timezone.utc)),
+        SimpleNamespace(id="b", kind="y", amount=5, ts=datetime(2026, 2, 1, 10, 0, tzinfo=timezone.utc)),
+        SimpleNamespace(id="c", kind="x", amount=7, ts=None),
+        SimpleNamespace(id="d", kind="x", amount=7, ts=datetime(2026, 2, 1, 10, 0, tzinfo=timezone.utc)),
+    ]
+
+
+def test_aggregate_runs_all_reducers_in_one_pass():
+    consumed = []
+
+    def stream():
+        for row in _rows():
+            consumed.append(row.id)
+            yield row
+
+    result = Aggregate(
+        total=Count(),
+        xs=Count(lambda row: row.kind == "x"),
+        amount=Sum(lambda row: row.amount),
+        kinds=Histogram(lambda row: row.kind, keys=("x", "y", "z")),
+        distinct=Distinct(lambda row: row.kind),
+        ids=Fold(list, lambda state, row: state.append(row.id)),
+    ).consume(stream()).result()
+
+    assert consumed == ["a", "b", "c", "d"]
+    assert result == {
+        "total": 4,
+        "xs": 3,
+        "amount": 29,
+        "kinds": {"x": 3, "y": 1, "z": 0},
+        "distinct": 2,
+        "ids": ["a", "b", "c", "d"],
+    }
+
+
+def test_monthly_buckets_skip_missing_timestamps_and_honour_timezone():
+    buckets = MonthlyBuckets(lambda row: row.ts, lambda row: row.amount, tz=ZoneInfo("Europe/Rome"))
+
+    assert buckets.consume(_rows()).result() == {"2026-02": 22}
+
+
+def test_topk_keeps_largest_and_first_seen_on_ties():
+    top = TopK(2, lambda row: row.ts or datetime(1970, 1, 1, tzinfo=timezone.utc)).consume(_rows())
+
+    assert [row.id for row in top.result()] == ["b", "d"]
+    assert len(top._heap) == 2
+
+
+def test_partitioned_with_fixed_partitions_ignores_unknown_keys():
+    only_x = Aggregate(count=Count(), amount=Sum(lambda row: row.amount))
+    partitioned = Partitioned(lambda row: row.kind, reducers={"x": only_x})
+
+    partitioned.consume(_rows())
+
+    assert partitioned.result() == {"x": {"count": 3, "amount": 24}}
+
+
+def test_partitioned_factory_and_filter_compose():
+    reducer = Filtered(
+        lambda row: row.ts is not None,
+        Partitioned(lambda row: row.kind, lambda: Sum(lambda row: row.amount)),
+    )
+
+    assert reducer.consume(_rows()).result() == {"x": 17, "y": 5}
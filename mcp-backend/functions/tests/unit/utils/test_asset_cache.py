@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from utils.asset_cache import AssetCache
+
+
+class _Blob:
+    def __init__(self, data, generation):
+        self.data = data
+        self.generation = generation
+        self.downloads = 0
+
+    def download_as_bytes(self):
+        self.downloads += 1
+        return self.data
+
+
+class _Storage:
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.metadata_calls = 0
+
+    def get_blob(self, path):
+        self.metadata_calls += 1
+        return self.blobs.get(path)
+
+
+def test_repeated_reads_share_one_download_and_one_file(tmp_path):
+    blob = _Blob(b"png-bytes", generation=1)
+    storage = _Storage({"logos/logo.png": blob})
+    cache = AssetCache(storage, cache_dir=str(tmp_path))
+
+    first = cache.local_path("logos/logo.png")
+    second = cache.local_path("logos/logo.png")
+
+    assert first == second
+    assert first.endswith(".png")
+    assert open(first, "rb").read() == b"png-bytes"
+    assert blob.downloads == 1
+    assert storage.metadata_calls == 1
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_new_generation_is_downloaded_after_revalidation(tmp_path):
+    storage = _Storage({"logos/logo.png": _Blob(b"old", generation=1)})
+    cache = AssetCache(storage, cache_dir=str(tmp_path), revalidate_seconds=0)
+
+    assert cache.get_bytes("logos/logo.png") == b"old"
+    storage.blobs["logos/logo.png"] = _Blob(b"new", generation=2)
+
+    assert cache.get_bytes("logos/logo.png") == b"new"
+    assert storage.metadata_calls == 2
+
+
+def test_evicts_least_recently_used_and_removes_its_file(tmp_path):
+    storage = _Storage({
+        "a.png": _Blob(b"a" * 6, generation=1),
+        "b.png": _Blob(b"b" * 6, generation=1),
+    })
+    cache = AssetCache(storage, max_bytes=10, cache_dir=str(tmp_path))
+
+    path_a = cache.local_path("a.png")
+    path_b = cache.local_path("b.png")
+
+    assert not os.path.exists(path_a)
+    assert os.path.exists(path_b)
+
+
+def test_missing_blob_raises(tmp_path):
+    cache = AssetCache(_Storage({}), cache_dir=str(tmp_path))
+
+    with pytest.raises(FileNotFoundError):
+        cache.local_path("missing.png")
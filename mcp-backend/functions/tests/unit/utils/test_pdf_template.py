@@ -0,0 +1,55 @@
+from utils import pdf_template
+
+
+def test_generate_ticket_pdfs_resolves_logo_once_and_keeps_order(monkeypatch):
+    downloads = []
+    monkeypatch.setattr(
+        pdf_template,
+        "download_image_from_firebase",
+        lambda path: downloads.append(path) or "/tmp/logo.png",
+    )
+    monkeypatch.setattr(
+        pdf_template,
+        "_render_member_ticket_pdf",
+        lambda html: html.encode(),
+    )
+    monkeypatch.setattr(
+        pdf_template,
+        "generate_member_ticket_pdf_html",
+        lambda ticket, event, logo, inline_styles=True: f"{ticket['name']}|{logo}|{inline_styles}",
+    )
+
+    buffers = pdf_template.generate_ticket_pdfs(
+        [{"name": "Anna"}, {"name": "Bruno"}],
+        {"title": "Members night", "purchaseMode": "only_members"},
+        "logos/logo_white.png",
+        max_workers=1,
+    )
+
+    assert downloads == ["logos/logo_white.png"]
+    assert [buffer.getvalue() for buffer in buffers] == [
+        b"Anna|/tmp/logo.png|False",
+        b"Bruno|/tmp/logo.png|False",
+    ]
+
+
+def test_generate_ticket_pdfs_empty_batch_skips_assets(monkeypatch):
+    monkeypatch.setattr(
+        pdf_template,
+        "download_image_from_firebase",
+        lambda path: (_ for _ in ()).throw(AssertionError("no download expected")),
+    )
+
+    assert pdf_template.generate_ticket_pdfs([], {"title": "Event"}, "logos/logo_white.png") == []
+
+
+def test_pdf_pool_size_follows_configured_vcpu_and_memory(monkeypatch):
+    monkeypatch.setattr(pdf_template, "PDF_BATCH_VCPU", 1)
+    monkeypatch.setattr(pdf_template, "PDF_BATCH_MEMORY_MB", 4096)
+    assert pdf_template._pdf_pool_size(None, 100) == 1
+
+    monkeypatch.setattr(pdf_template, "PDF_BATCH_VCPU", 4)
+    monkeypatch.setattr(pdf_template, "PDF_BATCH_MEMORY_MB", 1024)
+    # 1024 MB: tre worker da 256 MB accanto al processo principale.
+    assert pdf_template._pdf_pool_size(None, 100) == 3
+    assert pdf_template._pdf_pool_size(2, 100) == 2
@@ -0,0 +1,36 @@
+from utils.rate_limit import TokenBucket
+
+
+class _FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_burst_is_served_without_waiting():
+    fake = _FakeTime()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=fake.clock, sleep=fake.sleep)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    assert fake.sleeps == []
+
+
+def test_waits_for_refill_once_bucket_is_empty():
+    fake = _FakeTime()
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=fake.clock, sleep=fake.sleep)
+
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+
+    assert fake.sleeps == [0.5, 0.5]
+    assert fake.now == 1.0
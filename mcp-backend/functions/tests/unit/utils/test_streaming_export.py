@@ -0,0 +1,49 @@
+import json
+from datetime import datetime, timezone
+
+from utils.streaming_export import CSV_BOM, csv_chunks, ndjson_chunks
+
+
+def _rows(count):
+    for index in range(count):
+        yield {"id": f"p{index}", "name": f"Nome {index}", "tags": ["a", "b"], "ts": datetime(2026, 5, 1, tzinfo=timezone.utc)}
+
+
+def test_csv_chunks_emit_header_first_and_group_rows():
+    chunks = list(csv_chunks(_rows(5), ["id", "name", "tags", "missing"], chunk_rows=2))
+
+    assert chunks[0] == CSV_BOM + "id,name,tags,missing\r\n"
+    assert chunks[1] == "p0,Nome 0,a;b,\r\np1,Nome 1,a;b,\r\n"
+    assert len(chunks) == 4
+    assert "".join(chunks).count("\r\n") == 6
+
+
+def test_csv_chunks_are_lazy():
+    consumed = []
+
+    def rows():
+        for row in _rows(3):
+            consumed.append(row["id"])
+            yield row
+
+    stream = csv_chunks(rows(), ["id"], chunk_rows=10)
+    next(stream)
+
+    assert consumed == []
+
+
+def test_ndjson_chunks_keep_native_types_and_iso_dates():
+    lines = "".join(ndjson_chunks(_rows(2), ["id", "tags", "ts"], chunk_rows=1)).splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {"id": "p0", "tags": ["a", "b"], "ts": "2026-05-01T00:00:00+00:00"},
+        {"id": "p1", "tags": ["a", "b"], "ts": "2026-05-01T00:00:00+00:00"},
+    ]
+
+
+def test_csv_chunks_neutralize_formula_cells():
+    rows = [{"name": "=HYPERLINK(\"http://x\")", "note": "@SUM(A1)", "tags": ["-1+1", "ok"], "amount": -5}]
+
+    body = "".join(csv_chunks(rows, ["name", "note", "tags", "amount"])).split("\r\n")[1]
+
+    assert body == "\"'=HYPERLINK(\"\"http://x\"\")\",'@SUM(A1),'-1+1;ok,-5"
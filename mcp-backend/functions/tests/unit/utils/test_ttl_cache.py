@@ -0,0 +1,47 @@
+from utils.ttl_cache import TTLCache, clear_all_caches
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = _Clock()
+    cache = TTLCache(ttl_seconds=30, clock=clock)
+    cache.set("evt-1", "Closing Party")
+
+    clock.now = 29.9
+    assert cache.get("evt-1") == "Closing Party"
+
+    clock.now = 30
+    assert cache.get("evt-1") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_and_clear_all():
+    cache = TTLCache(ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    clear_all_caches()
+    assert cache.get("b") is None
+
+
+def test_evicts_least_recently_used_over_maxsize():
+    cache = TTLCache(ttl_seconds=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
@@ -2,11 +2,15 @@ import logging
 
 from firebase_functions import firestore_fn, scheduler_fn
 
+from config.analytics_config import ANALYTICS_DISPATCH_SCHEDULE
 from config.firebase_config import region
 from services.core.analytics_snapshot_service import AnalyticsSnapshotService
+from services.entrance_service import EntranceService
+from utils.safe_logging import redact_sensitive
 
 logger = logging.getLogger("analytics_trigger")
 analytics_snapshot_service = AnalyticsSnapshotService()
+entrance_service = EntranceService()
 
 
 def _snapshot_to_dict(snapshot):
@@ -34,6 +38,19 @@ def _extract_before_after(event):
     return before, after
 
 
+def _refresh_scanner_manifest(apply_change, *args):
+    # Il manifest offline degli scanner non deve restare indietro se falliscono gli analytics (e viceversa).
+    try:
+        apply_change(*args)
+    except Exception as exc:
+        logger.warning("scanner manifest version bump failed: %s", redact_sensitive(str(exc)))
+
+
+def _delivery_id(event):
+    # Id dell'evento CloudEvent: stabile tra le riconsegne della stessa scrittura.
+    return getattr(event, "id", None) or None
+
+
 @firestore_fn.on_document_written(document="purchases/{purchaseId}", region=region)
 def on_purchase_written(event: firestore_fn.Event):
     before, after = _extract_before_after(event)
@@ -41,8 +58,8 @@ def on_purchase_written(event: firestore_fn.Event):
     if not event_id:
         return
 
-    logger.info("on_purchase_written: enqueue event snapshot rebuild event_id=%s", event_id)
-    analytics_snapshot_service.enqueue_event_rebuild(event_id, reason="purchase_written")
+    logger.info("on_purchase_written: apply analytics deltas event_id=%s", event_id)
+    analytics_snapshot_service.apply_purchase_change(before, after, delivery_id=_delivery_id(event))
 
 
 @firestore_fn.on_document_written(
@@ -54,30 +71,30 @@ def on_participant_written(event: firestore_fn.Event):
     if not event_id:
         return
 
-    logger.info("on_participant_written: enqueue event snapshot rebuild event_id=%s", event_id)
-    analytics_snapshot_service.enqueue_event_rebuild(event_id, reason="participant_written")
-
-
-@firestore_fn.on_document_written(
-    document="entrance_scans/{eventId}/scans/{membershipId}",
-    region=region,
-)
-def on_entrance_scan_written(event: firestore_fn.Event):
-    event_id = (event.params or {}).get("eventId") if hasattr(event, "params") else None
-    if not event_id:
-        return
-
-    logger.info("on_entrance_scan_written: enqueue event snapshot rebuild event_id=%s", event_id)
-    analytics_snapshot_service.enqueue_event_rebuild(event_id, reason="entrance_scan_written")
+    before, after = _extract_before_after(event)
+    logger.info("on_participant_written: apply analytics deltas event_id=%s", event_id)
+    _refresh_scanner_manifest(entrance_service.apply_participant_change, event_id, before, after)
+    analytics_snapshot_service.apply_participant_change(event_id, before, after, delivery_id=_delivery_id(event))
 
 
 @firestore_fn.on_document_written(document="memberships/{membershipId}", region=region)
 def on_membership_written(event: firestore_fn.Event):
-    logger.info("on_membership_written: enqueue global snapshot rebuild")
-    analytics_snapshot_service.enqueue_global_rebuild(reason="membership_written")
+    before, after = _extract_before_after(event)
+    membership_id = (event.params or {}).get("membershipId") if hasattr(event, "params") else None
+    if membership_id:
+        _refresh_scanner_manifest(entrance_service.apply_membership_change, membership_id, before, after)
+    logger.info("on_membership_written: apply analytics deltas")
+    analytics_snapshot_service.apply_membership_change(before, after, delivery_id=_delivery_id(event))
 
 
 @scheduler_fn.on_schedule(schedule="15 5 * * *", timezone="Europe/Rome")
 def rebuild_analytics_nightly(event: scheduler_fn.ScheduledEvent):
+    # Riconciliazione: ricalcola snapshot e contatori incrementali da zero.
     logger.info("rebuild_analytics_nightly: enqueue full rebuild")
     analytics_snapshot_service.enqueue_full_rebuild(reason="scheduled_full_rebuild")
+
+
+@scheduler_fn.on_schedule(schedule=ANALYTICS_DISPATCH_SCHEDULE, timezone="Europe/Rome")
+def dispatch_analytics_rebuilds(event: scheduler_fn.ScheduledEvent):
+    # Le rebuild richieste dai trigger restano "scheduled" fino alla fine del debounce.
+    analytics_snapshot_service.dispatch_due_rebuilds()
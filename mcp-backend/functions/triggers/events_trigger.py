@@ -0,0 +1,19 @@
+import logging
+
+from firebase_functions import scheduler_fn
+
+from services.events.events_service import EventsService
+
+logger = logging.getLogger("events_trigger")
+events_service = EventsService()
+
+
+@scheduler_fn.on_schedule(schedule="30 4 * * *", timezone="Europe/Rome")
+def reconcile_event_participant_counts(event: scheduler_fn.ScheduledEvent) -> None:
+    """
+    Gira ogni notte alle 04:30.
+    Riallinea participantsCount sugli eventi: corregge eventuali derive del contatore
+    mantenuto dalle scritture dei partecipanti.
+    """
+    reconciled = events_service.reconcile_participant_counts()
+    logger.info("reconcile_event_participant_counts: reconciled events=%d", reconciled)
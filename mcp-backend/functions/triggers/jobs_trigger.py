@@ -1,8 +1,9 @@
 import logging
 
-from firebase_functions import firestore_fn
+from firebase_functions import firestore_fn, scheduler_fn
 
 from config.firebase_config import region
+from config.location_config import LOCATION_JOB_TIMEOUT_SEC
 from services.events.location_service import LocationService
 from services.core.analytics_snapshot_service import AnalyticsSnapshotService
 
@@ -29,9 +30,13 @@ def _event_after_data(event):
     return _snapshot_to_dict(data)
 
 
-@firestore_fn.on_document_written(document="location_jobs/{jobId}", region=region)
+@firestore_fn.on_document_written(
+    document="location_jobs/{jobId}",
+    region=region,
+    timeout_sec=LOCATION_JOB_TIMEOUT_SEC,
+)
 def process_send_location_job(event: firestore_fn.Event):
-    """Trigger Firestore: avvia il worker per job location queued in location_jobs."""
+    """Trigger Firestore: avvia il worker per job location queued in location_jobs (un blocco per invocazione)."""
     job_dict = _event_after_data(event)
     job_type = job_dict.get("type")
     job_status = job_dict.get("status")
@@ -53,6 +58,14 @@ def process_send_location_job(event: firestore_fn.Event):
         )
 
 
+@scheduler_fn.on_schedule(schedule="*/15 * * * *", timezone="Europe/Rome")
+def resume_stale_location_jobs(event: scheduler_fn.ScheduledEvent):
+    """Riattiva i job location rimasti running dopo un crash o un timeout, o queued senza worker."""
+    resumed = location_service.resume_stale_jobs()
+    if resumed:
+        logger.info("resume_stale_location_jobs: resumed %s job(s)", resumed)
+
+
 @firestore_fn.on_document_written(document="analytics_jobs/{jobId}", region=region)
 def process_analytics_rebuild_job(event: firestore_fn.Event):
     """Trigger Firestore: avvia worker analytics su create/update di analytics_jobs."""
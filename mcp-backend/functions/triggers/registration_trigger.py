@@ -1,14 +1,14 @@
 import logging
 
-import requests
 import firebase_admin.auth as fb_auth
 from firebase_functions.firestore_fn import on_document_created, Event, DocumentSnapshot
 
-from config.external_services import GENDER_API_URL
-from config.firebase_config import region, db
+from config.firebase_config import region
 from models import EventParticipant, Membership as MembershipModel
+from repositories.event_repository import EventRepository
 from services.communications.mail_service import EmailMessage, mail_service
 from services.core.error_logs_service import log_external_error
+from services.core.gender_service import GenderService
 from services.events.ticket_service import TicketService
 from services.memberships.pass2u_service import Pass2UService
 from services.sender.sender_sync import sync_membership_to_sender, sync_participant_to_sender
@@ -19,6 +19,8 @@ from utils.templates_mail import get_membership_email_template, get_membership_e
 logger = logging.getLogger("registration_trigger")
 
 ticket_service = TicketService()
+gender_service = GenderService()
+event_repository = EventRepository()
 
 
 @on_document_created(document="participants/{eventId}/participants_event/{participantId}", region=region)
@@ -47,22 +49,9 @@ def on_participant_created(event: Event[DocumentSnapshot | None]):
         participant_model = EventParticipant.from_firestore(participant_data, doc_id=participant_id)
 
         # Arricchimento non critico: se il provider gender fallisce, il partecipante resta valido.
-        name = (participant_model.name or "").split(" ")[0].strip().lower()
-        gender = "N/A"
-        probability = 0.0
-
-        if name == "andrea":
-            gender = "male"
-            probability = 1.0
-        elif name:
-            try:
-                response = requests.get(GENDER_API_URL, params={"name": name})
-                response.raise_for_status()
-                gender_info = response.json()
-                gender = gender_info.get("gender") or "N/A"
-                probability = round(float(gender_info.get("probability", 0.0)), 1)
-            except Exception as exc:
-                logger.warning("on_participant_created: gender API failed: %s", redact_sensitive(str(exc)))
+        guess = gender_service.lookup(participant_model.name)
+        gender = guess.gender
+        probability = round(guess.probability, 1)
 
         snapshot.reference.update({"gender": gender, "gender_probability": probability})
         logger.info("on_participant_created: gender=%s (%.1f) for %s", gender, probability, participant_id)
@@ -84,8 +73,8 @@ def on_participant_created(event: Event[DocumentSnapshot | None]):
         email = (participant_model.email or "").strip().lower()
         if participant_model.newsletter_consent and is_valid_email(email):
             try:
-                event_doc = db.collection("events").document(event_id).get()
-                event_title = (event_doc.to_dict() or {}).get("title", "") if event_doc.exists else ""
+                event_model = event_repository.get_model(event_id)
+                event_title = event_model.title if event_model else ""
                 sync_participant_to_sender(participant_id, participant_model, event_id, event_title=event_title)
             except Exception as exc:
                 logger.error("on_participant_created: Sender sync failed for %s: %s", mask_email(email), redact_sensitive(str(exc)))
@@ -0,0 +1,225 @@
+"""
+Reducer componibili per aggregare stream di documenti in un solo passaggio.
+
+Ogni reducer riceve gli elementi uno alla volta con ``add()`` e mantiene solo
+il proprio stato (un numero, un dict di bucket, un heap di ``k`` elementi), quindi
+la memoria non cresce con la lunghezza dello stream ma con il numero di chiavi
+distinte. I reducer si combinano con ``Aggregate`` (piu' metriche sullo stesso
+stream), ``Partitioned`` (un reducer per chiave) e ``Filtered``.
+
+    stats = Aggregate(
+        total=Count(),
+        revenue=Sum(lambda p: p.amount),
+        by_month=MonthlyBuckets(lambda p: p.timestamp),
+    ).consume(purchase_repository.stream_models())
+    stats.result()  # {"total": ..., "revenue": ..., "by_month": {...}}
+"""
+
+import heapq
+from datetime import datetime, tzinfo
+from itertools import count as _counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class Reducer:
+    def add(self, item: Any) -> None:
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+    def consume(self, items: Iterable[Any]) -> "Reducer":
+        for item in items:
+            self.add(item)
+        return self
+
+
+class Count(Reducer):
+    """Conta gli elementi (solo quelli che soddisfano ``predicate``, se indicato)."""
+
+    def __init__(self, predicate: Optional[Callable[[Any], bool]] = None):
+        self.predicate = predicate
+        self.value = 0
+
+    def add(self, item: Any) -> None:
+        if self.predicate is None or self.predicate(item):
+            self.value += 1
+
+    def result(self) -> int:
+        return self.value
+
+
+class Sum(Reducer):
+    def __init__(self, value_fn: Callable[[Any], float], initial: float = 0):
+        self.value_fn = value_fn
+        self.value = initial
+
+    def add(self, item: Any) -> None:
+        self.value += self.value_fn(item)
+
+    def result(self) -> float:
+        return self.value
+
+
+class Fold(Reducer):
+    """Riduzione generica: ``fn(state, item)`` aggiorna lo stato (in place o restituendolo)."""
+
+    def __init__(self, initial: Callable[[], Any], fn: Callable[[Any, Any], Any]):
+        self.fn = fn
+        self.state = initial()
+
+    def add(self, item: Any) -> None:
+        updated = self.fn(self.state, item)
+        if updated is not None:
+            self.state = updated
+
+    def result(self) -> Any:
+        return self.state
+
+
+class Histogram(Reducer):
+    """Somma ``value_fn(item)`` (default 1) nel bucket ``key_fn(item)``; le chiavi None sono scartate."""
+
+    def __init__(
+        self,
+        key_fn: Callable[[Any], Optional[Hashable]],
+        value_fn: Optional[Callable[[Any], float]] = None,
+        keys: Iterable[Hashable] = (),
+    ):
+        self.key_fn = key_fn
+        self.value_fn = value_fn
+        self.buckets: Dict[Hashable, float] = {key: 0 for key in keys}
+
+    def add(self, item: Any) -> None:
+        key = self.key_fn(item)
+        if key is None:
+            return
+        value = 1 if self.value_fn is None else self.value_fn(item)
+        self.buckets[key] = self.buckets.get(key, 0) + value
+
+    def result(self) -> Dict[Hashable, float]:
+        return self.buckets
+
+
+class MonthlyBuckets(Histogram):
+    """Istogramma per mese (``YYYY-MM``) del timestamp restituito da ``ts_fn``."""
+
+    def __init__(
+        self,
+        ts_fn: Callable[[Any], Optional[datetime]],
+        value_fn: Optional[Callable[[Any], float]] = None,
+        tz: Optional[tzinfo] = None,
+        fmt: str = "%Y-%m",
+    ):
+        def key_fn(item: Any) -> Optional[str]:
+            ts = ts_fn(item)
+            if ts is None:
+                return None
+            return (ts.astimezone(tz) if tz else ts).strftime(fmt)
+
+        super().__init__(key_fn, value_fn)
+
+
+class Distinct(Reducer):
+    """Numero di chiavi distinte: la memoria cresce con le chiavi, non con gli elementi."""
+
+    def __init__(self, key_fn: Callable[[Any], Optional[Hashable]]):
+        self.key_fn = key_fn
+        self.keys = set()
+
+    def add(self, item: Any) -> None:
+        key = self.key_fn(item)
+        if key:
+            self.keys.add(key)
+
+    def result(self) -> int:
+        return len(self.keys)
+
+
+class TopK(Reducer):
+    """
+    I ``k`` elementi con chiave piu' alta, in ordine decrescente.
+
+    A parita' di chiave vince l'elemento arrivato prima, come con ``sorted(..., reverse=True)[:k]``.
+    """
+
+    def __init__(self, k: int, key_fn: Callable[[Any], Any]):
+        self.k = k
+        self.key_fn = key_fn
+        self._heap: List[tuple] = []
+        self._seq = _counter()
+
+    def add(self, item: Any) -> None:
+        if self.k <= 0:
+            return
+        entry = (self.key_fn(item), -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def result(self) -> List[Any]:
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+class Filtered(Reducer):
+    def __init__(self, predicate: Callable[[Any], bool], reducer: Reducer):
+        self.predicate = predicate
+        self.reducer = reducer
+
+    def add(self, item: Any) -> None:
+        if self.predicate(item):
+            self.reducer.add(item)
+
+    def result(self) -> Any:
+        return self.reducer.result()
+
+
+class Aggregate(Reducer):
+    """Inoltra ogni elemento a tutti i reducer figli; ``result()`` e' un dict per nome."""
+
+    def __init__(self, **reducers: Reducer):
+        self.reducers = reducers
+
+    def __getitem__(self, name: str) -> Reducer:
+        return self.reducers[name]
+
+    def add(self, item: Any) -> None:
+        for reducer in self.reducers.values():
+            reducer.add(item)
+
+    def result(self) -> Dict[str, Any]:
+        return {name: reducer.result() for name, reducer in self.reducers.items()}
+
+
+class Partitioned(Reducer):
+    """
+    Un reducer per chiave ``key_fn(item)``.
+
+    Con ``factory`` le partizioni nascono al primo elemento; senza, vengono
+    alimentate solo le partizioni passate in ``reducers`` e le altre chiavi sono scartate.
+    """
+
+    def __init__(
+        self,
+        key_fn: Callable[[Any], Optional[Hashable]],
+        factory: Optional[Callable[[], Reducer]] = None,
+        reducers: Optional[Dict[Hashable, Reducer]] = None,
+    ):
+        self.key_fn = key_fn
+        self.factory = factory
+        self.partitions: Dict[Hashable, Reducer] = dict(reducers or {})
+
+    def add(self, item: Any) -> None:
+        key = self.key_fn(item)
+        if key is None:
+            return
+        reducer = self.partitions.get(key)
+        if reducer is None:
+            if self.factory is None:
+                return
+            reducer = self.partitions[key] = self.factory()
+        reducer.add(item)
+
+    def result(self) -> Dict[Hashable, Any]:
+        return {key: reducer.result() for key, reducer in self.partitions.items()}
@@ -0,0 +1,113 @@
+"""
+Cache di processo per gli asset statici dei PDF (loghi, pattern) salvati su Storage.
+
+Ogni blob e' indicizzato per ``(path, generation)``: i byte restano in memoria e
+ne esiste una sola copia su disco, nominata con l'hash del contenuto, da passare
+a WeasyPrint/ReportLab. La generation viene riverificata al piu' ogni
+``revalidate_seconds``, quindi le richieste ravvicinate non toccano Storage.
+Oltre ``max_bytes`` le voci meno usate vengono rimosse insieme al loro file.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional, Tuple
+
+from utils.ttl_cache import TTLCache
+
+ASSET_CACHE_MAX_BYTES = 32 * 1024 * 1024
+ASSET_REVALIDATE_SECONDS = 600
+
+
+@dataclass
+class _Asset:
+    data: bytes
+    file_path: str
+
+
+class AssetCache:
+    def __init__(
+        self,
+        storage,
+        max_bytes: int = ASSET_CACHE_MAX_BYTES,
+        revalidate_seconds: float = ASSET_REVALIDATE_SECONDS,
+        cache_dir: Optional[str] = None,
+    ):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "mcp-pdf-assets")
+        self._entries: "OrderedDict[Tuple[str, Hashable], _Asset]" = OrderedDict()
+        self._size = 0
+        self._latest = TTLCache(ttl_seconds=revalidate_seconds)
+        self._lock = threading.Lock()
+
+    def _lookup(self, key) -> Optional[_Asset]:
+        asset = self._entries.get(key)
+        if asset is not None:
+            self._entries.move_to_end(key)
+            if not os.path.exists(asset.file_path):
+                # /tmp e' in memoria sulle functions: se il file sparisce lo si riscrive.
+                self._write_file(asset.file_path, asset.data)
+        return asset
+
+    def _write_file(self, file_path: str, data: bytes) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, file_path)
+
+    def _store(self, key, data: bytes, suffix: str) -> _Asset:
+        digest = hashlib.sha256(data).hexdigest()
+        file_path = os.path.join(self.cache_dir, f"{digest}{suffix}")
+        if not os.path.exists(file_path):
+            self._write_file(file_path, data)
+        asset = _Asset(data=data, file_path=file_path)
+        self._entries[key] = asset
+        self._size += len(data)
+        self._evict()
+        return asset
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, asset = self._entries.popitem(last=False)
+            self._size -= len(asset.data)
+            if any(other.file_path == asset.file_path for other in self._entries.values()):
+                continue
+            try:
+                os.unlink(asset.file_path)
+            except OSError:
+                pass
+
+    def get(self, path: str) -> _Asset:
+        with self._lock:
+            key = self._latest.get(path)
+            if key is not None:
+                asset = self._lookup(key)
+                if asset is not None:
+                    return asset
+
+            blob = self.storage.get_blob(path)
+            if blob is None:
+                raise FileNotFoundError(f"Asset not found in storage: {path}")
+            key = (path, blob.generation)
+            self._latest.set(path, key)
+            asset = self._lookup(key)
+            if asset is not None:
+                return asset
+            return self._store(key, blob.download_as_bytes(), os.path.splitext(path)[1])
+
+    def local_path(self, path: str) -> str:
+        return self.get(path).file_path
+
+    def get_bytes(self, path: str) -> bytes:
+        return self.get(path).data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._latest.clear()
@@ -1,5 +1,9 @@
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -8,16 +12,30 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch    
 from reportlab.platypus import Spacer
 from reportlab.platypus import Image
-import tempfile
 from config.firebase_config import bucket
+from config.pdf_config import (
+    PDF_BATCH_MAX_WORKERS,
+    PDF_BATCH_MEMORY_MB,
+    PDF_BATCH_POOL_THRESHOLD,
+    PDF_BATCH_VCPU,
+    PDF_WORKER_MEMORY_MB,
+)
 from io import BytesIO
-from weasyprint import HTML
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
 from models import EventPurchaseAccessType
 from utils.events_utils import map_purchase_mode
 from dto.templates import MembershipCardPdfPayload, TicketPdfPayload
 from services.templates import render_template
+from utils.asset_cache import AssetCache
 
 _ASSETS_DIR = Path(__file__).resolve().parents[1] / "assets"
+_asset_cache = AssetCache(bucket)
+_MEMBER_TICKET_CSS = Path(__file__).resolve().parents[1] / "templates" / "pdf" / "member_ticket.css"
+
+# Stato per processo (worker del pool o processo principale): font e CSS parsati una volta.
+_font_config = None
+_member_ticket_stylesheets = None
 
 
 def _resolve_local_asset(image_path):
@@ -25,6 +43,12 @@ def _resolve_local_asset(image_path):
         return None
     if os.path.isabs(image_path) and os.path.exists(image_path):
         return image_path
+    return _resolve_bundled_asset(image_path)
+
+
+@lru_cache(maxsize=64)
+def _resolve_bundled_asset(image_path):
+    # Gli asset in assets/ fanno parte del deploy: il risultato non cambia per tutta la vita del processo.
     candidate = _ASSETS_DIR / image_path
     if candidate.exists():
         return str(candidate)
@@ -73,7 +97,7 @@ def generate_membership_pdf(membership_data, logo_path, pattern_path):
 
 
 
-def generate_member_ticket_pdf_html(ticket_data, event_data, logo_url):
+def generate_member_ticket_pdf_html(ticket_data, event_data, logo_url, inline_styles=True):
     first_name = ticket_data.get("name", "")
     last_name = ticket_data.get("surname", "")
     full_name = f"{first_name} {last_name}".strip()
@@ -90,6 +114,7 @@ def generate_member_ticket_pdf_html(ticket_data, event_data, logo_url):
         date=date or "",
         time=time,
         location=location or "",
+        inline_styles=inline_styles,
     )
     return render_template("pdf/member_ticket.html", payload)
 
@@ -114,13 +139,7 @@ def download_image_from_firebase(image_path):
     local_asset = _resolve_local_asset(image_path)
     if local_asset:
         return local_asset
-
-    blob = bucket.blob(image_path)
-    
-    _, temp_local_filename = tempfile.mkstemp()
-    blob.download_to_filename(temp_local_filename)
-    
-    return temp_local_filename
+    return _asset_cache.local_path(image_path)
 
 
 
@@ -175,3 +194,71 @@ def generate_ticket_pdf_reportlab(ticket_data, event_data, logo_path):
     doc.build(elements)
     buffer.seek(0)
     return buffer
+
+
+def _init_pdf_worker():
+    global _font_config, _member_ticket_stylesheets
+    _font_config = FontConfiguration()
+    _member_ticket_stylesheets = [CSS(filename=str(_MEMBER_TICKET_CSS), font_config=_font_config)]
+
+
+def _render_member_ticket_pdf(html: str) -> bytes:
+    if _font_config is None:
+        _init_pdf_worker()
+    return HTML(string=html, base_url=".").write_pdf(
+        stylesheets=_member_ticket_stylesheets,
+        font_config=_font_config,
+    )
+
+
+def _render_reportlab_ticket_pdf(job) -> bytes:
+    ticket_data, event_data, local_logo_path = job
+    return generate_ticket_pdf_reportlab(ticket_data, event_data, local_logo_path).getvalue()
+
+
+def _pdf_pool_size(max_workers: Optional[int], job_count: int) -> int:
+    # Il processo principale resta vivo accanto ai worker: la sua quota di memoria non e' disponibile.
+    memory_workers = PDF_BATCH_MEMORY_MB // PDF_WORKER_MEMORY_MB - 1
+    return min(max_workers or PDF_BATCH_MAX_WORKERS, PDF_BATCH_VCPU, memory_workers, job_count)
+
+
+def _run_pdf_jobs(render, jobs: List[Any], max_workers: Optional[int]) -> List[bytes]:
+    workers = _pdf_pool_size(max_workers, len(jobs))
+    if workers <= 1 or len(jobs) < PDF_BATCH_POOL_THRESHOLD:
+        return [render(job) for job in jobs]
+    # spawn: il fork di un processo con canali gRPC (Firestore) aperti non e' sicuro.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_pdf_worker) as pool:
+        return list(pool.map(render, jobs))
+
+
+def generate_ticket_pdfs(
+    tickets: List[Dict[str, Any]],
+    event_data: Dict[str, Any],
+    logo_path: str,
+    max_workers: Optional[int] = None,
+) -> List[BytesIO]:
+    """
+    Genera i PDF di piu' partecipanti dello stesso evento, nello stesso ordine di ``tickets``.
+    Logo, font e foglio di stile sono risolti una volta per batch (per worker); il
+    rendering WeasyPrint/ReportLab va su un pool di processi solo se vCPU e memoria
+    configurate in ``config.pdf_config`` lo consentono, altrimenti resta in linea.
+    """
+    if not tickets:
+        return []
+    purchase_mode = map_purchase_mode(event_data.get("purchaseMode") or event_data.get("type"))
+    local_logo_path = download_image_from_firebase(logo_path)
+
+    if purchase_mode in (
+        EventPurchaseAccessType.ONLY_MEMBERS,
+        EventPurchaseAccessType.ONLY_ALREADY_REGISTERED_MEMBERS,
+    ):
+        jobs = [
+            generate_member_ticket_pdf_html(ticket, event_data, local_logo_path, inline_styles=False)
+            for ticket in tickets
+        ]
+        rendered = _run_pdf_jobs(_render_member_ticket_pdf, jobs, max_workers)
+    else:
+        jobs = [(ticket, event_data, local_logo_path) for ticket in tickets]
+        rendered = _run_pdf_jobs(_render_reportlab_ticket_pdf, jobs, max_workers)
+    return [BytesIO(data) for data in rendered]
@@ -0,0 +1,96 @@
+"""
+Serializzazione a chunk per gli export admin (CSV e NDJSON).
+
+Le righe arrivano da un generatore (tipicamente ``repository.stream()``) e
+vengono scritte a blocchi di ``chunk_rows``: in memoria resta un solo blocco,
+non l'intera collection. Il primo chunk (intestazione CSV o prima riga NDJSON)
+esce subito, cosi' il client riceve il primo byte prima che lo stream finisca.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+EXPORT_CHUNK_ROWS = 200
+# BOM: Excel apre il CSV come UTF-8 (accenti nei nomi) invece che come ANSI.
+CSV_BOM = "\ufeff"
+# Celle testuali che Excel/Sheets interpreterebbero come formula (CSV injection):
+# vengono prefissate con un apice, che il foglio mostra come testo.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def _neutralize_formula(value: str) -> str:
+    return "'" + value if value.startswith(CSV_FORMULA_PREFIXES) else value
+
+
+def csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, str):
+        return _neutralize_formula(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return ";".join(str(csv_value(item)) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    return value
+
+
+def _chunked(lines: Iterable[str], chunk_rows: int) -> Iterator[str]:
+    buffer = []
+    for index, line in enumerate(lines):
+        buffer.append(line)
+        if index == 0 or len(buffer) >= chunk_rows:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def csv_chunks(
+    rows: Iterable[Dict[str, Any]],
+    columns: Sequence[str],
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[str]:
+    def lines() -> Iterator[str]:
+        out = io.StringIO()
+        writer = csv.writer(out)
+
+        def render(values) -> str:
+            writer.writerow(values)
+            line = out.getvalue()
+            out.seek(0)
+            out.truncate()
+            return line
+
+        yield CSV_BOM + render(columns)
+        for row in rows:
+            yield render([csv_value(row.get(column)) for column in columns])
+
+    return _chunked(lines(), chunk_rows)
+
+
+def ndjson_chunks(
+    rows: Iterable[Dict[str, Any]],
+    columns: Sequence[str],
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[str]:
+    lines = (
+        json.dumps({column: row.get(column) for column in columns}, default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+    return _chunked(lines, chunk_rows)
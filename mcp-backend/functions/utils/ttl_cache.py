@@ -0,0 +1,69 @@
+"""
+Cache in-process con scadenza (TTL) per letture calde e ripetute.
+
+Le istanze Cloud Functions restano calde tra una richiesta e l'altra, quindi
+gli stessi documenti (evento del checkout, token dello scanner) possono essere
+serviti dalla memoria. La cache e' locale all'istanza: le invalidazioni
+esplicite valgono solo qui, le altre istanze vedono il dato nuovo al piu'
+dopo ``ttl_seconds``. Tenere il TTL breve per i dati che autorizzano azioni.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List
+
+_REGISTRY: List["TTLCache"] = []
+
+
+class TTLCache:
+    """Mappa LRU limitata a ``maxsize`` voci, ognuna valida per ``ttl_seconds``."""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        maxsize: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def clear_all_caches() -> None:
+    """Svuota tutte le cache dell'istanza (usato dai test e dagli script)."""
+    for cache in _REGISTRY:
+        cache.clear()
@@ -71,6 +71,8 @@ import { resolvePurchaseMode } from "@/config/events-utils"
 import { getMembershipPrice, getMemberships } from "@/services/admin/memberships"
 import { endpoints } from "@/config/endpoints"
 import { safeFetch } from "@/lib/fetch"
+import { exportParticipants } from "@/services/admin/exports"
+import { useError } from "@/contexts/errorContext"
 
 const ADMIN_THEME = {
   "--color-black": "#0a0a0a",
@@ -200,6 +202,8 @@ export default function EventContent({ id: eventId }) {
   const [omaggioSearch, setOmaggioSearch] = useState("")
   const [omaggioEntryTime, setOmaggioEntryTime] = useState("")
   const [omaggioSending, setOmaggioSending] = useState(false)
+  const [exportCsvLoading, setExportCsvLoading] = useState(false)
+  const { setError } = useError()
   const [omaggioRowSendingId, setOmaggioRowSendingId] = useState(null)
   const [omaggioResult, setOmaggioResult] = useState(null)
   const [omaggioPage, setOmaggioPage] = useState(1)
@@ -681,6 +685,14 @@ export default function EventContent({ id: eventId }) {
     exportParticipantsToExcel(sorted, event?.title, eventId)
   }
 
+  // CSV generato dal backend in streaming: include tutti i partecipanti, non solo quelli filtrati.
+  const exportToCsv = async () => {
+    setExportCsvLoading(true)
+    const res = await exportParticipants(eventId, { format: "csv" })
+    setExportCsvLoading(false)
+    if (res?.error) setError(res.error)
+  }
+
   const exportOmaggioToExcel = () => {
     exportParticipantsToExcel(sortedOmaggi, event?.title ? `${event.title} - Omaggi` : "Omaggi", eventId)
   }
@@ -1055,6 +1067,9 @@ export default function EventContent({ id: eventId }) {
                     <Button onClick={() => openParticipantModal()}><Plus className="mr-2 h-4 w-4" /> Aggiungi</Button>
                     <Button onClick={() => openLocationModalForAll("tutti")}><Send className="mr-2 h-4 w-4" /> Location</Button>
                     <Button onClick={exportToExcel} disabled={!sorted.length}><Download className="mr-2 h-4 w-4" /> Esporta</Button>
+                    <Button variant="outline" onClick={exportToCsv} disabled={exportCsvLoading}>
+                      {exportCsvLoading ? <Loader2 className="mr-2 h-4 w-4 animate-spin" /> : <Download className="mr-2 h-4 w-4" />} CSV
+                    </Button>
                     <Button onClick={exportToTxt} disabled={!regularParticipants.length}><FileText className="mr-2 h-4 w-4" /> TXT</Button>
                     <Button variant="outline" onClick={exportRiduzioneTxt} disabled={!regularParticipants.filter(p => !!p.riduzione).length}>
                       <FileText className="mr-2 h-4 w-4" /> TXT Riduzione
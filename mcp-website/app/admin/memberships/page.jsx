@@ -24,6 +24,7 @@ import { useAdminEvents } from "@/hooks/useAdminEvents"
 import { MembershipModal } from "@/components/admin/memberships/MembershipsModal"
 import { useError } from "@/contexts/errorContext"
 import { getMembershipsReport } from "@/services/admin/memberships"
+import { exportMemberships } from "@/services/admin/exports"
 import { AdminPageHeader } from "@/components/admin/AdminPageChrome"
 import { safeFetch } from "@/lib/fetch"
 import { endpoints } from "@/config/endpoints"
@@ -97,6 +98,7 @@ export default function MembershipsPage() {
   )
   const [selectedEventId, setSelectedEventId] = useState(stored.selectedEventId || "")
   const [exportEventLoading, setExportEventLoading] = useState(false)
+  const [exportCsvLoading, setExportCsvLoading] = useState(false)
   const [sortBy, setSortBy] = useState(stored.sortBy || "name_asc")
   const [page, setPage] = useState(1)
   const [pageSize, setPageSize] = useState(stored.pageSize || 25)
@@ -156,6 +158,14 @@ export default function MembershipsPage() {
     XLSX.writeFile(wb, `membri_${Date.now()}.xlsx`)
   }
 
+  // Export completo dell'anno generato dal backend in streaming (non limitato alle righe caricate).
+  const exportCsv = async () => {
+    setExportCsvLoading(true)
+    const res = await exportMemberships({ year: selectedYear, format: "csv" })
+    setExportCsvLoading(false)
+    if (res?.error) setError(res.error)
+  }
+
   const exportEventExcel = async () => {
     if (!selectedEventId) {
       setError("Seleziona un evento per esportare.")
@@ -517,6 +527,10 @@ export default function MembershipsPage() {
               <Download className="mr-2 h-4 w-4" />
               Esporta
             </Button>
+            <Button onClick={exportCsv} disabled={exportCsvLoading} className="flex-1" variant="outline">
+              {exportCsvLoading ? <Loader2 className="mr-2 h-4 w-4 animate-spin" /> : <Download className="mr-2 h-4 w-4" />}
+              CSV completo
+            </Button>
             <Button onClick={exportManualMembers} className="flex-1" variant="outline">
               <Download className="mr-2 h-4 w-4" />
               Esporta onorari
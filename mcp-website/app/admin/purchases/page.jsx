@@ -2,7 +2,7 @@
 
 import { useState, useEffect, useMemo, useCallback } from "react"
 import { useRouter, useSearchParams } from "next/navigation"
-import { Loader2, Eye } from "lucide-react"
+import { Loader2, Eye, Download } from "lucide-react"
 import { motion } from "framer-motion"
 import { routes } from "@/config/routes"
 
@@ -18,6 +18,8 @@ import { useAdminPurchases } from "@/hooks/useAdminPurchases"
 import { useAdminEvents } from "@/hooks/useAdminEvents"
 import { PurchaseModal } from "@/components/admin/purchases/PurchaseModal"
 import { AdminPageHeader } from "@/components/admin/AdminPageChrome"
+import { useError } from "@/contexts/errorContext"
+import { exportPurchases } from "@/services/admin/exports"
 
 const PURCHASE_STATUSES = ["COMPLETED", "REFUNDED", "CANCELLED", "VOIDED", "FAILED", "DECLINED", "ERROR"]
 const INVALID_STATUSES = new Set(["FAILED", "CANCELLED", "VOIDED", "REFUNDED", "DECLINED", "ERROR"])
@@ -36,6 +38,7 @@ export default function PurchasesPage() {
   const legacyPurchaseId = searchParams.get("purchaseId")
   const { purchases, loading, updateStatus } = useAdminPurchases()
   const { events } = useAdminEvents()
+  const { setError } = useError()
 
   const filtersKey = "mcp_admin_purchases_filters"
   const readFilters = () => {
@@ -59,6 +62,7 @@ export default function PurchasesPage() {
   const [selectedPurchase, setSelectedPurchase] = useState(null)
   const [dateKey, setDateKey] = useState(0)
   const [savingIds, setSavingIds] = useState(new Set())
+  const [exportLoading, setExportLoading] = useState(false)
 
   useEffect(() => {
     if (legacyPurchaseId) {
@@ -88,6 +92,13 @@ export default function PurchasesPage() {
     }
   }
 
+  const handleExport = async () => {
+    setExportLoading(true)
+    const res = await exportPurchases({ format: "csv" })
+    setExportLoading(false)
+    if (res?.error) setError(res.error)
+  }
+
   const handleStatusChange = useCallback(async (purchaseId, newStatus) => {
     setSavingIds(prev => new Set(prev).add(purchaseId))
     await updateStatus(purchaseId, newStatus)
@@ -173,6 +184,12 @@ export default function PurchasesPage() {
           description="Consulta e filtra gli acquisti registrati."
           backHref={routes.admin.dashboard}
           backLabel="Torna alla dashboard"
+          actions={
+            <Button variant="outline" onClick={handleExport} disabled={exportLoading}>
+              {exportLoading ? <Loader2 className="mr-2 h-4 w-4 animate-spin" /> : <Download className="mr-2 h-4 w-4" />}
+              Esporta CSV
+            </Button>
+          }
         />
 
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-4">
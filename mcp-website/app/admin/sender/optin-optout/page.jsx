@@ -11,7 +11,8 @@ import { Card, CardContent } from "@/components/ui/card"
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table"
 import { Skeleton } from "@/components/ui/skeleton"
 import { routes } from "@/config/routes"
-import { getNewsletterSignups, getNewsletterConsents } from "@/services/admin/newsletter"
+import { getNewsletterSignupsPage, getNewsletterConsentsPage } from "@/services/admin/newsletter"
+import { ADMIN_TABLE_PAGE_SIZE, fetchAllPages } from "@/lib/fetch"
 import { getAllEventsAdmin } from "@/services/admin/events"
 import { AdminPageHeader } from "@/components/admin/AdminPageChrome"
 
@@ -187,9 +188,13 @@ export default function OptInOptOutPage() {
     setLoading(true)
     setError(null)
     try {
-      const [s, c, events] = await Promise.all([getNewsletterSignups(), getNewsletterConsents(), getAllEventsAdmin()])
-      setSignups(Array.isArray(s?.signups) ? s.signups : [])
-      setConsents(Array.isArray(c?.consents) ? c.consents : [])
+      const [s, c, events] = await Promise.all([
+        fetchAllPages((cursor) => getNewsletterSignupsPage({ cursor, page_size: ADMIN_TABLE_PAGE_SIZE }), setSignups),
+        fetchAllPages((cursor) => getNewsletterConsentsPage({ cursor, page_size: ADMIN_TABLE_PAGE_SIZE }), setConsents),
+        getAllEventsAdmin(),
+      ])
+      setSignups(Array.isArray(s) ? s : [])
+      setConsents(Array.isArray(c) ? c : [])
       const eventRows = Array.isArray(events) ? events : []
       const mappedTitles = eventRows.reduce((acc, event) => {
         const id = safeStr(event?.id)
@@ -90,6 +90,10 @@ export const endpoints = {
     createPurchase: make("create_purchase"),
     updatePurchaseStatus: make("update_purchase_status"),
     deletePurchase: make("delete_purchase"),
+
+    exportParticipants: make("admin_export_participants"),
+    exportMemberships: make("admin_export_memberships"),
+    exportPurchases: make("admin_export_purchases"),
     getGeneralStats: make("admin_get_general_stats"),
     getDashboardSnapshot: make("admin_get_dashboard_snapshot"),
     getAnalyticsEventSnapshot: make("admin_get_analytics_event_snapshot"),
@@ -99,6 +103,7 @@ export const endpoints = {
     getEntranceFlow: make("admin_get_entrance_flow"),
     getSalesOverTime: make("admin_get_sales_over_time"),
     getAudienceRetention: make("admin_get_audience_retention"),
+    getAttendanceCohorts: make("admin_get_attendance_cohorts"),
     getRevenueBreakdown: make("admin_get_revenue_breakdown"),
     getEventFunnel: make("admin_get_event_funnel"),
     getGenderDistribution: make("admin_get_gender_distribution"),
@@ -116,6 +121,11 @@ export const endpoints = {
       verifyScanToken: make("entrance_verify_scan_token"),
       deactivateScanToken: make("entrance_deactivate_scan_token"),
       manualEntry: make("entrance_manual_entry"),
+      validateBatch: make("entrance_validate_batch"),
+      scannerManifest: make("entrance_scanner_manifest"),
+      syncScans: make("entrance_sync_scans"),
+      liveStats: make("entrance_live_stats"),
+      adminLiveStats: make("entrance_admin_live_stats"),
     },
     
     
@@ -2,8 +2,9 @@
 
 import { useState, useCallback, useEffect, useRef } from "react";
 import { useError } from "@/contexts/errorContext";
+import { ADMIN_TABLE_PAGE_SIZE, fetchAllPages } from "@/lib/fetch";
 import {
-  getMemberships,
+  getMembershipsPage,
   getMembershipById,
   getMembershipPurchases,
   getMembershipEvents,
@@ -56,14 +57,14 @@ export function useAdminMemberships(options = {}) {
     const year = yearOverride !== undefined ? yearOverride : selectedYear;
     setLoading(true);
     try {
-      const res = await getMemberships(year);
+      const byStartDate = (rows) => rows.sort((a, b) => new Date(b.start_date) - new Date(a.start_date));
+      const res = await fetchAllPages(
+        (cursor) => getMembershipsPage({ year, cursor, page_size: ADMIN_TABLE_PAGE_SIZE }),
+        (rows) => setMemberships(byStartDate(rows))
+      );
       if (res?.error) {
         setError(res.error);
         setMemberships([]);
-      } else {
-        setMemberships(
-          res.sort((a, b) => new Date(b.start_date) - new Date(a.start_date))
-        );
       }
     } catch (e) {
       console.error("loadMemberships error", e);
@@ -1,7 +1,8 @@
 import { useEffect, useState, useCallback, useMemo } from "react"
 import { useError } from "@/contexts/errorContext"
+import { ADMIN_TABLE_PAGE_SIZE, fetchAllPages } from "@/lib/fetch"
 import {
-  getAllMessages,
+  getMessagesPage,
   getMessageById,
   deleteMessage,
   replyToMessage,
@@ -15,11 +16,12 @@ export function useAdminMessages() {
   const loadMessages = useCallback(async () => {
     setLoading(true)
     try {
-      const data = await getAllMessages()
+      const data = await fetchAllPages(
+        (cursor) => getMessagesPage({ cursor, sort: "name", page_size: ADMIN_TABLE_PAGE_SIZE }),
+        setMessages
+      )
       if (data?.error) {
         setError(data.error)
-      } else {
-        setMessages(data || [])
       }
     } catch (err) {
       console.error("Errore caricamento messaggi:", err)
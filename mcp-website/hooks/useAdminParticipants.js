@@ -2,8 +2,9 @@
 
 import { useState, useCallback, useEffect, useRef } from "react";
 import { useError } from "@/contexts/errorContext";
+import { ADMIN_TABLE_PAGE_SIZE, fetchAllPages } from "@/lib/fetch";
 import {
-  getParticipantsByEvent,
+  getParticipantsPage,
   getParticipantById,
   createParticipant as createParticipantService,
   updateParticipant as updateParticipantService,
@@ -35,21 +36,24 @@ export function useAdminParticipants(eventId) {
     if (!eventId) return;
     setLoading(true);
     try {
-      const res = await getParticipantsByEvent(eventId);
-      if (res?.error) {
-        setError(res.error);
-        setParticipants([]);
-      } else {
-        // ordina per creation timestamp crescente
-        const sorted = (res || []).sort((a, b) => {
+      // ordina per creation timestamp crescente
+      const toRows = (rows) => rows
+        .sort((a, b) => {
           const ta = a.createdAt?.seconds || 0;
           const tb = b.createdAt?.seconds || 0;
           return ta - tb;
-        });
-        setParticipants(sorted.map(p => ({
+        })
+        .map(p => ({
           ...p,
           isMember: !!p.membership_included
-        })));
+        }));
+      const res = await fetchAllPages(
+        (cursor) => getParticipantsPage(eventId, { cursor, page_size: ADMIN_TABLE_PAGE_SIZE }),
+        (rows) => setParticipants(toRows(rows))
+      );
+      if (res?.error) {
+        setError(res.error);
+        setParticipants([]);
       }
     } catch (e) {
       setError("Errore caricamento partecipanti.");
@@ -2,8 +2,9 @@
 
 import { useState, useCallback, useEffect } from "react";
 import { useError } from "@/contexts/errorContext";
+import { ADMIN_TABLE_PAGE_SIZE, fetchAllPages } from "@/lib/fetch";
 import {
-  getAllPurchases,
+  getPurchasesPage,
   getPurchaseById,
   createPurchase as createPurchaseService,
   updatePurchaseStatus as updatePurchaseStatusService,
@@ -19,12 +20,13 @@ export function useAdminPurchases() {
   const loadAll = useCallback(async () => {
     setLoading(true);
     try {
-      const res = await getAllPurchases();
+      const res = await fetchAllPages(
+        (cursor) => getPurchasesPage({ cursor, page_size: ADMIN_TABLE_PAGE_SIZE }),
+        setPurchases
+      );
       if (res?.error) {
         setError(res.error);
         setPurchases([]);
-      } else {
-        setPurchases(res);
       }
     } catch (e) {
       console.error("loadAllPurchases error", e);
@@ -1,6 +1,41 @@
 import { getToken as getAdminToken } from "@/config/firebase"
 import { getApiErrorMessage } from "@/lib/api-errors"
 
+/**
+ * Parametri delle liste admin paginate: { page_size, cursor, sort, fields }.
+ * `fields` puo' essere un array; i valori vuoti vengono omessi.
+ */
+export function pageQuery(params = {}) {
+  const search = new URLSearchParams()
+  Object.entries(params).forEach(([key, value]) => {
+    if (value === undefined || value === null || value === "") return
+    search.set(key, Array.isArray(value) ? value.join(",") : String(value))
+  })
+  return search.toString()
+}
+
+// Righe per richiesta quando una tabella admin scorre tutta la lista a pagine.
+export const ADMIN_TABLE_PAGE_SIZE = 200
+
+/**
+ * Scorre una lista paginata ({ items, next_cursor }) fino all'ultima pagina.
+ * `fetchPage(cursor)` chiama l'helper `get*Page`; `onPage(rows)` riceve le righe
+ * accumulate dopo ogni pagina, cosi' la tabella si popola senza attendere la fine.
+ * Ritorna l'array completo oppure la risposta `{ error }` della prima pagina fallita.
+ */
+export async function fetchAllPages(fetchPage, onPage) {
+  const rows = []
+  let cursor
+  do {
+    const res = await fetchPage(cursor)
+    if (res?.error) return res
+    rows.push(...(Array.isArray(res?.items) ? res.items : []))
+    if (onPage) onPage([...rows])
+    cursor = res?.next_cursor
+  } while (cursor)
+  return rows
+}
+
 /**
  * Safe fetch con gestione token, header, errori.
  */
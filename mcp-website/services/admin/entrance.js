@@ -39,3 +39,16 @@ export async function deactivateScanToken(token) {
 export async function manualEntry(event_id, membership_id, entered) {
   return safeFetch(endpoints.admin.entrance.manualEntry, "POST", { event_id, membership_id, entered });
 }
+
+// Long-poll: passare il `cursor` dell'ultima risposta; con changed=false si richiama subito.
+export async function getLiveStats(token, cursor = null) {
+  const params = new URLSearchParams({ token });
+  if (cursor !== null && cursor !== undefined) params.set("cursor", String(cursor));
+  return safeFetch(`${endpoints.admin.entrance.liveStats}?${params.toString()}`, "GET");
+}
+
+export async function getAdminLiveStats(eventId, cursor = null) {
+  const params = new URLSearchParams({ event_id: eventId });
+  if (cursor !== null && cursor !== undefined) params.set("cursor", String(cursor));
+  return safeFetch(`${endpoints.admin.entrance.adminLiveStats}?${params.toString()}`, "GET");
+}
@@ -0,0 +1,52 @@
+import { endpoints } from "@/config/endpoints"
+import { getToken as getAdminToken } from "@/config/firebase"
+import { getApiErrorMessage } from "@/lib/api-errors"
+import { pageQuery } from "@/lib/fetch"
+
+// Export generati lato server in streaming (CSV o NDJSON).
+// params: { format: "csv" | "ndjson", columns: [...] } piu' i filtri dell'export.
+async function downloadExport(url, params = {}) {
+  try {
+    const token = await getAdminToken()
+    if (!token) return { error: "Token non disponibile" }
+
+    const query = pageQuery(params)
+    const response = await fetch(query ? `${url}?${query}` : url, {
+      headers: { Authorization: `Bearer ${token}` },
+      cache: "no-store",
+    })
+
+    if (!response.ok) {
+      const data = await response.json().catch(() => null)
+      return { error: getApiErrorMessage(data, "Export non riuscito") }
+    }
+
+    const disposition = response.headers.get("Content-Disposition") || ""
+    const filename = disposition.match(/filename="([^"]+)"/)?.[1] || `export.${params.format || "csv"}`
+    const blob = await response.blob()
+
+    const href = window.URL.createObjectURL(blob)
+    const a = document.createElement("a")
+    a.style.display = "none"
+    a.href = href
+    a.download = filename
+    document.body.appendChild(a)
+    a.click()
+    window.URL.revokeObjectURL(href)
+    document.body.removeChild(a)
+
+    return { success: true, filename }
+  } catch (error) {
+    console.error("Errore export:", error)
+    return { error: "Errore di rete o del server." }
+  }
+}
+
+export const exportParticipants = (eventId, params = {}) =>
+  downloadExport(endpoints.admin.exportParticipants, { event_id: eventId, ...params })
+
+export const exportMemberships = (params = {}) =>
+  downloadExport(endpoints.admin.exportMemberships, params)
+
+export const exportPurchases = (params = {}) =>
+  downloadExport(endpoints.admin.exportPurchases, params)
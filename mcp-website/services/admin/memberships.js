@@ -1,4 +1,4 @@
-import { safeFetch } from "@/lib/fetch";
+import { pageQuery, safeFetch } from "@/lib/fetch";
 import { endpoints } from "@/config/endpoints";
 
 // CRUD & Azioni extra
@@ -10,6 +10,11 @@ export async function getMemberships(year) {
   return safeFetch(url, "GET");
 }
 
+// Pagina di membership: { items, next_cursor }. Passa next_cursor come `cursor` per la successiva.
+export async function getMembershipsPage({ year, ...page } = {}) {
+  return safeFetch(`${endpoints.admin.getMemberships}?${pageQuery({ year, page_size: 50, ...page })}`, "GET");
+}
+
 export async function getMembershipById(membership_id) {
   const endpointUrl = `${endpoints.admin.getMembershipById}?id=${membership_id}`;
   return safeFetch(endpointUrl, "GET");
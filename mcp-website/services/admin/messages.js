@@ -1,11 +1,16 @@
 import { endpoints } from "@/config/endpoints"
-import { safeFetch } from "@/lib/fetch"
+import { pageQuery, safeFetch } from "@/lib/fetch"
 
 // GET: tutti i messaggi
 export async function getAllMessages() {
   return await safeFetch(endpoints.admin.getAllMessages)
 }
 
+// GET: pagina di messaggi ({ items, next_cursor })
+export async function getMessagesPage(page = {}) {
+  return await safeFetch(`${endpoints.admin.getAllMessages}?${pageQuery({ page_size: 50, ...page })}`)
+}
+
 // GET: messaggio singolo per ID
 export async function getMessageById(id) {
   if (!id) return { error: "ID mancante" }
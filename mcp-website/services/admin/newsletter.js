@@ -1,5 +1,5 @@
 import { endpoints } from "@/config/endpoints"
-import { safeFetch } from "@/lib/fetch"
+import { pageQuery, safeFetch } from "@/lib/fetch"
 
 export const getNewsletterSignups = (signupId = null) =>
   safeFetch(
@@ -12,6 +12,13 @@ export const getNewsletterSignups = (signupId = null) =>
 export const getNewsletterConsents = () =>
   safeFetch(endpoints.admin.newsletter.getConsents, "GET")
 
+// Pagine { items, next_cursor }: passa next_cursor come `cursor` per la successiva.
+export const getNewsletterSignupsPage = (page = {}) =>
+  safeFetch(`${endpoints.admin.newsletter.getSignups}?${pageQuery({ page_size: 50, ...page })}`, "GET")
+
+export const getNewsletterConsentsPage = (page = {}) =>
+  safeFetch(`${endpoints.admin.newsletter.getConsents}?${pageQuery({ page_size: 50, ...page })}`, "GET")
+
 export const updateNewsletterSignup = (signupId, data) =>
   safeFetch(endpoints.admin.newsletter.getSignups, "PUT", { id: signupId, ...data })
 
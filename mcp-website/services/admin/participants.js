@@ -6,6 +6,11 @@ export async function getParticipantsByEvent(eventId) {
   return safeFetch(endpoints.admin.getParticipantsByEvent, 'POST', { eventId })
 }
 
+// Pagina di partecipanti: { items, next_cursor }
+export async function getParticipantsPage(eventId, page = {}) {
+  return safeFetch(endpoints.admin.getParticipantsByEvent, 'POST', { eventId, page_size: 50, ...page })
+}
+
 export async function getParticipantById(participantId) {
   return safeFetch(endpoints.admin.getParticipantById, 'POST', { participantId })
 }
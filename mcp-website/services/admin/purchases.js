@@ -1,12 +1,16 @@
 // services/admin/purchases.js
 
-import { safeFetch } from "@/lib/fetch";
+import { pageQuery, safeFetch } from "@/lib/fetch";
 import { endpoints } from "@/config/endpoints";
 
 export async function getAllPurchases() {
   return safeFetch(endpoints.admin.getAllPurchases, "GET");
 }
 
+export async function getPurchasesPage(page = {}) {
+  return safeFetch(`${endpoints.admin.getAllPurchases}?${pageQuery({ page_size: 50, ...page })}`, "GET");
+}
+
 export async function getPurchase() {
   return safeFetch(endpoints.admin.getPurchase, "GET");
 }
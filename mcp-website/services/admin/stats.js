@@ -47,6 +47,11 @@ export async function getAudienceRetention(eventId) {
   return safeFetch(`${endpoints.admin.getAudienceRetention}?event_id=${encodeURIComponent(eventId)}`, "GET")
 }
 
+export async function getAttendanceCohorts({ lastEvents = 6, minAttended = 2 } = {}) {
+  const params = new URLSearchParams({ last_events: String(lastEvents), min_attended: String(minAttended) })
+  return safeFetch(`${endpoints.admin.getAttendanceCohorts}?${params.toString()}`, "GET")
+}
+
 export async function getRevenueBreakdown(eventId) {
   if (!eventId) return { error: "eventId mancante" }
   return safeFetch(`${endpoints.admin.getRevenueBreakdown}?event_id=${encodeURIComponent(eventId)}`, "GET")